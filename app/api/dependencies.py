@@ -1,37 +1,28 @@
 """API dependencies - dependency injection for FastAPI."""
 
-from typing import Generator
+from collections.abc import Generator
+from typing import TYPE_CHECKING
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import Session, sessionmaker
-
-from app.domain.transformers import (
-    PandasBronzeToSilverTransformer,
-    PandasSilverToGoldTransformer,
-    SparkBronzeToSilverTransformer,
-    SparkSilverToGoldTransformer,
-)
+from app.infrastructure.engines import create_repository, create_transformers
 from app.infrastructure.repositories.base import BaseRepository
-from app.infrastructure.repositories.pandas_repository import PandasRepository
-from app.infrastructure.repositories.spark_repository import SparkRepository
 from app.infrastructure.settings import get_settings
 
+if TYPE_CHECKING:
+    from sqlalchemy.orm import Session
+
 
 def get_repository() -> BaseRepository:
     """
     Get repository based on execution mode.
 
+    The engine's modules are imported by the first request that needs
+    them, not when the app starts.
+
     Returns:
         Repository instance
     """
-    settings = get_settings()
-    
-    if settings.execution_mode == "local":
-        return PandasRepository(settings)
-    elif settings.execution_mode == "databricks":
-        return SparkRepository(settings)
-    else:
-        raise ValueError(f"Unknown execution mode: {settings.execution_mode}")
+    repository: BaseRepository = create_repository(get_settings())
+    return repository
 
 
 def get_transformers() -> tuple:
@@ -41,35 +32,26 @@ def get_transformers() -> tuple:
     Returns:
         Tuple of (bronze_to_silver, silver_to_gold) transformers
     """
-    settings = get_settings()
-    
-    if settings.execution_mode == "local":
-        return (
-            PandasBronzeToSilverTransformer(),
-            PandasSilverToGoldTransformer(),
-        )
-    elif settings.execution_mode == "databricks":
-        return (
-            SparkBronzeToSilverTransformer(),
-            SparkSilverToGoldTransformer(),
-        )
-    else:
-        raise ValueError(f"Unknown execution mode: {settings.execution_mode}")
+    return create_transformers(get_settings())
 
 
 def get_db_engine():
     """Get database engine."""
+    from sqlalchemy import create_engine
+
     settings = get_settings()
     return create_engine(settings.database_url)
 
 
 def get_session_maker():
     """Get SQLAlchemy session maker."""
+    from sqlalchemy.orm import sessionmaker
+
     engine = get_db_engine()
     return sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
-def get_db() -> Generator[Session, None, None]:
+def get_db() -> Generator["Session", None, None]:
     """
     Get database session.
 
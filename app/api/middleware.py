@@ -0,0 +1,132 @@
+"""API middleware - per-request runtime metrics and opt-in profiling."""
+
+import time
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from app.infrastructure.logging import get_logger
+from app.infrastructure.monitoring import MetricsCollector, get_metrics_collector
+from app.infrastructure.profiling import StageProfiler
+from app.infrastructure.settings import Settings
+
+logger = get_logger(__name__)
+
+# Request header that asks for a profile of the request
+PROFILE_HEADER = b"x-profile"
+
+# Response header naming the directory the profile was written to
+PROFILE_PATH_HEADER = b"x-profile-path"
+
+# Histogram buckets for response sizes in bytes
+RESPONSE_SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Route label of requests that matched no route (keeps label values bounded)
+UNMATCHED_ROUTE = "unmatched"
+
+
+class RequestMetricsMiddleware:
+    """
+    Records latency, response size and status of every HTTP request.
+
+    Written as plain ASGI middleware rather than on BaseHTTPMiddleware, so
+    responses are streamed through unchanged and the body size is counted
+    as it is sent. Requests are labelled with the route template (e.g.
+    /gold), not the raw path, so query strings and path parameters do not
+    create new series.
+    """
+
+    def __init__(self, app: Any, collector: MetricsCollector | None = None):
+        """
+        Initialize middleware.
+
+        Args:
+            app: ASGI application to wrap
+            collector: Metrics collector (defaults to the global collector)
+        """
+        self.app = app
+        self.collector = collector or get_metrics_collector()
+        self.collector.set_buckets("http_response_bytes", RESPONSE_SIZE_BUCKETS)
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        """Handle an ASGI call, measuring HTTP requests."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_wrapper(message: dict) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router stores the matched route in the shared scope
+            route = scope.get("route")
+            labels = {
+                "method": scope["method"],
+                "route": getattr(route, "path", UNMATCHED_ROUTE),
+                "status": status,
+            }
+            self.collector.record("http_request_seconds", time.perf_counter() - started, labels)
+            self.collector.record("http_response_bytes", size, labels)
+
+
+class ProfilingMiddleware:
+    """
+    Profiles requests sent with an X-Profile header.
+
+    Only installed when api_profiling_enabled is set, so requests cost
+    nothing extra otherwise. The profile covers the event loop thread for
+    the duration of the request, which includes any other request handled
+    concurrently; profile on an otherwise idle worker for clean results.
+    """
+
+    def __init__(self, app: Any, settings: Settings):
+        """
+        Initialize middleware.
+
+        Args:
+            app: ASGI application to wrap
+            settings: Application settings
+        """
+        self.app = app
+        self.output_path = Path(settings.profile_full_path) / "api"
+        self.top = settings.profile_top_functions
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        """Handle an ASGI call, profiling HTTP requests that ask for it."""
+        headers = dict(scope.get("headers") or []) if scope["type"] == "http" else {}
+        if headers.get(PROFILE_HEADER, b"").lower() not in (b"1", b"true"):
+            await self.app(scope, receive, send)
+            return
+
+        request_id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        profiler = StageProfiler(self.output_path / request_id, self.top)
+
+        async def send_wrapper(message: dict) -> None:
+            if message["type"] == "http.response.start":
+                path_header = (PROFILE_PATH_HEADER, str(profiler.output_path).encode())
+                message = {**message, "headers": [*message.get("headers", []), path_header]}
+            await send(message)
+
+        try:
+            with profiler.profile("request"):
+                await self.app(scope, receive, send_wrapper)
+        finally:
+            logger.info(
+                "request_profiled",
+                method=scope["method"],
+                path=scope["path"],
+                profile_path=str(profiler.close()),
+                hottest_functions=profiler.summary()["request"],
+            )
@@ -1,14 +1,27 @@
 """API routes - thin HTTP interface."""
 
-from datetime import datetime
+from datetime import date, datetime
+from pathlib import Path
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
 
 from app.api.dependencies import get_repository
-from app.api.schemas import GoldDataResponse, HealthResponse, MetricsResponse
-from app.infrastructure.monitoring import SystemHealth
+from app.api.schemas import (
+    GoldDataResponse,
+    HealthResponse,
+    MetricsResponse,
+    PercentilesResponse,
+)
+from app.infrastructure.logging import get_log_sampler, get_log_sink
+from app.infrastructure.monitoring import (
+    MetricsCollector,
+    get_metrics_collector,
+    render_prometheus,
+)
 from app.infrastructure.repositories.base import BaseRepository
+from app.infrastructure.settings import Settings, get_settings
 
 router = APIRouter()
 
@@ -38,16 +51,92 @@ async def health_check(repository: BaseRepository = Depends(get_repository)) ->
     )
 
 
+def _sketch_metrics(
+    repository: BaseRepository, start_date: date | None, end_date: date | None
+) -> MetricsResponse | None:
+    """
+    Answer gold metrics from the per-date counts and entity sketches of gold batches.
+
+    Sketches only cover the gold batches that recorded them, so gold is
+    scanned instead unless every batch with rows has its sketches (e.g.
+    while batches written before sketches existed are still in gold).
+
+    Returns:
+        Metrics merged from batch metadata, or None if gold must be scanned
+    """
+    from app.domain.sketches import HyperLogLog
+
+    batches = [m for m in repository.list_metadata("gold") if m.record_count > 0]
+    if not batches or any(not m.entity_sketches for m in batches):
+        return None
+
+    start = start_date.isoformat() if start_date else None
+    end = end_date.isoformat() if end_date else None
+    merged: HyperLogLog | None = None
+    total_records = 0
+    dates: set[str] = set()
+    last_updated = None
+    for metadata in batches:
+        in_range = [
+            day
+            for day in metadata.entity_sketches
+            if (start is None or day >= start) and (end is None or day <= end)
+        ]
+        for day in in_range:
+            sketch = HyperLogLog.from_string(metadata.entity_sketches[day])
+            if merged is None:
+                merged = sketch
+            else:
+                merged.merge(sketch)
+            total_records += metadata.partition_counts.get(day, 0)
+        if in_range:
+            dates.update(in_range)
+            # Batches are listed oldest first
+            last_updated = metadata.ingestion_time
+
+    return MetricsResponse(
+        total_records=total_records,
+        entity_count=merged.count() if merged is not None else 0,
+        date_range={"start": min(dates), "end": max(dates)} if dates else None,
+        last_updated=last_updated,
+        exact=False,
+        entity_count_error=merged.relative_error if merged is not None else 0.0,
+    )
+
+
 @router.get("/metrics", response_model=MetricsResponse)
-async def get_metrics(repository: BaseRepository = Depends(get_repository)) -> MetricsResponse:
+async def get_metrics(
+    start_date: date | None = Query(None, description="Inclusive start date"),
+    end_date: date | None = Query(None, description="Inclusive end date"),
+    exact: bool = Query(False, description="Count by scanning gold instead of merging sketches"),
+    repository: BaseRepository = Depends(get_repository),
+) -> MetricsResponse:
     """
     Get aggregated metrics from gold layer.
 
+    By default, counts are merged from the per-date entity sketches and
+    row counts each gold batch records in its metadata, so no data is
+    read; entity_count is then an estimate with entity_count_error.
+    Gold is scanned when exact is set or any gold batch lacks sketches.
+
+    Args:
+        start_date: Inclusive start date
+        end_date: Inclusive end date
+        exact: Whether to count exactly by scanning gold
+
     Returns:
         Business-level metrics
     """
     try:
-        gold_df = repository.read_gold()
+        if not exact:
+            metrics = _sketch_metrics(repository, start_date, end_date)
+            if metrics is not None:
+                return metrics
+
+        if start_date or end_date:
+            gold_df = repository.read_gold(start=start_date, end=end_date)
+        else:
+            gold_df = repository.read_gold()
 
         # Handle empty data
         if hasattr(gold_df, "__len__"):  # pandas
@@ -58,17 +147,17 @@ async def get_metrics(repository: BaseRepository = Depends(get_repository)) -> M
                     date_range=None,
                     last_updated=None,
                 )
-            
+
             total_records = len(gold_df)
             entity_count = gold_df["entity_id"].nunique() if "entity_id" in gold_df.columns else 0
-            
+
             date_range = None
             if "date" in gold_df.columns:
                 date_range = {
                     "start": str(gold_df["date"].min()),
                     "end": str(gold_df["date"].max()),
                 }
-            
+
             last_updated = None
             if "aggregated_at" in gold_df.columns:
                 last_updated = gold_df["aggregated_at"].max()
@@ -81,9 +170,13 @@ async def get_metrics(repository: BaseRepository = Depends(get_repository)) -> M
                     date_range=None,
                     last_updated=None,
                 )
-            
+
             total_records = gold_df.count()
-            entity_count = gold_df.select("entity_id").distinct().count() if "entity_id" in gold_df.columns else 0
+            entity_count = (
+                gold_df.select("entity_id").distinct().count()
+                if "entity_id" in gold_df.columns
+                else 0
+            )
             date_range = None
             last_updated = None
 
@@ -95,12 +188,129 @@ async def get_metrics(repository: BaseRepository = Depends(get_repository)) -> M
         )
 
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to retrieve metrics: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve metrics: {e!s}")
+
+
+def _record_batch_metrics(collector: MetricsCollector, repository: BaseRepository) -> None:
+    """
+    Export the latest batch's stage timings and cache counters from its saved metadata.
+
+    Batches run in CLI and scheduler processes, so their in-process metrics
+    never reach the API; the spans saved with each layer's metadata do.
+    """
+    latest = None
+    for layer in ("silver", "gold"):
+        metadata = repository.latest_metadata(layer)
+        if metadata is None:
+            continue
+        labels = {"layer": layer}
+        collector.set_gauge("pipeline_last_batch_records", metadata.record_count, labels)
+        collector.set_gauge(
+            "pipeline_last_batch_timestamp_seconds", metadata.ingestion_time.timestamp(), labels
+        )
+        if latest is None or metadata.ingestion_time >= latest.ingestion_time:
+            latest = metadata
+    if latest is None:
+        return
+
+    # Retried stages have a span per attempt
+    stage_seconds: dict[str, float] = {}
+    for span in latest.stages:
+        stage_seconds[span["name"]] = stage_seconds.get(span["name"], 0.0) + span["wall_seconds"]
+    for stage, seconds in stage_seconds.items():
+        collector.set_gauge("pipeline_last_batch_stage_seconds", seconds, {"stage": stage})
+    for name, value in latest.transform_cache.items():
+        collector.set_gauge(f"transform_cache_last_batch_{name}", value)
+
+
+def _record_scheduler_metrics(collector: MetricsCollector, settings: Settings) -> None:
+    """Export the latest report and watermark of every scheduled source from disk."""
+    from app.application.scheduler import SourceWatermarks
+
+    watermarks = SourceWatermarks(settings)
+    for report in watermarks.reports():
+        labels = {"source": report["source"]}
+        collector.set_gauge("scheduler_source_lag_seconds", report["lag_seconds"], labels)
+        collector.set_gauge(
+            "scheduler_source_reported_timestamp_seconds", report["reported_at"], labels
+        )
+        if report["status"] != "skipped":
+            collector.set_gauge("scheduler_source_throughput", report["throughput"], labels)
+        watermark = watermarks.get(report["source"])
+        if watermark is not None:
+            collector.set_gauge("scheduler_source_watermark_timestamp_seconds", watermark, labels)
+
+
+@router.get("/metrics/runtime", response_class=PlainTextResponse)
+async def get_runtime_metrics(
+    repository: BaseRepository = Depends(get_repository),
+) -> PlainTextResponse:
+    """
+    Get runtime telemetry in Prometheus text format.
+
+    Request latency, response size per route and cache statistics are those
+    of this process; each API worker process keeps its own. Stage timings
+    and transform-cache counters of the latest batch, and the lag and
+    throughput of scheduled sources, are read from what the pipeline and
+    scheduler processes persisted.
+
+    Returns:
+        Prometheus exposition text
+    """
+    from app.infrastructure.repositories.gold_snapshot import current_version
+    from app.infrastructure.repositories.manifest import manifest_cache_stats
+
+    collector = get_metrics_collector()
+    settings = get_settings()
+    _record_batch_metrics(collector, repository)
+    _record_scheduler_metrics(collector, settings)
+
+    for name, value in manifest_cache_stats().items():
+        collector.set_gauge(f"manifest_cache_{name}", value)
+
+    sink = get_log_sink()
+    if sink is not None:
+        for name, value in sink.stats().items():
+            collector.set_gauge(f"log_events_{name}", value)
+    sampler = get_log_sampler()
+    if sampler is not None:
+        collector.set_gauge("log_events_sampled_out", sampler.dropped)
+
+    if settings.gold_snapshot_enabled:
+        version = current_version(Path(settings.gold_snapshot_full_path))
+        collector.set_gauge("gold_snapshot_version", -1 if version is None else version)
+
+    return PlainTextResponse(
+        render_prometheus(collector), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+def _records(df: Any) -> list[dict[str, Any]]:
+    """
+    Convert a pandas frame to JSON-ready records.
+
+    Rows go through Arrow, so NumPy- and Arrow-backed frames give the same
+    Python values: dates, timestamps and numbers as native types, and NaN,
+    NaT and NA as None.
+
+    Args:
+        df: pandas DataFrame
+
+    Returns:
+        One dictionary per row
+    """
+    import pyarrow as pa
+
+    records: list[dict[str, Any]] = pa.Table.from_pandas(df, preserve_index=False).to_pylist()
+    return records
 
 
 @router.get("/gold", response_model=GoldDataResponse)
 async def get_gold_data(
     limit: int = Query(100, ge=1, le=1000, description="Maximum records to return"),
+    entity_id: list[str] | None = Query(None, description="Filter by entity ID"),
+    start_date: date | None = Query(None, description="Inclusive start date"),
+    end_date: date | None = Query(None, description="Inclusive end date"),
     repository: BaseRepository = Depends(get_repository),
 ) -> GoldDataResponse:
     """
@@ -108,23 +318,25 @@ async def get_gold_data(
 
     Args:
         limit: Maximum number of records to return
+        entity_id: Entity IDs to filter on
+        start_date: Inclusive start date
+        end_date: Inclusive end date
 
     Returns:
         Gold layer data
     """
     try:
-        gold_df = repository.read_gold()
+        gold_df = repository.read_gold(entity_ids=entity_id, start=start_date, end=end_date)
 
         # Handle pandas vs Spark
         if hasattr(gold_df, "to_dict"):  # pandas
             total_available = len(gold_df)
-            
-            # Limit results
-            limited_df = gold_df.head(limit)
-            
-            # Convert to dict
-            data = limited_df.to_dict(orient="records")
-            
+
+            # Limit results (value sketches are binary, for /gold/percentiles only)
+            limited_df = gold_df.head(limit).drop(columns=["value_sketch"], errors="ignore")
+
+            data = _records(limited_df)
+
             return GoldDataResponse(
                 data=data,
                 count=len(data),
@@ -133,13 +345,13 @@ async def get_gold_data(
 
         else:  # Spark
             total_available = gold_df.count()
-            
+
             # Limit results
-            limited_df = gold_df.limit(limit)
-            
+            limited_df = gold_df.limit(limit).drop("value_sketch")
+
             # Convert to list of dicts
             data = [row.asDict() for row in limited_df.collect()]
-            
+
             return GoldDataResponse(
                 data=data,
                 count=len(data),
@@ -147,7 +359,75 @@ async def get_gold_data(
             )
 
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to retrieve gold data: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve gold data: {e!s}")
+
+
+@router.get("/gold/percentiles", response_model=PercentilesResponse)
+async def get_gold_percentiles(
+    q: list[float] = Query([0.5, 0.95, 0.99], description="Quantiles between 0 and 1"),
+    entity_id: list[str] | None = Query(None, description="Filter by entity ID"),
+    start_date: date | None = Query(None, description="Inclusive start date"),
+    end_date: date | None = Query(None, description="Inclusive end date"),
+    per_entity: bool = Query(False, description="Also estimate the quantiles of every entity"),
+    repository: BaseRepository = Depends(get_repository),
+) -> PercentilesResponse:
+    """
+    Estimate percentiles of value over any range of gold.
+
+    The KLL value sketches of the selected entity-days are merged, so no
+    silver is read and any range is answered from gold alone.
+
+    Args:
+        q: Quantiles to estimate
+        entity_id: Entity IDs to filter on
+        start_date: Inclusive start date
+        end_date: Inclusive end date
+        per_entity: Whether to estimate the quantiles of every entity too
+
+    Returns:
+        Estimated percentiles
+    """
+    from app.domain.sketches import merge_kll_bytes
+
+    if any(not 0 <= fraction <= 1 for fraction in q):
+        raise HTTPException(status_code=422, detail="Quantiles must be between 0 and 1")
+
+    try:
+        gold_df = repository.read_gold(entity_ids=entity_id, start=start_date, end=end_date)
+        if "value_sketch" not in gold_df.columns:
+            rows: list[tuple[str, Any]] = []
+        elif hasattr(gold_df, "to_dict"):  # pandas
+            rows = list(zip(gold_df["entity_id"], gold_df["value_sketch"]))
+        else:  # Spark: one small binary per entity-day is collected
+            rows = [
+                (row["entity_id"], row["value_sketch"])
+                for row in gold_df.select("entity_id", "value_sketch").collect()
+            ]
+
+        def estimate(blobs: list[Any]) -> tuple[dict[str, float | None], int, bool]:
+            """Merge sketches into quantile estimates, values summarized and exactness."""
+            sketch = merge_kll_bytes(bytes(blob) for blob in blobs if blob is not None)
+            if sketch is None:
+                return {str(fraction): None for fraction in q}, 0, True
+            return dict(zip(map(str, q), sketch.quantiles(q))), len(sketch), sketch.is_exact
+
+        percentiles, record_count, exact = estimate([blob for _, blob in rows])
+        entities = None
+        if per_entity:
+            by_entity: dict[str, list[Any]] = {}
+            for entity, blob in rows:
+                by_entity.setdefault(str(entity), []).append(blob)
+            entities = {entity: estimate(blobs)[0] for entity, blobs in sorted(by_entity.items())}
+
+        return PercentilesResponse(
+            percentiles=percentiles,
+            record_count=record_count,
+            exact=exact,
+            entities=entities,
+        )
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to estimate percentiles: {e!s}")
 
 
 @router.get("/")
@@ -1,7 +1,7 @@
 """API response schemas."""
 
 from datetime import datetime
-from typing import Any, Optional
+from typing import Any
 
 from pydantic import BaseModel, Field
 
@@ -20,15 +20,23 @@ class MetricsResponse(BaseModel):
 
     total_records: int = Field(..., description="Total records in gold layer")
     entity_count: int = Field(..., description="Number of unique entities")
-    date_range: Optional[dict[str, str]] = Field(None, description="Data date range")
-    last_updated: Optional[datetime] = Field(None, description="Last update timestamp")
+    date_range: dict[str, str] | None = Field(default=None, description="Data date range")
+    last_updated: datetime | None = Field(default=None, description="Last update timestamp")
+    exact: bool = Field(default=True, description="Whether counts come from a scan of gold")
+    entity_count_error: float | None = Field(
+        default=None,
+        description=(
+            "Relative standard error of an estimated entity_count "
+            "(about 95% of estimates are within twice this); None if exact"
+        ),
+    )
 
 
 class ErrorResponse(BaseModel):
     """Error response."""
 
     error: str = Field(..., description="Error message")
-    detail: Optional[str] = Field(None, description="Detailed error information")
+    detail: str | None = Field(None, description="Detailed error information")
 
 
 class GoldDataResponse(BaseModel):
@@ -39,6 +47,25 @@ class GoldDataResponse(BaseModel):
     total_available: int = Field(..., description="Total records available")
 
 
+class PercentilesResponse(BaseModel):
+    """Percentile estimates merged from gold value sketches."""
+
+    percentiles: dict[str, float | None] = Field(
+        ..., description="Estimated value per requested quantile (None without data)"
+    )
+    record_count: int = Field(..., description="Values summarized by the merged sketches")
+    exact: bool = Field(
+        ...,
+        description=(
+            "Whether every value was kept, so the estimates are exact ranks "
+            "(of values stored as float32)"
+        ),
+    )
+    entities: dict[str, dict[str, float | None]] | None = Field(
+        None, description="Estimated value per quantile of every entity, if requested"
+    )
+
+
 class BatchJobRequest(BaseModel):
     """Batch job execution request."""
 
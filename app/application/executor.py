@@ -0,0 +1,121 @@
+"""Pipelined execution - overlapping storage I/O with computation."""
+
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Self, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class IoExecutor:
+    """
+    Runs I/O tasks in submission order on one background thread.
+
+    The calling thread submits writes and carries on computing while they
+    run. A single thread keeps the tasks in order, so layers and metadata
+    are committed in the order they were submitted, exactly as if they ran
+    inline. Once a task fails, the tasks queued after it are skipped; the
+    first error is raised by check() and wait().
+    """
+
+    def __init__(self, name: str = "pipeline-io"):
+        """
+        Initialize executor and its I/O thread.
+
+        Args:
+            name: Name prefix of the I/O thread
+        """
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+        self._futures: list[Future] = []
+        self._error: BaseException | None = None
+
+    def _run(self, func: Callable[..., Any], args: tuple) -> Any:
+        """Run a task unless an earlier task failed."""
+        if self._error is not None:
+            return None
+        try:
+            return func(*args)
+        except BaseException as e:
+            self._error = e
+            raise
+
+    def submit(self, func: Callable[..., Any], *args: Any) -> Future:
+        """
+        Queue a task behind the tasks already submitted.
+
+        Args:
+            func: Task to run on the I/O thread
+            *args: Arguments of the task
+
+        Returns:
+            Future of the task's result
+        """
+        future = self._pool.submit(self._run, func, args)
+        self._futures.append(future)
+        return future
+
+    def check(self) -> None:
+        """Raise the error of a failed task, if any has failed so far."""
+        if self._error is not None:
+            raise self._error
+
+    def wait(self) -> None:
+        """Wait until every submitted task has run, then raise the first error, if any."""
+        for future in self._futures:
+            if not future.cancelled():
+                future.exception()
+        self.check()
+
+    def close(self) -> None:
+        """Let queued tasks finish and stop the I/O thread."""
+        self._pool.shutdown(wait=True)
+
+    def __enter__(self) -> Self:
+        """Enter context."""
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Stop the I/O thread once its queued tasks have run."""
+        self.close()
+
+
+def prefetched(items: Iterable[T], load: Callable[[T], R], depth: int = 1) -> Iterator[R]:
+    """
+    Load items in order, reading up to depth items ahead on a background thread.
+
+    While the caller works on one loaded item, the next ones are already
+    being loaded, so reading input overlaps with processing it. With depth
+    0, items are loaded inline when they are reached.
+
+    Args:
+        items: Items to load (e.g. file paths)
+        load: Loads one item
+        depth: Items loaded ahead of the one being processed
+
+    Yields:
+        Loaded items, in input order
+
+    Raises:
+        Exception: Whatever load raised, when the failed item is reached
+    """
+    if depth <= 0:
+        for item in items:
+            yield load(item)
+        return
+
+    pending: deque[Future] = deque()
+    remaining = iter(items)
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch") as pool:
+        try:
+            for item in remaining:
+                pending.append(pool.submit(load, item))
+                if len(pending) > depth:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            # The consumer stopped early or failed; drop loads not yet started
+            for future in pending:
+                future.cancel()
@@ -1,6 +1,98 @@
 """Application metrics - data structures for tracking performance."""
 
-from dataclasses import dataclass
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from app.infrastructure.monitoring import PeakRssSampler
+from app.infrastructure.profiling import StageProfiler
+from app.infrastructure.repositories.base import IoCounters
+
+
+@dataclass
+class StageSpan:
+    """Measurements for one stage of a pipeline run."""
+
+    name: str
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    rows_in: int = 0
+    rows_out: int = 0
+    bytes_read: int = 0
+    bytes_written: int = 0
+    peak_rss_bytes: int = 0
+    error: str | None = None
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary."""
+        return asdict(self)
+
+
+class StageRecorder:
+    """
+    Records a span around each stage of a run.
+
+    Wall time, process CPU time and peak resident memory are measured
+    around the block; bytes are the change in the repository's I/O
+    counters for the thread running the block. CPU time and memory are
+    process-wide, so spans that overlap (e.g. a background write during a
+    transform) each include the other's. Lazy engines (Spark) do their work when a result is counted
+    or written, so their transform spans mostly measure planning. With a
+    profiler, each span is also profiled as a stage of the same name.
+    """
+
+    def __init__(self, io: IoCounters | None = None, profiler: StageProfiler | None = None):
+        """
+        Initialize recorder.
+
+        Args:
+            io: I/O counters of the repository used by the stages, if it keeps them
+            profiler: Profiler to run around every span (none if None)
+        """
+        self.io = io if isinstance(io, IoCounters) else None
+        self.profiler = profiler
+        self.spans: list[StageSpan] = []
+
+    @contextmanager
+    def span(self, name: str, rows_in: int = 0) -> Iterator[StageSpan]:
+        """
+        Measure a stage; the caller fills in rows_out on the yielded span.
+
+        Args:
+            name: Stage name
+            rows_in: Rows the stage consumes
+
+        Yields:
+            The span being recorded
+        """
+        span = StageSpan(name=name, rows_in=rows_in)
+        read_before, written_before = self.io.thread_totals() if self.io else (0, 0)
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+
+        sampler = PeakRssSampler()
+        profiling = self.profiler.profile(name) if self.profiler else nullcontext()
+        try:
+            with sampler, profiling:
+                yield span
+        except Exception as e:
+            span.error = type(e).__name__
+            raise
+        finally:
+            span.wall_seconds = time.perf_counter() - wall_start
+            span.cpu_seconds = time.process_time() - cpu_start
+            span.peak_rss_bytes = sampler.peak_bytes
+            if self.io:
+                read_after, written_after = self.io.thread_totals()
+                span.bytes_read = read_after - read_before
+                span.bytes_written = written_after - written_before
+            self.spans.append(span)
+
+    def to_dicts(self) -> list[dict[str, Any]]:
+        """Spans recorded so far, as dictionaries."""
+        return [span.to_dict() for span in self.spans]
 
 
 @dataclass
@@ -11,6 +103,9 @@ class PipelineMetrics:
     records_out: int
     duration_seconds: float
     errors: int
+    records_quarantined: int = 0
+    records_duplicate: int = 0
+    stages: list[StageSpan] = field(default_factory=list)
 
     @property
     def success_rate(self) -> float:
@@ -33,6 +128,9 @@ class PipelineMetrics:
             "records_out": self.records_out,
             "duration_seconds": self.duration_seconds,
             "errors": self.errors,
+            "records_quarantined": self.records_quarantined,
+            "records_duplicate": self.records_duplicate,
             "success_rate": self.success_rate,
             "throughput": self.throughput,
+            "stages": [span.to_dict() for span in self.stages],
         }
@@ -1,9 +1,51 @@
 """Pipeline orchestration - medallion architecture flow."""
 
-from typing import Any
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional
 
-from app.domain.transformers import BronzeToSilverTransformer, SilverToGoldTransformer
-from app.infrastructure.repositories.base import BaseRepository
+from app.application.executor import prefetched
+from app.domain.transformers import (
+    BronzeToSilverTransformer,
+    MultiGrainTransformer,
+    SilverToGoldTransformer,
+)
+from app.infrastructure.dedup_index import BaseDedupIndex
+from app.infrastructure.repositories.base import BaseRepository, BronzeFileReader
+from app.infrastructure.settings import Settings
+from app.infrastructure.transform_cache import TransformCache, content_key, file_checksum
+
+if TYPE_CHECKING:
+    from app.application.tables import TableGraph
+
+
+def count_rows(df: Any) -> int:
+    """
+    Count rows of a pandas or Spark DataFrame.
+
+    Args:
+        df: DataFrame to count, or None
+
+    Returns:
+        Number of rows (0 for None)
+    """
+    if df is None:
+        return 0
+    if hasattr(df, "__len__"):  # pandas
+        return len(df)
+    return int(df.count())  # Spark
+
+
+def _combine_fragments(silver_parts: list[Any], quarantine_parts: list[Any]) -> tuple[Any, Any]:
+    """Concatenate per-file silver and quarantine frames, dropping rows repeated across files."""
+    import pandas as pd
+
+    silver = pd.concat(silver_parts, ignore_index=True)
+    quarantine = pd.concat(quarantine_parts, ignore_index=True)
+
+    # Fragments are deduplicated per file; drop rows repeated across files
+    subset = [c for c in silver.columns if c != "processed_at"]
+    silver = silver.drop_duplicates(subset=subset, ignore_index=True)
+    return silver, quarantine
 
 
 class Pipeline:
@@ -14,6 +56,10 @@ class Pipeline:
         repository: BaseRepository,
         bronze_to_silver: BronzeToSilverTransformer,
         silver_to_gold: SilverToGoldTransformer,
+        dedup_index: BaseDedupIndex | None = None,
+        transform_cache: TransformCache | None = None,
+        tables: Optional["TableGraph"] = None,
+        gold_grains: MultiGrainTransformer | None = None,
     ):
         """
         Initialize pipeline.
@@ -22,10 +68,232 @@ class Pipeline:
             repository: Data repository
             bronze_to_silver: Bronze to Silver transformer
             silver_to_gold: Silver to Gold transformer
+            dedup_index: Optional cross-batch dedup index consulted for silver
+            transform_cache: Optional cache of silver fragments per bronze file
+            tables: Optional derived tables built from silver and gold after each batch
+            gold_grains: Optional multi-grain transformer of the per-grain gold tables
+
+        Raises:
+            ValueError: If a transform cache is given for a repository that
+                cannot read bronze file by file
         """
+        if transform_cache is not None and not isinstance(repository, BronzeFileReader):
+            raise ValueError(
+                f"{type(repository).__name__} does not read bronze per file, "
+                "so it cannot use a transform cache"
+            )
         self.repository = repository
         self.bronze_to_silver = bronze_to_silver
         self.silver_to_gold = silver_to_gold
+        self.dedup_index = dedup_index
+        self.transform_cache = transform_cache
+        self.tables = tables
+        self.gold_grains = gold_grains
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "Pipeline":
+        """
+        Create the pipeline of the configured execution mode.
+
+        The transform cache is file-based, so it is only used when the
+        repository can read bronze file by file.
+        The default derived tables are declared when derived tables are enabled.
+
+        Args:
+            settings: Application settings
+
+        Returns:
+            Pipeline with the mode's repository, transformers and dedup index
+
+        Raises:
+            ValueError: If no engine is registered for the execution mode
+        """
+        from app.infrastructure.engines import (
+            create_dedup_index,
+            create_multi_grain_transformer,
+            create_repository,
+            create_transformers,
+        )
+
+        tables = None
+        if settings.derived_tables_enabled:
+            from app.application.tables import default_tables
+
+            tables = default_tables(settings)
+
+        repository = create_repository(settings)
+        bronze_to_silver, silver_to_gold = create_transformers(settings)
+        use_cache = settings.transform_cache_enabled and isinstance(repository, BronzeFileReader)
+        return cls(
+            repository=repository,
+            bronze_to_silver=bronze_to_silver,
+            silver_to_gold=silver_to_gold,
+            dedup_index=create_dedup_index(settings, repository),
+            transform_cache=TransformCache(settings) if use_cache else None,
+            tables=tables,
+            gold_grains=create_multi_grain_transformer(settings),
+        )
+
+    def to_silver(self, bronze_df: Any) -> tuple[Any, Any | None]:
+        """
+        Run the Bronze -> Silver stage.
+
+        Args:
+            bronze_df: Raw bronze data
+
+        Returns:
+            Tuple of (silver_df, quarantine_df)
+        """
+        return self.bronze_to_silver.transform_with_quarantine(bronze_df)
+
+    def release_silver(self) -> None:
+        """Free what the Bronze -> Silver stage cached, once silver and quarantine are written."""
+        self.bronze_to_silver.release()
+
+    def to_silver_prefetched(self, prefetch: int) -> tuple[Any, Any, int]:
+        """
+        Run the Bronze -> Silver stage file by file, reading ahead.
+
+        The next bronze files are read on a background thread while the
+        current one is transformed, so reading overlaps with transforming.
+
+        Args:
+            prefetch: Bronze files read ahead of the one being transformed
+
+        Returns:
+            Tuple of (silver_df, quarantine_df, records_in)
+
+        Raises:
+            TypeError: If the repository cannot read bronze file by file
+        """
+        reader = self.repository
+        if not isinstance(reader, BronzeFileReader):
+            raise TypeError(f"{type(reader).__name__} does not read bronze per file")
+
+        silver_parts = []
+        quarantine_parts = []
+        records_in = 0
+        for bronze_df in prefetched(reader.list_bronze_files(), reader.read_bronze_file, prefetch):
+            silver, quarantine = self.to_silver(bronze_df)
+            silver_parts.append(silver)
+            quarantine_parts.append(quarantine)
+            records_in += len(bronze_df)
+
+        if not silver_parts:
+            silver, quarantine = self.to_silver(reader.read_bronze())
+            return silver, quarantine, 0
+
+        silver, quarantine = _combine_fragments(silver_parts, quarantine_parts)
+        return silver, quarantine, records_in
+
+    def to_silver_cached(self, prefetch: int = 0) -> tuple[Any, Any, int, str]:
+        """
+        Run the Bronze -> Silver stage file by file, reusing cached fragments.
+
+        Each bronze file is checksummed and combined with the transformer
+        fingerprint; files whose content hash is cached are not re-read or
+        re-transformed. With prefetch, the next files are checksummed, looked
+        up and read on a background thread while the current one is
+        transformed.
+
+        Args:
+            prefetch: Bronze files loaded ahead of the one being transformed
+
+        Returns:
+            Tuple of (silver_df, quarantine_df, records_in, checksum), where
+            checksum identifies the combined input content of the batch
+
+        Raises:
+            TypeError: If the repository cannot read bronze file by file
+            ValueError: If there is no transform cache
+        """
+        reader, cache = self.repository, self.transform_cache
+        if not isinstance(reader, BronzeFileReader):
+            raise TypeError(f"{type(reader).__name__} does not read bronze per file")
+        if cache is None:
+            raise ValueError("Pipeline has no transform cache")
+        fingerprint = self.bronze_to_silver.fingerprint()
+        silver_parts = []
+        quarantine_parts = []
+        keys = []
+        records_in = 0
+
+        def load(path: str) -> tuple[str, tuple | None, Any]:
+            key = content_key(file_checksum(Path(path)), fingerprint)
+            cached = cache.get(key)
+            bronze_df = reader.read_bronze_file(path) if cached is None else None
+            return key, cached, bronze_df
+
+        files = reader.list_bronze_files()
+        for key, cached, bronze_df in prefetched(files, load, prefetch):
+            keys.append(key)
+
+            if cached is None:
+                silver, quarantine = self.to_silver(bronze_df)
+                cached = (silver, quarantine, len(bronze_df))
+                cache.put(key, *cached)
+
+            silver_parts.append(cached[0])
+            quarantine_parts.append(cached[1])
+            records_in += cached[2]
+
+        if not silver_parts:
+            silver, quarantine = self.to_silver(self.repository.read_bronze())
+            return silver, quarantine, 0, content_key(fingerprint)
+
+        silver, quarantine = _combine_fragments(silver_parts, quarantine_parts)
+        return silver, quarantine, records_in, content_key(*keys)
+
+    def deduplicate(self, silver_df: Any) -> tuple[Any, int]:
+        """
+        Drop silver rows whose key was already committed by an earlier batch.
+
+        Args:
+            silver_df: Cleaned silver data
+
+        Returns:
+            Tuple of (silver_df, duplicate_count)
+        """
+        if self.dedup_index is None:
+            return silver_df, 0
+        return self.dedup_index.drop_seen(silver_df)
+
+    def commit_silver_keys(self, silver_df: Any) -> None:
+        """
+        Record silver keys in the dedup index once silver has been written.
+
+        Args:
+            silver_df: Silver data that was written
+        """
+        if self.dedup_index is not None:
+            self.dedup_index.commit(silver_df)
+
+    def to_gold(self, silver_df: Any) -> Any:
+        """
+        Run the Silver -> Gold stage.
+
+        Args:
+            silver_df: Cleaned silver data
+
+        Returns:
+            Aggregated gold data
+        """
+        return self.silver_to_gold.transform(silver_df)
+
+    def to_gold_grains(self, silver_df: Any) -> dict[str, Any]:
+        """
+        Run the Silver -> Gold stage of the per-grain gold tables.
+
+        Args:
+            silver_df: Cleaned silver data
+
+        Returns:
+            Aggregated data of every configured grain, by gold table name
+            (empty if no grains are configured)
+        """
+        if self.gold_grains is None:
+            return {}
+        return self.gold_grains.transform(silver_df)
 
     def run_batch(self) -> tuple[Any, Any, int, int]:
         """
@@ -36,21 +304,12 @@ class Pipeline:
         """
         # Bronze -> Silver
         bronze_df = self.repository.read_bronze()
-        silver_df = self.bronze_to_silver.transform(bronze_df)
-        
-        # Get count based on DataFrame type
-        if hasattr(silver_df, "__len__"):  # pandas
-            silver_count = len(silver_df)
-        else:  # Spark
-            silver_count = silver_df.count()
+        silver_df, _ = self.to_silver(bronze_df)
+        silver_df, _ = self.deduplicate(silver_df)
+        silver_count = count_rows(silver_df)
 
         # Silver -> Gold
-        gold_df = self.silver_to_gold.transform(silver_df)
-        
-        # Get count based on DataFrame type
-        if hasattr(gold_df, "__len__"):  # pandas
-            gold_count = len(gold_df)
-        else:  # Spark
-            gold_count = gold_df.count()
+        gold_df = self.to_gold(silver_df)
+        gold_count = count_rows(gold_df)
 
         return silver_df, gold_df, silver_count, gold_count
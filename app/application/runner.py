@@ -1,22 +1,92 @@
 """Runner layer - execution management with metadata and metrics."""
 
+import re
 import time
+from collections.abc import Callable
+from contextlib import AbstractContextManager, nullcontext
+from dataclasses import dataclass, field
 from datetime import datetime
+from functools import partial
+from pathlib import Path
 from typing import Any
 
-from app.application.metrics import PipelineMetrics
-from app.application.pipeline import Pipeline
-from app.domain.models import BatchMetadata
+from app.application.executor import IoExecutor
+from app.application.metrics import PipelineMetrics, StageRecorder
+from app.application.pipeline import Pipeline, count_rows
+from app.application.tables import TableBuilder
+from app.domain.models import BatchMetadata, ValidationResult
+from app.domain.sketches import partition_sketches
+from app.domain.validation import validate_silver_quality, validate_silver_quality_sampled
+from app.infrastructure.checkpoints import BatchCheckpoint, CheckpointStore
 from app.infrastructure.logging import get_logger
-from app.infrastructure.repositories.base import BaseRepository
+from app.infrastructure.monitoring import get_metrics_collector
+from app.infrastructure.profiling import StageProfiler
+from app.infrastructure.repositories.base import BaseRepository, BronzeFileReader
+from app.infrastructure.settings import Settings, get_settings
 
 logger = get_logger(__name__)
 
+# Factor by which the wait before retrying a stage grows with every retry
+RETRY_BACKOFF = 2.0
+
+
+def retry_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """
+    Seconds to wait before retrying a failed stage.
+
+    Args:
+        attempt: Retries already made (0 before the first retry)
+        base_delay: Wait before the first retry
+        max_delay: Longest wait
+
+    Returns:
+        Wait in seconds
+    """
+    return min(base_delay * RETRY_BACKOFF**attempt, max_delay)
+
+
+def source_slug(source: str) -> str:
+    """
+    Form of a source name that is safe in file names.
+
+    Args:
+        source: Data source identifier
+
+    Returns:
+        The name with runs of other characters than letters, digits, - and _ replaced by _
+    """
+    return re.sub(r"[^A-Za-z0-9_-]+", "_", source).strip("_") or "default"
+
+
+def new_batch_id(source: str, now: datetime | None = None) -> str:
+    """
+    Identifier of a new batch of a source.
+
+    Batches name the files they write to every layer, so the source is part
+    of the identifier: batches of different sources started in the same
+    second never write over each other's files.
+
+    Args:
+        source: Data source identifier
+        now: Start time of the batch (defaults to now)
+
+    Returns:
+        Batch identifier, e.g. 20260201_120000_meters
+    """
+    return f"{(now or datetime.now()):%Y%m%d_%H%M%S}_{source_slug(source)}"
+
 
 class BatchRunner:
     """Manages batch processing execution."""
 
-    def __init__(self, pipeline: Pipeline, repository: BaseRepository, source: str = "default"):
+    def __init__(
+        self,
+        pipeline: Pipeline,
+        repository: BaseRepository,
+        source: str = "default",
+        settings: Settings | None = None,
+        profile: bool = False,
+    ):
         """
         Initialize batch runner.
 
@@ -24,104 +94,528 @@ class BatchRunner:
             pipeline: Pipeline instance
             repository: Data repository
             source: Data source identifier
+            settings: Application settings (defaults to the cached settings)
+            profile: Capture a CPU and allocation profile of every stage
         """
         self.pipeline = pipeline
         self.repository = repository
         self.source = source
+        self.settings = settings or get_settings()
+        self.profile = profile
+        self.checkpoints = (
+            CheckpointStore(self.settings) if self.settings.checkpoint_enabled else None
+        )
+        self.batch_id: str | None = None  # batch of the latest run
+
+    def _validate_silver(self, silver_df: Any) -> ValidationResult:
+        """Validate silver data using the configured validation mode."""
+        if self.settings.validation_mode == "sample":
+            return validate_silver_quality_sampled(
+                silver_df,
+                confidence=self.settings.validation_confidence,
+                margin=self.settings.validation_margin,
+                threshold=self.settings.validation_failure_threshold,
+            )
+        return validate_silver_quality(silver_df)
+
+    def _metadata(
+        self,
+        batch_id: str,
+        layer: str,
+        record_count: int,
+        checksum: str | None = None,
+        recorder: StageRecorder | None = None,
+    ) -> BatchMetadata:
+        """Build the metadata of a layer write, with the stage spans recorded so far."""
+        return BatchMetadata(
+            batch_id=batch_id,
+            source=self.source,
+            ingestion_time=datetime.now(),
+            record_count=record_count,
+            checksum=checksum,
+            layer=layer,
+            stages=recorder.to_dicts() if recorder else [],
+        )
+
+    def _transform_cache_stats(self) -> dict[str, int]:
+        """Counters of the pipeline's transform cache (empty without a cache)."""
+        cache = self.pipeline.transform_cache
+        return cache.stats() if cache is not None else {}
 
-    def run(self) -> PipelineMetrics:
+    def _record_runtime_metrics(
+        self, metrics: PipelineMetrics, cache_before: dict[str, int]
+    ) -> None:
+        """Add the run's stage timings and cache counters to the process metrics."""
+        collector = get_metrics_collector()
+        for span in metrics.stages:
+            collector.record("pipeline_stage_seconds", span.wall_seconds, {"stage": span.name})
+        collector.increment(
+            "pipeline_batches", labels={"status": "failed" if metrics.errors else "succeeded"}
+        )
+        collector.increment("pipeline_records_in", metrics.records_in)
+        for name, value in self._transform_cache_stats().items():
+            collector.increment(f"transform_cache_{name}", value - cache_before.get(name, 0))
+
+    def _start(self, resume: str | None) -> BatchCheckpoint:
+        """Create the checkpoint of a new batch, or load the one of a batch to resume."""
+        if resume is None:
+            checkpoint = BatchCheckpoint(batch_id=new_batch_id(self.source), source=self.source)
+        elif self.checkpoints is None:
+            raise ValueError("Checkpoints are disabled, so no batch can be resumed")
+        else:
+            loaded = self.checkpoints.load(resume)
+            if loaded is None:
+                raise ValueError(f"No checkpoint for batch {resume}")
+            checkpoint = loaded
+            # Later stages must describe the batch as its first run did
+            self.source = checkpoint.source
+
+        checkpoint.runs += 1
+        if self.checkpoints is not None:
+            self.checkpoints.save(checkpoint)
+        return checkpoint
+
+    def _run_stage(
+        self,
+        state: "_BatchState",
+        name: str,
+        func: Callable[[], dict[str, Any] | None],
+        retry: bool = True,
+        background: bool = False,
+    ) -> None:
+        """
+        Run a stage of the batch unless an earlier run of it completed the stage.
+
+        Data frames returned by the stage are checkpointed before the stage
+        is recorded as completed, so a resumed run can pick them up. When
+        the batch overlaps I/O, background stages run on the I/O thread, and
+        the checkpointing of the other stages is queued there too; stages
+        are then recorded as completed in the order they were started.
+
+        Args:
+            state: Progress of the batch
+            name: Stage name
+            func: Runs the stage and returns the data frames it produced, by name
+            retry: Whether to retry failures
+            background: Whether the stage may run on the I/O thread
+        """
+        if state.checkpoint.is_completed(name):
+            logger.info("stage_skipped", batch_id=state.batch_id, stage=name)
+            return
+
+        if state.io is None:
+            self._complete(state, name, self._attempt(state, name, func, retry))
+        elif background:
+            state.io.submit(
+                lambda: self._complete(state, name, self._attempt(state, name, func, retry))
+            )
+        else:
+            # Do not start computing once a queued write has failed
+            state.io.check()
+            state.io.submit(self._complete, state, name, self._attempt(state, name, func, retry))
+
+    def _attempt(
+        self,
+        state: "_BatchState",
+        name: str,
+        func: Callable[[], dict[str, Any] | None],
+        retry: bool,
+    ) -> dict[str, Any]:
+        """
+        Run a stage, retrying failures.
+
+        Failures are retried up to max_retries times, waiting exponentially
+        longer before each retry. Stages that only transform data in memory
+        pass retry=False, since they would fail the same way again.
+
+        Returns:
+            Data frames produced by the stage, by name
+        """
+        attempts = self.settings.max_retries + 1 if retry else 1
+        for attempt in range(attempts):
+            try:
+                outputs = func() or {}
+                break
+            except Exception as e:
+                if attempt + 1 == attempts:
+                    raise
+                delay = retry_delay(
+                    attempt, self.settings.retry_delay, self.settings.retry_max_delay
+                )
+                logger.warning(
+                    "stage_retrying",
+                    batch_id=state.batch_id,
+                    stage=name,
+                    attempt=attempt + 1,
+                    delay_seconds=delay,
+                    error=str(e),
+                )
+                time.sleep(delay)
+
+        state.frames.update(outputs)
+        return outputs
+
+    def _complete(self, state: "_BatchState", name: str, outputs: dict[str, Any]) -> None:
+        """Checkpoint the outputs of a stage and record it as completed."""
+        checkpoint = state.checkpoint
+        checkpoint.completed.append(name)
+        if self.checkpoints is not None:
+            if outputs:
+                with state.recorder.span(f"checkpoint_{name}"):
+                    for output, df in outputs.items():
+                        self.repository.write_checkpoint(df, checkpoint.batch_id, output)
+            self.checkpoints.save(checkpoint)
+
+    def _frame(self, state: "_BatchState", name: str) -> Any:
+        """Get a data frame of the batch, reading it from its checkpoint if a past run made it."""
+        if name not in state.frames:
+            with state.recorder.span(f"load_{name}_checkpoint") as span:
+                state.frames[name] = self.repository.read_checkpoint(state.batch_id, name)
+                span.rows_out = count_rows(state.frames[name])
+        return state.frames[name]
+
+    def _build_silver(self, state: "_BatchState") -> dict[str, Any]:
+        """Stage: read bronze, clean it into silver and drop duplicates."""
+        recorder = state.recorder
+        prefetch = self.settings.pipeline_prefetch_files
+        if self.pipeline.transform_cache is not None:
+            # Unchanged bronze files are served from the transform cache
+            cache_before = self._transform_cache_stats()
+            with recorder.span("bronze_to_silver_cached") as span:
+                silver_df, quarantine_df, records_in, checksum = self.pipeline.to_silver_cached(
+                    prefetch=prefetch
+                )
+                span.rows_in = records_in
+                span.rows_out = count_rows(silver_df)
+            state.values["records_in"] = records_in
+            # Saved with the layer metadata, which other processes export
+            state.values["transform_cache"] = {
+                name: value - cache_before.get(name, 0)
+                for name, value in self._transform_cache_stats().items()
+            }
+            logger.info(
+                "bronze_loaded",
+                batch_id=state.batch_id,
+                record_count=records_in,
+                checksum=checksum,
+                transform_cache=self.pipeline.transform_cache.stats(),
+            )
+        elif prefetch > 0 and isinstance(self.repository, BronzeFileReader):
+            # Bronze files are read ahead while the current one is transformed
+            with recorder.span("bronze_to_silver") as span:
+                silver_df, quarantine_df, records_in = self.pipeline.to_silver_prefetched(prefetch)
+                span.rows_in = records_in
+                span.rows_out = count_rows(silver_df)
+            checksum = None
+            state.values["records_in"] = records_in
+            logger.info("bronze_loaded", batch_id=state.batch_id, record_count=records_in)
+        else:
+            # Read bronze data once and hand it to the pipeline stages
+            with recorder.span("read_bronze") as span:
+                bronze_df = self.repository.read_bronze()
+                records_in = span.rows_out = count_rows(bronze_df)
+            checksum = None
+            state.values["records_in"] = records_in
+            logger.info("bronze_loaded", batch_id=state.batch_id, record_count=records_in)
+            with recorder.span("bronze_to_silver", rows_in=records_in) as span:
+                silver_df, quarantine_df = self.pipeline.to_silver(bronze_df)
+                span.rows_out = count_rows(silver_df)
+
+        with recorder.span("deduplicate", rows_in=count_rows(silver_df)) as span:
+            silver_df, duplicate_count = self.pipeline.deduplicate(silver_df)
+            span.rows_out = count_rows(silver_df)
+
+        state.values.update(
+            checksum=checksum,
+            duplicate_count=duplicate_count,
+            silver_count=span.rows_out,
+            quarantine_count=count_rows(quarantine_df),
+        )
+        return {"silver": silver_df, "quarantine": quarantine_df}
+
+    def _check_silver(self, state: "_BatchState") -> None:
+        """Stage: validate silver quality (logged; does not stop the batch)."""
+        silver_df = self._frame(state, "silver")
+        with state.recorder.span("validate_silver", rows_in=state.values["silver_count"]) as span:
+            validation = self._validate_silver(silver_df)
+            span.rows_out = validation.records_validated
+        logger.info(
+            "silver_validated",
+            batch_id=state.batch_id,
+            is_valid=validation.is_valid,
+            sampled=validation.sampled,
+            records_validated=validation.records_validated,
+            records_failed=int(validation.records_failed),
+            estimated_failure_rate=validation.estimated_failure_rate,
+            errors=validation.errors,
+            warnings=validation.warnings,
+        )
+
+    def _build_gold(self, state: "_BatchState") -> dict[str, Any]:
+        """Stage: aggregate silver into gold."""
+        silver_df = self._frame(state, "silver")
+        with state.recorder.span("silver_to_gold", rows_in=state.values["silver_count"]) as span:
+            gold_df = self.pipeline.to_gold(silver_df)
+            state.values["gold_count"] = span.rows_out = count_rows(gold_df)
+        with state.recorder.span("sketch_gold", rows_in=state.values["gold_count"]) as span:
+            counts, sketches = partition_sketches(
+                gold_df, "entity_id", "date", self.settings.entity_sketch_precision
+            )
+            state.values["gold_partition_counts"] = counts
+            state.values["gold_entity_sketches"] = {
+                date: sketch.to_string() for date, sketch in sketches.items()
+            }
+            span.rows_out = len(sketches)
+        return {"gold": gold_df}
+
+    def _build_gold_grains(self, state: "_BatchState") -> dict[str, Any]:
+        """Stage: aggregate silver into the gold table of every configured grain."""
+        silver_df = self._frame(state, "silver")
+        with state.recorder.span(
+            "silver_to_gold_grains", rows_in=state.values["silver_count"]
+        ) as span:
+            tables = self.pipeline.to_gold_grains(silver_df)
+            for name, df in tables.items():
+                state.values[f"{name}_count"] = count_rows(df)
+            span.rows_out = sum(state.values[f"{name}_count"] for name in tables)
+        return tables
+
+    def _write(self, state: "_BatchState", layer: str) -> None:
+        """Stage: write the batch's data frame of a layer."""
+        df = self._frame(state, layer)
+        count = state.values[f"{layer}_count"]
+        writers = {
+            "silver": self.repository.write_silver,
+            "quarantine": self.repository.write_quarantine,
+            "gold": self.repository.write_gold,
+        }
+        # Per-grain gold tables gain the batch's rows like the gold layer
+        writer = writers.get(
+            layer, lambda df, metadata: self.repository.write_table(df, layer, metadata, "append")
+        )
+        # Quarantined rows are not part of the batch's content checksum
+        checksum = None if layer == "quarantine" else state.values["checksum"]
+        with state.recorder.span(f"write_{layer}", rows_in=count) as span:
+            writer(df, self._metadata(state.batch_id, layer, count, checksum))
+            span.rows_out = count
+
+    def _save_metadata(self, state: "_BatchState", layer: str) -> None:
+        """Stage: save the metadata of a layer write, with the spans recorded so far."""
+        with state.recorder.span(f"save_{layer}_metadata"):
+            metadata = self._metadata(
+                state.batch_id,
+                layer,
+                state.values[f"{layer}_count"],
+                state.values["checksum"],
+                state.recorder,
+            )
+            # Gold metadata carries the per-date counts and entity sketches /metrics merges
+            metadata.partition_counts = state.values.get(f"{layer}_partition_counts", {})
+            metadata.entity_sketches = state.values.get(f"{layer}_entity_sketches", {})
+            metadata.transform_cache = state.values.get("transform_cache", {})
+            self.repository.save_metadata(metadata)
+
+    def _commit_silver_keys(self, state: "_BatchState") -> None:
+        """Stage: record the written silver keys in the dedup index."""
+        # Without an index there is nothing to commit, so a resumed run skips the load
+        silver_df = None
+        if self.pipeline.dedup_index is not None:
+            silver_df = self._frame(state, "silver")
+        with state.recorder.span("commit_silver_keys", rows_in=state.values["silver_count"]):
+            self.pipeline.commit_silver_keys(silver_df)
+
+    def _build_tables(self, state: "_BatchState") -> None:
+        """Stage: build the derived tables whose inputs changed, failing if one fails."""
+        if self.pipeline.tables is None:
+            return
+        builder = TableBuilder(self.repository, self.pipeline.tables, self.settings)
+        with state.recorder.span("build_tables") as span:
+            reports = builder.build()
+            span.rows_out = sum(r.record_count for r in reports if r.status == "built")
+        failed = [r.table for r in reports if r.status == "failed"]
+        if failed:
+            raise RuntimeError(f"Derived tables failed: {', '.join(failed)}")
+
+    def _io_executor(self) -> AbstractContextManager[IoExecutor | None]:
+        """Background I/O thread of a batch run (None if I/O does not overlap compute)."""
+        if self.settings.pipeline_overlap_io:
+            return IoExecutor()
+        return nullcontext()
+
+    def _finish(self, state: "_BatchState") -> None:
+        """Delete the checkpoint of a completed batch."""
+        if self.checkpoints is not None:
+            self.repository.delete_checkpoint(state.batch_id)
+            self.checkpoints.delete(state.batch_id)
+
+    def run(self, resume: str | None = None) -> PipelineMetrics:
         """
         Execute batch processing with metadata tracking.
 
+        Each completed stage is checkpointed. A failed batch can be rerun
+        with resume set to its batch ID, which skips the stages that
+        completed and reuses their checkpointed outputs.
+
+        Args:
+            resume: ID of a failed batch to resume (a new batch is started if None)
+
         Returns:
             Pipeline execution metrics
+
+        Raises:
+            ValueError: If the batch to resume has no checkpoint
         """
-        # Generate batch ID
-        batch_id = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
+        checkpoint = self._start(resume)
+        batch_id = self.batch_id = checkpoint.batch_id
+
         logger.info(
             "batch_started",
             batch_id=batch_id,
             source=self.source,
+            resumed=resume is not None,
+            completed_stages=list(checkpoint.completed),
         )
 
         start_time = time.time()
         errors = 0
+        profiler = None
+        if self.profile:
+            # Resumed runs are profiled next to, not over, the first run's profile
+            run_name = batch_id if checkpoint.runs == 1 else f"{batch_id}_run{checkpoint.runs}"
+            profile_path = Path(self.settings.profile_full_path) / run_name
+            profiler = StageProfiler(profile_path, self.settings.profile_top_functions)
+        recorder = StageRecorder(getattr(self.repository, "io", None), profiler)
+        state = _BatchState(checkpoint, recorder)
+        values = checkpoint.values
+        cache_before = self._transform_cache_stats()
 
         try:
-            # Read bronze data count
-            bronze_df = self.repository.read_bronze()
-            if hasattr(bronze_df, "__len__"):  # pandas
-                records_in = len(bronze_df)
-            else:  # Spark
-                records_in = bronze_df.count()
+            with self._io_executor() as io:
+                state.io = io
+                self._run_stage(state, "silver", lambda: self._build_silver(state))
 
-            logger.info("bronze_loaded", batch_id=batch_id, record_count=records_in)
+                # Silver and rejected rows are written (on the I/O thread, when
+                # overlapping) while silver is validated and gold is computed
+                self._run_stage(
+                    state, "write_silver", lambda: self._write(state, "silver"), background=True
+                )
+                if values["quarantine_count"] > 0:
+                    self._run_stage(
+                        state,
+                        "write_quarantine",
+                        lambda: self._write(state, "quarantine"),
+                        background=True,
+                    )
+                self._run_stage(
+                    state,
+                    "save_silver_metadata",
+                    lambda: self._save_metadata(state, "silver"),
+                    background=True,
+                )
 
-            # Run pipeline
-            silver_df, gold_df, silver_count, gold_count = self.pipeline.run_batch()
+                self._run_stage(
+                    state, "validate_silver", lambda: self._check_silver(state), retry=False
+                )
+                self._run_stage(state, "gold", lambda: self._build_gold(state), retry=False)
+                gold_grains = self.pipeline.gold_grains
+                if gold_grains is not None:
+                    self._run_stage(
+                        state,
+                        "gold_grains",
+                        lambda: self._build_gold_grains(state),
+                        retry=False,
+                    )
 
-            # Create and save silver metadata
-            silver_metadata = BatchMetadata(
-                batch_id=batch_id,
-                source=self.source,
-                ingestion_time=datetime.now(),
-                record_count=silver_count,
-                layer="silver",
-            )
+                # Gold is queued behind silver, so it is never committed first
+                self._run_stage(
+                    state, "write_gold", lambda: self._write(state, "gold"), background=True
+                )
+                self._run_stage(
+                    state,
+                    "save_gold_metadata",
+                    lambda: self._save_metadata(state, "gold"),
+                    background=True,
+                )
+                for table in gold_grains.tables if gold_grains is not None else []:
+                    self._run_stage(
+                        state,
+                        f"write_{table}",
+                        partial(self._write, state, table),
+                        background=True,
+                    )
+                # Keys are committed last, so a failed gold write leaves the batch
+                # replayable instead of its rows being dropped as duplicates
+                self._run_stage(
+                    state,
+                    "commit_silver_keys",
+                    lambda: self._commit_silver_keys(state),
+                    background=True,
+                )
+                if io is not None:
+                    io.wait()
+
+            # Derived tables read the committed layers, so they follow the writes
+            state.io = None
+            if self.pipeline.tables:
+                self._run_stage(state, "build_tables", lambda: self._build_tables(state))
 
-            # Write silver data
-            self.repository.write_silver(silver_df, silver_metadata)
-            self.repository.save_metadata(silver_metadata)
-            
             logger.info(
                 "silver_written",
                 batch_id=batch_id,
-                record_count=silver_count,
+                record_count=values["silver_count"],
+                quarantined_count=values["quarantine_count"],
+                duplicate_count=values["duplicate_count"],
             )
-
-            # Create and save gold metadata
-            gold_metadata = BatchMetadata(
-                batch_id=batch_id,
-                source=self.source,
-                ingestion_time=datetime.now(),
-                record_count=gold_count,
-                layer="gold",
-            )
-
-            # Write gold data
-            self.repository.write_gold(gold_df, gold_metadata)
-            self.repository.save_metadata(gold_metadata)
-            
             logger.info(
                 "gold_written",
                 batch_id=batch_id,
-                record_count=gold_count,
+                record_count=values["gold_count"],
             )
 
-            records_out = gold_count
+            self._finish(state)
+            records_out = values["gold_count"]
+            quarantine_count = values["quarantine_count"]
+            duplicate_count = values["duplicate_count"]
 
         except Exception as e:
-            logger.error(
+            logger.exception(
                 "batch_failed",
                 batch_id=batch_id,
                 error=str(e),
-                exc_info=True,
+                failed_stage=next((span.name for span in recorder.spans if span.error), None),
+                completed_stages=list(checkpoint.completed),
+                resumable=self.checkpoints is not None,
             )
             errors = 1
-            records_in = 0
             records_out = 0
+            quarantine_count = 0
+            duplicate_count = 0
+
+        # All writes have finished or failed, so frames cached for them can go
+        self.pipeline.release_silver()
 
         # Calculate duration
         duration_seconds = time.time() - start_time
 
         # Create metrics
         metrics = PipelineMetrics(
-            records_in=records_in,
+            records_in=values.get("records_in", 0),
             records_out=records_out,
             duration_seconds=duration_seconds,
             errors=errors,
+            records_quarantined=quarantine_count,
+            records_duplicate=duplicate_count,
+            stages=recorder.spans,
         )
+        self._record_runtime_metrics(metrics, cache_before)
+
+        if profiler is not None:
+            logger.info(
+                "batch_profiled",
+                batch_id=batch_id,
+                profile_path=str(profiler.close()),
+                hottest_functions=profiler.summary(),
+            )
 
         logger.info(
             "batch_completed",
@@ -132,10 +626,37 @@ class BatchRunner:
         return metrics
 
 
+@dataclass
+class _BatchState:
+    """Progress of one run of a batch: its checkpoint, spans and data frames in memory."""
+
+    checkpoint: BatchCheckpoint
+    recorder: StageRecorder
+    frames: dict[str, Any] = field(default_factory=dict)
+    io: IoExecutor | None = None  # I/O thread, when writes overlap compute
+
+    @property
+    def batch_id(self) -> str:
+        """Batch identifier."""
+        return self.checkpoint.batch_id
+
+    @property
+    def values(self) -> dict[str, Any]:
+        """Counts and checksum of the batch."""
+        return self.checkpoint.values
+
+
 class StreamingRunner:
     """Manages streaming processing execution (scaffold only)."""
 
-    def __init__(self, pipeline: Pipeline, repository: BaseRepository, source: str = "default"):
+    def __init__(
+        self,
+        pipeline: Pipeline,
+        repository: BaseRepository,
+        source: str = "default",
+        settings: Settings | None = None,
+        profile: bool = False,
+    ):
         """
         Initialize streaming runner.
 
@@ -143,10 +664,14 @@ class StreamingRunner:
             pipeline: Pipeline instance
             repository: Data repository
             source: Data source identifier
+            settings: Application settings (defaults to the cached settings)
+            profile: Profile each micro-batch (for implementations of run)
         """
         self.pipeline = pipeline
         self.repository = repository
         self.source = source
+        self.settings = settings or get_settings()
+        self.profile = profile
 
     def run(self) -> None:
         """
@@ -167,6 +692,8 @@ class StreamingRunner:
         # 3. Apply transformations
         # 4. Write to silver/gold layers
         # 5. Handle checkpointing and exactly-once semantics
+        # Micro-batches would be timed, and profiled if self.profile is set,
+        # through a StageRecorder as in BatchRunner.run
 
         raise NotImplementedError(
             "Streaming processing is scaffolded but not fully implemented. "
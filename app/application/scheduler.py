@@ -0,0 +1,493 @@
+"""Multi-source scheduler - runs the batches of many sources concurrently within budgets."""
+
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app.application.pipeline import Pipeline
+from app.application.runner import BatchRunner, source_slug
+from app.infrastructure.logging import get_log_sink, get_logger
+from app.infrastructure.monitoring import get_metrics_collector
+from app.infrastructure.settings import Settings
+
+logger = get_logger(__name__)
+
+# Directory, under the scheduler path, of the latest report of every source
+REPORTS_DIR = "reports"
+
+
+@dataclass
+class SourcePlan:
+    """Backlog of a source and the resources its batch is expected to need."""
+
+    source: str
+    bronze_path: str
+    files: int  # bronze files the batch reads
+    backlog_files: int  # files added or changed since the last successful batch
+    backlog_bytes: int
+    lag_seconds: float  # age of the oldest file not yet processed
+    memory_bytes: int  # estimated peak memory of the batch
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to dictionary."""
+        return asdict(self)
+
+
+@dataclass
+class SourceReport:
+    """Outcome of a source's batch in a scheduler run."""
+
+    source: str
+    status: str  # succeeded, failed or skipped
+    backlog_files: int = 0
+    backlog_bytes: int = 0
+    lag_seconds: float = 0.0
+    batch_id: str | None = None
+    started_at: float | None = None  # epoch seconds
+    queued_seconds: float = 0.0  # wait for a worker and the memory budget
+    duration_seconds: float = 0.0
+    records_in: int = 0
+    records_out: int = 0
+    peak_rss_bytes: int = 0
+    error: str | None = None
+
+    @property
+    def throughput(self) -> float:
+        """Records per second of the batch."""
+        if self.duration_seconds == 0:
+            return 0.0
+        return self.records_in / self.duration_seconds
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to dictionary."""
+        return {**asdict(self), "throughput": self.throughput}
+
+
+class SourceWatermarks:
+    """
+    Start time of every source's last successful batch.
+
+    Bronze files modified after it are the source's backlog. Only the
+    scheduling process writes watermarks, one JSON file per source,
+    replaced atomically. The latest report of each source is kept next to
+    them, so processes other than the scheduler can export it.
+    """
+
+    def __init__(self, settings: Settings):
+        """
+        Initialize watermark store.
+
+        Args:
+            settings: Application settings
+        """
+        self.path = Path(settings.scheduler_full_path)
+
+    def _file(self, source: str) -> Path:
+        """Watermark file of a source."""
+        return self.path / f"{source_slug(source)}.json"
+
+    def get(self, source: str) -> float | None:
+        """
+        Get the start of the source's last successful batch.
+
+        Args:
+            source: Source name
+
+        Returns:
+            Epoch seconds, or None if the source never completed a batch
+        """
+        try:
+            return float(json.loads(self._file(source).read_text())["started_at"])
+        except FileNotFoundError:
+            return None
+
+    def set(self, source: str, started_at: float, batch_id: str | None = None) -> None:
+        """
+        Record a successful batch of a source.
+
+        Args:
+            source: Source name
+            started_at: Epoch seconds the batch started at
+            batch_id: Identifier of the batch
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        path = self._file(source)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        tmp_path.write_text(
+            json.dumps({"source": source, "started_at": started_at, "batch_id": batch_id})
+        )
+        os.replace(tmp_path, path)
+
+    def save_report(self, report: SourceReport) -> None:
+        """
+        Record the latest report of a source, replacing the previous one.
+
+        Args:
+            report: Report of the source's latest scheduling outcome
+        """
+        reports_path = self.path / REPORTS_DIR
+        reports_path.mkdir(parents=True, exist_ok=True)
+        path = reports_path / f"{source_slug(report.source)}.json"
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        tmp_path.write_text(json.dumps({**report.to_dict(), "reported_at": time.time()}))
+        os.replace(tmp_path, path)
+
+    def reports(self) -> list[dict[str, Any]]:
+        """
+        Get the latest report of every source, with the time it was recorded.
+
+        Returns:
+            Report dictionaries, one per source that has been scheduled
+        """
+        reports = []
+        for path in sorted((self.path / REPORTS_DIR).glob("*.json")):
+            try:
+                reports.append(json.loads(path.read_text()))
+            except (FileNotFoundError, ValueError):
+                continue
+        return reports
+
+
+def parse_sources(entries: list[str]) -> dict[str, str]:
+    """
+    Parse sources given as name=bronze_path.
+
+    Args:
+        entries: Source entries
+
+    Returns:
+        Bronze path per source name
+
+    Raises:
+        ValueError: If an entry is malformed or a name is repeated
+    """
+    sources: dict[str, str] = {}
+    for entry in entries:
+        name, separator, path = entry.partition("=")
+        if not separator or not name.strip() or not path.strip():
+            raise ValueError(f"Expected name=bronze_path, got: {entry}")
+        if name.strip() in sources:
+            raise ValueError(f"Source {name.strip()} given more than once")
+        sources[name.strip()] = path.strip()
+    return sources
+
+
+def memory_budget_bytes(settings: Settings) -> int:
+    """
+    Memory the scheduler lets running batches use.
+
+    Args:
+        settings: Application settings
+
+    Returns:
+        Budget in bytes (0 if unlimited because the RAM size is unknown)
+    """
+    if settings.scheduler_memory_budget_mb > 0:
+        return settings.scheduler_memory_budget_mb * 1024**2
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // 2
+    except (AttributeError, ValueError, OSError):
+        return 0
+
+
+def _row_count(path: Path) -> int:
+    """Rows of a Parquet file according to its footer (0 if it cannot be read)."""
+    try:
+        return int(pq.read_metadata(path).num_rows)
+    except (OSError, pa.ArrowException):
+        return 0
+
+
+def plan_source(
+    settings: Settings,
+    source: str,
+    bronze_path: str,
+    watermark: float | None,
+    now: float | None = None,
+) -> SourcePlan:
+    """
+    Measure a source's backlog and estimate the memory of its batch.
+
+    A batch reads every bronze file of its source, so the memory estimate
+    covers all of them, from the row counts in their Parquet footers. A
+    file whose footer cannot be read adds nothing; the batch reading it
+    reports the error.
+
+    Args:
+        settings: Application settings
+        source: Source name
+        bronze_path: Bronze path of the source, relative to the storage path
+        watermark: Start of the source's last successful batch (epoch seconds)
+        now: Current time (epoch seconds)
+
+    Returns:
+        Plan of the source
+    """
+    now = now if now is not None else time.time()
+    files = sorted((Path(settings.storage_path) / bronze_path).glob("*.parquet"))
+    stats = [path.stat() for path in files]
+    backlog = [stat for stat in stats if watermark is None or stat.st_mtime > watermark]
+    rows = sum(_row_count(path) for path in files)
+    return SourcePlan(
+        source=source,
+        bronze_path=bronze_path,
+        files=len(files),
+        backlog_files=len(backlog),
+        backlog_bytes=sum(stat.st_size for stat in backlog),
+        lag_seconds=max(0.0, now - min(stat.st_mtime for stat in backlog)) if backlog else 0.0,
+        memory_bytes=rows * settings.scheduler_memory_per_row,
+    )
+
+
+def admit(
+    pending: list[SourcePlan], running: int, reserved: int, workers: int, budget: int
+) -> list[SourcePlan]:
+    """
+    Choose the pending batches to start now.
+
+    Batches are taken in priority order while a worker is free and their
+    memory estimate fits in what is left of the budget; smaller batches
+    further down may fill the room a larger one does not fit in. A batch
+    estimated above the whole budget runs alone, once nothing else runs.
+
+    Args:
+        pending: Batches waiting, highest priority first
+        running: Batches running
+        reserved: Memory estimate of the running batches
+        workers: Most batches running at once
+        budget: Memory budget (0 for unlimited)
+
+    Returns:
+        Batches to start, in priority order
+    """
+    admitted: list[SourcePlan] = []
+    for plan in pending:
+        if running + len(admitted) >= workers:
+            break
+        fits = budget <= 0 or reserved + plan.memory_bytes <= budget
+        if fits or (running == 0 and not admitted):
+            admitted.append(plan)
+            reserved += plan.memory_bytes
+    return admitted
+
+
+def run_source(settings: Settings, plan: SourcePlan, queued_at: float) -> SourceReport:
+    """
+    Run the batch of one source (in a scheduler worker process).
+
+    Args:
+        settings: Application settings shared by all sources
+        plan: Plan of the source
+        queued_at: Epoch seconds the scheduler queued the batch at
+
+    Returns:
+        Report of the batch
+    """
+    started_at = time.time()
+    source_settings = settings.model_copy(update={"bronze_path": plan.bronze_path})
+    pipeline = Pipeline.from_settings(source_settings)
+    runner = BatchRunner(
+        pipeline=pipeline,
+        repository=pipeline.repository,
+        source=plan.source,
+        settings=source_settings,
+    )
+    try:
+        metrics = runner.run()
+    finally:
+        # Worker processes exit without running atexit handlers
+        sink = get_log_sink()
+        if sink is not None:
+            sink.flush()
+
+    failed = next((span for span in metrics.stages if span.error), None)
+    return SourceReport(
+        source=plan.source,
+        status="failed" if metrics.errors else "succeeded",
+        backlog_files=plan.backlog_files,
+        backlog_bytes=plan.backlog_bytes,
+        lag_seconds=plan.lag_seconds,
+        batch_id=runner.batch_id,
+        started_at=started_at,
+        queued_seconds=max(0.0, started_at - queued_at),
+        duration_seconds=metrics.duration_seconds,
+        records_in=metrics.records_in,
+        records_out=metrics.records_out,
+        peak_rss_bytes=max((span.peak_rss_bytes for span in metrics.stages), default=0),
+        error=f"{failed.name}: {failed.error}" if failed else None,
+    )
+
+
+class Scheduler:
+    """
+    Runs the batches of many sources concurrently.
+
+    Each source has its own bronze path and runs as a BatchRunner in a
+    worker process, so batches use separate CPUs. Sources with the largest
+    backlog start first. A batch starts when a worker is free and its
+    estimated memory fits in the budget left by the running batches.
+
+    Sources share the silver, gold and quarantine layers: every batch
+    writes its own files there (the source is part of the batch
+    identifier), and the shared manifests, dedup index and gold snapshot
+    are committed under file locks.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        sources: dict[str, str],
+        workers: int | None = None,
+        memory_budget: int | None = None,
+    ):
+        """
+        Initialize scheduler.
+
+        Args:
+            settings: Application settings
+            sources: Bronze path per source name, relative to the storage path
+            workers: Most batches running at once (scheduler_max_workers if None)
+            memory_budget: Memory budget in bytes (from the settings if None)
+
+        Raises:
+            ValueError: If not in local mode, no sources are given or two share a bronze path
+        """
+        if settings.execution_mode != "local":
+            raise ValueError("The scheduler runs local batches only; use Databricks jobs instead")
+        if not sources:
+            raise ValueError("No sources to schedule")
+        if len(set(sources.values())) < len(sources):
+            raise ValueError("Every source needs a bronze path of its own")
+
+        self.settings = settings
+        self.sources = sources
+        self.workers = workers or settings.scheduler_max_workers or os.cpu_count() or 1
+        self.memory_budget = (
+            memory_budget if memory_budget is not None else memory_budget_bytes(settings)
+        )
+        self.watermarks = SourceWatermarks(settings)
+
+    def plan(self) -> list[SourcePlan]:
+        """
+        Plan every source.
+
+        Returns:
+            Plans, highest priority (largest backlog) first
+        """
+        now = time.time()
+        plans = [
+            plan_source(self.settings, source, path, self.watermarks.get(source), now)
+            for source, path in self.sources.items()
+        ]
+        return sorted(plans, key=lambda p: (-p.backlog_bytes, -p.lag_seconds, p.source))
+
+    def run(self, force: bool = False) -> list[SourceReport]:
+        """
+        Run a batch of every source with a backlog.
+
+        Args:
+            force: Also run sources without new bronze files
+
+        Returns:
+            Report per source, in the order the batches finished
+        """
+        reports = []
+        pending = []
+        queued_at = time.time()
+        for plan in self.plan():
+            if plan.files and (plan.backlog_files or force):
+                pending.append(plan)
+            else:
+                reports.append(self._skipped(plan))
+
+        logger.info(
+            "scheduler_started",
+            sources=len(self.sources),
+            pending=len(pending),
+            workers=self.workers,
+            memory_budget_bytes=self.memory_budget,
+        )
+        if self.workers <= 1:
+            for plan in pending:
+                reports.append(self._finish(plan, self._run_inline(plan, queued_at)))
+        else:
+            reports.extend(self._run_pool(pending, queued_at))
+        return reports
+
+    def _run_inline(self, plan: SourcePlan, queued_at: float) -> SourceReport:
+        """Run a source in this process, reporting an error raised before its batch ran."""
+        try:
+            return run_source(self.settings, plan, queued_at)
+        except Exception as e:
+            return self._failed(plan, e)
+
+    def _run_pool(self, pending: list[SourcePlan], queued_at: float) -> list[SourceReport]:
+        """Run batches in worker processes within the worker and memory budgets."""
+        reports = []
+        running: dict[Future, SourcePlan] = {}
+        reserved = 0
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            while pending or running:
+                admitted = admit(pending, len(running), reserved, self.workers, self.memory_budget)
+                for plan in admitted:
+                    pending.remove(plan)
+                    running[pool.submit(run_source, self.settings, plan, queued_at)] = plan
+                    reserved += plan.memory_bytes
+                    logger.info("source_batch_submitted", **plan.to_dict())
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    plan = running.pop(future)
+                    reserved -= plan.memory_bytes
+                    try:
+                        report = future.result()
+                    except Exception as e:
+                        report = self._failed(plan, e)
+                    reports.append(self._finish(plan, report))
+        return reports
+
+    def _skipped(self, plan: SourcePlan) -> SourceReport:
+        """Report of a source without a backlog."""
+        report = SourceReport(source=plan.source, status="skipped", lag_seconds=plan.lag_seconds)
+        self._record(report)
+        return report
+
+    def _failed(self, plan: SourcePlan, error: Exception) -> SourceReport:
+        """Report of a source whose batch could not run."""
+        return SourceReport(
+            source=plan.source,
+            status="failed",
+            backlog_files=plan.backlog_files,
+            backlog_bytes=plan.backlog_bytes,
+            lag_seconds=plan.lag_seconds,
+            error=str(error),
+        )
+
+    def _finish(self, plan: SourcePlan, report: SourceReport) -> SourceReport:
+        """Advance the watermark of a successful source and record its report."""
+        if report.status == "succeeded" and report.started_at is not None:
+            self.watermarks.set(plan.source, report.started_at, report.batch_id)
+        self._record(report)
+        log = logger.info if report.status == "succeeded" else logger.error
+        log("source_batch_finished", **report.to_dict())
+        return report
+
+    def _record(self, report: SourceReport) -> None:
+        """Add a source's lag and throughput to the process metrics and persist its report."""
+        self.watermarks.save_report(report)
+        collector = get_metrics_collector()
+        labels = {"source": report.source}
+        collector.set_gauge("scheduler_source_lag_seconds", report.lag_seconds, labels)
+        collector.increment(
+            "scheduler_batches", labels={"source": report.source, "status": report.status}
+        )
+        if report.status != "skipped":
+            collector.set_gauge("scheduler_source_throughput", report.throughput, labels)
+            collector.record("scheduler_queued_seconds", report.queued_seconds, labels)
@@ -0,0 +1,316 @@
+"""Derived tables - a dependency graph of gold tables built from silver, gold and each other."""
+
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any
+
+from app.application.pipeline import count_rows
+from app.domain.models import BatchMetadata
+from app.domain.transformers import TableTransformer
+from app.infrastructure.logging import get_logger
+from app.infrastructure.monitoring import get_metrics_collector
+from app.infrastructure.repositories.base import BaseRepository
+from app.infrastructure.settings import Settings, get_settings
+
+logger = get_logger(__name__)
+
+# Tables written by the batch pipeline, which derived tables can read
+BASE_TABLES = ("silver", "gold")
+
+
+@dataclass(frozen=True)
+class DerivedTable:
+    """A table built by a transformer from input tables."""
+
+    name: str
+    inputs: tuple[str, ...]
+    transformer: TableTransformer
+
+    @property
+    def layer(self) -> str:
+        """Layer of the table's build metadata."""
+        return f"table_{self.name}"
+
+
+class TableGraph:
+    """
+    Derived tables and the tables they are built from.
+
+    A table's inputs must be silver, gold or tables added before it, so
+    the graph has no cycles and the order tables were added in is a valid
+    build order.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty graph."""
+        self.tables: dict[str, DerivedTable] = {}
+
+    def add(self, name: str, inputs: list[str], transformer: TableTransformer) -> DerivedTable:
+        """
+        Declare a derived table.
+
+        Args:
+            name: Table name (letters, digits, - and _)
+            inputs: Tables the transformer reads
+            transformer: Builds the table from its inputs
+
+        Returns:
+            The declared table
+
+        Raises:
+            ValueError: If the name is invalid or taken, or an input is unknown
+        """
+        if not re.fullmatch(r"[A-Za-z0-9_-]+", name) or name in BASE_TABLES:
+            raise ValueError(f"Invalid derived table name: {name}")
+        if name in self.tables:
+            raise ValueError(f"Table {name} is already declared")
+        if not inputs:
+            raise ValueError(f"Table {name} needs at least one input")
+        for input_name in inputs:
+            if input_name not in BASE_TABLES and input_name not in self.tables:
+                raise ValueError(f"Unknown input {input_name} of table {name}")
+
+        table = DerivedTable(name=name, inputs=tuple(inputs), transformer=transformer)
+        self.tables[name] = table
+        return table
+
+    def upstream(self, names: list[str]) -> list[str]:
+        """
+        Select tables together with the derived tables they depend on.
+
+        Args:
+            names: Tables to build
+
+        Returns:
+            Names of the tables and their derived ancestors, in build order
+
+        Raises:
+            ValueError: If a table is not declared
+        """
+        selected: set[str] = set()
+        stack = list(names)
+        while stack:
+            name = stack.pop()
+            if name not in self.tables:
+                raise ValueError(f"Unknown derived table: {name}")
+            if name not in selected:
+                selected.add(name)
+                stack.extend(i for i in self.tables[name].inputs if i not in BASE_TABLES)
+        return [name for name in self.tables if name in selected]
+
+    def __len__(self) -> int:
+        """Number of derived tables."""
+        return len(self.tables)
+
+
+@dataclass
+class TableBuildReport:
+    """Outcome of one derived table in a build."""
+
+    table: str
+    status: str  # built, fresh, failed or skipped (an input failed)
+    version: int | None = None
+    input_versions: dict[str, int | None] = field(default_factory=dict)
+    record_count: int = 0
+    seconds: float = 0.0
+    error: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to dictionary."""
+        return asdict(self)
+
+
+class TableBuilder:
+    """
+    Builds the derived tables of a graph, skipping those that are fresh.
+
+    A table is fresh when the metadata store says its last build read the
+    current versions of its inputs with the current transformer, so it is
+    not rebuilt. Tables whose inputs are ready are built in parallel on a
+    thread pool (Spark runs their jobs concurrently; pandas overlaps their
+    reads and writes). Each input is read once per build, at the version
+    recorded for it, and shared by all tables reading it; a table built in
+    the same run is handed to the tables reading it without a re-read.
+    """
+
+    def __init__(
+        self,
+        repository: BaseRepository,
+        graph: TableGraph,
+        settings: Settings | None = None,
+        max_workers: int | None = None,
+    ):
+        """
+        Initialize builder.
+
+        Args:
+            repository: Data repository
+            graph: Derived tables to build
+            settings: Application settings (defaults to the cached settings)
+            max_workers: Tables built at once (derived_tables_max_workers if None)
+        """
+        self.repository = repository
+        self.graph = graph
+        self.settings = settings or get_settings()
+        self.max_workers = max(1, max_workers or self.settings.derived_tables_max_workers)
+        self._versions: dict[str, int | None] = {}
+        self._frames: dict[str, Any] = {}
+        self._consumers: dict[str, int] = {}
+        self._locks: dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def build(self, tables: list[str] | None = None, force: bool = False) -> list[TableBuildReport]:
+        """
+        Build derived tables whose inputs changed since their last build.
+
+        Args:
+            tables: Tables to build, with the tables they depend on (all if None)
+            force: Rebuild tables even if they are fresh
+
+        Returns:
+            Report per table, in the order the tables finished
+        """
+        names = self.graph.upstream(tables) if tables else list(self.graph.tables)
+        selected = [self.graph.tables[name] for name in names]
+
+        self._versions = {name: self.repository.table_version(name) for name in BASE_TABLES}
+        self._frames = {}
+        self._consumers = {}
+        for table in selected:
+            for input_name in table.inputs:
+                self._consumers[input_name] = self._consumers.get(input_name, 0) + 1
+        self._locks = {name: threading.Lock() for name in [*BASE_TABLES, *names]}
+
+        waiting = {table.name: {i for i in table.inputs if i in names} for table in selected}
+        reports: list[TableBuildReport] = []
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="tables") as pool:
+            running: dict[Future, DerivedTable] = {}
+            while waiting or running:
+                for table in selected:
+                    if table.name in waiting and not waiting[table.name]:
+                        del waiting[table.name]
+                        running[pool.submit(self._build_table, table, force)] = table
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    table = running.pop(future)
+                    report = future.result()
+                    reports.append(report)
+                    if report.status == "failed":
+                        reports.extend(self._skip_dependents(table.name, waiting))
+                    for inputs in waiting.values():
+                        inputs.discard(table.name)
+
+        self._frames = {}
+        return reports
+
+    def _skip_dependents(self, failed: str, waiting: dict[str, set[str]]) -> list[TableBuildReport]:
+        """Drop the waiting tables that depend on a failed table, reporting them as skipped."""
+        reports = []
+        blocked = {failed}
+        for table in self.graph.tables.values():
+            if table.name in waiting and blocked.intersection(table.inputs):
+                del waiting[table.name]
+                blocked.add(table.name)
+                reports.append(TableBuildReport(table=table.name, status="skipped"))
+                self._release(table.inputs)
+                logger.warning("derived_table_skipped", table=table.name, failed_input=failed)
+        return reports
+
+    def _build_table(self, table: DerivedTable, force: bool) -> TableBuildReport:
+        """Build one table unless it is fresh."""
+        started = time.perf_counter()
+        input_versions = {name: self._versions.get(name) for name in table.inputs}
+        fingerprint = table.transformer.fingerprint()
+        report = TableBuildReport(table=table.name, status="fresh", input_versions=input_versions)
+
+        try:
+            last = self.repository.latest_metadata(table.layer)
+            version = self.repository.table_version(table.name)
+            if (
+                not force
+                and last is not None
+                and version is not None
+                and last.input_versions == input_versions
+                and last.checksum == fingerprint
+            ):
+                report.record_count = last.record_count
+            else:
+                inputs = {name: self._input(name) for name in table.inputs}
+                df = table.transformer.transform(inputs)
+                report.record_count = count_rows(df)
+                metadata = BatchMetadata(
+                    batch_id=f"{datetime.now():%Y%m%d_%H%M%S}_{table.name}",
+                    source="derived",
+                    ingestion_time=datetime.now(),
+                    record_count=report.record_count,
+                    checksum=fingerprint,
+                    layer=table.layer,
+                    input_versions=input_versions,
+                )
+                self.repository.write_table(df, table.name, metadata)
+                self.repository.save_metadata(metadata)
+                version = self.repository.table_version(table.name)
+                report.status = "built"
+                if self._consumers.get(table.name):
+                    self._frames[table.name] = df
+            self._versions[table.name] = version
+            report.version = version
+        except Exception as e:
+            report.status = "failed"
+            report.error = str(e)
+            logger.exception("derived_table_failed", table=table.name, error=str(e))
+        finally:
+            self._release(table.inputs)
+
+        report.seconds = time.perf_counter() - started
+        collector = get_metrics_collector()
+        collector.record("derived_table_seconds", report.seconds, {"table": table.name})
+        collector.increment("derived_tables", labels={"status": report.status})
+        if report.status == "built":
+            logger.info("derived_table_built", **report.to_dict())
+        elif report.status == "fresh":
+            logger.info("derived_table_fresh", **report.to_dict())
+        return report
+
+    def _input(self, name: str) -> Any:
+        """
+        Get an input table, reading it on first use at its recorded version.
+
+        Tables share the frame, so pandas frames are handed out as shallow
+        copies: columns a transformer adds stay in its own copy.
+        """
+        with self._locks[name]:
+            if name not in self._frames:
+                self._frames[name] = self.repository.read_table(name, self._versions.get(name))
+            df = self._frames[name]
+        return df.copy(deep=False) if hasattr(df, "copy") else df
+
+    def _release(self, inputs: tuple[str, ...]) -> None:
+        """Drop frames no waiting table will read."""
+        with self._lock:
+            for name in inputs:
+                self._consumers[name] -= 1
+                if self._consumers[name] == 0:
+                    self._frames.pop(name, None)
+
+
+def default_tables(settings: Settings) -> TableGraph:
+    """
+    Declare the derived tables built for the configured execution mode.
+
+    Args:
+        settings: Application settings
+
+    Returns:
+        Graph with the per-entity summary mart built from gold
+    """
+    from app.infrastructure.engines import create_table_transformer
+
+    graph = TableGraph()
+    graph.add("entity_summary", ["gold"], create_table_transformer(settings, "entity_summary"))
+    return graph
@@ -0,0 +1 @@
+"""Benchmarks used to choose storage and pipeline settings from measurements."""
@@ -0,0 +1,8 @@
+"""Benchmark defaults, importable without the benchmark dependencies (for CLI options)."""
+
+# Codecs and rows-per-row-group values compared by the parquet benchmark
+DEFAULT_CODECS = ("none", "snappy", "lz4", "zstd", "gzip")
+DEFAULT_ROW_GROUP_SIZES = (16 * 1024, 128 * 1024, 1024 * 1024)
+
+# Relative change treated as a regression when comparing result files
+DEFAULT_REGRESSION_THRESHOLD = 0.10
@@ -0,0 +1,167 @@
+"""Benchmark of parquet write configurations on representative layer data."""
+
+import itertools
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, replace
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from app.benchmarks.defaults import DEFAULT_CODECS, DEFAULT_ROW_GROUP_SIZES
+from app.infrastructure.repositories.parquet_options import ParquetWriteOptions
+
+
+@dataclass
+class ParquetBenchmarkResult:
+    """Measurements for one write configuration."""
+
+    label: str
+    options: ParquetWriteOptions
+    rows: int
+    write_seconds: float
+    file_bytes: int
+    read_seconds: float
+    filter_seconds: float
+    filter_rows: int
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to dictionary."""
+        result = asdict(self)
+        result["options"] = self.options.to_dict()
+        return result
+
+
+def sample_silver(num_entities: int, periods: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Build silver-shaped readings: hourly values per entity, in arrival order.
+
+    Args:
+        num_entities: Number of distinct entities
+        periods: Hourly readings per entity
+        seed: Random seed
+
+    Returns:
+        DataFrame with timestamp, entity_id, value and processed_at columns
+    """
+    rng = np.random.default_rng(seed)
+    timestamps = pd.date_range("2026-01-01", periods=periods, freq="h")
+    entities = np.array([f"entity_{i:05d}" for i in range(num_entities)], dtype=object)
+
+    return pd.DataFrame(
+        {
+            "timestamp": np.repeat(timestamps.to_numpy(), num_entities),
+            "entity_id": np.tile(entities, periods),
+            "value": np.round(rng.gamma(2.0, 20.0, periods * num_entities), 3),
+            "processed_at": pd.Timestamp("2026-01-01"),
+        }
+    )
+
+
+def configurations(
+    base: ParquetWriteOptions,
+    codecs: tuple[str, ...] = DEFAULT_CODECS,
+    row_group_sizes: tuple[int, ...] = DEFAULT_ROW_GROUP_SIZES,
+) -> list[tuple[str, ParquetWriteOptions]]:
+    """
+    Build the grid of codec, row-group size and sorting to measure.
+
+    Args:
+        base: Options the grid varies (dictionary and statistics are kept)
+        codecs: Compression codecs to try
+        row_group_sizes: Rows per row group to try
+
+    Returns:
+        List of (label, options)
+    """
+    grid = []
+    for codec, row_group_size, sort in itertools.product(codecs, row_group_sizes, (True, False)):
+        options = replace(
+            base,
+            compression=codec,
+            compression_level=base.compression_level if codec == base.compression else None,
+            row_group_size=row_group_size,
+            sort_keys=list(base.sort_keys) if sort else [],
+        )
+        label = f"{codec}/rg={row_group_size}/{'sorted' if sort else 'unsorted'}"
+        grid.append((label, options))
+    return grid
+
+
+def _best_of(repeats: int, func: Callable[[], Any]) -> tuple[float, Any]:
+    """Run a function several times and return the fastest time and last result."""
+    best = float("inf")
+    result = None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def _read_filtered(path: Path, filters: list[tuple[str, str, Any]]) -> pd.DataFrame:
+    """Read the rows of a parquet file that match the filters."""
+    return pq.read_table(path, filters=filters).to_pandas()
+
+
+def run_parquet_benchmark(
+    df: pd.DataFrame,
+    configs: list[tuple[str, ParquetWriteOptions]],
+    time_column: str,
+    repeats: int = 3,
+    directory: Path | None = None,
+) -> list[ParquetBenchmarkResult]:
+    """
+    Measure write time, file size, full read time and filtered read time.
+
+    The filtered read asks for one entity over the first tenth of the time
+    range, pushed down to pyarrow so row groups are skipped by statistics,
+    which is how sorting and row-group size pay off for layer queries.
+
+    Args:
+        df: Representative layer data
+        configs: List of (label, options) to measure
+        time_column: Time column used for the filtered read
+        repeats: Runs per measurement (the fastest is reported)
+        directory: Scratch directory (a temporary one if None)
+
+    Returns:
+        One result per configuration
+    """
+    times = pd.to_datetime(df[time_column])
+    start = times.min()
+    end = start + (times.max() - start) / 10
+    if df[time_column].dtype == object:
+        start, end = start.date(), end.date()
+    entity = sorted(df["entity_id"].unique())[len(df["entity_id"].unique()) // 2]
+    filters = [("entity_id", "==", entity), (time_column, ">=", start), (time_column, "<=", end)]
+
+    with tempfile.TemporaryDirectory(dir=directory) as scratch:
+        results = []
+        for i, (label, options) in enumerate(configs):
+            path = Path(scratch) / f"config_{i}.parquet"
+
+            write_seconds, _ = _best_of(repeats, partial(options.write, df, path))
+            read_seconds, _ = _best_of(repeats, partial(pd.read_parquet, path))
+            filter_seconds, filtered = _best_of(repeats, partial(_read_filtered, path, filters))
+
+            results.append(
+                ParquetBenchmarkResult(
+                    label=label,
+                    options=options,
+                    rows=len(df),
+                    write_seconds=write_seconds,
+                    file_bytes=path.stat().st_size,
+                    read_seconds=read_seconds,
+                    filter_seconds=filter_seconds,
+                    filter_rows=len(filtered),
+                )
+            )
+            path.unlink()
+
+    return results
@@ -0,0 +1,336 @@
+"""Benchmark of each pipeline stage across data scales and execution modes."""
+
+import json
+import platform
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, cast, get_args
+
+import numpy as np
+import pandas as pd
+
+from app.application.pipeline import count_rows
+from app.benchmarks.defaults import DEFAULT_REGRESSION_THRESHOLD
+from app.benchmarks.parquet import sample_silver
+from app.domain.models import BatchMetadata
+from app.domain.validation import validate_silver_quality
+from app.infrastructure.engines import available_engines, create_repository, create_transformers
+from app.infrastructure.monitoring import PeakRssSampler
+from app.infrastructure.settings import ExecutionMode, Settings
+
+# Stages in pipeline order; each consumes the output of an earlier one
+STAGES = (
+    "read_bronze",
+    "bronze_to_silver",
+    "validate_silver",
+    "silver_to_gold",
+    "write_silver",
+    "write_gold",
+    "read_gold",
+)
+
+# Entities in generated bronze data (rows are spread evenly across them)
+BENCHMARK_ENTITIES = 100
+
+
+@dataclass
+class StageResult:
+    """Measurements for one stage at one scale and execution mode."""
+
+    mode: str
+    scale: int
+    stage: str
+    rows: int
+    wall_seconds: float
+    peak_rss_bytes: int
+
+    @property
+    def rows_per_second(self) -> float:
+        """Rows processed per second of wall time."""
+        if self.wall_seconds == 0:
+            return 0.0
+        return self.rows / self.wall_seconds
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to dictionary."""
+        result = asdict(self)
+        result["rows_per_second"] = self.rows_per_second
+        return result
+
+
+@dataclass
+class Regression:
+    """A stage that got slower or used more memory than in the baseline."""
+
+    mode: str
+    scale: int
+    stage: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def change(self) -> float:
+        """Relative change from the baseline."""
+        if self.baseline == 0:
+            return 0.0
+        return (self.current - self.baseline) / self.baseline
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to dictionary."""
+        result = asdict(self)
+        result["change"] = self.change
+        return result
+
+
+def available_modes() -> list[str]:
+    """Execution modes that can run in this environment."""
+    return available_engines()
+
+
+def sample_bronze(rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Build bronze readings with the defects the silver stage cleans up.
+
+    About 1% of values are null and 1% of rows are exact duplicates.
+
+    Args:
+        rows: Approximate number of rows
+        seed: Random seed
+
+    Returns:
+        DataFrame with timestamp, entity_id and value columns
+    """
+    rng = np.random.default_rng(seed)
+    periods = max(1, rows // BENCHMARK_ENTITIES)
+    df = sample_silver(BENCHMARK_ENTITIES, periods, seed=seed).drop(columns="processed_at")
+
+    df.loc[rng.random(len(df)) < 0.01, "value"] = np.nan
+    duplicates = df.sample(frac=0.01, random_state=seed)
+    return pd.concat([df, duplicates], ignore_index=True)
+
+
+def _components(settings: Settings) -> tuple[Any, Any, Any]:
+    """Create the repository and transformers of the settings' execution mode."""
+    return (create_repository(settings), *create_transformers(settings))
+
+
+def _write_bronze(mode: str, repository: Any, settings: Settings, df: pd.DataFrame) -> None:
+    """Store generated bronze data where the mode's repository reads it."""
+    if mode == "databricks":
+        repository.spark.createDataFrame(df).write.format("delta").mode("overwrite").save(
+            settings.bronze_full_path
+        )
+        return
+    path = Path(settings.bronze_full_path)
+    path.mkdir(parents=True, exist_ok=True)
+    df.to_parquet(path / "benchmark.parquet", index=False)
+
+
+def _materialize(df: Any) -> Any:
+    """Force evaluation so lazy (Spark) stages are timed where they run."""
+    if hasattr(df, "cache"):
+        df = df.cache()
+    count_rows(df)
+    return df
+
+
+def _run_stage(
+    mode: str, scale: int, stage: str, func: Callable[[], Any], rows: Callable[[Any], int]
+) -> tuple[StageResult, Any]:
+    """Time one stage and sample its peak resident memory."""
+    with PeakRssSampler() as sampler:
+        started = time.perf_counter()
+        output = func()
+        wall_seconds = time.perf_counter() - started
+
+    result = StageResult(
+        mode=mode,
+        scale=scale,
+        stage=stage,
+        rows=rows(output),
+        wall_seconds=wall_seconds,
+        peak_rss_bytes=sampler.peak_bytes,
+    )
+    return result, output
+
+
+def _execution_mode(mode: str) -> ExecutionMode:
+    """Check that a mode name is an execution mode Settings accepts."""
+    if mode not in get_args(ExecutionMode):
+        raise ValueError(f"Unknown execution mode: {mode}")
+    return cast(ExecutionMode, mode)
+
+
+def _stages(
+    repository: Any,
+    bronze_to_silver: Any,
+    silver_to_gold: Any,
+    metadata: BatchMetadata,
+    outputs: dict[str, Any],
+) -> dict[str, tuple[Callable[[], Any], Callable[[Any], int]]]:
+    """Work and row count of every stage, reading earlier stages' results from outputs."""
+    return {
+        "read_bronze": (
+            lambda: _materialize(repository.read_bronze()),
+            count_rows,
+        ),
+        "bronze_to_silver": (
+            lambda: _materialize(bronze_to_silver.transform(outputs["read_bronze"])),
+            lambda _: count_rows(outputs["read_bronze"]),
+        ),
+        "validate_silver": (
+            lambda: validate_silver_quality(outputs["bronze_to_silver"]),
+            lambda v: v.records_validated,
+        ),
+        "silver_to_gold": (
+            lambda: _materialize(silver_to_gold.transform(outputs["bronze_to_silver"])),
+            lambda _: count_rows(outputs["bronze_to_silver"]),
+        ),
+        "write_silver": (
+            lambda: repository.write_silver(outputs["bronze_to_silver"], metadata),
+            lambda _: count_rows(outputs["bronze_to_silver"]),
+        ),
+        "write_gold": (
+            lambda: repository.write_gold(outputs["silver_to_gold"], metadata),
+            lambda _: count_rows(outputs["silver_to_gold"]),
+        ),
+        "read_gold": (
+            lambda: _materialize(repository.read_gold()),
+            count_rows,
+        ),
+    }
+
+
+def run_pipeline_benchmark(
+    scales: list[int],
+    modes: list[str] | None = None,
+    directory: Path | None = None,
+) -> list[StageResult]:
+    """
+    Run every pipeline stage at each scale and execution mode.
+
+    Each (mode, scale) pair gets fresh storage, so writes and reads are not
+    affected by earlier runs. Stages run in pipeline order on the previous
+    stage's output, and stage outputs are materialized inside the timing.
+    Throughput counts the rows a stage consumes (rows produced for reads).
+
+    Args:
+        scales: Bronze row counts to benchmark
+        modes: Execution modes (all available modes if None)
+        directory: Scratch directory (a temporary one if None)
+
+    Returns:
+        One result per stage, scale and mode
+    """
+    results = []
+    for mode in modes or available_modes():
+        for scale in scales:
+            with tempfile.TemporaryDirectory(dir=directory) as scratch:
+                settings = Settings(storage_path=scratch, execution_mode=_execution_mode(mode))
+                repository, bronze_to_silver, silver_to_gold = _components(settings)
+                _write_bronze(mode, repository, settings, sample_bronze(scale))
+                metadata = BatchMetadata(
+                    batch_id="benchmark",
+                    source="benchmark",
+                    ingestion_time=datetime.now(),
+                    record_count=scale,
+                    layer="silver",
+                )
+                outputs: dict[str, Any] = {}
+                stages = _stages(repository, bronze_to_silver, silver_to_gold, metadata, outputs)
+
+                for stage in STAGES:
+                    func, rows = stages[stage]
+                    result, outputs[stage] = _run_stage(mode, scale, stage, func, rows)
+                    results.append(result)
+
+    return results
+
+
+def save_results(results: list[StageResult], path: Path) -> None:
+    """
+    Write benchmark results and environment details to a JSON file.
+
+    Args:
+        results: Stage results
+        path: Output file
+    """
+    document = {
+        "created_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "pandas": pd.__version__,
+        "results": [r.to_dict() for r in results],
+    }
+    Path(path).write_text(json.dumps(document, indent=2))
+
+
+def load_results(path: Path) -> list[StageResult]:
+    """
+    Read benchmark results from a JSON file.
+
+    Args:
+        path: File written by save_results
+
+    Returns:
+        Stage results
+    """
+    document = json.loads(Path(path).read_text())
+    fields = StageResult.__dataclass_fields__
+    return [StageResult(**{k: v for k, v in r.items() if k in fields}) for r in document["results"]]
+
+
+def compare_results(
+    baseline: list[StageResult],
+    current: list[StageResult],
+    threshold: float = DEFAULT_REGRESSION_THRESHOLD,
+) -> list[Regression]:
+    """
+    Find stages whose throughput dropped or peak memory grew beyond a threshold.
+
+    Stages are matched on (mode, scale, stage); stages present in only one
+    of the two runs are ignored.
+
+    Args:
+        baseline: Results of the reference run
+        current: Results of the run being checked
+        threshold: Relative change treated as a regression (0.1 = 10%)
+
+    Returns:
+        Regressions found, in the order of the current results
+    """
+    reference = {(r.mode, r.scale, r.stage): r for r in baseline}
+
+    regressions = []
+    for result in current:
+        base = reference.get((result.mode, result.scale, result.stage))
+        if base is None:
+            continue
+        if result.rows_per_second < base.rows_per_second * (1 - threshold):
+            regressions.append(
+                Regression(
+                    result.mode,
+                    result.scale,
+                    result.stage,
+                    "rows_per_second",
+                    base.rows_per_second,
+                    result.rows_per_second,
+                )
+            )
+        if result.peak_rss_bytes > base.peak_rss_bytes * (1 + threshold):
+            regressions.append(
+                Regression(
+                    result.mode,
+                    result.scale,
+                    result.stage,
+                    "peak_rss_bytes",
+                    base.peak_rss_bytes,
+                    result.peak_rss_bytes,
+                )
+            )
+    return regressions
@@ -0,0 +1,139 @@
+"""Benchmark of layer read modes: dtype backend and memory mapping."""
+
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+import pyarrow as pa
+
+from app.benchmarks.parquet import sample_silver
+from app.domain.models import BatchMetadata
+from app.domain.transformers import PandasSilverToGoldTransformer
+from app.infrastructure.repositories.pandas_repository import PandasRepository
+from app.infrastructure.settings import Settings
+
+# (dtype backend, memory map) combinations measured by default
+DEFAULT_READ_MODES = (("numpy", False), ("numpy", True), ("pyarrow", True))
+
+
+@dataclass
+class ReadBenchmarkResult:
+    """Measurements for one read mode."""
+
+    dtype_backend: str
+    memory_map: bool
+    silver_rows: int
+    silver_read_seconds: float
+    gold_read_seconds: float
+    silver_to_gold_seconds: float
+    frame_bytes: int
+    python_peak_bytes: int
+    arrow_bytes: int
+
+    @property
+    def label(self) -> str:
+        """Short name of the read mode."""
+        return f"{self.dtype_backend}/{'mmap' if self.memory_map else 'read'}"
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to dictionary."""
+        result = asdict(self)
+        result["label"] = self.label
+        return result
+
+
+def _populate(settings: Settings, num_entities: int, periods: int, batches: int) -> None:
+    """Write sample silver and gold batches into a scratch storage path."""
+    repository = PandasRepository(settings)
+    transformer = PandasSilverToGoldTransformer()
+    for batch in range(batches):
+        silver = sample_silver(num_entities, periods, seed=batch)
+        silver["timestamp"] += pd.Timedelta(hours=batch * periods)
+        metadata = BatchMetadata(
+            batch_id=f"bench_{batch:04d}",
+            source="benchmark",
+            ingestion_time=datetime.now(),
+            record_count=len(silver),
+            layer="silver",
+        )
+        repository.write_silver(silver, metadata)
+        repository.write_gold(transformer.transform(silver.copy()), metadata)
+
+
+def _timed(func: Any) -> tuple[float, Any]:
+    """Run a function once and return its duration and result."""
+    started = time.perf_counter()
+    result = func()
+    return time.perf_counter() - started, result
+
+
+def run_read_benchmark(
+    num_entities: int = 100,
+    periods: int = 24 * 30,
+    batches: int = 10,
+    modes: tuple[tuple[str, bool], ...] = DEFAULT_READ_MODES,
+    directory: Path | None = None,
+) -> list[ReadBenchmarkResult]:
+    """
+    Measure silver and gold load time, memory and the silver-to-gold stage per read mode.
+
+    Memory is reported three ways: the DataFrame's own size, the peak of
+    Python/NumPy allocations during the silver load (tracemalloc), and the
+    bytes held by the Arrow memory pool afterwards, since Arrow buffers are
+    invisible to tracemalloc.
+
+    Args:
+        num_entities: Entities per batch
+        periods: Hourly readings per entity and batch
+        batches: Number of silver and gold files written
+        modes: (dtype backend, memory map) combinations to measure
+        directory: Scratch directory (a temporary one if None)
+
+    Returns:
+        One result per read mode
+    """
+    results = []
+    with tempfile.TemporaryDirectory(dir=directory) as scratch:
+        settings = Settings(storage_path=scratch)
+        _populate(settings, num_entities, periods, batches)
+
+        for dtype_backend, memory_map in modes:
+            repository = PandasRepository(
+                settings.model_copy(
+                    update={"read_dtype_backend": dtype_backend, "read_memory_map": memory_map}
+                )
+            )
+
+            arrow_before = pa.total_allocated_bytes()
+            tracemalloc.start()
+            silver_seconds, silver = _timed(repository.read_silver)
+            _, python_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            arrow_bytes = pa.total_allocated_bytes() - arrow_before
+
+            gold_seconds, _ = _timed(repository.read_gold)
+            transform_seconds, _ = _timed(
+                lambda frame=silver: PandasSilverToGoldTransformer().transform(frame.copy())
+            )
+
+            results.append(
+                ReadBenchmarkResult(
+                    dtype_backend=dtype_backend,
+                    memory_map=memory_map,
+                    silver_rows=len(silver),
+                    silver_read_seconds=silver_seconds,
+                    gold_read_seconds=gold_seconds,
+                    silver_to_gold_seconds=transform_seconds,
+                    frame_bytes=int(silver.memory_usage(deep=True).sum()),
+                    python_peak_bytes=python_peak,
+                    arrow_bytes=max(arrow_bytes, 0),
+                )
+            )
+            del silver
+
+    return results
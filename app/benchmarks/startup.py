@@ -0,0 +1,100 @@
+"""Benchmark of CLI and API start-up time in fresh interpreters."""
+
+import json
+import subprocess
+import sys
+from dataclasses import asdict, dataclass, field
+from typing import Any, cast
+
+# Libraries whose import dominates start-up when they are loaded eagerly
+HEAVY_MODULES = ("pandas", "numpy", "pyarrow", "pyspark", "sqlalchemy")
+
+# Runs in the child interpreter: time the target, then report what it imported
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+{body}
+seconds = time.perf_counter() - started
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(json.dumps({{"seconds": seconds, "heavy_modules": heavy}}))
+"""
+
+_CLI_BODY = """
+from app.cli import app
+try:
+    app(args=[{command!r}, "--help"], standalone_mode=False, prog_name="energy-platform")
+except SystemExit:
+    pass
+"""
+
+_API_BODY = "import app.main"
+
+
+@dataclass
+class StartupResult:
+    """Start-up time of one CLI command or the API."""
+
+    target: str
+    seconds: float
+    heavy_modules: list[str] = field(default_factory=list)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to dictionary."""
+        return asdict(self)
+
+
+def cli_commands() -> list[str]:
+    """Names of the CLI's commands, as typed on the command line."""
+    import click
+    import typer.main
+
+    from app.cli import app
+
+    return sorted(cast(click.Group, typer.main.get_command(app)).commands)
+
+
+def _probe(body: str, repeats: int) -> tuple[float, list[str]]:
+    """Run a probe in fresh interpreters and return its fastest time and heavy imports."""
+    script = _PROBE.format(body=body, heavy=HEAVY_MODULES)
+    best: float | None = None
+    heavy: list[str] = []
+    for _ in range(repeats):
+        completed = subprocess.run(
+            [sys.executable, "-c", script], capture_output=True, text=True, check=True
+        )
+        # The report is the last line; commands may print help text before it
+        report = json.loads(completed.stdout.strip().splitlines()[-1])
+        if best is None or report["seconds"] < best:
+            best = report["seconds"]
+        heavy = report["heavy_modules"]
+    return best or 0.0, heavy
+
+
+def run_startup_benchmark(
+    commands: list[str] | None = None, repeats: int = 3, include_api: bool = True
+) -> list[StartupResult]:
+    """
+    Measure how long each CLI command and the API take to start.
+
+    Every measurement runs in a new interpreter, so nothing is already
+    imported. A CLI command is timed from importing the CLI until its
+    --help has been printed, which is the cost paid before the command's
+    own work starts; the API is timed importing app.main (what a server
+    worker does before accepting requests).
+
+    Args:
+        commands: CLI commands to measure (all if None)
+        repeats: Runs per target (fastest is reported)
+        include_api: Whether to measure the API as well
+
+    Returns:
+        Result per target
+    """
+    results = []
+    for command in commands if commands is not None else cli_commands():
+        seconds, heavy = _probe(_CLI_BODY.format(command=command), repeats)
+        results.append(StartupResult(target=f"cli {command}", seconds=seconds, heavy_modules=heavy))
+    if include_api:
+        seconds, heavy = _probe(_API_BODY, repeats)
+        results.append(StartupResult(target="api", seconds=seconds, heavy_modules=heavy))
+    return results
@@ -1,23 +1,27 @@
-"""CLI entrypoint for orchestration."""
+"""CLI entrypoint for orchestration.
+
+Commands import the pipeline, engines and benchmarks they use when they
+run, so starting the CLI (or asking for --help) does not load pandas,
+pyarrow or pyspark.
+"""
 
-from datetime import datetime
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import pandas as pd
 import typer
 
-from app.application.pipeline import Pipeline
-from app.application.runner import BatchRunner, StreamingRunner
-from app.domain.transformers import (
-    PandasBronzeToSilverTransformer,
-    PandasSilverToGoldTransformer,
-    SparkBronzeToSilverTransformer,
-    SparkSilverToGoldTransformer,
+from app.benchmarks.defaults import (
+    DEFAULT_CODECS,
+    DEFAULT_REGRESSION_THRESHOLD,
+    DEFAULT_ROW_GROUP_SIZES,
 )
 from app.infrastructure.logging import get_logger, setup_logging
-from app.infrastructure.repositories.pandas_repository import PandasRepository
-from app.infrastructure.repositories.spark_repository import SparkRepository
-from app.infrastructure.settings import get_settings
+from app.infrastructure.settings import Settings, get_settings
+
+if TYPE_CHECKING:
+    from app.application.pipeline import Pipeline
+    from app.benchmarks.pipeline import Regression
+    from app.infrastructure.repositories.base import BaseRepository
 
 # Create Typer app
 app = typer.Typer(
@@ -34,20 +38,31 @@ logger = get_logger(__name__)
 def run_batch(
     source: str = typer.Option("cli", help="Data source identifier"),
     generate_sample: bool = typer.Option(False, help="Generate sample bronze data"),
+    profile: bool = typer.Option(
+        False, help="Write a CPU and allocation profile per stage to the profile directory"
+    ),
+    resume: str | None = typer.Option(
+        None, help="ID of a failed batch to resume from its first incomplete stage"
+    ),
 ) -> None:
     """
     Run batch processing pipeline.
 
     Executes the full medallion architecture flow:
     Bronze -> Silver -> Gold
+
+    With CHECKPOINT_ENABLED=true, completed stages are checkpointed and a
+    failed batch can be rerun with --resume, which skips the stages it
+    completed.
     """
     settings = get_settings()
-    
+
     logger.info(
         "cli_batch_started",
         execution_mode=settings.execution_mode,
         processing_mode=settings.processing_mode,
         source=source,
+        resume=resume,
     )
 
     # Generate sample data if requested
@@ -55,56 +70,53 @@ def run_batch(
         _generate_sample_bronze_data(settings)
         logger.info("sample_data_generated")
 
+    from app.application.runner import BatchRunner
+
     # Instantiate components based on execution mode
-    if settings.execution_mode == "local":
-        repository = PandasRepository(settings)
-        bronze_to_silver = PandasBronzeToSilverTransformer()
-        silver_to_gold = PandasSilverToGoldTransformer()
-    elif settings.execution_mode == "databricks":
-        repository = SparkRepository(settings)
-        bronze_to_silver = SparkBronzeToSilverTransformer()
-        silver_to_gold = SparkSilverToGoldTransformer()
-    else:
-        logger.error("invalid_execution_mode", mode=settings.execution_mode)
-        raise typer.BadParameter(f"Unknown execution mode: {settings.execution_mode}")
+    pipeline, repository = _create_pipeline(settings)
 
-    # Create pipeline and runner
-    pipeline = Pipeline(
-        repository=repository,
-        bronze_to_silver=bronze_to_silver,
-        silver_to_gold=silver_to_gold,
-    )
-    
     runner = BatchRunner(
         pipeline=pipeline,
         repository=repository,
         source=source,
+        settings=settings,
+        profile=profile,
     )
 
     # Execute pipeline
     try:
-        metrics = runner.run()
-        
-        logger.info(
-            "cli_batch_completed",
-            metrics=metrics.to_dict(),
-        )
-        
-        typer.echo(f"✅ Batch processing completed successfully!")
-        typer.echo(f"📊 Records In: {metrics.records_in}")
-        typer.echo(f"📊 Records Out: {metrics.records_out}")
-        typer.echo(f"⏱️  Duration: {metrics.duration_seconds:.2f}s")
-        typer.echo(f"📈 Success Rate: {metrics.success_rate:.1f}%")
-        
+        metrics = runner.run(resume=resume)
     except Exception as e:
-        logger.error("cli_batch_failed", error=str(e), exc_info=True)
-        typer.echo(f"❌ Batch processing failed: {str(e)}", err=True)
+        logger.exception("cli_batch_failed", error=str(e))
+        typer.echo(f"❌ Batch processing failed: {e!s}", err=True)
         raise typer.Exit(code=1)
 
+    if metrics.errors:
+        failed_stage = next((span.name for span in metrics.stages if span.error), "unknown")
+        typer.echo(f"❌ Batch {runner.batch_id} failed in stage {failed_stage}", err=True)
+        if runner.checkpoints is not None:
+            typer.echo(f"💡 Resume it with: run-batch --resume {runner.batch_id}", err=True)
+        raise typer.Exit(code=1)
+
+    logger.info(
+        "cli_batch_completed",
+        metrics=metrics.to_dict(),
+    )
+
+    typer.echo("✅ Batch processing completed successfully!")
+    typer.echo(f"📊 Records In: {metrics.records_in}")
+    typer.echo(f"📊 Records Out: {metrics.records_out}")
+    typer.echo(f"🚫 Records Quarantined: {metrics.records_quarantined}")
+    typer.echo(f"⏱️  Duration: {metrics.duration_seconds:.2f}s")
+    typer.echo(f"📈 Success Rate: {metrics.success_rate:.1f}%")
+
 
 @app.command()
 def run_stream(
     source: str = typer.Option("cli", help="Data source identifier"),
+    profile: bool = typer.Option(
+        False, help="Write a CPU and allocation profile per micro-batch to the profile directory"
+    ),
 ) -> None:
     """
     Run streaming processing pipeline (scaffold only).
@@ -113,7 +125,7 @@ def run_stream(
     Extend StreamingRunner to integrate with your streaming platform.
     """
     settings = get_settings()
-    
+
     logger.info(
         "cli_stream_started",
         execution_mode=settings.execution_mode,
@@ -121,29 +133,17 @@ def run_stream(
         source=source,
     )
 
+    from app.application.runner import StreamingRunner
+
     # Instantiate components
-    if settings.execution_mode == "local":
-        repository = PandasRepository(settings)
-        bronze_to_silver = PandasBronzeToSilverTransformer()
-        silver_to_gold = PandasSilverToGoldTransformer()
-    elif settings.execution_mode == "databricks":
-        repository = SparkRepository(settings)
-        bronze_to_silver = SparkBronzeToSilverTransformer()
-        silver_to_gold = SparkSilverToGoldTransformer()
-    else:
-        raise typer.BadParameter(f"Unknown execution mode: {settings.execution_mode}")
+    pipeline, repository = _create_pipeline(settings)
 
-    # Create pipeline and runner
-    pipeline = Pipeline(
-        repository=repository,
-        bronze_to_silver=bronze_to_silver,
-        silver_to_gold=silver_to_gold,
-    )
-    
     runner = StreamingRunner(
         pipeline=pipeline,
         repository=repository,
         source=source,
+        settings=settings,
+        profile=profile,
     )
 
     # Execute pipeline
@@ -151,35 +151,399 @@ def run_stream(
         runner.run()
     except NotImplementedError as e:
         logger.warning("streaming_not_implemented", message=str(e))
-        typer.echo(f"⚠️  {str(e)}")
+        typer.echo(f"⚠️  {e!s}")
         typer.echo("💡 Extend StreamingRunner to add streaming functionality")
         raise typer.Exit(code=0)
     except Exception as e:
-        logger.error("cli_stream_failed", error=str(e), exc_info=True)
-        typer.echo(f"❌ Streaming processing failed: {str(e)}", err=True)
+        logger.exception("cli_stream_failed", error=str(e))
+        typer.echo(f"❌ Streaming processing failed: {e!s}", err=True)
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def schedule(
+    sources: list[str] | None = typer.Argument(
+        None, help="Sources as name=bronze_path (default: SCHEDULER_SOURCES)"
+    ),
+    workers: int = typer.Option(0, help="Batches run at once (default: scheduler_max_workers)"),
+    memory_budget_mb: int = typer.Option(
+        0, help="Estimated memory running batches may use (default: from settings)"
+    ),
+    force: bool = typer.Option(False, help="Also run sources without new bronze files"),
+) -> None:
+    """
+    Run the batches of many sources concurrently.
+
+    Each source has its own bronze path. Sources with the largest backlog
+    start first, within the worker and memory budgets; sources without new
+    bronze files since their last successful batch are skipped. Reports the
+    lag and throughput of every source.
+    """
+    from app.application.scheduler import Scheduler, parse_sources
+
+    settings = get_settings()
+    try:
+        source_paths = parse_sources(sources) if sources else settings.scheduler_sources
+        scheduler = Scheduler(
+            settings,
+            source_paths,
+            workers=workers or None,
+            memory_budget=memory_budget_mb * 1024**2 if memory_budget_mb > 0 else None,
+        )
+    except ValueError as e:
+        raise typer.BadParameter(str(e))
+
+    typer.echo(
+        f"🗓️  Scheduling {len(source_paths)} sources on {scheduler.workers} workers"
+        f" ({scheduler.memory_budget / 1024**2:.0f} MB memory budget)"
+    )
+    reports = scheduler.run(force=force)
+
+    typer.echo(
+        f"{'source':<20}{'status':<11}{'backlog':>8}{'lag s':>10}{'queued s':>10}"
+        f"{'seconds':>10}{'rows/s':>12}"
+    )
+    for report in reports:
+        typer.echo(
+            f"{report.source:<20}{report.status:<11}{report.backlog_files:>8}"
+            f"{report.lag_seconds:>10.1f}{report.queued_seconds:>10.2f}"
+            f"{report.duration_seconds:>10.2f}{report.throughput:>12,.0f}"
+        )
+        if report.error:
+            typer.echo(f"   ❌ {report.error}", err=True)
+
+    if any(report.status == "failed" for report in reports):
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def generate(
+    entities: int = typer.Option(100, help="Number of entities"),
+    start: str = typer.Option("2026-01-01", help="First reading time"),
+    end: str = typer.Option("2026-01-31", help="Last reading time (ignored with --rows-per-file)"),
+    freq: str = typer.Option("h", help="Reading interval, e.g. 15min, h, D"),
+    files: int = typer.Option(1, help="Number of output files"),
+    rows_per_file: int = typer.Option(0, help="Rows per file (0 covers start..end)"),
+    null_ratio: float = typer.Option(0.0, help="Fraction of rows with a null field"),
+    bad_type_ratio: float = typer.Option(0.0, help="Fraction of rows with an unparseable field"),
+    duplicate_ratio: float = typer.Option(0.0, help="Fraction of rows duplicating another row"),
+    late_ratio: float = typer.Option(0.0, help="Fraction of rows arriving late"),
+    late_max: str = typer.Option("2D", help="Maximum lateness of late rows"),
+    seed: int = typer.Option(0, help="Random seed"),
+    chunk_rows: int = typer.Option(1_000_000, help="Rows generated and written per chunk"),
+    workers: int = typer.Option(0, help="Worker processes (0 uses all CPUs)"),
+    prefix: str = typer.Option("bronze", help="Output file name prefix"),
+) -> None:
+    """
+    Generate synthetic bronze data at scale.
+
+    Data is generated with vectorized NumPy in fixed-size chunks, one worker
+    process per file, so memory stays bounded for 100M+ rows and output is
+    reproducible for a given seed.
+    """
+    from app.infrastructure.generator import GeneratorConfig, generate_bronze
+
+    settings = get_settings()
+    config = GeneratorConfig(
+        entities=entities,
+        start=start,
+        end=end,
+        freq=freq,
+        files=files,
+        rows_per_file=rows_per_file or None,
+        null_ratio=null_ratio,
+        bad_type_ratio=bad_type_ratio,
+        duplicate_ratio=duplicate_ratio,
+        late_ratio=late_ratio,
+        late_max=late_max,
+        seed=seed,
+        chunk_rows=chunk_rows,
+        prefix=prefix,
+    )
+
+    typer.echo(f"🏭 Generating {config.total_rows:,} rows in {files} files")
+    report = generate_bronze(config, Path(settings.bronze_full_path), workers=workers or None)
+    logger.info("bronze_generated", config=config.to_dict(), **report.to_dict())
+
+    typer.echo(
+        f"📝 Wrote {report.rows:,} rows / {report.bytes_written / 1024**2:.1f} MB to "
+        f"{settings.bronze_full_path} in {report.duration_seconds:.1f}s "
+        f"({report.rows_per_second:,.0f} rows/s)"
+    )
+
+
+@app.command()
+def compact(
+    layer: str = typer.Option("all", help="Layer to compact: silver, gold or all"),
+    target_mb: int = typer.Option(0, help="Target file size in MB (0 uses settings)"),
+) -> None:
+    """
+    Compact small files in the silver and gold layers.
+
+    Merges small per-batch files into larger files sorted by entity and time,
+    swapping them in atomically so concurrent readers never see partial state.
+    """
+    settings = get_settings()
+
+    if layer not in ("silver", "gold", "all"):
+        raise typer.BadParameter(f"Unknown layer: {layer}")
+
+    repository = _create_repository(settings)
+
+    target_file_bytes = target_mb * 1024 * 1024 if target_mb > 0 else None
+    layers = ["silver", "gold"] if layer == "all" else [layer]
+
+    for name in layers:
+        report = repository.compact(name, target_file_bytes)
+        logger.info("layer_compacted", **report.to_dict())
+        typer.echo(
+            f"🗜️  {name}: {report.files_before} files / {report.bytes_before / 1024**2:.1f} MB"
+            f" -> {report.files_after} files / {report.bytes_after / 1024**2:.1f} MB"
+        )
+
+
+@app.command()
+def build_tables(
+    tables: list[str] | None = typer.Argument(
+        None, help="Derived tables to build, with the tables they depend on (default: all)"
+    ),
+    force: bool = typer.Option(False, help="Rebuild tables even if their inputs are unchanged"),
+    workers: int = typer.Option(0, help="Tables built at once (default: from settings)"),
+) -> None:
+    """
+    Build the derived gold tables.
+
+    Tables are built in dependency order, independent ones in parallel.
+    A table whose inputs have not changed since its last build is skipped.
+    """
+    from app.application.tables import TableBuilder, default_tables
+
+    settings = get_settings()
+    repository = _create_repository(settings)
+    try:
+        graph = default_tables(settings)
+        reports = TableBuilder(repository, graph, settings, workers or None).build(tables, force)
+    except ValueError as e:
+        raise typer.BadParameter(str(e))
+
+    typer.echo(f"{'table':<24}{'status':<9}{'version':>8}{'rows':>12}{'seconds':>10}")
+    for report in reports:
+        typer.echo(
+            f"{report.table:<24}{report.status:<9}{report.version or '-':>8}"
+            f"{report.record_count:>12,}{report.seconds:>10.2f}"
+        )
+        if report.error:
+            typer.echo(f"   ❌ {report.error}", err=True)
+
+    if any(report.status in ("failed", "skipped") for report in reports):
         raise typer.Exit(code=1)
 
 
+@app.command()
+def bench(
+    scales: str = typer.Option("10000,100000", help="Comma-separated bronze row counts"),
+    modes: str = typer.Option("", help="Comma-separated execution modes (default: all available)"),
+    output: Path = typer.Option(Path("benchmark_results.json"), help="Results JSON file"),
+    baseline: Path | None = typer.Option(None, help="Results file to compare against"),
+    threshold: float = typer.Option(
+        DEFAULT_REGRESSION_THRESHOLD, help="Relative change flagged as a regression"
+    ),
+) -> None:
+    """
+    Benchmark each pipeline stage at several data scales.
+
+    Records rows/sec, wall time and peak RSS per stage to a JSON file and,
+    with --baseline, exits non-zero if any stage regressed.
+    """
+    from app.benchmarks.pipeline import (
+        available_modes,
+        compare_results,
+        load_results,
+        run_pipeline_benchmark,
+        save_results,
+    )
+
+    mode_list = [m.strip() for m in modes.split(",") if m.strip()] or available_modes()
+    scale_list = [int(n) for n in scales.split(",")]
+
+    typer.echo(f"🧪 Benchmarking stages for modes {mode_list} at scales {scale_list}")
+    results = run_pipeline_benchmark(scale_list, mode_list)
+    save_results(results, output)
+
+    typer.echo(
+        f"{'mode':<12}{'rows':>10}  {'stage':<18}{'wall s':>10}{'rows/s':>14}{'peak MB':>10}"
+    )
+    for result in results:
+        typer.echo(
+            f"{result.mode:<12}{result.scale:>10}  {result.stage:<18}"
+            f"{result.wall_seconds:>10.3f}{result.rows_per_second:>14,.0f}"
+            f"{result.peak_rss_bytes / 1024**2:>10.1f}"
+        )
+    typer.echo(f"📝 Results written to {output}")
+
+    if baseline is not None:
+        _report_regressions(compare_results(load_results(baseline), results, threshold))
+
+
+@app.command()
+def bench_compare(
+    baseline: Path = typer.Argument(..., help="Reference results file"),
+    current: Path = typer.Argument(..., help="Results file to check"),
+    threshold: float = typer.Option(
+        DEFAULT_REGRESSION_THRESHOLD, help="Relative change flagged as a regression"
+    ),
+) -> None:
+    """Compare two benchmark result files and exit non-zero on regressions."""
+    from app.benchmarks.pipeline import compare_results, load_results
+
+    _report_regressions(compare_results(load_results(baseline), load_results(current), threshold))
+
+
+def _report_regressions(regressions: "list[Regression]") -> None:
+    """Print regressions and exit with an error if there are any."""
+    if not regressions:
+        typer.echo("✅ No regressions")
+        return
+
+    for regression in regressions:
+        logger.warning("benchmark_regression", **regression.to_dict())
+        typer.echo(
+            f"❌ {regression.mode} {regression.scale} {regression.stage}: {regression.metric} "
+            f"{regression.baseline:,.0f} -> {regression.current:,.0f} ({regression.change:+.1%})"
+        )
+    raise typer.Exit(code=1)
+
+
+@app.command()
+def bench_parquet(
+    layer: str = typer.Option("silver", help="Layer whose data shape to benchmark: silver or gold"),
+    entities: int = typer.Option(100, help="Number of entities in the sample data"),
+    hours: int = typer.Option(24 * 90, help="Hourly readings per entity"),
+    codecs: str = typer.Option(
+        ",".join(DEFAULT_CODECS), help="Comma-separated compression codecs to try"
+    ),
+    row_groups: str = typer.Option(
+        ",".join(str(n) for n in DEFAULT_ROW_GROUP_SIZES),
+        help="Comma-separated rows-per-row-group values to try",
+    ),
+    repeats: int = typer.Option(3, help="Runs per measurement (fastest is reported)"),
+) -> None:
+    """
+    Benchmark parquet write settings on representative layer data.
+
+    Measures write time, file size, full read time and a filtered read for
+    every combination of codec, row-group size and sorting, so the layer's
+    parquet settings can be chosen from measurements.
+    """
+    from app.benchmarks.parquet import configurations, run_parquet_benchmark, sample_silver
+    from app.domain.transformers import PandasSilverToGoldTransformer
+    from app.infrastructure.repositories.parquet_options import ParquetWriteOptions
+
+    settings = get_settings()
+
+    if layer not in ("silver", "gold"):
+        raise typer.BadParameter(f"Unknown layer: {layer}")
+
+    df = sample_silver(entities, hours)
+    time_column = "timestamp"
+    if layer == "gold":
+        df = PandasSilverToGoldTransformer().transform(df)
+        time_column = "date"
+
+    base = ParquetWriteOptions.from_settings(settings, layer)
+    configs = configurations(
+        base,
+        codecs=tuple(c.strip() for c in codecs.split(",")),
+        row_group_sizes=tuple(int(n) for n in row_groups.split(",")),
+    )
+
+    typer.echo(f"🧪 Benchmarking {len(configs)} configurations on {len(df)} {layer} rows")
+    results = run_parquet_benchmark(df, configs, time_column, repeats=repeats)
+
+    typer.echo(f"{'configuration':<36}{'write s':>10}{'MB':>10}{'read s':>10}{'filter s':>10}")
+    for result in sorted(results, key=lambda r: r.filter_seconds):
+        logger.info("parquet_benchmark_result", **result.to_dict())
+        typer.echo(
+            f"{result.label:<36}{result.write_seconds:>10.3f}"
+            f"{result.file_bytes / 1024**2:>10.2f}{result.read_seconds:>10.3f}"
+            f"{result.filter_seconds:>10.4f}"
+        )
+
+
+@app.command()
+def bench_read(
+    entities: int = typer.Option(100, help="Entities per batch"),
+    hours: int = typer.Option(24 * 30, help="Hourly readings per entity and batch"),
+    batches: int = typer.Option(10, help="Number of silver and gold files"),
+) -> None:
+    """
+    Benchmark silver and gold read modes.
+
+    Compares NumPy-backed reads with Arrow-backed (pd.ArrowDtype) reads, with
+    and without memory mapping, on load time, memory and silver-to-gold time.
+    """
+    from app.benchmarks.reads import run_read_benchmark
+
+    typer.echo(f"🧪 Benchmarking read modes on {batches} batches of {entities * hours} rows")
+    results = run_read_benchmark(num_entities=entities, periods=hours, batches=batches)
+
+    typer.echo(
+        f"{'mode':<16}{'silver s':>10}{'gold s':>10}{'s->g s':>10}"
+        f"{'frame MB':>10}{'py peak MB':>12}{'arrow MB':>10}"
+    )
+    for result in results:
+        logger.info("read_benchmark_result", **result.to_dict())
+        typer.echo(
+            f"{result.label:<16}{result.silver_read_seconds:>10.3f}"
+            f"{result.gold_read_seconds:>10.3f}{result.silver_to_gold_seconds:>10.3f}"
+            f"{result.frame_bytes / 1024**2:>10.1f}{result.python_peak_bytes / 1024**2:>12.1f}"
+            f"{result.arrow_bytes / 1024**2:>10.1f}"
+        )
+
+
+@app.command()
+def bench_startup(
+    commands: str = typer.Option("", help="Comma-separated commands (default: all)"),
+    repeats: int = typer.Option(3, help="Runs per target (fastest is reported)"),
+    api: bool = typer.Option(True, help="Also measure API start-up"),
+) -> None:
+    """
+    Benchmark start-up time of each CLI command and the API.
+
+    Runs every target in a fresh interpreter and reports its start-up time
+    and which heavy libraries (pandas, pyarrow, pyspark, ...) it imported.
+    """
+    from app.benchmarks.startup import run_startup_benchmark
+
+    command_list = [c.strip() for c in commands.split(",") if c.strip()] or None
+    results = run_startup_benchmark(command_list, repeats=repeats, include_api=api)
+
+    typer.echo(f"{'target':<24}{'seconds':>10}  heavy modules")
+    for result in results:
+        logger.info("startup_benchmark_result", **result.to_dict())
+        typer.echo(
+            f"{result.target:<24}{result.seconds:>10.3f}  "
+            f"{', '.join(result.heavy_modules) or '-'}"
+        )
+
+
 @app.command()
 def health() -> None:
     """Check system health."""
     settings = get_settings()
-    
+
     typer.echo("🏥 Checking system health...")
-    
+
     # Check repository
-    if settings.execution_mode == "local":
-        repository = PandasRepository(settings)
-    else:
-        repository = SparkRepository(settings)
-    
+    repository = _create_repository(settings)
+
     storage_ok = repository.health_check()
-    
+
     if storage_ok:
         typer.echo("✅ Storage: Healthy")
     else:
         typer.echo("❌ Storage: Unhealthy")
-    
+
     if storage_ok:
         typer.echo("\n✅ System is healthy")
     else:
@@ -187,34 +551,38 @@ def health() -> None:
         raise typer.Exit(code=1)
 
 
-def _generate_sample_bronze_data(settings) -> None:
+def _create_repository(settings: Settings) -> "BaseRepository":
+    """Create the repository of the configured execution mode."""
+    from app.infrastructure.engines import create_repository
+
+    try:
+        repository: BaseRepository = create_repository(settings)
+    except ValueError as e:
+        logger.error("invalid_execution_mode", mode=settings.execution_mode)
+        raise typer.BadParameter(str(e))
+    return repository
+
+
+def _create_pipeline(settings: Settings) -> "tuple[Pipeline, BaseRepository]":
+    """Create the pipeline of the configured execution mode and its repository."""
+    from app.application.pipeline import Pipeline
+
+    try:
+        pipeline = Pipeline.from_settings(settings)
+    except ValueError as e:
+        logger.error("invalid_execution_mode", mode=settings.execution_mode)
+        raise typer.BadParameter(str(e))
+    return pipeline, pipeline.repository
+
+
+def _generate_sample_bronze_data(settings: Settings) -> None:
     """Generate sample bronze data for testing."""
-    import numpy as np
-    
-    # Create sample data
-    dates = pd.date_range(start="2026-02-01", end="2026-02-20", freq="h")
-    entities = ["entity_1", "entity_2", "entity_3"]
-    
-    records = []
-    for date in dates:
-        for entity in entities:
-            records.append({
-                "timestamp": date,
-                "entity_id": entity,
-                "value": float(np.random.uniform(10, 100)),
-            })
-    
-    df = pd.DataFrame(records)
-    
-    # Ensure bronze directory exists
-    bronze_path = Path(settings.bronze_full_path)
-    bronze_path.mkdir(parents=True, exist_ok=True)
-    
-    # Write to bronze layer
-    output_file = bronze_path / "sample_data.parquet"
-    df.to_parquet(output_file, index=False)
-    
-    typer.echo(f"📝 Generated {len(df)} sample records in bronze layer")
+    from app.infrastructure.generator import GeneratorConfig, generate_bronze
+
+    config = GeneratorConfig(entities=3, start="2026-02-01", end="2026-02-20", prefix="sample_data")
+    report = generate_bronze(config, Path(settings.bronze_full_path), workers=1)
+
+    typer.echo(f"📝 Generated {report.rows} sample records in bronze layer")
 
 
 if __name__ == "__main__":
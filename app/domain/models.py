@@ -1,8 +1,7 @@
 """Domain models - pure data structures with no dependencies."""
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional
 
 
 @dataclass
@@ -13,8 +12,14 @@ class BatchMetadata:
     source: str
     ingestion_time: datetime
     record_count: int
-    checksum: Optional[str] = None
-    layer: Optional[str] = None  # bronze, silver, gold
+    checksum: str | None = None
+    layer: str | None = None  # bronze, silver, gold
+    stages: list[dict] = field(default_factory=list)  # stage spans of the run so far
+    # Versions of the tables a derived table read (None for a table never written)
+    input_versions: dict[str, int | None] = field(default_factory=dict)
+    partition_counts: dict[str, int] = field(default_factory=dict)  # rows per ISO date
+    entity_sketches: dict[str, str] = field(default_factory=dict)  # serialized HLL per ISO date
+    transform_cache: dict[str, int] = field(default_factory=dict)  # cache counters of the run
 
     def to_dict(self) -> dict:
         """Convert to dictionary for storage."""
@@ -25,8 +30,35 @@ class BatchMetadata:
             "record_count": self.record_count,
             "checksum": self.checksum,
             "layer": self.layer,
+            "stages": self.stages,
+            "input_versions": self.input_versions,
+            "partition_counts": self.partition_counts,
+            "entity_sketches": self.entity_sketches,
+            "transform_cache": self.transform_cache,
         }
 
+    @classmethod
+    def from_dict(cls, data: dict) -> "BatchMetadata":
+        """Create from a stored dictionary."""
+        ingestion_time = data["ingestion_time"]
+        return cls(
+            batch_id=data["batch_id"],
+            source=data["source"],
+            ingestion_time=(
+                datetime.fromisoformat(ingestion_time)
+                if isinstance(ingestion_time, str)
+                else ingestion_time
+            ),
+            record_count=data["record_count"],
+            checksum=data.get("checksum"),
+            layer=data.get("layer"),
+            stages=list(data.get("stages") or []),
+            input_versions=dict(data.get("input_versions") or {}),
+            partition_counts=dict(data.get("partition_counts") or {}),
+            entity_sketches=dict(data.get("entity_sketches") or {}),
+            transform_cache=dict(data.get("transform_cache") or {}),
+        )
+
 
 @dataclass
 class DataRecord:
@@ -35,7 +67,7 @@ class DataRecord:
     timestamp: datetime
     entity_id: str
     value: float
-    metadata: Optional[dict] = None
+    metadata: dict | None = None
 
 
 @dataclass
@@ -47,6 +79,9 @@ class ValidationResult:
     warnings: list[str]
     records_validated: int
     records_failed: int
+    sampled: bool = False
+    estimated_failure_rate: float | None = None
+    confidence_interval: tuple[float, float] | None = None
 
     @property
     def success_rate(self) -> float:
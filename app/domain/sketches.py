@@ -0,0 +1,637 @@
+"""Probabilistic sketches - compact, mergeable summaries of large data sets."""
+
+import base64
+import math
+import random
+import struct
+import zlib
+from collections.abc import Iterable, Sequence, Sized
+from typing import Any, Optional
+
+import numpy as np
+
+
+def hash_values(values: Iterable[Any]) -> np.ndarray:
+    """
+    Hash values to stable 64-bit integers.
+
+    The hash is deterministic across processes and runs, so sketches built
+    in one batch can be merged with or queried against sketches from another.
+
+    Args:
+        values: Values to hash (converted to strings)
+
+    Returns:
+        Array of uint64 hashes
+    """
+    import pandas as pd
+
+    if not isinstance(values, Sized):
+        values = list(values)
+    if len(values) == 0:
+        return np.empty(0, dtype=np.uint64)
+    keys = pd.Series(values, copy=False).astype(str).to_numpy(dtype=object)
+    hashes: np.ndarray = pd.util.hash_array(keys, categorize=False)
+    return hashes
+
+
+class BloomFilter:
+    """Bloom filter over 64-bit hashes with vectorized add and membership checks."""
+
+    def __init__(self, num_bits: int, num_hashes: int, bits: np.ndarray | None = None):
+        """
+        Initialize bloom filter.
+
+        Args:
+            num_bits: Size of the bit array
+            num_hashes: Number of probe positions per key
+            bits: Existing packed bit array (for deserialization)
+        """
+        self.num_bits = max(8, num_bits)
+        self.num_hashes = max(1, num_hashes)
+        num_bytes = (self.num_bits + 7) // 8
+        self.bits = bits if bits is not None else np.zeros(num_bytes, dtype=np.uint8)
+
+    @classmethod
+    def for_capacity(cls, capacity: int, false_positive_rate: float = 0.01) -> "BloomFilter":
+        """
+        Create a bloom filter sized for an expected number of keys.
+
+        Args:
+            capacity: Expected number of distinct keys
+            false_positive_rate: Target false positive probability
+
+        Returns:
+            Empty bloom filter
+        """
+        capacity = max(1, capacity)
+        num_bits = math.ceil(-capacity * math.log(false_positive_rate) / (math.log(2) ** 2))
+        num_hashes = round(num_bits / capacity * math.log(2))
+        return cls(num_bits, num_hashes)
+
+    def _positions(self, hashes: np.ndarray) -> np.ndarray:
+        """Derive probe positions with double hashing (shape: keys x num_hashes)."""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        h1 = hashes & np.uint64(0xFFFFFFFF)
+        h2 = (hashes >> np.uint64(32)) | np.uint64(1)
+        probes = np.arange(self.num_hashes, dtype=np.uint64)
+        return (h1[:, None] + probes[None, :] * h2[:, None]) % np.uint64(self.num_bits)
+
+    def add_hashes(self, hashes: np.ndarray) -> None:
+        """Add pre-hashed keys to the filter."""
+        positions = self._positions(hashes).ravel()
+        np.bitwise_or.at(
+            self.bits,
+            (positions >> np.uint64(3)).astype(np.int64),
+            (np.uint8(1) << (positions & np.uint64(7)).astype(np.uint8)),
+        )
+
+    def contains_hashes(self, hashes: np.ndarray) -> np.ndarray:
+        """Check pre-hashed keys; False means definitely absent."""
+        positions = self._positions(hashes)
+        byte_values = self.bits[(positions >> np.uint64(3)).astype(np.int64)]
+        bit_values = (byte_values >> (positions & np.uint64(7)).astype(np.uint8)) & 1
+        return np.asarray(bit_values.all(axis=1), dtype=bool)
+
+    def add(self, values: Iterable[Any]) -> None:
+        """Add values to the filter."""
+        self.add_hashes(hash_values(values))
+
+    def contains(self, values: Iterable[Any]) -> np.ndarray:
+        """Check values; False means definitely absent."""
+        return self.contains_hashes(hash_values(values))
+
+    def __contains__(self, value: Any) -> bool:
+        """Check a single value."""
+        return bool(self.contains([value])[0])
+
+    def to_bytes(self) -> bytes:
+        """Serialize to bytes (16-byte header followed by the bit array)."""
+        return struct.pack("<QQ", self.num_bits, self.num_hashes) + self.bits.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "BloomFilter":
+        """Deserialize from :meth:`to_bytes` output."""
+        num_bits, num_hashes = struct.unpack_from("<QQ", data)
+        bits = np.frombuffer(data, dtype=np.uint8, offset=16).copy()
+        return cls(num_bits, num_hashes, bits)
+
+    def to_string(self) -> str:
+        """Serialize to a compact string for JSON storage."""
+        header = f"{self.num_bits}:{self.num_hashes}:"
+        return header + base64.b64encode(self.bits.tobytes()).decode("ascii")
+
+    @classmethod
+    def from_string(cls, data: str) -> "BloomFilter":
+        """Deserialize from :meth:`to_string` output."""
+        num_bits, num_hashes, payload = data.split(":", 2)
+        bits = np.frombuffer(base64.b64decode(payload), dtype=np.uint8).copy()
+        return cls(int(num_bits), int(num_hashes), bits)
+
+
+# Header of a serialized KLL sketch: k, values summarized and number of levels
+_KLL_HEADER = struct.Struct("<IQI")
+_LEVEL_SIZE = struct.Struct("<I")
+
+# Items are stored as float32: half the bytes of float64, and a relative
+# rounding error (about 6e-8) far below the rank error of the sketch
+_KLL_ITEM = np.dtype("<f4")
+
+
+def _pack_kll(k: int, count: int, levels: Sequence[Sequence[float] | np.ndarray]) -> bytes:
+    """Serialize KLL levels: header, items per level, then all items as float32."""
+    sizes = np.array([len(level) for level in levels], dtype="<u4")
+    return (
+        _KLL_HEADER.pack(k, count, len(levels))
+        + sizes.tobytes()
+        + b"".join(np.asarray(level, dtype=_KLL_ITEM).tobytes() for level in levels)
+    )
+
+
+def _unpack_kll(data: bytes) -> tuple[int, int, list[np.ndarray]]:
+    """Deserialize :func:`_pack_kll` output to (k, count, float64 items per level)."""
+    k, count, num_levels = _KLL_HEADER.unpack_from(data)
+    sizes = struct.unpack_from(f"<{num_levels}I", data, _KLL_HEADER.size)
+    offset = _KLL_HEADER.size + 4 * num_levels
+    items = np.frombuffer(data, dtype=_KLL_ITEM, offset=offset).astype(np.float64)
+    levels = []
+    start = 0
+    for size in sizes:
+        levels.append(items[start : start + size])
+        start += size
+    return k, count, levels
+
+
+class KllSketch:
+    """
+    KLL streaming quantile sketch over floats.
+
+    Values are kept in a stack of compactors. Level h holds items that each
+    stand for 2**h input values; when the sketch is full, the lowest level
+    over capacity is sorted and every other item (from a random offset) is
+    promoted to the level above, halving its size. Memory stays around
+    3 * k items whatever the input size, and the rank error of a quantile
+    is roughly 1.7 / k (about 1% for the default k). Sketches with the same
+    k can be merged, so per-batch or per-partition sketches combine into
+    one for the whole data set.
+    """
+
+    # Ratio between the capacities of consecutive levels
+    CAPACITY_DECAY = 2 / 3
+
+    def __init__(
+        self,
+        k: int = 200,
+        compactors: list[list[float]] | None = None,
+        count: int = 0,
+        seed: int | None = None,
+    ):
+        """
+        Initialize KLL sketch.
+
+        Args:
+            k: Capacity of the top level; larger is more accurate
+            compactors: Existing items per level (for deserialization)
+            count: Number of values summarized by the existing items
+            seed: Seed for the compaction offsets (random if None)
+        """
+        self.k = max(8, k)
+        self.compactors = compactors if compactors is not None else [[]]
+        self.count = count
+        self._random = random.Random(seed)
+        self._size = sum(len(c) for c in self.compactors)
+        self._max_size = sum(self._capacity(h) for h in range(len(self.compactors)))
+
+    def _capacity(self, level: int) -> int:
+        """Number of items a level may hold before it is compacted."""
+        depth = len(self.compactors) - level - 1
+        return max(2, math.ceil(self.k * self.CAPACITY_DECAY**depth))
+
+    def _grow(self) -> None:
+        """Add a level on top; lower levels shrink as a result."""
+        self.compactors.append([])
+        self._max_size = sum(self._capacity(h) for h in range(len(self.compactors)))
+
+    def _compress(self) -> None:
+        """Compact levels until the sketch is within its size bound."""
+        while self._size >= self._max_size:
+            for level, items in enumerate(self.compactors):
+                if len(items) < self._capacity(level):
+                    continue
+                if level + 1 == len(self.compactors):
+                    self._grow()
+
+                items.sort()
+                # An odd item out stays at this level
+                keep = [items.pop()] if len(items) % 2 else []
+                promoted = items[self._random.randint(0, 1) :: 2]
+                self.compactors[level + 1].extend(promoted)
+                self.compactors[level] = keep
+                self._size -= len(items) - len(promoted)
+                break
+
+    def update(self, value: float) -> None:
+        """Add a value to the sketch."""
+        self.compactors[0].append(float(value))
+        self.count += 1
+        self._size += 1
+        if self._size >= self._max_size:
+            self._compress()
+
+    def update_many(self, values: Iterable[float]) -> None:
+        """Add many values to the sketch; NaN values are skipped."""
+        array = np.asarray(values, dtype=np.float64).ravel()
+        array = array[~np.isnan(array)]
+        for start in range(0, len(array), self.k):
+            chunk = array[start : start + self.k].tolist()
+            self.compactors[0].extend(chunk)
+            self.count += len(chunk)
+            self._size += len(chunk)
+            if self._size >= self._max_size:
+                self._compress()
+
+    def merge(self, other: "KllSketch") -> None:
+        """
+        Merge another sketch into this one.
+
+        Args:
+            other: Sketch built with the same k
+        """
+        if other.k != self.k:
+            raise ValueError(f"Cannot merge KLL sketches with k={self.k} and k={other.k}")
+        while len(self.compactors) < len(other.compactors):
+            self._grow()
+        for level, items in enumerate(other.compactors):
+            self.compactors[level].extend(items)
+        self.count += other.count
+        self._size = sum(len(c) for c in self.compactors)
+        self._compress()
+
+    def quantiles(self, fractions: Iterable[float]) -> list[float | None]:
+        """
+        Estimate several quantiles at once.
+
+        Args:
+            fractions: Quantiles between 0 and 1 (0.5 is the median)
+
+        Returns:
+            Estimated value per quantile (None if the sketch is empty)
+        """
+        fractions = list(fractions)
+        if self.count == 0:
+            return [None] * len(fractions)
+
+        items = np.concatenate([np.asarray(c, dtype=np.float64) for c in self.compactors])
+        weights = np.concatenate(
+            [np.full(len(c), 2**level, dtype=np.float64) for level, c in enumerate(self.compactors)]
+        )
+        order = np.argsort(items, kind="stable")
+        items = items[order]
+        cumulative = np.cumsum(weights[order])
+
+        targets = np.clip(np.asarray(fractions, dtype=np.float64), 0.0, 1.0) * cumulative[-1]
+        positions = np.searchsorted(cumulative, targets, side="left")
+        positions = np.minimum(positions, len(items) - 1)
+        return [float(items[p]) for p in positions]
+
+    def quantile(self, fraction: float) -> float | None:
+        """Estimate a single quantile (None if the sketch is empty)."""
+        return self.quantiles([fraction])[0]
+
+    def __len__(self) -> int:
+        """Number of values summarized."""
+        return self.count
+
+    def to_string(self) -> str:
+        """Serialize to a compact string for JSON storage."""
+        levels = ";".join(
+            base64.b64encode(np.asarray(c, dtype="<f8").tobytes()).decode("ascii")
+            for c in self.compactors
+        )
+        return f"{self.k}:{self.count}:{levels}"
+
+    @classmethod
+    def from_string(cls, data: str) -> "KllSketch":
+        """Deserialize from :meth:`to_string` output."""
+        k, count, payload = data.split(":", 2)
+        compactors = [
+            np.frombuffer(base64.b64decode(level), dtype="<f8").tolist()
+            for level in payload.split(";")
+        ]
+        return cls(int(k), compactors, int(count))
+
+    def to_bytes(self) -> bytes:
+        """Serialize to compact bytes for binary columns (16-byte header, then float32 items)."""
+        return _pack_kll(self.k, self.count, self.compactors)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "KllSketch":
+        """Deserialize from :meth:`to_bytes` output."""
+        k, count, levels = _unpack_kll(data)
+        return cls(k, [level.tolist() for level in levels], count)
+
+    @property
+    def is_exact(self) -> bool:
+        """Whether every value is kept, so quantiles are exact."""
+        return len(self.compactors) == 1
+
+
+def merge_kll_bytes(blobs: Iterable[bytes | None]) -> Optional["KllSketch"]:
+    """
+    Merge serialized KLL sketches in one pass.
+
+    The items of every level are concatenated across sketches and then
+    compacted once, which is equivalent to merging the sketches one by one
+    but avoids building and compacting a sketch per input.
+
+    Args:
+        blobs: Sketches serialized with :meth:`KllSketch.to_bytes` (None entries are skipped)
+
+    Returns:
+        Merged sketch, or None if no sketch was given
+
+    Raises:
+        ValueError: If the sketches were built with different k
+    """
+    k = None
+    count = 0
+    levels: list[list[np.ndarray]] = []
+    for blob in blobs:
+        if blob is None:
+            continue
+        blob_k, blob_count, blob_levels = _unpack_kll(blob)
+        if k is None:
+            k = blob_k
+        elif blob_k != k:
+            raise ValueError(f"Cannot merge KLL sketches with k={k} and k={blob_k}")
+        count += blob_count
+        for level, items in enumerate(blob_levels):
+            if level == len(levels):
+                levels.append([])
+            levels[level].append(items)
+    if k is None:
+        return None
+
+    # Sorted levels make the compactions' list sorts linear
+    compactors = [np.sort(np.concatenate(items)).tolist() for items in levels]
+    sketch = KllSketch(k, compactors or [[]], count)
+    sketch._compress()
+    return sketch
+
+
+def grouped_kll_sketches(
+    codes: np.ndarray,
+    values: np.ndarray,
+    num_groups: int,
+    k: int = 200,
+    fractions: Iterable[float] = (),
+) -> tuple[list[bytes], np.ndarray]:
+    """
+    Build a serialized KLL sketch of the values of every group, with quantiles.
+
+    Values are sorted by group once. A group with fewer than k values fits
+    in a sketch's first level uncompacted, so its sketch is serialized
+    directly from the sorted values and its quantiles are read off them;
+    only larger groups build a :class:`KllSketch`, fed the sorted values
+    with a fixed compaction seed. A group's sketch therefore depends only
+    on its values, so any engine calling this function builds the same
+    bytes, and the quantiles are those of the serialized (float32) sketch.
+
+    Args:
+        codes: Group of every value (0 to num_groups - 1; negative to skip the value)
+        values: Values to summarize (NaN values are skipped)
+        num_groups: Number of groups
+        k: Sketch capacity, as in :class:`KllSketch`
+        fractions: Quantiles to estimate per group
+
+    Returns:
+        Tuple of (sketch bytes per group, quantile array of shape
+        num_groups x len(fractions), NaN for groups without values)
+    """
+    k = max(8, k)
+    codes = np.asarray(codes, dtype=np.int64)
+    values = np.asarray(values, dtype=np.float64)
+    keep = (codes >= 0) & ~np.isnan(values)
+    codes, values = codes[keep], values[keep]
+    order = np.lexsort((values, codes))
+    values = values[order]
+
+    sizes = np.bincount(codes, minlength=num_groups)
+    ends = np.cumsum(sizes)
+    starts = ends - sizes
+    fractions = np.clip(np.asarray(list(fractions), dtype=np.float64), 0.0, 1.0)
+
+    # Nearest-rank positions, as KllSketch.quantiles picks them from exact items
+    ranks = np.maximum(np.ceil(fractions[None, :] * sizes[:, None]) - 1, 0).astype(np.int64)
+    exact = (sizes > 0) & (sizes < k)
+    quantiles = np.full((num_groups, len(fractions)), np.nan)
+    quantiles[exact] = values[(starts[:, None] + ranks)[exact]].astype(_KLL_ITEM)
+
+    sketches = []
+    for group, (start, end) in enumerate(zip(starts.tolist(), ends.tolist())):
+        size = end - start
+        if size < k:
+            # Same bytes as _pack_kll with a single level
+            header = _KLL_HEADER.pack(k, size, 1) + _LEVEL_SIZE.pack(size)
+            sketches.append(header + values[start:end].astype(_KLL_ITEM).tobytes())
+        else:
+            sketch = KllSketch(k, seed=0)
+            sketch.update_many(values[start:end])
+            sketches.append(sketch.to_bytes())
+            # Rounding to float32 keeps the order, so these are the stored sketch's
+            quantiles[group] = np.asarray(sketch.quantiles(fractions)).astype(_KLL_ITEM)
+    return sketches, quantiles
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    """Number of significant bits of each uint64 (0 for zero)."""
+    values = np.asarray(values, dtype=np.uint64)
+    high = (values >> np.uint64(32)).astype(np.float64)
+    low = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    # Both halves are exact as floats, so frexp's exponent is their bit length
+    return np.where(high > 0, 32 + np.frexp(high)[1], np.frexp(low)[1]).astype(np.uint8)
+
+
+def hll_registers(hashes: np.ndarray, precision: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Map 64-bit hashes to HyperLogLog registers and ranks.
+
+    Args:
+        hashes: Array of uint64 hashes
+        precision: Number of leading hash bits selecting the register
+
+    Returns:
+        Tuple of (register index, rank) arrays. The rank is the position of
+        the first set bit in the remaining hash bits.
+    """
+    hashes = np.asarray(hashes, dtype=np.uint64)
+    width = 64 - precision
+    index = (hashes >> np.uint64(width)).astype(np.int64)
+    remainder = hashes & np.uint64((1 << width) - 1)
+    return index, (width + 1 - _bit_length(remainder)).astype(np.uint8)
+
+
+class HyperLogLog:
+    """
+    HyperLogLog distinct-count sketch over 64-bit hashes.
+
+    Each of the 2**precision registers keeps the highest rank (position of
+    the first set bit) among the hashes routed to it, from which the number
+    of distinct values is estimated with a relative standard error of
+    1.04 / sqrt(2**precision) (1.6% for the default precision). Sketches of
+    the same precision merge by taking register maxima, so distinct counts
+    of any union of batches or partitions come from their sketches alone.
+    """
+
+    def __init__(self, precision: int = 12, registers: np.ndarray | None = None):
+        """
+        Initialize HyperLogLog sketch.
+
+        Args:
+            precision: Register index bits, between 4 and 18; larger is more accurate
+            registers: Existing registers (for deserialization)
+
+        Raises:
+            ValueError: If the precision is out of range
+        """
+        if not 4 <= precision <= 18:
+            raise ValueError(f"HyperLogLog precision must be between 4 and 18, got {precision}")
+        self.precision = precision
+        self.registers = (
+            registers if registers is not None else np.zeros(1 << precision, dtype=np.uint8)
+        )
+
+    @property
+    def relative_error(self) -> float:
+        """Relative standard error of the distinct-count estimate."""
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def add_hashes(self, hashes: np.ndarray) -> None:
+        """Add pre-hashed values to the sketch."""
+        index, rank = hll_registers(hashes, self.precision)
+        np.maximum.at(self.registers, index, rank)
+
+    def add(self, values: Iterable[Any]) -> None:
+        """Add values to the sketch."""
+        self.add_hashes(hash_values(values))
+
+    def merge(self, other: "HyperLogLog") -> None:
+        """
+        Merge another sketch into this one.
+
+        Args:
+            other: Sketch with the same precision
+        """
+        if other.precision != self.precision:
+            raise ValueError(
+                f"Cannot merge HyperLogLog sketches with precision {self.precision} "
+                f"and {other.precision}"
+            )
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def count(self) -> int:
+        """Estimate the number of distinct values added."""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / float(np.sum(np.ldexp(1.0, -self.registers.astype(np.int64))))
+        empty = int(np.count_nonzero(self.registers == 0))
+        # Linear counting is more accurate while many registers are empty
+        if estimate <= 2.5 * m and empty > 0:
+            estimate = m * math.log(m / empty)
+        return round(estimate)
+
+    def to_string(self) -> str:
+        """Serialize to a compact string for JSON storage (registers are compressed)."""
+        payload = base64.b64encode(zlib.compress(self.registers.tobytes())).decode("ascii")
+        return f"{self.precision}:{payload}"
+
+    @classmethod
+    def from_string(cls, data: str) -> "HyperLogLog":
+        """Deserialize from :meth:`to_string` output."""
+        precision, payload = data.split(":", 1)
+        registers = np.frombuffer(zlib.decompress(base64.b64decode(payload)), dtype=np.uint8)
+        return cls(int(precision), registers.copy())
+
+
+def partition_sketches(
+    df: Any, column: str, partition_column: str, precision: int = 12
+) -> tuple[dict[str, int], dict[str, HyperLogLog]]:
+    """
+    Count rows and sketch a column's distinct values per date partition.
+
+    Works on pandas and Spark data frames. Both hash values with
+    :func:`hash_values` (on Spark through a pandas UDF), so sketches built
+    by either engine merge with each other.
+
+    Args:
+        df: Data with the column and a date partition column
+        column: Column whose distinct values are sketched
+        partition_column: Date column partitioning the data
+        precision: HyperLogLog precision
+
+    Returns:
+        Tuple of (row count, sketch) dictionaries keyed by ISO date.
+        Both are empty if either column is missing.
+    """
+    if column not in df.columns or partition_column not in df.columns:
+        return {}, {}
+    if not hasattr(df, "__len__"):
+        return _spark_partition_sketches(df, column, partition_column, precision)
+
+    import pandas as pd
+
+    df = df[df[column].notna() & df[partition_column].notna()]
+    codes, partitions = pd.factorize(df[partition_column], sort=True)
+    index, rank = hll_registers(hash_values(df[column]), precision)
+    registers = np.zeros((len(partitions), 1 << precision), dtype=np.uint8)
+    np.maximum.at(registers, (codes, index), rank)
+    rows = np.bincount(codes, minlength=len(partitions))
+
+    keys = pd.to_datetime(pd.Series(partitions)).dt.strftime("%Y-%m-%d")
+    counts = {key: int(rows[i]) for i, key in enumerate(keys)}
+    sketches = {key: HyperLogLog(precision, registers[i]) for i, key in enumerate(keys)}
+    return counts, sketches
+
+
+def _spark_partition_sketches(
+    df: Any, column: str, partition_column: str, precision: int
+) -> tuple[dict[str, int], dict[str, HyperLogLog]]:
+    """Spark version of :func:`partition_sketches`: registers are reduced in Spark."""
+    import pandas as pd
+    from pyspark.sql import functions as F
+
+    @F.pandas_udf("long")
+    def value_hash(values: pd.Series) -> pd.Series:
+        """Hash values like hash_values, as signed 64-bit integers."""
+        return pd.Series(hash_values(values).view(np.int64))
+
+    width = 64 - precision
+    remainder = F.col("_hash").bitwiseAND(F.lit((1 << width) - 1))
+    rows = (
+        df.filter(F.col(column).isNotNull() & F.col(partition_column).isNotNull())
+        .select(
+            F.date_format(F.col(partition_column), "yyyy-MM-dd").alias("_partition"),
+            value_hash(F.col(column)).alias("_hash"),
+        )
+        .select(
+            "_partition",
+            F.shiftrightunsigned(F.col("_hash"), width).alias("_index"),
+            F.when(remainder == 0, width + 1)
+            .otherwise(width + 1 - F.length(F.bin(remainder)))
+            .alias("_rank"),
+        )
+        .groupBy("_partition", "_index")
+        .agg(F.max("_rank").alias("_rank"), F.count(F.lit(1)).alias("_rows"))
+        .collect()
+    )
+
+    counts: dict[str, int] = {}
+    sketches: dict[str, HyperLogLog] = {}
+    for row in rows:
+        key = row["_partition"]
+        if key not in sketches:
+            counts[key] = 0
+            sketches[key] = HyperLogLog(precision)
+        counts[key] += row["_rows"]
+        sketches[key].registers[row["_index"]] = row["_rank"]
+    return dict(sorted(counts.items())), dict(sorted(sketches.items()))
@@ -1,14 +1,66 @@
 """Domain transformers - pure, stateless transformation logic."""
 
+import hashlib
+import inspect
+import sys
 from abc import ABC, abstractmethod
+from functools import cache
 from typing import Any, Protocol
 
+# Reject reason codes for rows split off into the quarantine layer
+REJECT_NULL_TIMESTAMP = "null_timestamp"
+REJECT_NULL_ENTITY_ID = "null_entity_id"
+REJECT_UNPARSEABLE_TIMESTAMP = "unparseable_timestamp"
+
+
+# Version of the transformation logic, mixed into every transformer
+# fingerprint. Bump it when behavior changes outside the modules that
+# define transformers (e.g. in shared helpers), so cached outputs are
+# invalidated.
+TRANSFORM_VERSION = 1
+
+
+@cache
+def _module_source(name: str) -> str:
+    """Source of a loaded module (its name if the source is unavailable)."""
+    try:
+        return inspect.getsource(sys.modules[name])
+    except (KeyError, OSError, TypeError):
+        return name
+
+
+def transformer_fingerprint(transformer: Any) -> str:
+    """
+    Hash a transformer's code and instance attributes.
+
+    The code is the source of every module defining the transformer's
+    class or a base class, so module-level constants (such as the
+    ``REJECT_*`` codes) and helper functions are covered, plus
+    ``TRANSFORM_VERSION``. Private (underscore) attributes hold runtime
+    state rather than configuration, so they are left out.
+
+    Args:
+        transformer: Transformer instance
+
+    Returns:
+        Hex digest that changes with the transformer's code or configuration
+    """
+    cls = type(transformer)
+    modules = dict.fromkeys(
+        c.__module__ for c in cls.__mro__ if c.__module__ not in ("builtins", "abc")
+    )
+    sources = "\n".join(_module_source(name) for name in modules)
+    config = repr(sorted((k, v) for k, v in vars(transformer).items() if not k.startswith("_")))
+    digest = hashlib.sha256()
+    for part in (str(TRANSFORM_VERSION), cls.__qualname__, sources, config):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
 
 class DataFrame(Protocol):
     """Protocol for DataFrame-like objects (pandas.DataFrame or pyspark.sql.DataFrame)."""
 
-    pass
-
 
 class BronzeToSilverTransformer(ABC):
     """Abstract transformer for Bronze -> Silver layer."""
@@ -24,7 +76,42 @@ class BronzeToSilverTransformer(ABC):
         Returns:
             Cleaned and validated silver data
         """
-        pass
+
+    def transform_with_quarantine(self, df: DataFrame) -> tuple[DataFrame, DataFrame | None]:
+        """
+        Transform bronze data to silver and split off rejected rows.
+
+        Args:
+            df: Raw bronze data
+
+        Returns:
+            Tuple of (silver_df, quarantine_df). quarantine_df holds the rejected
+            rows tagged with a ``reject_reason`` code, or is None if the
+            transformer does not track rejected rows.
+        """
+        return self.transform(df), None
+
+    def release(self) -> None:
+        """Free what was cached for the frames returned by the last transform, once written."""
+
+    def fingerprint(self) -> str:
+        """
+        Identify the transformer's code and configuration.
+
+        Used to key cached outputs, so any change to the transformation
+        logic or its settings invalidates them.
+
+        Returns:
+            Hex digest of the transformer's code and instance attributes
+        """
+        return transformer_fingerprint(self)
+
+
+# Percentile columns of gold and the quantile each estimates from the value sketch
+GOLD_PERCENTILES = {"p50_value": 0.5, "p95_value": 0.95, "p99_value": 0.99}
+
+# Capacity of the KLL value sketches in gold; groups with fewer values are kept exactly
+GOLD_SKETCH_K = 200
 
 
 class SilverToGoldTransformer(ABC):
@@ -41,7 +128,113 @@ class SilverToGoldTransformer(ABC):
         Returns:
             Aggregated gold data
         """
-        pass
+
+
+class TableTransformer(ABC):
+    """Abstract transformer of a derived table, built from one or more input tables."""
+
+    @abstractmethod
+    def transform(self, inputs: dict[str, DataFrame]) -> DataFrame:
+        """
+        Build a derived table.
+
+        Args:
+            inputs: Data of every input table, by table name
+
+        Returns:
+            Data of the derived table
+        """
+
+    def fingerprint(self) -> str:
+        """
+        Identify the transformer's code and configuration.
+
+        A derived table is rebuilt when its transformer's fingerprint
+        changes, even if its inputs did not.
+
+        Returns:
+            Hex digest of the transformer's code and instance attributes
+        """
+        return transformer_fingerprint(self)
+
+
+class SingleInputTransformer(TableTransformer):
+    """Builds a derived table with a silver-to-gold transformer applied to one input table."""
+
+    def __init__(self, transformer: SilverToGoldTransformer, input_name: str = "silver"):
+        """
+        Initialize transformer.
+
+        Args:
+            transformer: Transformer applied to the input table
+            input_name: Name of the input table
+        """
+        self.transformer = transformer
+        self.input_name = input_name
+
+    def transform(self, inputs: dict[str, DataFrame]) -> DataFrame:
+        """Apply the wrapped transformer to the input table."""
+        return self.transformer.transform(inputs[self.input_name])
+
+    def fingerprint(self) -> str:
+        """Identify the wrapped transformer and the input it is applied to."""
+        inner = transformer_fingerprint(self.transformer)
+        return hashlib.sha256(f"{inner}\n{self.input_name}".encode()).hexdigest()
+
+
+# Time grains of multi-grain gold, finest first, and the gold table each is written to
+GRAINS = ("hour", "day", "month")
+GRAIN_TABLES = {"hour": "gold_hourly", "day": "gold_daily", "month": "gold_monthly"}
+
+# Columns of every multi-grain gold table; period is the start of the hour, day or month
+GRAIN_COLUMNS = [
+    "entity_id",
+    "period",
+    "total_value",
+    "avg_value",
+    "min_value",
+    "max_value",
+    "record_count",
+    "value_range",
+    "aggregated_at",
+]
+
+
+class MultiGrainTransformer(ABC):
+    """Abstract transformer aggregating silver at several time grains in one pass."""
+
+    def __init__(self, grains: list[str]):
+        """
+        Initialize transformer.
+
+        Args:
+            grains: Time grains to aggregate at (hour, day and/or month)
+
+        Raises:
+            ValueError: If no grain or an unknown grain is given
+        """
+        unknown = sorted(set(grains) - set(GRAINS))
+        if unknown or not grains:
+            raise ValueError(f"Invalid gold grains: {', '.join(unknown) or 'none given'}")
+        # Finest first, the order coarser grains are rolled up in
+        self.grains = [grain for grain in GRAINS if grain in grains]
+
+    @property
+    def tables(self) -> list[str]:
+        """Gold tables written, finest grain first."""
+        return [GRAIN_TABLES[grain] for grain in self.grains]
+
+    @abstractmethod
+    def transform(self, df: DataFrame) -> dict[str, DataFrame]:
+        """
+        Aggregate silver data at every grain.
+
+        Args:
+            df: Cleaned silver data
+
+        Returns:
+            Aggregated data of every grain, by gold table name
+        """
 
 
 class PandasBronzeToSilverTransformer(BronzeToSilverTransformer):
@@ -57,22 +250,58 @@ class PandasBronzeToSilverTransformer(BronzeToSilverTransformer):
         - Enforce data types
         - Add quality flags
         """
+        silver, _ = self.transform_with_quarantine(df)
+        return silver
+
+    def transform_with_quarantine(self, df: Any) -> tuple[Any, Any]:
+        """
+        Clean bronze data and split off rejected rows using pandas.
+
+        Rows with a null timestamp, a null entity_id or an unparseable
+        timestamp are rejected. The reject masks are computed once and used
+        both to filter silver and to build the quarantine frame.
+        """
+        import numpy as np
         import pandas as pd
 
         # Remove duplicates
         df = df.drop_duplicates()
 
-        # Handle missing values in critical columns
+        # Build reject masks for critical columns, in order of precedence
+        masks = []
+        reasons = []
+        parsed_timestamp = None
+
         if "timestamp" in df.columns:
-            df = df.dropna(subset=["timestamp"])
+            masks.append(df["timestamp"].isna().to_numpy())
+            reasons.append(REJECT_NULL_TIMESTAMP)
 
         if "entity_id" in df.columns:
-            df = df.dropna(subset=["entity_id"])
+            masks.append(df["entity_id"].isna().to_numpy())
+            reasons.append(REJECT_NULL_ENTITY_ID)
 
-        # Convert timestamp to datetime
         if "timestamp" in df.columns:
-            df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce")
-            df = df.dropna(subset=["timestamp"])
+            parsed_timestamp = pd.to_datetime(df["timestamp"], errors="coerce")
+            masks.append(parsed_timestamp.isna().to_numpy())
+            reasons.append(REJECT_UNPARSEABLE_TIMESTAMP)
+
+        if masks:
+            rejected = np.logical_or.reduce(masks)
+            reject_reason = np.select(masks, reasons, default="")
+        else:
+            rejected = np.zeros(len(df), dtype=bool)
+            reject_reason = np.full(len(df), "", dtype=object)
+
+        # Quarantine keeps raw values as strings so mixed-type columns stay writable
+        quarantine = df.loc[rejected].astype("string")
+        quarantine["reject_reason"] = reject_reason[rejected]
+        quarantine["quarantined_at"] = pd.Timestamp.now()
+
+        df = df.loc[~rejected].copy()
+
+        # Convert timestamp to datetime
+        if parsed_timestamp is not None:
+            df["timestamp"] = parsed_timestamp.loc[~rejected]
 
         # Convert value to numeric
         if "value" in df.columns:
@@ -82,12 +311,21 @@ class PandasBronzeToSilverTransformer(BronzeToSilverTransformer):
         # Add processing timestamp
         df["processed_at"] = pd.Timestamp.now()
 
-        return df
+        return df, quarantine
 
 
 class PandasSilverToGoldTransformer(SilverToGoldTransformer):
     """Pandas implementation of Silver -> Gold transformation."""
 
+    def __init__(self, sketch_k: int = GOLD_SKETCH_K):
+        """
+        Initialize transformer.
+
+        Args:
+            sketch_k: Capacity of the KLL value sketch of every entity-day
+        """
+        self.sketch_k = sketch_k
+
     def transform(self, df: Any) -> Any:
         """
         Aggregate silver data to business metrics using pandas.
@@ -96,11 +334,16 @@ class PandasSilverToGoldTransformer(SilverToGoldTransformer):
         - Group by entity and time period
         - Calculate aggregations (sum, avg, count)
         - Compute derived metrics
+        - Sketch the values (mergeable KLL bytes) and read the percentiles
+          off the sketches
         """
+        import numpy as np
         import pandas as pd
 
-        # Ensure timestamp is datetime
-        if "timestamp" in df.columns:
+        from app.domain.sketches import grouped_kll_sketches
+
+        # Ensure timestamp is datetime (Arrow-backed timestamps are kept as they are)
+        if "timestamp" in df.columns and not pd.api.types.is_datetime64_any_dtype(df["timestamp"]):
             df["timestamp"] = pd.to_datetime(df["timestamp"])
 
         # Create time-based aggregations
@@ -109,20 +352,30 @@ class PandasSilverToGoldTransformer(SilverToGoldTransformer):
             df["date"] = df["timestamp"].dt.date
 
             # Aggregate by entity and date
-            gold = (
-                df.groupby(["entity_id", "date"])
-                .agg(
-                    total_value=("value", "sum"),
-                    avg_value=("value", "mean"),
-                    min_value=("value", "min"),
-                    max_value=("value", "max"),
-                    record_count=("value", "count"),
-                )
-                .reset_index()
-            )
+            groups = df.groupby(["entity_id", "date"])
+            gold = groups.agg(
+                total_value=("value", "sum"),
+                avg_value=("value", "mean"),
+                min_value=("value", "min"),
+                max_value=("value", "max"),
+                record_count=("value", "count"),
+            ).reset_index()
 
             # Add computed metrics
             gold["value_range"] = gold["max_value"] - gold["min_value"]
+
+            # Sketch each group's values; rows are matched to groups in gold's order
+            codes = groups.ngroup().to_numpy(dtype=np.float64, na_value=-1)
+            sketches, quantiles = grouped_kll_sketches(
+                codes,
+                df["value"].to_numpy(dtype=np.float64, na_value=np.nan),
+                len(gold),
+                self.sketch_k,
+                GOLD_PERCENTILES.values(),
+            )
+            for i, column in enumerate(GOLD_PERCENTILES):
+                gold[column] = quantiles[:, i]
+            gold["value_sketch"] = sketches
             gold["aggregated_at"] = pd.Timestamp.now()
 
             return gold
@@ -134,6 +387,10 @@ class PandasSilverToGoldTransformer(SilverToGoldTransformer):
 class SparkBronzeToSilverTransformer(BronzeToSilverTransformer):
     """Spark implementation of Bronze -> Silver transformation."""
 
+    def __init__(self) -> None:
+        """Initialize transformer."""
+        self._persisted: list[Any] = []
+
     def transform(self, df: Any) -> Any:
         """
         Clean and validate bronze data using PySpark.
@@ -144,22 +401,56 @@ class SparkBronzeToSilverTransformer(BronzeToSilverTransformer):
         - Enforce data types
         - Add quality flags
         """
+        silver, _ = self.transform_with_quarantine(df)
+        return silver
+
+    def transform_with_quarantine(self, df: Any) -> tuple[Any, Any]:
+        """
+        Clean bronze data and split off rejected rows using PySpark.
+
+        A single ``reject_reason`` column is derived from the same conditions
+        used for cleaning; silver and quarantine are both filters on it. The
+        tagged frame is persisted, so counting and writing both outputs scan
+        bronze once; ``release`` unpersists it after the writes.
+        """
         from pyspark.sql import functions as F
 
         # Remove duplicates
         df = df.dropDuplicates()
+        bronze_columns = df.columns
 
-        # Handle missing values in critical columns
+        # Build reject conditions for critical columns, in order of precedence
+        conditions = []
         if "timestamp" in df.columns:
-            df = df.filter(F.col("timestamp").isNotNull())
+            conditions.append((F.col("timestamp").isNull(), REJECT_NULL_TIMESTAMP))
 
         if "entity_id" in df.columns:
-            df = df.filter(F.col("entity_id").isNotNull())
+            conditions.append((F.col("entity_id").isNull(), REJECT_NULL_ENTITY_ID))
 
-        # Convert timestamp to proper type
         if "timestamp" in df.columns:
-            df = df.withColumn("timestamp", F.to_timestamp(F.col("timestamp")))
-            df = df.filter(F.col("timestamp").isNotNull())
+            df = df.withColumn("_parsed_timestamp", F.to_timestamp(F.col("timestamp")))
+            conditions.append((F.col("_parsed_timestamp").isNull(), REJECT_UNPARSEABLE_TIMESTAMP))
+
+        reject_reason = F.lit(None).cast("string")
+        if conditions:
+            reject_reason = F.when(conditions[0][0], F.lit(conditions[0][1]))
+            for condition, reason in conditions[1:]:
+                reject_reason = reject_reason.when(condition, F.lit(reason))
+        df = df.withColumn("reject_reason", reject_reason).persist()
+        self._persisted.append(df)
+
+        # Quarantine keeps raw values as strings so mixed-type columns stay writable
+        quarantine = df.filter(F.col("reject_reason").isNotNull()).select(
+            *[F.col(c).cast("string").alias(c) for c in bronze_columns],
+            F.col("reject_reason"),
+            F.current_timestamp().alias("quarantined_at"),
+        )
+
+        df = df.filter(F.col("reject_reason").isNull()).drop("reject_reason")
+
+        # Convert timestamp to proper type
+        if "_parsed_timestamp" in df.columns:
+            df = df.withColumn("timestamp", F.col("_parsed_timestamp")).drop("_parsed_timestamp")
 
         # Convert value to numeric and add validation flag
         if "value" in df.columns:
@@ -169,12 +460,26 @@ class SparkBronzeToSilverTransformer(BronzeToSilverTransformer):
         # Add processing timestamp
         df = df.withColumn("processed_at", F.current_timestamp())
 
-        return df
+        return df, quarantine
+
+    def release(self) -> None:
+        """Unpersist the tagged bronze frames of earlier transforms."""
+        while self._persisted:
+            self._persisted.pop().unpersist()
 
 
 class SparkSilverToGoldTransformer(SilverToGoldTransformer):
     """Spark implementation of Silver -> Gold transformation."""
 
+    def __init__(self, sketch_k: int = GOLD_SKETCH_K):
+        """
+        Initialize transformer.
+
+        Args:
+            sketch_k: Capacity of the KLL value sketch of every entity-day
+        """
+        self.sketch_k = sketch_k
+
     def transform(self, df: Any) -> Any:
         """
         Aggregate silver data to business metrics using PySpark.
@@ -183,9 +488,33 @@ class SparkSilverToGoldTransformer(SilverToGoldTransformer):
         - Group by entity and time period
         - Calculate aggregations (sum, avg, count)
         - Compute derived metrics
+        - Sketch the values (KLL bytes, identical to pandas-built sketches)
+          and read the percentiles off the sketches, as pandas does
+
+        A grouped-aggregate pandas UDF cannot share an aggregation with
+        built-in functions, so the sketches are aggregated separately and
+        joined back on entity and date.
         """
+        import numpy as np
+        import pandas as pd
         from pyspark.sql import functions as F
 
+        from app.domain.sketches import KllSketch, grouped_kll_sketches
+
+        sketch_k = self.sketch_k
+        fractions = list(GOLD_PERCENTILES.values())
+
+        @F.pandas_udf("binary")
+        def value_sketch(values: pd.Series) -> bytes:
+            """Serialize a KLL sketch of a group's values, as the pandas transformer does."""
+            items = values.to_numpy(dtype="float64", na_value=float("nan"))
+            return grouped_kll_sketches(np.zeros(len(items)), items, 1, sketch_k)[0][0]
+
+        @F.pandas_udf("array<double>")
+        def sketch_percentiles(sketches: pd.Series) -> pd.Series:
+            """Percentiles of serialized sketches."""
+            return sketches.map(lambda data: KllSketch.from_bytes(data).quantiles(fractions))
+
         # Ensure timestamp is proper type
         if "timestamp" in df.columns:
             df = df.withColumn("timestamp", F.to_timestamp(F.col("timestamp")))
@@ -196,19 +525,248 @@ class SparkSilverToGoldTransformer(SilverToGoldTransformer):
             df = df.withColumn("date", F.to_date(F.col("timestamp")))
 
             # Aggregate by entity and date
-            gold = df.groupBy("entity_id", "date").agg(
+            keys = ["entity_id", "date"]
+            gold = df.groupBy(*keys).agg(
                 F.sum("value").alias("total_value"),
                 F.avg("value").alias("avg_value"),
                 F.min("value").alias("min_value"),
                 F.max("value").alias("max_value"),
                 F.count("value").alias("record_count"),
             )
+            sketches = df.groupBy(*keys).agg(value_sketch("value").alias("value_sketch"))
+            gold = gold.join(sketches, on=keys, how="left")
 
             # Add computed metrics
             gold = gold.withColumn("value_range", F.col("max_value") - F.col("min_value"))
-            gold = gold.withColumn("aggregated_at", F.current_timestamp())
+            gold = gold.withColumn("_percentiles", sketch_percentiles("value_sketch"))
+            for i, column in enumerate(GOLD_PERCENTILES):
+                gold = gold.withColumn(column, F.col("_percentiles")[i])
+            gold = gold.drop("_percentiles").withColumn("aggregated_at", F.current_timestamp())
 
             return gold
 
         # If columns don't match expected schema, return as-is
         return df
+
+
+def _truncate_timestamps(timestamps: Any, grain: str) -> Any:
+    """Truncate a pandas datetime series to the start of its hour, day or month."""
+    import pandas as pd
+
+    if grain == "hour":
+        return timestamps.dt.floor("h")
+    days = timestamps.dt.floor("D")
+    if grain == "day":
+        return days
+    return days - pd.to_timedelta(timestamps.dt.day - 1, unit="D")
+
+
+class PandasMultiGrainTransformer(MultiGrainTransformer):
+    """Pandas implementation of multi-grain gold aggregation."""
+
+    def transform(self, df: Any) -> dict[str, Any]:
+        """
+        Aggregate silver data at every grain using pandas.
+
+        Transformations:
+        - Group silver by entity and the finest grain's period, once
+        - Roll each coarser grain up from the next finer grain's result
+        - Compute the average and range from the rolled-up sums and extremes
+        """
+        import pandas as pd
+
+        if not {"timestamp", "entity_id", "value"}.issubset(df.columns):
+            return {table: pd.DataFrame(columns=GRAIN_COLUMNS) for table in self.tables}
+
+        timestamps = df["timestamp"]
+        if not pd.api.types.is_datetime64_any_dtype(timestamps):
+            timestamps = pd.to_datetime(timestamps)
+
+        # The only pass over silver: sums, extremes and counts roll up exactly
+        keyed = pd.DataFrame(
+            {
+                "entity_id": df["entity_id"],
+                "period": _truncate_timestamps(timestamps, self.grains[0]),
+                "value": df["value"],
+            }
+        )
+        aggregates = (
+            keyed.groupby(["entity_id", "period"])
+            .agg(
+                total_value=("value", "sum"),
+                min_value=("value", "min"),
+                max_value=("value", "max"),
+                record_count=("value", "count"),
+            )
+            .reset_index()
+        )
+
+        aggregated_at = pd.Timestamp.now()
+        results = {}
+        for i, grain in enumerate(self.grains):
+            if i > 0:
+                aggregates = (
+                    aggregates.assign(period=_truncate_timestamps(aggregates["period"], grain))
+                    .groupby(["entity_id", "period"])
+                    .agg(
+                        total_value=("total_value", "sum"),
+                        min_value=("min_value", "min"),
+                        max_value=("max_value", "max"),
+                        record_count=("record_count", "sum"),
+                    )
+                    .reset_index()
+                )
+            gold = aggregates.assign(
+                avg_value=aggregates["total_value"] / aggregates["record_count"],
+                value_range=aggregates["max_value"] - aggregates["min_value"],
+                aggregated_at=aggregated_at,
+            )
+            results[GRAIN_TABLES[grain]] = gold[GRAIN_COLUMNS]
+        return results
+
+
+class SparkMultiGrainTransformer(MultiGrainTransformer):
+    """Spark implementation of multi-grain gold aggregation."""
+
+    def transform(self, df: Any) -> dict[str, Any]:
+        """
+        Aggregate silver data at every grain using PySpark.
+
+        Transformations:
+        - Truncate timestamps to the period of every grain
+        - Aggregate all grains in one job with a rollup from coarsest to finest
+        - Split the rollup's levels into one data frame per grain
+
+        The rollup result is persisted, so writing the grains does not run
+        the aggregation once per grain.
+        """
+        from pyspark.sql import functions as F
+
+        if not {"timestamp", "entity_id", "value"}.issubset(df.columns):
+            return {table: df for table in self.tables}
+
+        df = df.withColumn("timestamp", F.to_timestamp(F.col("timestamp")))
+        # Coarsest first, so every rollup level groups by a grain and the coarser ones
+        coarse_first = list(reversed(self.grains))
+        for grain in coarse_first:
+            df = df.withColumn(f"_{grain}", F.date_trunc(grain, F.col("timestamp")))
+
+        aggregates = (
+            df.rollup("entity_id", *[f"_{grain}" for grain in coarse_first])
+            .agg(
+                F.sum("value").alias("total_value"),
+                F.avg("value").alias("avg_value"),
+                F.min("value").alias("min_value"),
+                F.max("value").alias("max_value"),
+                F.count("value").alias("record_count"),
+                F.grouping_id().alias("_level"),
+            )
+            .persist()
+        )
+
+        results = {}
+        for i, grain in enumerate(self.grains):
+            # Grouping ID bits are set for the i finer grains rolled up at this level
+            level = (1 << i) - 1
+            gold = (
+                aggregates.filter(F.col("_level") == level)
+                .withColumnRenamed(f"_{grain}", "period")
+                .withColumn("value_range", F.col("max_value") - F.col("min_value"))
+                .withColumn("aggregated_at", F.current_timestamp())
+            )
+            results[GRAIN_TABLES[grain]] = gold.select(*GRAIN_COLUMNS)
+        return results
+
+
+# Columns of the per-entity summary mart
+ENTITY_SUMMARY_COLUMNS = [
+    "entity_id",
+    "first_date",
+    "last_date",
+    "days",
+    "total_value",
+    "avg_daily_value",
+    "max_daily_value",
+    "record_count",
+]
+
+
+class PandasEntitySummaryTransformer(TableTransformer):
+    """Pandas implementation of the per-entity summary mart, built from daily aggregates."""
+
+    def __init__(self, input_name: str = "gold"):
+        """
+        Initialize transformer.
+
+        Args:
+            input_name: Input table with daily aggregates per entity (gold schema)
+        """
+        self.input_name = input_name
+
+    def transform(self, inputs: dict[str, Any]) -> Any:
+        """
+        Summarize the daily gold aggregates of every entity using pandas.
+
+        Transformations:
+        - Group daily gold rows by entity
+        - Calculate first and last day, days covered, totals and peaks
+        - Compute the average daily value
+        """
+        import pandas as pd
+
+        gold = inputs[self.input_name]
+        if gold.empty or not {"entity_id", "date", "total_value", "record_count"}.issubset(
+            gold.columns
+        ):
+            return pd.DataFrame(columns=ENTITY_SUMMARY_COLUMNS)
+
+        summary = (
+            gold.groupby("entity_id")
+            .agg(
+                first_date=("date", "min"),
+                last_date=("date", "max"),
+                days=("date", "nunique"),
+                total_value=("total_value", "sum"),
+                max_daily_value=("total_value", "max"),
+                record_count=("record_count", "sum"),
+            )
+            .reset_index()
+        )
+        summary["avg_daily_value"] = summary["total_value"] / summary["days"]
+        return summary[ENTITY_SUMMARY_COLUMNS]
+
+
+class SparkEntitySummaryTransformer(TableTransformer):
+    """Spark implementation of the per-entity summary mart, built from daily aggregates."""
+
+    def __init__(self, input_name: str = "gold"):
+        """
+        Initialize transformer.
+
+        Args:
+            input_name: Input table with daily aggregates per entity (gold schema)
+        """
+        self.input_name = input_name
+
+    def transform(self, inputs: dict[str, Any]) -> Any:
+        """
+        Summarize the daily gold aggregates of every entity using PySpark.
+
+        Transformations:
+        - Group daily gold rows by entity
+        - Calculate first and last day, days covered, totals and peaks
+        - Compute the average daily value
+        """
+        from pyspark.sql import functions as F
+
+        gold = inputs[self.input_name]
+        summary = gold.groupBy("entity_id").agg(
+            F.min("date").alias("first_date"),
+            F.max("date").alias("last_date"),
+            F.countDistinct("date").alias("days"),
+            F.sum("total_value").alias("total_value"),
+            F.max("total_value").alias("max_daily_value"),
+            F.sum("record_count").alias("record_count"),
+        )
+        summary = summary.withColumn("avg_daily_value", F.col("total_value") / F.col("days"))
+        return summary.select(*ENTITY_SUMMARY_COLUMNS)
@@ -1,9 +1,14 @@
 """Domain validation logic - pure validation functions."""
 
+import math
+from statistics import NormalDist
 from typing import Any
 
 from app.domain.models import ValidationResult
 
+# Above this sample fraction, sampled validation falls back to a full scan
+MAX_SAMPLE_FRACTION = 0.5
+
 
 def validate_bronze_schema(df: Any) -> ValidationResult:
     """
@@ -22,18 +27,18 @@ def validate_bronze_schema(df: Any) -> ValidationResult:
     try:
         # Check for required columns
         required_columns = ["timestamp", "entity_id", "value"]
-        
+
         if hasattr(df, "columns"):  # pandas
             actual_columns = set(df.columns)
             missing = set(required_columns) - actual_columns
-            
+
             if missing:
                 errors.append(f"Missing required columns: {missing}")
-            
+
             # Check for empty dataframe
             if len(df) == 0:
                 warnings.append("DataFrame is empty")
-            
+
             # Check for null values in critical columns
             for col in required_columns:
                 if col in df.columns:
@@ -41,25 +46,25 @@ def validate_bronze_schema(df: Any) -> ValidationResult:
                     if null_count > 0:
                         warnings.append(f"Column '{col}' has {null_count} null values")
                         records_failed += null_count
-            
+
             records_validated = len(df)
-        
+
         else:  # Assume Spark DataFrame
             actual_columns = set(df.columns)
             missing = set(required_columns) - actual_columns
-            
+
             if missing:
                 errors.append(f"Missing required columns: {missing}")
-            
+
             # Check for empty dataframe
             count = df.count()
             if count == 0:
                 warnings.append("DataFrame is empty")
-            
+
             records_validated = count
 
     except Exception as e:
-        errors.append(f"Validation error: {str(e)}")
+        errors.append(f"Validation error: {e!s}")
         records_validated = 0
 
     return ValidationResult(
@@ -88,23 +93,23 @@ def validate_silver_quality(df: Any) -> ValidationResult:
     try:
         if hasattr(df, "columns"):  # pandas
             records_validated = len(df)
-            
+
             # Check for duplicates
             if "entity_id" in df.columns and "timestamp" in df.columns:
                 duplicates = df.duplicated(subset=["entity_id", "timestamp"]).sum()
                 if duplicates > 0:
                     errors.append(f"Found {duplicates} duplicate records")
                     records_failed += duplicates
-            
+
             # Check data quality flags if present
             if "value_is_valid" in df.columns:
                 invalid_count = (~df["value_is_valid"]).sum()
                 if invalid_count > 0:
                     warnings.append(f"Found {invalid_count} records with invalid values")
-        
+
         else:  # Spark
             records_validated = df.count()
-            
+
             # Check for duplicates
             if "entity_id" in df.columns and "timestamp" in df.columns:
                 distinct_count = df.select("entity_id", "timestamp").distinct().count()
@@ -114,7 +119,7 @@ def validate_silver_quality(df: Any) -> ValidationResult:
                     records_failed += duplicates
 
     except Exception as e:
-        errors.append(f"Validation error: {str(e)}")
+        errors.append(f"Validation error: {e!s}")
         records_validated = 0
 
     return ValidationResult(
@@ -124,3 +129,197 @@ def validate_silver_quality(df: Any) -> ValidationResult:
         records_validated=records_validated,
         records_failed=records_failed,
     )
+
+
+def required_sample_size(population: int, confidence: float = 0.95, margin: float = 0.01) -> int:
+    """
+    Compute the sample size needed to estimate a failure rate.
+
+    Uses Cochran's formula with the worst-case proportion (p = 0.5) and a
+    finite population correction.
+
+    Args:
+        population: Number of rows in the batch
+        confidence: Target confidence level, e.g. 0.95
+        margin: Target margin of error on the failure rate, e.g. 0.01
+
+    Returns:
+        Number of rows to sample (never more than the population)
+    """
+    if population <= 0:
+        return 0
+
+    z = NormalDist().inv_cdf(1 - (1 - confidence) / 2)
+    n0 = (z**2) * 0.25 / (margin**2)
+    n = n0 / (1 + (n0 - 1) / population)
+    return min(population, math.ceil(n))
+
+
+def _wilson_interval(failures: int, n: int, confidence: float) -> tuple[float, float]:
+    """Wilson score interval for a binomial proportion."""
+    if n == 0:
+        return (0.0, 1.0)
+
+    z = NormalDist().inv_cdf(1 - (1 - confidence) / 2)
+    p = failures / n
+    denominator = 1 + z**2 / n
+    centre = (p + z**2 / (2 * n)) / denominator
+    spread = z * math.sqrt(p * (1 - p) / n + z**2 / (4 * n**2)) / denominator
+    return (max(0.0, centre - spread), min(1.0, centre + spread))
+
+
+def validate_silver_quality_sampled(
+    df: Any,
+    confidence: float = 0.95,
+    margin: float = 0.01,
+    threshold: float = 0.01,
+    seed: int | None = None,
+) -> ValidationResult:
+    """
+    Validate silver layer data quality on a sample.
+
+    Draws a sample stratified by ``entity_id`` (``groupby().sample`` in
+    pandas, ``sampleBy`` with per-entity fractions in Spark) sized from the
+    target confidence level and margin of error, and estimates the rate of
+    rows with a null timestamp or entity_id or an invalid value. Duplicate
+    (entity_id, timestamp) keys are checked within the sample only. When the
+    estimate exceeds ``threshold``, or the sample contains a duplicate key,
+    the batch is validated in full so that its errors and counts are exact.
+
+    Args:
+        df: DataFrame to validate
+        confidence: Target confidence level for the estimate
+        margin: Target margin of error for the estimate
+        threshold: Estimated failure rate above which full validation runs
+        seed: Random seed for reproducible sampling
+
+    Returns:
+        ValidationResult with the estimated failure rate and its confidence
+        interval, from full validation when the sample escalated
+    """
+    try:
+        has_keys = "entity_id" in df.columns and "timestamp" in df.columns
+        entity_counts = None
+        if hasattr(df, "__len__"):  # pandas
+            population = len(df)
+        elif "entity_id" in df.columns:  # Spark: rows per entity in one aggregation
+            entity_counts = df.groupBy("entity_id").count().collect()
+            population = sum(int(row["count"]) for row in entity_counts)
+        else:
+            population = df.count()
+
+        sample_size = required_sample_size(population, confidence, margin)
+        fraction = sample_size / population if population else 1.0
+
+        # Sampling only pays off when it skips most of the batch
+        if fraction > MAX_SAMPLE_FRACTION:
+            return validate_silver_quality(df)
+
+        if hasattr(df, "__len__"):  # pandas
+            if "entity_id" in df.columns:
+                sample = df.groupby("entity_id", group_keys=False, dropna=False).sample(
+                    frac=fraction, random_state=seed
+                )
+            else:
+                sample = df.sample(frac=fraction, random_state=seed)
+
+            failed = None
+            for col in ("timestamp", "entity_id"):
+                if col in sample.columns:
+                    mask = sample[col].isna()
+                    failed = mask if failed is None else failed | mask
+            if "value_is_valid" in sample.columns:
+                mask = ~sample["value_is_valid"].astype(bool)
+                failed = mask if failed is None else failed | mask
+
+            records_sampled = len(sample)
+            records_invalid = int(failed.sum()) if failed is not None else 0
+            sample_duplicates = 0
+            if has_keys:
+                sample_duplicates = int(sample.duplicated(subset=["entity_id", "timestamp"]).sum())
+
+        else:  # Spark
+            from pyspark.sql import functions as F
+
+            if entity_counts is not None:
+                # Null entity_ids are sampled under the empty key
+                stratum = F.coalesce(F.col("entity_id").cast("string"), F.lit(""))
+                fractions = {
+                    "" if row["entity_id"] is None else str(row["entity_id"]): fraction
+                    for row in entity_counts
+                }
+                sample = df.sampleBy(stratum, fractions, seed)
+            else:
+                sample = df.sample(fraction=fraction, seed=seed)
+
+            conditions = [F.col(c).isNull() for c in ("timestamp", "entity_id") if c in df.columns]
+            if "value_is_valid" in df.columns:
+                conditions.append(~F.col("value_is_valid"))
+
+            invalid = F.lit(False)
+            for condition in conditions:
+                invalid = invalid | condition
+            flagged = sample.withColumn("_invalid", F.when(invalid, 1).otherwise(0))
+
+            # Sampled rows, invalid rows and duplicate keys in one job
+            if has_keys:
+                row = (
+                    flagged.groupBy("entity_id", "timestamp")
+                    .agg(F.count(F.lit(1)).alias("rows"), F.sum("_invalid").alias("invalid"))
+                    .agg(
+                        F.sum("rows").alias("rows"),
+                        F.sum("invalid").alias("invalid"),
+                        F.sum(F.col("rows") - 1).alias("duplicates"),
+                    )
+                    .first()
+                )
+                sample_duplicates = int(row["duplicates"] or 0)
+            else:
+                row = flagged.agg(
+                    F.count(F.lit(1)).alias("rows"), F.sum("_invalid").alias("invalid")
+                ).first()
+                sample_duplicates = 0
+            records_sampled = int(row["rows"] or 0)
+            records_invalid = int(row["invalid"] or 0)
+
+    except Exception as e:
+        return ValidationResult(
+            is_valid=False,
+            errors=[f"Validation error: {e!s}"],
+            warnings=[],
+            records_validated=0,
+            records_failed=0,
+            sampled=True,
+        )
+
+    estimated_rate = records_invalid / records_sampled if records_sampled else 0.0
+    interval = _wilson_interval(records_invalid, records_sampled, confidence)
+    summary = (
+        f"Estimated failure rate {estimated_rate:.2%} "
+        f"({confidence:.0%} CI {interval[0]:.2%}-{interval[1]:.2%}) "
+        f"from {records_sampled} of {population} records"
+    )
+
+    # Escalate to full validation when the sample finds a problem
+    if sample_duplicates > 0 or estimated_rate > threshold:
+        result = validate_silver_quality(df)
+        reason = (
+            f"{sample_duplicates} duplicate keys in sample"
+            if sample_duplicates > 0
+            else f"exceeds threshold {threshold:.2%}"
+        )
+        result.warnings.insert(0, f"{summary}: {reason}")
+        result.estimated_failure_rate = estimated_rate
+        result.confidence_interval = interval
+        return result
+
+    return ValidationResult(
+        is_valid=True,
+        errors=[],
+        warnings=[summary],
+        records_validated=records_sampled,
+        records_failed=records_invalid,
+        sampled=True,
+        estimated_failure_rate=estimated_rate,
+        confidence_interval=interval,
+    )
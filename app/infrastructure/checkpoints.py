@@ -0,0 +1,124 @@
+"""Batch checkpoints - progress of a batch run, kept so a failed batch can be resumed."""
+
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from app.infrastructure.settings import Settings
+
+
+@dataclass
+class BatchCheckpoint:
+    """Stages a batch has completed and the values later stages need from them."""
+
+    batch_id: str
+    source: str
+    completed: list[str] = field(default_factory=list)
+    values: dict[str, Any] = field(default_factory=dict)  # counts and checksum of the batch
+    runs: int = 0  # times the batch was started or resumed
+    updated_at: datetime | None = None
+
+    def is_completed(self, stage: str) -> bool:
+        """Whether a stage has completed."""
+        return stage in self.completed
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for storage."""
+        return {
+            "batch_id": self.batch_id,
+            "source": self.source,
+            # Copies, as stages on another thread may be adding to them
+            "completed": list(self.completed),
+            "values": dict(self.values),
+            "runs": self.runs,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "BatchCheckpoint":
+        """Create from a stored dictionary."""
+        updated_at = data.get("updated_at")
+        return cls(
+            batch_id=data["batch_id"],
+            source=data["source"],
+            completed=list(data.get("completed", [])),
+            values=dict(data.get("values", {})),
+            runs=data.get("runs", 0),
+            updated_at=datetime.fromisoformat(updated_at) if updated_at else None,
+        )
+
+
+class CheckpointStore:
+    """
+    Stores batch checkpoints as one JSON file per batch.
+
+    The file is replaced atomically on every save, so a crash leaves either
+    the previous or the new checkpoint. Data frames produced by checkpointed
+    stages are stored by the repository next to these files, under the
+    batch's own directory.
+    """
+
+    def __init__(self, settings: Settings):
+        """
+        Initialize checkpoint store.
+
+        Args:
+            settings: Application settings
+        """
+        self.path = Path(settings.checkpoint_full_path)
+
+    def _file(self, batch_id: str) -> Path:
+        """Checkpoint file of a batch."""
+        return self.path / f"{batch_id}.json"
+
+    def load(self, batch_id: str) -> BatchCheckpoint | None:
+        """
+        Load the checkpoint of a batch.
+
+        Args:
+            batch_id: Batch identifier
+
+        Returns:
+            The checkpoint, or None if the batch has none
+        """
+        try:
+            return BatchCheckpoint.from_dict(json.loads(self._file(batch_id).read_text()))
+        except FileNotFoundError:
+            return None
+
+    def save(self, checkpoint: BatchCheckpoint) -> None:
+        """
+        Save a checkpoint, replacing the batch's previous one.
+
+        Args:
+            checkpoint: Checkpoint to save
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        checkpoint.updated_at = datetime.now()
+        path = self._file(checkpoint.batch_id)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        tmp_path.write_text(json.dumps(checkpoint.to_dict(), indent=2, default=str))
+        os.replace(tmp_path, path)
+
+    def delete(self, batch_id: str) -> None:
+        """
+        Delete the checkpoint of a batch, if any.
+
+        Args:
+            batch_id: Batch identifier
+        """
+        self._file(batch_id).unlink(missing_ok=True)
+
+    def list_batches(self) -> list[str]:
+        """
+        List batches with a checkpoint (batches that have not completed).
+
+        Returns:
+            Batch identifiers, oldest first
+        """
+        if not self.path.exists():
+            return []
+        return sorted(path.stem for path in self.path.glob("*.json"))
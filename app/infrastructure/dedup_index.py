@@ -0,0 +1,260 @@
+"""Persistent cross-batch deduplication index keyed on (entity_id, timestamp)."""
+
+import os
+from abc import ABC, abstractmethod
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from app.domain.sketches import BloomFilter
+from app.infrastructure.filelock import file_lock
+from app.infrastructure.settings import Settings
+
+KEY_COLUMNS = ("entity_id", "timestamp")
+
+
+class BaseDedupIndex(ABC):
+    """Abstract index of record keys already committed to silver."""
+
+    @abstractmethod
+    def drop_seen(self, df: Any) -> tuple[Any, int]:
+        """
+        Drop rows whose key was committed by an earlier batch or repeats within this one.
+
+        Args:
+            df: Silver DataFrame
+
+        Returns:
+            Tuple of (new_rows_df, duplicate_count)
+        """
+
+    @abstractmethod
+    def commit(self, df: Any) -> None:
+        """
+        Record the keys of rows written to silver and expire old keys.
+
+        Args:
+            df: Silver DataFrame that was written
+        """
+
+
+class PandasDedupIndex(BaseDedupIndex):
+    """
+    Local dedup index stored as one bucket per event day.
+
+    Each bucket holds a sorted array of 64-bit key hashes (memory-mapped on
+    lookup) and a bloom filter used to skip the exact check for keys that
+    are definitely new. Buckets older than the retention window, measured
+    from the newest bucket but never from later than today, are deleted at
+    commit time, so disk and memory stay bounded regardless of silver
+    history and a far-future timestamp cannot expire the whole index.
+    """
+
+    def __init__(self, settings: Settings):
+        """
+        Initialize pandas dedup index.
+
+        Args:
+            settings: Application settings
+        """
+        self.path = Path(settings.dedup_full_path)
+        self.retention_days = settings.dedup_retention_days
+        self.false_positive_rate = settings.dedup_bloom_fpr
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def _keys(df: Any) -> tuple[np.ndarray, np.ndarray]:
+        """Hash row keys and derive each row's event day."""
+        import pandas as pd
+
+        timestamps = pd.to_datetime(df["timestamp"]).astype("datetime64[ns]")
+        keys = pd.DataFrame(
+            {
+                "entity_id": df["entity_id"].astype(str).to_numpy(dtype=object),
+                "timestamp": timestamps.astype("int64").to_numpy(),
+            }
+        )
+        hashes = pd.util.hash_pandas_object(keys, index=False).to_numpy()
+        days = timestamps.to_numpy().astype("datetime64[D]")
+        return hashes, days
+
+    def _bucket(self, day: np.datetime64) -> tuple[Path, Path]:
+        """Paths of the key array and bloom filter for a day."""
+        return self.path / f"{day}.npy", self.path / f"{day}.bloom"
+
+    def _bucket_days(self) -> list[date]:
+        """Days that currently have a bucket."""
+        return sorted(date.fromisoformat(p.stem) for p in self.path.glob("*.npy"))
+
+    def _cutoff(self) -> date | None:
+        """Oldest day still retained, relative to the newest bucket clamped to today."""
+        days = self._bucket_days()
+        if not days:
+            return None
+        return min(days[-1], date.today()) - timedelta(days=self.retention_days)
+
+    def drop_seen(self, df: Any) -> tuple[Any, int]:
+        """Drop rows already present in the index or repeated within the batch."""
+        import pandas as pd
+
+        if len(df) == 0 or not all(c in df.columns for c in KEY_COLUMNS):
+            return df, 0
+
+        hashes, days = self._keys(df)
+
+        # Keys repeated within the batch (first occurrence is kept)
+        seen = pd.Series(hashes).duplicated().to_numpy(copy=True)
+
+        for day in np.unique(days):
+            keys_path, bloom_path = self._bucket(day)
+            if not keys_path.exists():
+                continue
+
+            rows = np.flatnonzero(days == day)
+            bloom = BloomFilter.from_bytes(bloom_path.read_bytes())
+            candidates = rows[bloom.contains_hashes(hashes[rows])]
+            if len(candidates) == 0:
+                continue
+
+            stored = np.load(keys_path, mmap_mode="r")
+            positions = np.searchsorted(stored, hashes[candidates])
+            positions = np.minimum(positions, len(stored) - 1)
+            found = stored[positions] == hashes[candidates]
+            seen[candidates[found]] = True
+
+        return df.loc[~seen], int(seen.sum())
+
+    def commit(self, df: Any) -> None:
+        """Merge the batch's keys into their day buckets and expire old buckets."""
+        if len(df) == 0 or not all(c in df.columns for c in KEY_COLUMNS):
+            return
+
+        hashes, days = self._keys(df)
+
+        with file_lock(self.path / ".lock"):
+            for day in np.unique(days):
+                keys_path, bloom_path = self._bucket(day)
+                merged = np.unique(hashes[days == day])
+                if keys_path.exists():
+                    merged = np.union1d(np.load(keys_path), merged)
+
+                bloom = BloomFilter.for_capacity(len(merged), self.false_positive_rate)
+                bloom.add_hashes(merged)
+
+                tmp_keys = keys_path.with_name(f".{keys_path.name}.tmp")
+                with open(tmp_keys, "wb") as f:
+                    np.save(f, merged)
+                tmp_bloom = bloom_path.with_name(f".{bloom_path.name}.tmp")
+                tmp_bloom.write_bytes(bloom.to_bytes())
+                os.replace(tmp_bloom, bloom_path)
+                os.replace(tmp_keys, keys_path)
+
+            self.expire()
+
+    def expire(self) -> None:
+        """Delete buckets that fall outside the retention window."""
+        cutoff = self._cutoff()
+        if cutoff is None:
+            return
+
+        for day in self._bucket_days():
+            if day < cutoff:
+                keys_path, bloom_path = self._bucket(np.datetime64(day))
+                keys_path.unlink(missing_ok=True)
+                bloom_path.unlink(missing_ok=True)
+
+
+class SparkDedupIndex(BaseDedupIndex):
+    """
+    Dedup index stored as a Delta table of key hashes partitioned by event date.
+
+    Lookups join the index restricted to the batch's date range, so only
+    the relevant partitions are scanned; Spark's runtime bloom filter join
+    optimization provides the fast negative check. Partitions older than
+    the retention window, measured from the newest partition clamped to
+    today, are deleted at commit time.
+    """
+
+    def __init__(self, settings: Settings, spark: Any):
+        """
+        Initialize Spark dedup index.
+
+        Args:
+            settings: Application settings
+            spark: Active Spark session
+        """
+        self.path = settings.dedup_full_path
+        self.retention_days = settings.dedup_retention_days
+        self.spark = spark
+
+    @staticmethod
+    def _with_keys(df: Any) -> Any:
+        """Add key hash and event date columns."""
+        from pyspark.sql import functions as F
+
+        return df.withColumn(
+            "_key_hash", F.xxhash64(F.col("entity_id").cast("string"), F.col("timestamp"))
+        ).withColumn("_event_date", F.to_date(F.col("timestamp")))
+
+    def _load(self) -> Any:
+        """Load the index table, or None if it does not exist yet."""
+        from pyspark.errors import AnalysisException
+
+        try:
+            return self.spark.read.format("delta").load(self.path)
+        except AnalysisException:
+            return None
+
+    def drop_seen(self, df: Any) -> tuple[Any, int]:
+        """Drop rows already present in the index or repeated within the batch."""
+        from pyspark.sql import functions as F
+
+        if not all(c in df.columns for c in KEY_COLUMNS):
+            return df, 0
+
+        keyed = self._with_keys(df).withColumn("_seen", F.lit(None).cast("boolean"))
+
+        index = self._load()
+        if index is not None:
+            bounds = keyed.agg(F.min("_event_date"), F.max("_event_date")).first()
+            if bounds[0] is not None:
+                seen = (
+                    index.filter(F.col("_event_date").between(bounds[0], bounds[1]))
+                    .select("_event_date", "_key_hash")
+                    .distinct()
+                    .withColumn("_seen", F.lit(True))
+                )
+                keyed = keyed.drop("_seen").join(seen, on=["_event_date", "_key_hash"], how="left")
+
+        new = F.col("_seen").isNull()
+        # Rows in, minus the distinct new keys that are kept, in one aggregation
+        counts = keyed.agg(
+            F.count(F.lit(1)).alias("rows"),
+            F.countDistinct(F.when(new, F.col("_key_hash"))).alias("kept"),
+        ).first()
+
+        result = (
+            keyed.filter(new)
+            .dropDuplicates(["_key_hash"])
+            .drop("_key_hash", "_event_date", "_seen")
+        )
+        return result, int(counts["rows"]) - int(counts["kept"])
+
+    def commit(self, df: Any) -> None:
+        """Append the batch's keys and expire partitions outside the retention window."""
+        from pyspark.sql import functions as F
+
+        if not all(c in df.columns for c in KEY_COLUMNS):
+            return
+
+        keys = self._with_keys(df).select("_key_hash", "_event_date").distinct()
+        keys.write.format("delta").mode("append").partitionBy("_event_date").save(self.path)
+
+        newest = self._load().agg(F.max("_event_date")).first()[0]
+        if newest is not None:
+            cutoff = min(newest, date.today()) - timedelta(days=self.retention_days)
+            self.spark.sql(
+                f"DELETE FROM delta.`{self.path}` WHERE _event_date < '{cutoff.isoformat()}'"
+            )
@@ -0,0 +1,192 @@
+"""Execution engine registry - repository and transformer classes per execution mode."""
+
+import importlib
+import importlib.util
+from dataclasses import dataclass, field
+from functools import cache
+from typing import Any
+
+from app.infrastructure.settings import Settings
+
+
+@dataclass(frozen=True)
+class EngineSpec:
+    """
+    Where the components of an execution engine live.
+
+    Components are given as "module:attribute" paths and imported on first
+    use, so selecting an engine never imports the other engines' libraries
+    (pandas, pyarrow, pyspark), and commands that need no engine import none.
+    """
+
+    name: str
+    repository: str
+    bronze_to_silver: str
+    silver_to_gold: str
+    dedup_index: str
+    multi_grain: str | None = None  # multi-grain gold transformer
+    requires: str | None = None  # top-level package the engine needs installed
+    table_transformers: dict[str, str] = field(default_factory=dict)  # per derived table
+
+
+ENGINES: dict[str, EngineSpec] = {
+    "local": EngineSpec(
+        name="local",
+        repository="app.infrastructure.repositories.pandas_repository:PandasRepository",
+        bronze_to_silver="app.domain.transformers:PandasBronzeToSilverTransformer",
+        silver_to_gold="app.domain.transformers:PandasSilverToGoldTransformer",
+        dedup_index="app.infrastructure.dedup_index:PandasDedupIndex",
+        multi_grain="app.domain.transformers:PandasMultiGrainTransformer",
+        table_transformers={
+            "entity_summary": "app.domain.transformers:PandasEntitySummaryTransformer",
+        },
+    ),
+    "databricks": EngineSpec(
+        name="databricks",
+        repository="app.infrastructure.repositories.spark_repository:SparkRepository",
+        bronze_to_silver="app.domain.transformers:SparkBronzeToSilverTransformer",
+        silver_to_gold="app.domain.transformers:SparkSilverToGoldTransformer",
+        dedup_index="app.infrastructure.dedup_index:SparkDedupIndex",
+        multi_grain="app.domain.transformers:SparkMultiGrainTransformer",
+        requires="pyspark",
+        table_transformers={
+            "entity_summary": "app.domain.transformers:SparkEntitySummaryTransformer",
+        },
+    ),
+}
+
+
+@cache
+def load_component(path: str) -> Any:
+    """
+    Import a component from a "module:attribute" path.
+
+    Args:
+        path: Module and attribute separated by a colon
+
+    Returns:
+        The attribute (usually a class)
+    """
+    module_name, _, attribute = path.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def get_engine(mode: str) -> EngineSpec:
+    """
+    Look up an execution engine.
+
+    Args:
+        mode: Execution mode (e.g. local, databricks)
+
+    Returns:
+        Engine specification
+
+    Raises:
+        ValueError: If no engine is registered for the mode
+    """
+    try:
+        return ENGINES[mode]
+    except KeyError:
+        raise ValueError(f"Unknown execution mode: {mode}")
+
+
+def register_engine(spec: EngineSpec) -> None:
+    """Register (or replace) the engine of an execution mode."""
+    ENGINES[spec.name] = spec
+
+
+def available_engines() -> list[str]:
+    """Execution modes whose required packages are installed."""
+    return [
+        name
+        for name, spec in ENGINES.items()
+        if spec.requires is None or importlib.util.find_spec(spec.requires) is not None
+    ]
+
+
+def create_repository(settings: Settings) -> Any:
+    """
+    Create the repository of the configured execution mode.
+
+    Args:
+        settings: Application settings
+
+    Returns:
+        Repository instance
+    """
+    return load_component(get_engine(settings.execution_mode).repository)(settings)
+
+
+def create_transformers(settings: Settings) -> tuple[Any, Any]:
+    """
+    Create the transformers of the configured execution mode.
+
+    Args:
+        settings: Application settings
+
+    Returns:
+        Tuple of (bronze_to_silver, silver_to_gold) transformers
+    """
+    engine = get_engine(settings.execution_mode)
+    return load_component(engine.bronze_to_silver)(), load_component(engine.silver_to_gold)()
+
+
+def create_table_transformer(settings: Settings, name: str) -> Any:
+    """
+    Create the configured execution mode's transformer of a derived table.
+
+    Args:
+        settings: Application settings
+        name: Derived table the transformer builds
+
+    Returns:
+        Table transformer instance
+
+    Raises:
+        ValueError: If the mode has no transformer for the table
+    """
+    engine = get_engine(settings.execution_mode)
+    if name not in engine.table_transformers:
+        raise ValueError(f"No {name} transformer for execution mode {engine.name}")
+    return load_component(engine.table_transformers[name])()
+
+
+def create_multi_grain_transformer(settings: Settings) -> Any | None:
+    """
+    Create the multi-grain gold transformer of the configured execution mode, if enabled.
+
+    Args:
+        settings: Application settings
+
+    Returns:
+        Transformer of the configured gold grains, or None if no grains are configured
+
+    Raises:
+        ValueError: If the mode has no multi-grain transformer
+    """
+    if not settings.gold_grains:
+        return None
+    engine = get_engine(settings.execution_mode)
+    if engine.multi_grain is None:
+        raise ValueError(f"No multi-grain transformer for execution mode {engine.name}")
+    return load_component(engine.multi_grain)(list(settings.gold_grains))
+
+
+def create_dedup_index(settings: Settings, repository: Any) -> Any | None:
+    """
+    Create the cross-batch dedup index of the configured execution mode, if enabled.
+
+    Args:
+        settings: Application settings
+        repository: Repository of the same mode (Spark indexes share its session)
+
+    Returns:
+        Dedup index, or None if dedup is disabled
+    """
+    if not settings.dedup_enabled:
+        return None
+    index_class = load_component(get_engine(settings.execution_mode).dedup_index)
+    # Spark indexes run on the repository's session
+    if hasattr(repository, "spark"):
+        return index_class(settings, repository.spark)
+    return index_class(settings)
@@ -0,0 +1,324 @@
+"""Vectorized synthetic bronze data generator."""
+
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+# Values written in place of a number or a timestamp for bad-type rows
+BAD_VALUE = "n/a"
+BAD_TIMESTAMP = "not-a-timestamp"
+
+
+@dataclass
+class GeneratorConfig:
+    """
+    What synthetic bronze data to generate.
+
+    Rows walk an (entity x time) grid in time order, so the files together
+    cover every entity at every period from start to end. If rows_per_file
+    is set, the grid is extended past start for as many periods as needed
+    and end is ignored.
+    """
+
+    entities: int = 3
+    start: str = "2026-02-01"
+    end: str = "2026-02-20"
+    freq: str = "h"
+    files: int = 1
+    rows_per_file: int | None = None
+    null_ratio: float = 0.0
+    bad_type_ratio: float = 0.0
+    duplicate_ratio: float = 0.0
+    late_ratio: float = 0.0
+    late_max: str = "2D"
+    seed: int = 0
+    chunk_rows: int = 1_000_000
+    prefix: str = "bronze"
+
+    @property
+    def step_ns(self) -> int:
+        """Nanoseconds between consecutive periods."""
+        try:
+            return int(pd.tseries.frequencies.to_offset(self.freq).nanos)
+        except ValueError:
+            raise ValueError(f"Frequency must be fixed-length (e.g. 15min, h, D): {self.freq}")
+
+    @property
+    def total_rows(self) -> int:
+        """Rows across all files."""
+        if self.rows_per_file:
+            return self.rows_per_file * self.files
+        span = pd.Timestamp(self.end) - pd.Timestamp(self.start)
+        periods = int(span.value) // self.step_ns + 1
+        return self.entities * periods
+
+    def file_rows(self, file_index: int) -> tuple[int, int]:
+        """Grid row range [first, last) written to a file."""
+        total = self.total_rows
+        return file_index * total // self.files, (file_index + 1) * total // self.files
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to dictionary."""
+        return asdict(self)
+
+
+@dataclass
+class GenerationReport:
+    """Summary of a generator run."""
+
+    files: int
+    rows: int
+    bytes_written: int
+    duration_seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        """Rows generated per second."""
+        if self.duration_seconds == 0:
+            return 0.0
+        return self.rows / self.duration_seconds
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to dictionary."""
+        result = asdict(self)
+        result["rows_per_second"] = self.rows_per_second
+        return result
+
+
+@lru_cache(maxsize=4)
+def _entity_names(entities: int) -> pa.Array:
+    """Entity id strings, built once per process and entity count."""
+    numbers = np.char.zfill(np.arange(entities).astype(str), 6)
+    return pa.array(np.char.add("entity_", numbers).astype(object), pa.string())
+
+
+def generate_chunk(
+    config: GeneratorConfig, first_row: int, num_rows: int, seed: tuple[int, ...]
+) -> pa.Table:
+    """
+    Generate a contiguous range of grid rows with the configured defects.
+
+    Args:
+        config: Generator configuration
+        first_row: Index of the first grid row
+        num_rows: Number of rows
+        seed: Entropy for this chunk's random generator
+
+    Returns:
+        Arrow table with timestamp, entity_id and value columns
+    """
+    rng = np.random.default_rng(seed)
+    rows = np.arange(first_row, first_row + num_rows, dtype=np.int64)
+
+    entity_index = rows % config.entities
+    timestamps = pd.Timestamp(config.start).value + (rows // config.entities) * config.step_ns
+    values = np.round(rng.uniform(10.0, 100.0, num_rows), 3)
+
+    # Late arrivals: readings for earlier periods written among newer rows
+    late = rng.random(num_rows) < config.late_ratio
+    max_lag = max(pd.Timedelta(config.late_max).value // config.step_ns, 1)
+    timestamps[late] -= rng.integers(1, max_lag + 1, late.sum()) * config.step_ns
+
+    columns = {
+        "timestamp": pa.array(timestamps.astype("datetime64[ns]")),
+        "entity_id": pc.take(_entity_names(config.entities), pa.array(entity_index)),
+        "value": pa.array(values),
+    }
+
+    if config.bad_type_ratio > 0:
+        # Values that cannot be parsed force timestamp and value to be strings
+        bad = rng.random(num_rows) < config.bad_type_ratio
+        bad_timestamp = bad & (rng.random(num_rows) < 0.5)
+
+        # A chunk spans few distinct times, so only those are formatted
+        distinct, inverse = np.unique(timestamps, return_inverse=True)
+        distinct_seconds = distinct.astype("datetime64[ns]").astype("datetime64[s]")
+        distinct_text = pc.cast(pa.array(distinct_seconds), pa.string())
+        timestamp_text = pc.take(distinct_text, pa.array(inverse))
+        columns["timestamp"] = pc.if_else(pa.array(bad_timestamp), BAD_TIMESTAMP, timestamp_text)
+
+        value_text = pc.cast(columns["value"], pa.string())
+        columns["value"] = pc.if_else(pa.array(bad & ~bad_timestamp), BAD_VALUE, value_text)
+
+    if config.null_ratio > 0:
+        # Each null row loses one of its three fields
+        null = rng.random(num_rows) < config.null_ratio
+        field = rng.integers(0, 3, num_rows)
+        for i, name in enumerate(("timestamp", "entity_id", "value")):
+            mask = pa.array(null & (field == i))
+            columns[name] = pc.if_else(mask, pa.scalar(None, columns[name].type), columns[name])
+
+    table = pa.table(columns)
+
+    # Duplicates: exact copies of another, non-duplicate row of the chunk,
+    # taken after its defects are applied
+    is_duplicate = rng.random(num_rows) < config.duplicate_ratio
+    originals = np.flatnonzero(~is_duplicate)
+    if is_duplicate.any() and len(originals):
+        rows_taken = np.arange(num_rows)
+        duplicate = np.flatnonzero(is_duplicate)
+        rows_taken[duplicate] = originals[rng.integers(0, len(originals), len(duplicate))]
+        table = table.take(pa.array(rows_taken))
+
+    return table
+
+
+def _file_chunks(config: GeneratorConfig, file_index: int) -> list[tuple[int, int]]:
+    """Grid row ranges (first row, rows) of a file's chunks, in order."""
+    first, last = config.file_rows(file_index)
+    return [
+        (chunk_start, min(config.chunk_rows, last - chunk_start))
+        for chunk_start in range(first, last, config.chunk_rows)
+    ]
+
+
+class _FileWriter:
+    """Appends chunks to one bronze file as row groups, publishing it on close."""
+
+    def __init__(self, config: GeneratorConfig, file_index: int, output_path: str):
+        self.file_index = file_index
+        self.path = Path(output_path) / f"{config.prefix}_{file_index:05d}.parquet"
+        self.tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        self.writer: pq.ParquetWriter | None = None
+        self.rows = 0
+
+    def write(self, table: pa.Table) -> None:
+        """Append a chunk."""
+        if self.writer is None:
+            self.writer = pq.ParquetWriter(self.tmp_path, table.schema)
+        self.writer.write_table(table)
+        self.rows += table.num_rows
+
+    def close(self) -> tuple[int, int]:
+        """Close the file and move it into place; returns (rows, bytes)."""
+        if self.writer is None:
+            return 0, 0
+        self.writer.close()
+        os.replace(self.tmp_path, self.path)
+        return self.rows, self.path.stat().st_size
+
+    def discard(self) -> None:
+        """Close and remove a partly written file."""
+        if self.writer is not None:
+            self.writer.close()
+            self.tmp_path.unlink(missing_ok=True)
+
+
+def _write_file(config: GeneratorConfig, file_index: int, output_path: str) -> tuple[int, int]:
+    """Write one bronze file chunk by chunk; returns (rows, bytes)."""
+    file_writer = _FileWriter(config, file_index, output_path)
+    try:
+        for chunk_index, (chunk_start, num_rows) in enumerate(_file_chunks(config, file_index)):
+            seed = (config.seed, file_index, chunk_index)
+            file_writer.write(generate_chunk(config, chunk_start, num_rows, seed))
+    except BaseException:
+        file_writer.discard()
+        raise
+    return file_writer.close()
+
+
+def _write_chunks(config: GeneratorConfig, output_path: str, workers: int) -> list[tuple[int, int]]:
+    """
+    Generate the chunks of all files on worker processes and append them in order.
+
+    At most two chunks per worker are in flight, so memory stays bounded
+    while fewer files than workers still keep every worker busy.
+    """
+    written = []
+    current: _FileWriter | None = None
+    pending: deque[tuple[int, Future]] = deque()
+
+    def append(file_index: int, table: pa.Table) -> None:
+        nonlocal current
+        # Chunks arrive in file order, so a file is complete once the next one starts
+        if current is None or current.file_index != file_index:
+            if current is not None:
+                written.append(current.close())
+            current = _FileWriter(config, file_index, output_path)
+        current.write(table)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        try:
+            for file_index in range(config.files):
+                chunks = _file_chunks(config, file_index)
+                for chunk_index, (chunk_start, num_rows) in enumerate(chunks):
+                    seed = (config.seed, file_index, chunk_index)
+                    future = pool.submit(generate_chunk, config, chunk_start, num_rows, seed)
+                    pending.append((file_index, future))
+                    if len(pending) > 2 * workers:
+                        done_index, done = pending.popleft()
+                        append(done_index, done.result())
+            while pending:
+                done_index, done = pending.popleft()
+                append(done_index, done.result())
+        except BaseException:
+            for _, future in pending:
+                future.cancel()
+            if current is not None:
+                current.discard()
+            raise
+
+    if current is not None:
+        written.append(current.close())
+    return written
+
+
+def generate_bronze(
+    config: GeneratorConfig, output_path: Path, workers: int | None = None
+) -> GenerationReport:
+    """
+    Generate bronze parquet files on worker processes.
+
+    Each file is written in chunks of config.chunk_rows, so memory is
+    bounded by workers x chunk_rows regardless of the total volume. With at
+    least as many files as workers, each worker writes whole files; with
+    fewer, chunks are generated in parallel and appended to their file as
+    row groups. Every chunk is seeded from (seed, file, chunk), so output
+    is reproducible for a given configuration whatever the number of
+    workers.
+
+    Args:
+        config: Generator configuration
+        output_path: Bronze directory to write into
+        workers: Worker processes (CPU count if None, 1 writes in-process)
+
+    Returns:
+        GenerationReport for the run
+    """
+    output_path = Path(output_path)
+    output_path.mkdir(parents=True, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+
+    started = time.perf_counter()
+    if workers <= 1:
+        written = [_write_file(config, i, str(output_path)) for i in range(config.files)]
+    elif config.files < workers:
+        written = _write_chunks(config, str(output_path), workers)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            written = list(
+                pool.map(
+                    _write_file,
+                    [config] * config.files,
+                    range(config.files),
+                    [str(output_path)] * config.files,
+                )
+            )
+
+    return GenerationReport(
+        files=sum(1 for rows, _ in written if rows > 0),
+        rows=sum(rows for rows, _ in written),
+        bytes_written=sum(size for _, size in written),
+        duration_seconds=time.perf_counter() - started,
+    )
@@ -1,30 +1,291 @@
 """Structured logging configuration."""
 
+import atexit
+import importlib
+import json
 import logging
+import os
+import queue
+import random
 import sys
-from typing import Any
+import threading
+import time
+from collections.abc import Callable
+from types import ModuleType
+from typing import Any, TextIO
 
 import structlog
 
 from app.infrastructure.settings import get_settings
 
 
+def _optional_module(name: str) -> ModuleType | None:
+    """Import an optional dependency, or return None if it is not installed."""
+    try:
+        return importlib.import_module(name)
+    except ImportError:  # pragma: no cover - optional dependency
+        return None
+
+
+orjson = _optional_module("orjson")
+
+
+def _json_dumps(event_dict: dict[str, Any], **kwargs: Any) -> str:
+    """Serialize an event with orjson when installed, else the standard library."""
+    if orjson is not None:
+        serialized: bytes = orjson.dumps(
+            event_dict, default=str, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+        return serialized.decode()
+    return json.dumps(event_dict, default=str)
+
+
+class EventSampler:
+    """
+    Processor keeping a fraction of the events with configured names.
+
+    Events without a rate are always kept. Kept events of sampled names
+    carry their sample_rate, so counts can be scaled back up downstream.
+    """
+
+    def __init__(self, rates: dict[str, float]):
+        """
+        Initialize sampler.
+
+        Args:
+            rates: Fraction of events kept (0 to 1) per event name
+        """
+        self.rates = dict(rates)
+        self.dropped = 0
+
+    def __call__(self, logger: Any, method_name: str, event_dict: dict) -> dict:
+        """Drop the event unless it is sampled in."""
+        rate = self.rates.get(str(event_dict.get("event")))
+        if rate is None:
+            return event_dict
+        if random.random() >= rate:
+            self.dropped += 1
+            raise structlog.DropEvent
+        event_dict["sample_rate"] = rate
+        return event_dict
+
+
+class QueueLogSink:
+    """
+    Renders and writes log events on a background thread.
+
+    The processor chain up to this sink runs on the calling thread (level
+    filter, context, timestamp, sampling) and then hands the event dict to
+    a bounded queue, so the caller only pays for a non-blocking put.
+    The writer thread renders queued events and writes them in batches,
+    one write and flush per batch. When the queue is full, events are
+    dropped and counted rather than blocking the caller; the writer logs a
+    log_events_dropped event with the count once it catches up.
+
+    Threads do not survive fork, so a forked child (e.g. a scheduler or
+    generator worker) starts a writer thread of its own with an empty queue.
+    Counters are updated under a lock, since every logging thread queues
+    events.
+    """
+
+    def __init__(
+        self,
+        renderer: Callable[[Any, str, dict], str],
+        stream: TextIO | None = None,
+        max_queue: int = 10_000,
+        batch_size: int = 512,
+        flush_interval: float = 0.1,
+    ):
+        """
+        Initialize sink and start its writer thread.
+
+        Args:
+            renderer: structlog processor turning an event dict into a line
+            stream: Output stream (stdout if None)
+            max_queue: Events buffered before new ones are dropped
+            batch_size: Most events rendered per write
+            flush_interval: Seconds the writer waits for more events before flushing
+        """
+        self.renderer = renderer
+        self.stream = stream
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queued = 0
+        self.written = 0
+        self.dropped = 0
+        self._reported_dropped = 0
+        self._lock = threading.Lock()
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._closed = threading.Event()
+        self._start()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _start(self) -> None:
+        """Start the writer thread."""
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def _after_fork(self) -> None:
+        """Restart the writer in a forked child; events queued by the parent stay with it."""
+        if self._closed.is_set():
+            return
+        # The lock may have been held by a parent thread at the time of the fork
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=self._queue.maxsize)
+        self.queued = self.written = self.dropped = self._reported_dropped = 0
+        self._start()
+
+    def __call__(self, logger: Any, method_name: str, event_dict: dict) -> dict:
+        """Queue the event and end the processor chain."""
+        # Exceptions must be captured on the thread that is handling them
+        if event_dict.get("exc_info") is True:
+            event_dict["exc_info"] = sys.exc_info()
+        try:
+            self._queue.put_nowait((method_name, event_dict))
+            with self._lock:
+                self.queued += 1
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+        raise structlog.DropEvent
+
+    def _render(self, method_name: str, event_dict: dict) -> str:
+        """Render an event, falling back to its repr if rendering fails."""
+        try:
+            return self.renderer(None, method_name, event_dict)
+        except Exception as e:
+            return repr({"event": "log_render_failed", "error": str(e), "original": event_dict})
+
+    def _run(self) -> None:
+        """Writer loop: wait for events, render a batch, write it once."""
+        while True:
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                if self._closed.is_set():
+                    return
+                continue
+
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            lines = [self._render(method_name, event) for method_name, event in batch]
+            with self._lock:
+                dropped = self.dropped
+            if dropped > self._reported_dropped:
+                lines.append(
+                    self._render(
+                        "warning",
+                        {
+                            "event": "log_events_dropped",
+                            "level": "warning",
+                            "dropped": dropped - self._reported_dropped,
+                        },
+                    )
+                )
+                self._reported_dropped = dropped
+
+            stream = self.stream or sys.stdout
+            try:
+                stream.write("\n".join(lines) + "\n")
+                stream.flush()
+            except (OSError, ValueError):
+                pass  # stream closed (e.g. at interpreter exit)
+            with self._lock:
+                self.written += len(batch)
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Wait until the events queued so far have been written (or the timeout passes)."""
+        target = self.queued
+        deadline = time.monotonic() + timeout
+        while self.written < target and self._thread.is_alive() and time.monotonic() < deadline:
+            time.sleep(0.001)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Write remaining events and stop the writer thread."""
+        self.flush(timeout)
+        self._closed.set()
+        self._thread.join(timeout)
+
+    def stats(self) -> dict[str, int]:
+        """Get queued, written and dropped event counters."""
+        with self._lock:
+            return {"queued": self.queued, "written": self.written, "dropped": self.dropped}
+
+
+_sink: QueueLogSink | None = None
+_sampler: EventSampler | None = None
+
+
+def get_log_sink() -> QueueLogSink | None:
+    """Get the active background log sink (None in synchronous mode)."""
+    return _sink
+
+
+def get_log_sampler() -> EventSampler | None:
+    """Get the active event sampler (None if no sampling is configured)."""
+    return _sampler
+
+
 def setup_logging() -> None:
-    """Configure structured logging."""
+    """
+    Configure structured logging.
+
+    With log_async set, events are rendered and written by a QueueLogSink
+    on a background thread; otherwise they are rendered and printed on the
+    calling thread. Loggers cache their processors on first use, so a sink
+    is started once per process and reused if logging is set up again.
+    """
+    global _sink, _sampler
     settings = get_settings()
 
+    renderer = (
+        structlog.processors.JSONRenderer(serializer=_json_dumps)
+        if settings.log_format == "json"
+        else structlog.dev.ConsoleRenderer()
+    )
+
+    processors: list[Any] = [
+        structlog.contextvars.merge_contextvars,
+        structlog.processors.add_log_level,
+    ]
+    if not settings.log_sample_rates:
+        _sampler = None
+    elif _sampler is None or _sampler.rates != settings.log_sample_rates:
+        _sampler = EventSampler(settings.log_sample_rates)
+    if _sampler is not None:
+        processors.append(_sampler)
+    processors += [
+        structlog.processors.TimeStamper(fmt="iso"),
+        structlog.processors.StackInfoRenderer(),
+    ]
+
+    if settings.log_async:
+        if _sink is None:
+            format_exc = structlog.processors.format_exc_info
+
+            def render(logger: Any, method_name: str, event_dict: dict) -> str:
+                line = renderer(logger, method_name, format_exc(logger, method_name, event_dict))
+                return line.decode() if isinstance(line, bytes) else line
+
+            _sink = QueueLogSink(
+                render,
+                max_queue=settings.log_queue_size,
+                batch_size=settings.log_batch_size,
+                flush_interval=settings.log_flush_interval,
+            )
+            atexit.register(_sink.close)
+        processors.append(_sink)
+    else:
+        processors += [structlog.processors.format_exc_info, renderer]
+
     # Configure structlog
     structlog.configure(
-        processors=[
-            structlog.contextvars.merge_contextvars,
-            structlog.processors.add_log_level,
-            structlog.processors.TimeStamper(fmt="iso"),
-            structlog.processors.StackInfoRenderer(),
-            structlog.processors.format_exc_info,
-            structlog.processors.JSONRenderer()
-            if settings.log_format == "json"
-            else structlog.dev.ConsoleRenderer(),
-        ],
+        processors=processors,
         wrapper_class=structlog.make_filtering_bound_logger(
             logging.getLevelName(settings.log_level)
         ),
@@ -55,9 +316,7 @@ def get_logger(name: str) -> Any:
 
 
 # Convenience function for logging with context
-def log_event(
-    logger: Any, level: str, event: str, **kwargs: Any
-) -> None:
+def log_event(logger: Any, level: str, event: str, **kwargs: Any) -> None:
     """
     Log an event with context.
 
@@ -1,8 +1,33 @@
 """Monitoring and metrics collection."""
 
+import bisect
+import math
+import os
+import re
+import resource
+import sys
+import threading
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any
+from typing import TYPE_CHECKING, Any, Self
+
+if TYPE_CHECKING:
+    from app.domain.sketches import KllSketch
+
+# Seconds between resident memory samples while a PeakRssSampler is active
+RSS_SAMPLE_INTERVAL = 0.005
+
+# Default histogram bucket upper bounds, suited to durations in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Accuracy parameter of the per-series quantile sketch (about 1% rank error)
+QUANTILE_SKETCH_K = 200
+
+# Prefix of exported Prometheus metric names
+PROMETHEUS_NAMESPACE = "energy_platform"
+
+# Quantiles exported for every recorded metric
+PROMETHEUS_QUANTILES = (0.5, 0.95, 0.99)
 
 
 @dataclass
@@ -20,52 +45,382 @@ class SystemHealth:
         return self.status == "healthy" and self.database_connected
 
 
+def _new_sketch() -> "KllSketch":
+    """Create a series' quantile sketch (imported here; sketches need NumPy)."""
+    from app.domain.sketches import KllSketch
+
+    return KllSketch(k=QUANTILE_SKETCH_K)
+
+
 @dataclass
+class MetricSeries:
+    """
+    Constant-memory summary of the values recorded for one metric and label set.
+
+    Count, sum, min and max are exact. Values are also counted into fixed
+    histogram buckets (values above the previous bound up to the bucket's
+    own, plus an overflow bucket) and summarized by a KLL sketch for
+    quantiles.
+    """
+
+    buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    count: int = 0
+    total: float = 0.0
+    min: float = math.inf
+    max: float = -math.inf
+    bucket_counts: list[int] = field(default_factory=list)
+    sketch: "KllSketch" = field(default_factory=_new_sketch)
+
+    def __post_init__(self) -> None:
+        """Size the bucket counts to the bucket bounds plus overflow."""
+        if not self.bucket_counts:
+            self.bucket_counts = [0] * (len(self.buckets) + 1)
+
+    def observe(self, value: float) -> None:
+        """Add a value to the summary."""
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sketch.update(value)
+
+    def merge(self, other: "MetricSeries") -> None:
+        """Merge another series with the same buckets into this one."""
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.bucket_counts = [a + b for a, b in zip(self.bucket_counts, other.bucket_counts)]
+        self.sketch.merge(other.sketch)
+
+    @property
+    def average(self) -> float:
+        """Mean of the recorded values."""
+        if self.count == 0:
+            return 0.0
+        return self.total / self.count
+
+    def quantile(self, fraction: float) -> float:
+        """Estimated quantile of the recorded values (0.0 if empty)."""
+        value = self.sketch.quantile(fraction)
+        return 0.0 if value is None else value
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to dictionary."""
+        p50, p95, p99 = self.sketch.quantiles([0.5, 0.95, 0.99])
+        return {
+            "total": self.total,
+            "average": self.average,
+            "count": self.count,
+            "min": self.min if self.count else 0.0,
+            "max": self.max if self.count else 0.0,
+            "p50": p50 or 0.0,
+            "p95": p95 or 0.0,
+            "p99": p99 or 0.0,
+            "buckets": {
+                **{str(bound): n for bound, n in zip(self.buckets, self.bucket_counts)},
+                "+Inf": self.bucket_counts[-1],
+            },
+        }
+
+
+LabelKey = tuple[tuple[str, str], ...]
+
+
+def _label_key(labels: dict[str, Any] | None) -> LabelKey:
+    """Canonical, hashable form of a label set."""
+    return tuple(sorted((str(k), str(v)) for k, v in (labels or {}).items()))
+
+
+def series_name(metric_name: str, labels: LabelKey) -> str:
+    """Display name of a series, e.g. request_seconds{route=/metrics}."""
+    if not labels:
+        return metric_name
+    return metric_name + "{" + ",".join(f"{k}={v}" for k, v in labels) + "}"
+
+
 class MetricsCollector:
-    """Collects and aggregates metrics."""
+    """
+    Collects and aggregates metrics in constant memory per series.
+
+    A series is a metric name plus an optional label set. Queries without
+    labels aggregate every series of the metric; queries with labels
+    aggregate the series carrying at least those labels. Updates and
+    queries are serialized by a lock, so the collector can be shared by
+    threads (API handlers, background workers).
 
-    _metrics: dict[str, list[float]] = field(default_factory=dict)
+    Besides recorded distributions, the collector holds plain counters
+    (increment) and gauges (set_gauge), one number per series.
+    """
 
-    def record(self, metric_name: str, value: float) -> None:
-        """Record a metric value."""
-        if metric_name not in self._metrics:
-            self._metrics[metric_name] = []
-        self._metrics[metric_name].append(value)
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        """
+        Initialize collector.
+
+        Args:
+            buckets: Default histogram bucket upper bounds, in increasing order
+        """
+        self.buckets = tuple(sorted(buckets))
+        self._metric_buckets: dict[str, tuple[float, ...]] = {}
+        self._series: dict[tuple[str, LabelKey], MetricSeries] = {}
+        self._values: dict[tuple[str, LabelKey], float] = {}
+        self._kinds: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def set_buckets(self, metric_name: str, buckets: tuple[float, ...]) -> None:
+        """Use other histogram buckets for a metric (before it is first recorded)."""
+        with self._lock:
+            self._metric_buckets[metric_name] = tuple(sorted(buckets))
+
+    def _buckets(self, metric_name: str) -> tuple[float, ...]:
+        """Histogram buckets of a metric."""
+        return self._metric_buckets.get(metric_name, self.buckets)
+
+    def record(self, metric_name: str, value: float, labels: dict[str, Any] | None = None) -> None:
+        """Record a metric value, optionally for a labelled series."""
+        key = (metric_name, _label_key(labels))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = MetricSeries(buckets=self._buckets(metric_name))
+            series.observe(float(value))
+
+    def increment(
+        self, metric_name: str, amount: float = 1, labels: dict[str, Any] | None = None
+    ) -> None:
+        """Add to a counter."""
+        key = (metric_name, _label_key(labels))
+        with self._lock:
+            self._kinds[metric_name] = "counter"
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def set_gauge(
+        self, metric_name: str, value: float, labels: dict[str, Any] | None = None
+    ) -> None:
+        """Set a gauge to its current value."""
+        key = (metric_name, _label_key(labels))
+        with self._lock:
+            self._kinds[metric_name] = "gauge"
+            self._values[key] = float(value)
+
+    def get_value(self, metric_name: str, labels: dict[str, Any] | None = None) -> float:
+        """Get a counter or gauge, summed over labels not given."""
+        wanted = set(_label_key(labels))
+        with self._lock:
+            return sum(
+                value
+                for (name, key), value in self._values.items()
+                if name == metric_name and wanted.issubset(key)
+            )
+
+    def _aggregate(self, metric_name: str, labels: dict[str, Any] | None) -> MetricSeries:
+        """Merge the series of a metric that carry the given labels (lock held)."""
+        wanted = set(_label_key(labels))
+        result = MetricSeries(buckets=self._buckets(metric_name))
+        for (name, key), series in self._series.items():
+            if name == metric_name and wanted.issubset(key):
+                result.merge(series)
+        return result
 
-    def get_average(self, metric_name: str) -> float:
+    def get_series(self, metric_name: str, labels: dict[str, Any] | None = None) -> MetricSeries:
+        """Get a copy of a metric's series, aggregated over labels not given."""
+        with self._lock:
+            return self._aggregate(metric_name, labels)
+
+    def get_average(self, metric_name: str, labels: dict[str, Any] | None = None) -> float:
         """Get average value for a metric."""
-        if metric_name not in self._metrics or not self._metrics[metric_name]:
-            return 0.0
-        return sum(self._metrics[metric_name]) / len(self._metrics[metric_name])
+        return self.get_series(metric_name, labels).average
 
-    def get_total(self, metric_name: str) -> float:
+    def get_total(self, metric_name: str, labels: dict[str, Any] | None = None) -> float:
         """Get total value for a metric."""
-        if metric_name not in self._metrics:
-            return 0.0
-        return sum(self._metrics[metric_name])
+        return self.get_series(metric_name, labels).total
 
-    def get_count(self, metric_name: str) -> int:
+    def get_count(self, metric_name: str, labels: dict[str, Any] | None = None) -> int:
         """Get count of recorded values for a metric."""
-        if metric_name not in self._metrics:
-            return 0
-        return len(self._metrics[metric_name])
+        return self.get_series(metric_name, labels).count
+
+    def get_quantile(
+        self, metric_name: str, fraction: float, labels: dict[str, Any] | None = None
+    ) -> float:
+        """Get an estimated quantile (0.5 = median) for a metric."""
+        return self.get_series(metric_name, labels).quantile(fraction)
 
     def reset(self) -> None:
         """Reset all metrics."""
-        self._metrics.clear()
-
-    def get_all_metrics(self) -> dict[str, dict[str, float]]:
-        """Get all metrics with aggregations."""
-        result = {}
-        for metric_name in self._metrics:
-            result[metric_name] = {
-                "total": self.get_total(metric_name),
-                "average": self.get_average(metric_name),
-                "count": self.get_count(metric_name),
-            }
+        with self._lock:
+            self._series.clear()
+            self._values.clear()
+            self._kinds.clear()
+
+    def snapshot(self) -> list[tuple[str, LabelKey, MetricSeries]]:
+        """Get a copy of every series as (metric name, labels, series)."""
+        with self._lock:
+            result = []
+            for (name, key), series in sorted(self._series.items()):
+                copied = MetricSeries(buckets=series.buckets)
+                copied.merge(series)
+                result.append((name, key, copied))
+            return result
+
+    def snapshot_values(self) -> list[tuple[str, LabelKey, str, float]]:
+        """Get every counter and gauge as (metric name, labels, kind, value)."""
+        with self._lock:
+            return [
+                (name, key, self._kinds[name], value)
+                for (name, key), value in sorted(self._values.items())
+            ]
+
+    def get_all_metrics(self) -> dict[str, dict[str, Any]]:
+        """Get all series with aggregations, keyed by series name."""
+        result = {series_name(name, key): series.to_dict() for name, key, series in self.snapshot()}
+        for name, key, kind, value in self.snapshot_values():
+            result[series_name(name, key)] = {"type": kind, "value": value}
         return result
 
 
+def _prometheus_name(name: str) -> str:
+    """Restrict a metric name to the Prometheus character set."""
+    name = re.sub(r"[^a-zA-Z0-9_:]", "_", name)
+    return name if re.match(r"[a-zA-Z_:]", name) else f"_{name}"
+
+
+def _prometheus_labels(labels: LabelKey, **extra: str) -> str:
+    """Format a label set as {name="value",...} (empty if there are none)."""
+    pairs = [(_prometheus_name(k), v) for k, v in labels] + list(extra.items())
+    if not pairs:
+        return ""
+    escaped = (
+        (k, str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')) for k, v in pairs
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+def _prometheus_number(value: float) -> str:
+    """Format a sample value."""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def render_prometheus(collector: MetricsCollector, namespace: str = PROMETHEUS_NAMESPACE) -> str:
+    """
+    Render every metric of a collector in the Prometheus text exposition format.
+
+    Recorded distributions become histograms (cumulative buckets, _sum and
+    _count) plus a {name}_quantile gauge with the sketch's p50, p95 and p99,
+    since a metric family cannot be both a histogram and a summary.
+    Counters get the conventional _total suffix.
+
+    Args:
+        collector: Collector to export
+        namespace: Prefix of every metric name
+
+    Returns:
+        Exposition text
+    """
+    lines: list[str] = []
+    prefix = f"{namespace}_" if namespace else ""
+
+    families: dict[str, list[tuple[LabelKey, MetricSeries]]] = {}
+    for name, key, series in collector.snapshot():
+        families.setdefault(name, []).append((key, series))
+
+    for name, members in families.items():
+        family = _prometheus_name(prefix + name)
+        lines.append(f"# TYPE {family} histogram")
+        for key, series in members:
+            cumulative = 0
+            for bound, count in zip(series.buckets, series.bucket_counts):
+                cumulative += count
+                le = _prometheus_number(bound)
+                lines.append(f"{family}_bucket{_prometheus_labels(key, le=le)} {cumulative}")
+            lines.append(f'{family}_bucket{_prometheus_labels(key, le="+Inf")} {series.count}')
+            total = _prometheus_number(series.total)
+            lines.append(f"{family}_sum{_prometheus_labels(key)} {total}")
+            lines.append(f"{family}_count{_prometheus_labels(key)} {series.count}")
+
+        lines.append(f"# TYPE {family}_quantile gauge")
+        for key, series in members:
+            values = series.sketch.quantiles(PROMETHEUS_QUANTILES)
+            for fraction, value in zip(PROMETHEUS_QUANTILES, values):
+                labels = _prometheus_labels(key, quantile=str(fraction))
+                lines.append(f"{family}_quantile{labels} {_prometheus_number(value or 0.0)}")
+
+    declared: set[str] = set()
+    for name, key, kind, value in collector.snapshot_values():
+        family = _prometheus_name(prefix + name)
+        if kind == "counter" and not family.endswith("_total"):
+            family += "_total"
+        if family not in declared:
+            lines.append(f"# TYPE {family} {kind}")
+            declared.add(family)
+        lines.append(f"{family}{_prometheus_labels(key)} {_prometheus_number(value)}")
+
+    return "\n".join(lines) + "\n"
+
+
+def current_rss_bytes() -> int:
+    """
+    Get the current resident set size of this process.
+
+    Read from /proc on Linux; elsewhere the lifetime peak from getrusage is
+    the closest available figure.
+
+    Returns:
+        Resident memory in bytes
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and kilobytes on Linux
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class PeakRssSampler:
+    """
+    Track the peak resident memory of the process while a block runs.
+
+    A background thread samples RSS at a fixed interval, so short spikes
+    between samples can be missed; the result is a lower bound.
+    """
+
+    def __init__(self, interval: float = RSS_SAMPLE_INTERVAL):
+        """
+        Initialize sampler.
+
+        Args:
+            interval: Seconds between samples
+        """
+        self.interval = interval
+        self.start_bytes = 0
+        self.peak_bytes = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _sample(self) -> None:
+        """Sample RSS until stopped."""
+        while not self._stop.wait(self.interval):
+            self.peak_bytes = max(self.peak_bytes, current_rss_bytes())
+
+    def __enter__(self) -> Self:
+        """Start sampling."""
+        self.start_bytes = self.peak_bytes = current_rss_bytes()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Stop sampling and take a final sample."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.peak_bytes = max(self.peak_bytes, current_rss_bytes())
+
+
 # Global metrics collector instance
 _metrics_collector = MetricsCollector()
 
@@ -0,0 +1,198 @@
+"""Opt-in CPU and allocation profiling of pipeline stages and API requests."""
+
+import cProfile
+import json
+import pstats
+import re
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+# Frames kept per traced allocation (the allocating line is enough to rank sites)
+TRACEMALLOC_FRAMES = 1
+
+# Allocation sites of the profiler's own machinery, left out of reports
+_IGNORED_FILES = (tracemalloc.__file__, "<frozen importlib._bootstrap>", "<unknown>")
+
+
+# pstats function key: (filename, line, name)
+_FunctionKey = tuple[str, int, str]
+
+# pstats totals of a function: (primitive calls, calls, own time, cumulative time, callers)
+_FunctionTotals = tuple[int, int, float, float, dict[_FunctionKey, Any]]
+
+
+def _function_name(key: _FunctionKey) -> str:
+    """Readable name of a pstats function key."""
+    filename, line, name = key
+    if filename == "~":
+        return name  # built-in
+    return f"{filename}:{line}({name})"
+
+
+def _function_totals(profile: cProfile.Profile) -> dict[_FunctionKey, _FunctionTotals]:
+    """
+    Per-function totals of a profile, keyed by file, line and name.
+
+    ``Stats.get_stats_profile`` keys functions by bare name, which merges
+    same-named functions, and rounds times to milliseconds, so the table
+    it is built from is read instead.
+    """
+    totals: dict[_FunctionKey, _FunctionTotals] = vars(pstats.Stats(profile))["stats"]
+    return totals
+
+
+def hottest_functions(profile: cProfile.Profile, limit: int) -> list[dict[str, Any]]:
+    """
+    Rank the functions of a profile by time spent in their own code.
+
+    Args:
+        profile: Finished profile
+        limit: Number of functions to return
+
+    Returns:
+        Function name, call count, own time and cumulative time per function
+    """
+    totals = _function_totals(profile)
+    ranked = sorted(totals.items(), key=lambda item: item[1][2], reverse=True)
+    result = []
+    for key, (_, calls, own_seconds, cumulative_seconds, _) in ranked[:limit]:
+        result.append(
+            {
+                "function": _function_name(key),
+                "calls": calls,
+                "own_seconds": round(own_seconds, 6),
+                "cumulative_seconds": round(cumulative_seconds, 6),
+            }
+        )
+    return result
+
+
+def top_allocations(
+    before: tracemalloc.Snapshot, after: tracemalloc.Snapshot, limit: int
+) -> list[dict[str, Any]]:
+    """
+    Rank source lines by the memory they allocated and kept between two snapshots.
+
+    Args:
+        before: Snapshot taken when the stage started
+        after: Snapshot taken when the stage ended
+        limit: Number of sites to return
+
+    Returns:
+        Site, bytes and allocation count still held per site
+    """
+    filters = [tracemalloc.Filter(False, pattern) for pattern in _IGNORED_FILES]
+    after = after.filter_traces(filters)
+    before = before.filter_traces(filters)
+
+    result = []
+    for diff in after.compare_to(before, "lineno")[:limit]:
+        if diff.size_diff <= 0:
+            break
+        frame = diff.traceback[0]
+        result.append(
+            {
+                "site": f"{frame.filename}:{frame.lineno}",
+                "bytes": diff.size_diff,
+                "count": diff.count_diff,
+            }
+        )
+    return result
+
+
+class StageProfiler:
+    """
+    Captures a CPU profile and allocation sites for each profiled stage.
+
+    Every stage gets a cProfile dump ({stage}.prof, readable with pstats or
+    snakeviz) in the output directory; close() writes summary.json with the
+    hottest functions, the largest allocation sites and the traced peak of
+    each stage. Allocation tracing is started on the first stage and
+    stopped on close unless it was already running. cProfile only sees the
+    calling thread, and tracing slows the stages down noticeably, so
+    profiled timings are for finding hotspots, not for comparison with
+    unprofiled runs.
+    """
+
+    def __init__(self, output_path: Path, top: int = 10):
+        """
+        Initialize stage profiler.
+
+        Args:
+            output_path: Directory to write profiles into
+            top: Functions and allocation sites reported per stage
+        """
+        self.output_path = Path(output_path)
+        self.top = top
+        self.stages: dict[str, dict[str, Any]] = {}
+        self._started_tracing = False
+
+    def _file_name(self, stage: str) -> str:
+        """File-system-safe name of a stage."""
+        return re.sub(r"[^A-Za-z0-9_.-]", "_", stage).strip("_") or "stage"
+
+    @contextmanager
+    def profile(self, stage: str) -> Iterator[None]:
+        """
+        Profile a block as a named stage.
+
+        Args:
+            stage: Stage name (repeated names overwrite earlier results)
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            self._started_tracing = True
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            after = tracemalloc.take_snapshot()
+            _, traced_peak = tracemalloc.get_traced_memory()
+
+            self.output_path.mkdir(parents=True, exist_ok=True)
+            profile.dump_stats(self.output_path / f"{self._file_name(stage)}.prof")
+            self.stages[stage] = {
+                "hottest_functions": hottest_functions(profile, self.top),
+                "top_allocations": top_allocations(before, after, self.top),
+                "traced_peak_bytes": traced_peak,
+            }
+
+    def summary(self, limit: int = 5) -> dict[str, list[str]]:
+        """
+        Get the hottest functions of each stage, short enough for a log line.
+
+        Args:
+            limit: Functions per stage
+
+        Returns:
+            Function names with their own time, per stage
+        """
+        return {
+            stage: [
+                f"{f['function']} {f['own_seconds']:.3f}s"
+                for f in result["hottest_functions"][:limit]
+            ]
+            for stage, result in self.stages.items()
+        }
+
+    def close(self) -> Path:
+        """
+        Stop tracing (if started here) and write summary.json.
+
+        Returns:
+            Output directory
+        """
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        self.output_path.mkdir(parents=True, exist_ok=True)
+        (self.output_path / "summary.json").write_text(json.dumps(self.stages, indent=2))
+        return self.output_path
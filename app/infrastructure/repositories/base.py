@@ -1,11 +1,105 @@
 """Base repository interface."""
 
+import threading
 from abc import ABC, abstractmethod
-from typing import Any
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Protocol, runtime_checkable
 
 from app.domain.models import BatchMetadata
 
 
+@dataclass
+class CompactionReport:
+    """Outcome of compacting a layer."""
+
+    layer: str
+    files_before: int
+    bytes_before: int
+    files_after: int = 0
+    bytes_after: int = 0
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary."""
+        return {
+            "layer": self.layer,
+            "files_before": self.files_before,
+            "bytes_before": self.bytes_before,
+            "files_after": self.files_after,
+            "bytes_after": self.bytes_after,
+        }
+
+
+@dataclass
+class IoCounters:
+    """
+    Cumulative bytes a repository has read from and written to storage.
+
+    Bytes are also counted per thread, so work measured on one thread is
+    not charged for I/O that another thread does at the same time.
+    """
+
+    bytes_read: int = 0
+    bytes_written: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+    _threads: dict[int, list[int]] = field(default_factory=dict, repr=False, compare=False)
+
+    def _add(self, read: int, written: int) -> None:
+        """Add bytes to the totals and to the current thread's totals."""
+        with self._lock:
+            self.bytes_read += read
+            self.bytes_written += written
+            totals = self._threads.setdefault(threading.get_ident(), [0, 0])
+            totals[0] += read
+            totals[1] += written
+
+    def add_read(self, num_bytes: int) -> None:
+        """Count bytes read."""
+        self._add(num_bytes, 0)
+
+    def add_written(self, num_bytes: int) -> None:
+        """Count bytes written."""
+        self._add(0, num_bytes)
+
+    def thread_totals(self) -> tuple[int, int]:
+        """Bytes read and written so far by the current thread."""
+        with self._lock:
+            read, written = self._threads.get(threading.get_ident(), (0, 0))
+        return read, written
+
+
+@runtime_checkable
+class BronzeFileReader(Protocol):
+    """
+    Optional repository capability of reading bronze file by file.
+
+    Repositories whose bronze layer is a set of files implement it, so the
+    pipeline can cache silver per bronze file; table-backed repositories
+    (such as Delta on Spark) do not.
+    """
+
+    def list_bronze_files(self) -> list[str]:
+        """
+        List the individual files that make up the bronze layer.
+
+        Returns:
+            Bronze file paths
+        """
+        ...
+
+    def read_bronze_file(self, path: str) -> Any:
+        """
+        Read a single bronze file.
+
+        Args:
+            path: Bronze file path from :meth:`list_bronze_files`
+
+        Returns:
+            DataFrame with the file's bronze data
+        """
+        ...
+
+
 class BaseRepository(ABC):
     """Abstract base repository for data operations."""
 
@@ -17,7 +111,6 @@ class BaseRepository(ABC):
         Returns:
             DataFrame with bronze data
         """
-        pass
 
     @abstractmethod
     def write_silver(self, df: Any, metadata: BatchMetadata) -> None:
@@ -28,17 +121,37 @@ class BaseRepository(ABC):
             df: DataFrame to write
             metadata: Batch metadata
         """
-        pass
 
     @abstractmethod
-    def read_silver(self) -> Any:
+    def write_quarantine(self, df: Any, metadata: BatchMetadata) -> None:
+        """
+        Write rows rejected during silver cleaning to the quarantine layer.
+
+        Args:
+            df: DataFrame of rejected rows tagged with a reject reason
+            metadata: Batch metadata
+        """
+
+    @abstractmethod
+    def read_silver(
+        self,
+        entity_ids: list[str] | None = None,
+        start: date | datetime | None = None,
+        end: date | datetime | None = None,
+        version: int | None = None,
+    ) -> Any:
         """
         Read data from silver layer.
 
+        Args:
+            entity_ids: Only return rows for these entities (None for all)
+            start: Inclusive lower bound on the layer's time column
+            end: Inclusive upper bound on the layer's time column
+            version: Table version to read (None for latest)
+
         Returns:
             DataFrame with silver data
         """
-        pass
 
     @abstractmethod
     def write_gold(self, df: Any, metadata: BatchMetadata) -> None:
@@ -49,17 +162,115 @@ class BaseRepository(ABC):
             df: DataFrame to write
             metadata: Batch metadata
         """
-        pass
 
     @abstractmethod
-    def read_gold(self) -> Any:
+    def read_gold(
+        self,
+        entity_ids: list[str] | None = None,
+        start: date | datetime | None = None,
+        end: date | datetime | None = None,
+        version: int | None = None,
+    ) -> Any:
         """
         Read data from gold layer.
 
+        Args:
+            entity_ids: Only return rows for these entities (None for all)
+            start: Inclusive lower bound on the layer's time column
+            end: Inclusive upper bound on the layer's time column
+            version: Table version to read (None for latest)
+
         Returns:
             DataFrame with gold data
         """
-        pass
+
+    @abstractmethod
+    def write_table(
+        self, df: Any, name: str, metadata: BatchMetadata, mode: str = "overwrite"
+    ) -> None:
+        """
+        Write a derived gold table.
+
+        Args:
+            df: Complete data of the table (overwrite) or a batch of rows to add (append)
+            name: Table name
+            metadata: Metadata of the build or batch
+            mode: overwrite to replace the table's contents, append to add to them
+
+        Raises:
+            ValueError: If the mode is unknown
+        """
+
+    @abstractmethod
+    def read_table(self, name: str, version: int | None = None) -> Any:
+        """
+        Read a table: silver, gold or a derived table.
+
+        Args:
+            name: Table name
+            version: Table version to read (None for latest)
+
+        Returns:
+            DataFrame with the table's data (empty if never written)
+        """
+
+    @abstractmethod
+    def table_version(self, name: str) -> int | None:
+        """
+        Get the latest committed version of a table: silver, gold or a derived table.
+
+        Args:
+            name: Table name
+
+        Returns:
+            Version number, or None if the table was never written
+        """
+
+    @abstractmethod
+    def compact(self, layer: str, target_file_bytes: int | None = None) -> CompactionReport:
+        """
+        Merge small files of a layer into larger, sorted files.
+
+        Args:
+            layer: Layer to compact ("silver" or "gold")
+            target_file_bytes: Target output file size (defaults to settings)
+
+        Returns:
+            Files and bytes before and after compaction
+        """
+
+    @abstractmethod
+    def write_checkpoint(self, df: Any, batch_id: str, name: str) -> None:
+        """
+        Store an intermediate result of a batch so a resumed run can reuse it.
+
+        Args:
+            df: DataFrame to store
+            batch_id: Batch the result belongs to
+            name: Name of the result within the batch (e.g. silver, gold)
+        """
+
+    @abstractmethod
+    def read_checkpoint(self, batch_id: str, name: str) -> Any:
+        """
+        Read an intermediate result stored by write_checkpoint.
+
+        Args:
+            batch_id: Batch the result belongs to
+            name: Name of the result within the batch
+
+        Returns:
+            DataFrame with the stored result
+        """
+
+    @abstractmethod
+    def delete_checkpoint(self, batch_id: str) -> None:
+        """
+        Delete all intermediate results of a batch.
+
+        Args:
+            batch_id: Batch whose results to delete
+        """
 
     @abstractmethod
     def save_metadata(self, metadata: BatchMetadata) -> None:
@@ -69,7 +280,30 @@ class BaseRepository(ABC):
         Args:
             metadata: Batch metadata to save
         """
-        pass
+
+    @abstractmethod
+    def latest_metadata(self, layer: str) -> BatchMetadata | None:
+        """
+        Get the most recently saved metadata of a layer.
+
+        Args:
+            layer: Layer name (e.g. silver, gold, or a derived table's layer)
+
+        Returns:
+            Metadata, or None if none was saved for the layer
+        """
+
+    @abstractmethod
+    def list_metadata(self, layer: str) -> list[BatchMetadata]:
+        """
+        Get all metadata saved for a layer.
+
+        Args:
+            layer: Layer name (e.g. silver, gold, or a derived table's layer)
+
+        Returns:
+            Metadata of every batch that wrote the layer, oldest first
+        """
 
     @abstractmethod
     def health_check(self) -> bool:
@@ -79,4 +313,3 @@ class BaseRepository(ABC):
         Returns:
             True if healthy, False otherwise
         """
-        pass
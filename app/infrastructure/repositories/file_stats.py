@@ -0,0 +1,227 @@
+"""File and row-group statistics for data skipping."""
+
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime
+from functools import cached_property
+from pathlib import Path
+from typing import TypeAlias
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from app.domain.sketches import BloomFilter
+
+# Chunks with more distinct entities than this store a bloom filter instead of a set
+ENTITY_SET_MAX = 256
+
+TimeBound: TypeAlias = str | date | datetime | pd.Timestamp | None
+
+
+@dataclass
+class ChunkStats:
+    """Statistics for a file or row group, used to decide whether it can match a query."""
+
+    num_rows: int
+    min_time: str | None = None
+    max_time: str | None = None
+    entity_ids: list[str] | None = None
+    entity_bloom: str | None = None
+
+    @cached_property
+    def _bloom(self) -> BloomFilter | None:
+        """Deserialized entity bloom filter."""
+        if self.entity_bloom is None:
+            return None
+        return BloomFilter.from_string(self.entity_bloom)
+
+    def may_match(
+        self,
+        entity_ids: set[str] | None = None,
+        start: pd.Timestamp | None = None,
+        end: pd.Timestamp | None = None,
+    ) -> bool:
+        """
+        Check whether this chunk may contain rows matching the filters.
+
+        Args:
+            entity_ids: Entity IDs to look up (None for all)
+            start: Inclusive lower time bound
+            end: Inclusive upper time bound
+
+        Returns:
+            False only if the chunk definitely has no matching rows
+        """
+        if self.num_rows == 0:
+            return False
+
+        if start is not None and self.max_time is not None and pd.Timestamp(self.max_time) < start:
+            return False
+
+        if end is not None and self.min_time is not None and pd.Timestamp(self.min_time) > end:
+            return False
+
+        if entity_ids:
+            if self.entity_ids is not None:
+                return not entity_ids.isdisjoint(self.entity_ids)
+            if self._bloom is not None:
+                return bool(self._bloom.contains(list(entity_ids)).any())
+
+        return True
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for storage."""
+        return {k: v for k, v in asdict(self).items() if v is not None}
+
+
+@dataclass
+class FileStats(ChunkStats):
+    """Statistics for a data file and each of its row groups."""
+
+    file: str = ""
+    size_bytes: int = 0
+    row_groups: list[ChunkStats] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for storage."""
+        data = super().to_dict()
+        data["row_groups"] = [rg.to_dict() for rg in self.row_groups]
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "FileStats":
+        """Create from a stored dictionary."""
+        data = dict(data)
+        row_groups = [ChunkStats(**rg) for rg in data.pop("row_groups", [])]
+        return cls(row_groups=row_groups, **data)
+
+
+@dataclass
+class ScanStats:
+    """Files and row groups touched by the last read of a layer."""
+
+    files_total: int = 0
+    files_read: int = 0
+    row_groups_read: int = 0
+
+
+def _chunk_stats(df: pd.DataFrame, time_column: str | None) -> ChunkStats:
+    """Compute statistics for a DataFrame slice."""
+    stats = ChunkStats(num_rows=len(df))
+
+    if len(df) == 0:
+        return stats
+
+    if time_column and time_column in df.columns:
+        times = pd.to_datetime(df[time_column])
+        if times.notna().any():
+            stats.min_time = times.min().isoformat()
+            stats.max_time = times.max().isoformat()
+
+    if "entity_id" in df.columns:
+        entities = df["entity_id"].dropna().astype(str).unique()
+        if len(entities) <= ENTITY_SET_MAX:
+            stats.entity_ids = sorted(entities)
+        else:
+            bloom = BloomFilter.for_capacity(len(entities))
+            bloom.add(entities)
+            stats.entity_bloom = bloom.to_string()
+
+    return stats
+
+
+def collect_file_stats(path: Path, df: pd.DataFrame, time_column: str | None) -> FileStats:
+    """
+    Collect file and row-group statistics for a freshly written parquet file.
+
+    Row-group boundaries are read from the parquet footer; the statistics
+    themselves are computed from the in-memory DataFrame that was written,
+    so the file is not read back.
+
+    Args:
+        path: Path of the written parquet file
+        df: DataFrame that was written to the file
+        time_column: Name of the time column to track (timestamp or date)
+
+    Returns:
+        FileStats for the file
+    """
+    metadata = pq.ParquetFile(path).metadata
+
+    row_groups = []
+    offset = 0
+    for i in range(metadata.num_row_groups):
+        num_rows = metadata.row_group(i).num_rows
+        row_groups.append(_chunk_stats(df.iloc[offset : offset + num_rows], time_column))
+        offset += num_rows
+
+    file_stats = _chunk_stats(df, time_column)
+    return FileStats(
+        **asdict(file_stats),
+        file=path.name,
+        size_bytes=path.stat().st_size,
+        row_groups=row_groups,
+    )
+
+
+def to_timestamp(value: TimeBound) -> pd.Timestamp | None:
+    """Normalize a query time bound to a pandas Timestamp."""
+    if value is None:
+        return None
+    return pd.Timestamp(value)
+
+
+def filter_rows(
+    df: pd.DataFrame,
+    time_column: str | None,
+    entity_ids: set[str] | None,
+    start: pd.Timestamp | None,
+    end: pd.Timestamp | None,
+) -> pd.DataFrame:
+    """Apply exact row-level filters after chunk pruning."""
+    mask = pd.Series(True, index=df.index)
+
+    if entity_ids and "entity_id" in df.columns:
+        mask &= df["entity_id"].astype(str).isin(entity_ids)
+
+    if time_column and time_column in df.columns and (start is not None or end is not None):
+        times = pd.to_datetime(df[time_column])
+        if start is not None:
+            mask &= times >= start
+        if end is not None:
+            mask &= times <= end
+
+    return df.loc[mask].reset_index(drop=True)
+
+
+def filter_table(
+    table: pa.Table,
+    time_column: str | None,
+    entity_ids: set[str] | None,
+    start: pd.Timestamp | None,
+    end: pd.Timestamp | None,
+) -> pa.Table:
+    """Apply the same row-level filters as filter_rows to an Arrow table, without converting it."""
+    mask = None
+
+    def _and(condition: pa.ChunkedArray) -> None:
+        nonlocal mask
+        mask = condition if mask is None else pc.and_(mask, condition)
+
+    if entity_ids and "entity_id" in table.column_names:
+        entities = pc.cast(table["entity_id"], pa.string())
+        _and(pc.is_in(entities, value_set=pa.array(sorted(entity_ids))))
+
+    if time_column and time_column in table.column_names and (start is not None or end is not None):
+        times = table[time_column]
+        if not pa.types.is_timestamp(times.type):
+            times = pc.cast(times, pa.timestamp("us"))
+        if start is not None:
+            _and(pc.greater_equal(times, pa.scalar(start.to_pydatetime())))
+        if end is not None:
+            _and(pc.less_equal(times, pa.scalar(end.to_pydatetime())))
+
+    if mask is None:
+        return table
+    return table.filter(pc.fill_null(mask, False))
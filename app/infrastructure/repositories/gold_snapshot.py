@@ -0,0 +1,128 @@
+"""Memory-mapped gold serving snapshot shared by API worker processes."""
+
+import os
+from functools import cache
+from pathlib import Path
+
+import pyarrow as pa
+from pyarrow import feather
+
+from app.infrastructure.filelock import file_lock
+
+# Marker file naming the current snapshot version
+CURRENT_MARKER = "_current"
+
+# Snapshot files kept on disk; older ones may still be mapped by slow workers
+SNAPSHOTS_RETAINED = 2
+
+
+def _snapshot_file(path: Path, version: int) -> Path:
+    """Path of the snapshot built from a gold table version."""
+    return path / f"gold-{version:020d}.arrow"
+
+
+def current_version(path: Path) -> int | None:
+    """
+    Get the version of the current snapshot.
+
+    Args:
+        path: Snapshot directory
+
+    Returns:
+        Gold table version the snapshot was built from, or None if there is none
+    """
+    try:
+        return int((Path(path) / CURRENT_MARKER).read_text())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def publish_snapshot(path: Path, table: pa.Table, version: int) -> bool:
+    """
+    Write gold as an uncompressed Arrow IPC (Feather v2) file and make it current.
+
+    The file is written under a temporary name, renamed into place, and
+    only then is the version marker moved, so readers never map a partial
+    file. A snapshot older than the current one is not published, which
+    keeps concurrent writers from moving the marker backwards.
+
+    Args:
+        path: Snapshot directory
+        table: Full gold table at the version
+        version: Gold table version the snapshot was built from
+
+    Returns:
+        True if the snapshot was published
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+
+    with file_lock(path / ".lock"):
+        current = current_version(path)
+        if current is not None and current >= version:
+            return False
+
+        target = _snapshot_file(path, version)
+        tmp_target = target.with_name(f".{target.name}.tmp")
+        feather.write_feather(table, tmp_target, compression="uncompressed")
+        os.replace(tmp_target, target)
+
+        tmp_marker = path / f".{CURRENT_MARKER}.tmp"
+        tmp_marker.write_text(str(version))
+        os.replace(tmp_marker, path / CURRENT_MARKER)
+
+        # Unlinked files stay valid for workers that still have them mapped
+        for old in sorted(path.glob("gold-*.arrow"))[:-SNAPSHOTS_RETAINED]:
+            old.unlink(missing_ok=True)
+
+    return True
+
+
+class SnapshotReader:
+    """
+    Per-process view of the current gold snapshot.
+
+    The snapshot file is memory-mapped read-only, so its pages live in the
+    OS page cache and are shared by every worker process mapping the same
+    file. Each access checks the version marker and remaps when a newer
+    snapshot has been published.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Initialize snapshot reader.
+
+        Args:
+            path: Snapshot directory
+        """
+        self.path = Path(path)
+        self.version: int | None = None
+        self._table: pa.Table | None = None
+
+    def table(self) -> pa.Table | None:
+        """
+        Get the current snapshot, remapping it if a newer version was published.
+
+        Returns:
+            Memory-mapped gold table, or None if no snapshot exists
+        """
+        version = current_version(self.path)
+        if version is None:
+            return None
+
+        if version != self.version:
+            try:
+                source = pa.memory_map(str(_snapshot_file(self.path, version)), "r")
+            except FileNotFoundError:
+                # Superseded and removed between reading the marker and mapping
+                return self._table
+            self._table = pa.ipc.open_file(source).read_all()
+            self.version = version
+
+        return self._table
+
+
+@cache
+def get_snapshot_reader(path: str) -> SnapshotReader:
+    """Get the process-wide snapshot reader for a snapshot directory."""
+    return SnapshotReader(Path(path))
@@ -0,0 +1,250 @@
+"""Versioned manifest log giving local layers atomic commits and snapshot reads."""
+
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+
+import pandas as pd
+
+from app.infrastructure.filelock import file_lock
+from app.infrastructure.repositories.file_stats import FileStats, collect_file_stats
+
+# Directory holding a layer's manifests, one JSON file per committed version
+MANIFEST_DIR = "_manifest"
+
+# Pointer file naming the latest committed version
+LATEST_POINTER = "_latest"
+
+# Unreferenced data files younger than this may belong to an in-flight commit
+VACUUM_GRACE_SECONDS = 3600
+
+# Pre-manifest statistics index, imported when a layer is first bootstrapped
+LEGACY_INDEX = "_index.json"
+
+
+@dataclass
+class Snapshot:
+    """The set of live data files of a layer at one version."""
+
+    version: int
+    files: dict[str, FileStats] = field(default_factory=dict)
+    operation: str = "create"
+    committed_at: str | None = None
+
+    @property
+    def num_rows(self) -> int:
+        """Total rows across live files."""
+        return sum(s.num_rows for s in self.files.values())
+
+    @property
+    def size_bytes(self) -> int:
+        """Total bytes across live files."""
+        return sum(s.size_bytes for s in self.files.values())
+
+
+@lru_cache(maxsize=64)
+def _read_manifest(path: str) -> Snapshot:
+    """Parse a manifest file (manifests are immutable, so parsing is cached)."""
+    with open(path) as f:
+        data = json.load(f)
+    return Snapshot(
+        version=data["version"],
+        files={name: FileStats.from_dict(s) for name, s in data["files"].items()},
+        operation=data["operation"],
+        committed_at=data["committed_at"],
+    )
+
+
+def manifest_cache_stats() -> dict[str, int]:
+    """Get hit, miss and size counters of the parsed-manifest cache."""
+    info = _read_manifest.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "entries": info.currsize}
+
+
+class TableLog:
+    """
+    Transaction log of a layer directory.
+
+    Each commit writes a complete manifest of live files for a new version,
+    then moves the latest-version pointer to it. Data files are written
+    before their manifest, so a reader resolving the pointer always sees a
+    complete snapshot, and resolving it needs no directory listing.
+    """
+
+    def __init__(self, layer_path: Path):
+        """
+        Initialize table log.
+
+        Args:
+            layer_path: Directory of the layer
+        """
+        self.layer_path = Path(layer_path)
+        self.manifest_path = self.layer_path / MANIFEST_DIR
+        self.pointer_path = self.manifest_path / LATEST_POINTER
+        self.lock_path = self.manifest_path / ".lock"
+
+    def _manifest_file(self, version: int) -> Path:
+        """Path of the manifest for a version."""
+        return self.manifest_path / f"{version:020d}.json"
+
+    def latest_version(self) -> int | None:
+        """
+        Get the latest committed version.
+
+        Returns:
+            Version number, or None if the layer has no manifest yet
+        """
+        try:
+            return int(self.pointer_path.read_text())
+        except FileNotFoundError:
+            return None
+
+    def versions(self) -> list[int]:
+        """List versions whose manifests are still retained."""
+        if not self.manifest_path.exists():
+            return []
+        return sorted(int(p.stem) for p in self.manifest_path.glob("*.json"))
+
+    def snapshot(self, version: int | None = None) -> Snapshot:
+        """
+        Resolve the live files of a version.
+
+        Args:
+            version: Version to read (None for latest)
+
+        Returns:
+            Snapshot of the layer (version 0 and no files if never committed)
+        """
+        if version is None:
+            version = self.latest_version()
+            if version is None:
+                return Snapshot(version=0)
+
+        manifest = self._manifest_file(version)
+        if not manifest.exists():
+            raise ValueError(f"Version {version} of {self.layer_path} does not exist")
+        return _read_manifest(str(manifest))
+
+    def commit(
+        self,
+        added: list[FileStats],
+        removed: list[str] | None = None,
+        operation: str = "append",
+        replace: bool = False,
+    ) -> int:
+        """
+        Commit a new version adding and removing data files.
+
+        Args:
+            added: Statistics of new data files (already written)
+            removed: Names of data files no longer live
+            operation: Operation recorded in the manifest
+            replace: Drop every live file, so the version holds only the added files
+
+        Returns:
+            The committed version
+        """
+        self.manifest_path.mkdir(parents=True, exist_ok=True)
+
+        with file_lock(self.lock_path):
+            current = self.snapshot()
+            files = {} if replace else dict(current.files)
+            for name in removed or []:
+                files.pop(name, None)
+            for stats in added:
+                files[stats.file] = stats
+
+            version = current.version + 1
+            self._write_manifest(version, files, operation)
+            return version
+
+    def _write_manifest(self, version: int, files: dict[str, FileStats], operation: str) -> None:
+        """Write a manifest, then publish it by moving the latest pointer."""
+        manifest = self._manifest_file(version)
+        tmp_manifest = manifest.with_name(f".{manifest.name}.tmp")
+        with open(tmp_manifest, "w") as f:
+            json.dump(
+                {
+                    "version": version,
+                    "operation": operation,
+                    "committed_at": datetime.now().isoformat(),
+                    "files": {name: s.to_dict() for name, s in files.items()},
+                },
+                f,
+            )
+        os.replace(tmp_manifest, manifest)
+
+        tmp_pointer = self.pointer_path.with_name(f".{LATEST_POINTER}.tmp")
+        tmp_pointer.write_text(str(version))
+        os.replace(tmp_pointer, self.pointer_path)
+
+    def bootstrap(self, time_column: str | None) -> None:
+        """
+        Create the first version from files already in the layer.
+
+        Used once for layers written before the manifest log existed. Stats
+        are taken from the legacy index when present, otherwise computed
+        from the files themselves. An empty layer gets no version, so it has
+        none until its first commit.
+
+        Args:
+            time_column: Name of the time column to track
+        """
+        self.manifest_path.mkdir(parents=True, exist_ok=True)
+
+        with file_lock(self.lock_path):
+            if self.latest_version() is not None:
+                return
+
+            legacy_index = self.layer_path / LEGACY_INDEX
+            if legacy_index.exists():
+                with open(legacy_index) as f:
+                    stored = json.load(f)["files"]
+                files = {name: FileStats.from_dict(s) for name, s in stored.items()}
+            else:
+                files = {}
+                for path in sorted(self.layer_path.glob("*.parquet")):
+                    stats = collect_file_stats(path, pd.read_parquet(path), time_column)
+                    files[path.name] = stats
+                if not files:
+                    return
+
+            self._write_manifest(1, files, "create")
+
+    def vacuum(self, retain_versions: int) -> list[str]:
+        """
+        Drop old manifests and delete data files no retained version references.
+
+        Unreferenced files newer than the grace period are kept, since they
+        may have been written by a commit that is still in progress.
+
+        Args:
+            retain_versions: Number of most recent versions to keep readable
+
+        Returns:
+            Names of deleted data files
+        """
+        with file_lock(self.lock_path):
+            versions = self.versions()
+            retained = versions[-retain_versions:] if retain_versions > 0 else versions[-1:]
+
+            referenced: set[str] = set()
+            for version in retained:
+                referenced.update(self.snapshot(version).files)
+
+            for version in versions:
+                if version not in retained:
+                    self._manifest_file(version).unlink(missing_ok=True)
+
+            deleted = []
+            cutoff = time.time() - VACUUM_GRACE_SECONDS
+            for path in self.layer_path.glob("*.parquet"):
+                if path.name not in referenced and path.stat().st_mtime < cutoff:
+                    path.unlink(missing_ok=True)
+                    deleted.append(path.name)
+
+        return deleted
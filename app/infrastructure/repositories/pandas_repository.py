@@ -1,15 +1,52 @@
 """Pandas-based repository for local execution."""
 
 import json
+import os
+import re
+import shutil
+import uuid
 from pathlib import Path
-from typing import Any
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 from app.domain.models import BatchMetadata
-from app.infrastructure.repositories.base import BaseRepository
+from app.infrastructure.filelock import file_lock
+from app.infrastructure.repositories.base import BaseRepository, CompactionReport, IoCounters
+from app.infrastructure.repositories.file_stats import (
+    FileStats,
+    ScanStats,
+    TimeBound,
+    collect_file_stats,
+    filter_rows,
+    filter_table,
+    to_timestamp,
+)
+from app.infrastructure.repositories.gold_snapshot import get_snapshot_reader, publish_snapshot
+from app.infrastructure.repositories.manifest import Snapshot, TableLog
+from app.infrastructure.repositories.parquet_options import ParquetWriteOptions
 from app.infrastructure.settings import Settings
 
+# Attempts for a read that races with a concurrent compaction
+READ_RETRIES = 3
+
+# Lock file held for the duration of a layer compaction
+COMPACTION_LOCK_NAME = "_compaction.lock"
+
+# Directory of the metadata store holding the latest metadata of every layer
+LATEST_METADATA_DIR = "_latest"
+
+
+def _row_groups_bytes(metadata: pq.FileMetaData, row_groups: list[int]) -> int:
+    """Compressed bytes of the column chunks of some row groups of a file."""
+    total = 0
+    for i in row_groups:
+        row_group = metadata.row_group(i)
+        columns = range(row_group.num_columns)
+        total += sum(row_group.column(j).total_compressed_size for j in columns)
+    return total
+
 
 class PandasRepository(BaseRepository):
     """Repository implementation using pandas for local storage."""
@@ -22,6 +59,8 @@ class PandasRepository(BaseRepository):
             settings: Application settings
         """
         self.settings = settings
+        self.last_scan = ScanStats()
+        self.io = IoCounters()
         self._ensure_directories()
 
     def _ensure_directories(self) -> None:
@@ -29,60 +68,440 @@ class PandasRepository(BaseRepository):
         Path(self.settings.bronze_full_path).mkdir(parents=True, exist_ok=True)
         Path(self.settings.silver_full_path).mkdir(parents=True, exist_ok=True)
         Path(self.settings.gold_full_path).mkdir(parents=True, exist_ok=True)
+        Path(self.settings.quarantine_full_path).mkdir(parents=True, exist_ok=True)
         Path(self.settings.metadata_full_path).mkdir(parents=True, exist_ok=True)
 
+    def list_bronze_files(self) -> list[str]:
+        """List bronze parquet files."""
+        bronze_path = Path(self.settings.bronze_full_path)
+        return [str(f) for f in sorted(bronze_path.glob("*.parquet"))]
+
+    def read_bronze_file(self, path: str) -> pd.DataFrame:
+        """Read a single bronze parquet file."""
+        self.io.add_read(os.path.getsize(path))
+        return pd.read_parquet(path)
+
     def read_bronze(self) -> pd.DataFrame:
         """Read bronze data from parquet files."""
-        bronze_path = Path(self.settings.bronze_full_path)
-        parquet_files = list(bronze_path.glob("*.parquet"))
+        parquet_files = self.list_bronze_files()
 
         if not parquet_files:
             # Return empty DataFrame with expected schema if no files exist
             return pd.DataFrame(columns=["timestamp", "entity_id", "value"])
 
         # Read all parquet files and concatenate
-        dfs = [pd.read_parquet(f) for f in parquet_files]
+        dfs = [self.read_bronze_file(f) for f in parquet_files]
         return pd.concat(dfs, ignore_index=True) if dfs else pd.DataFrame()
 
+    def _layer(self, layer: str) -> tuple[Path, str]:
+        """Resolve a layer name to its path and time column."""
+        if layer == "silver":
+            return Path(self.settings.silver_full_path), "timestamp"
+        if layer == "gold":
+            return Path(self.settings.gold_full_path), "date"
+        raise ValueError(f"Unknown layer: {layer}")
+
+    def _derived_table(self, name: str) -> Path:
+        """Resolve a derived table name to its directory."""
+        if name in ("silver", "gold") or not re.fullmatch(r"[A-Za-z0-9_-]+", name):
+            raise ValueError(f"Invalid derived table name: {name}")
+        return Path(self.settings.derived_tables_full_path) / name
+
+    def _snapshot(
+        self, layer_path: Path, time_column: str | None, version: int | None = None
+    ) -> Snapshot:
+        """Resolve a layer snapshot, bootstrapping the manifest log on first use."""
+        log = TableLog(layer_path)
+        if log.latest_version() is None:
+            log.bootstrap(time_column)
+        return log.snapshot(version)
+
+    def _write_layer(self, df: pd.DataFrame, layer: str, batch_id: str) -> None:
+        """Write a batch file to a layer and commit it to the layer's manifest log."""
+        layer_path, time_column = self._layer(layer)
+        options = ParquetWriteOptions.from_settings(self.settings, layer)
+
+        # Files written before the manifest log are adopted first, so the new
+        # file is only committed by its own append
+        self._snapshot(layer_path, time_column)
+
+        output_path = layer_path / f"{batch_id}.parquet"
+        tmp_path = layer_path / f".{batch_id}.parquet.tmp"
+        df = options.write(df, tmp_path)
+        os.replace(tmp_path, output_path)
+        self.io.add_written(output_path.stat().st_size)
+
+        # The manifest is written last, which makes the new file visible atomically
+        stats = collect_file_stats(output_path, df, time_column)
+        self._commit_append(TableLog(layer_path), [stats])
+
+    def _commit_append(self, log: TableLog, stats: list[FileStats]) -> int:
+        """
+        Commit appended files, vacuuming the log every few versions.
+
+        Each manifest lists every live file, so the log is vacuumed once per
+        ``manifest_retain_versions`` appends; at most twice that many
+        manifests are kept between vacuums.
+
+        Args:
+            log: Transaction log of the layer or table
+            stats: Statistics of the appended files
+
+        Returns:
+            The committed version
+        """
+        version = log.commit(stats)
+        retain_versions = self.settings.manifest_retain_versions
+        if version % max(retain_versions, 1) == 0:
+            log.vacuum(retain_versions)
+        return version
+
+    def _read_layer(
+        self,
+        layer_path: Path,
+        time_column: str | None,
+        entity_ids: list[str] | None = None,
+        start: TimeBound = None,
+        end: TimeBound = None,
+        version: int | None = None,
+    ) -> pd.DataFrame:
+        """
+        Read a layer snapshot, skipping files and row groups that cannot match the filters.
+
+        The snapshot is resolved once from the manifest log, so writes and
+        compactions committed during the read are not observed. If a file of
+        the latest snapshot is vacuumed mid-read, the read is retried against
+        the new latest snapshot.
+        """
+        for attempt in range(READ_RETRIES):
+            snapshot = self._snapshot(layer_path, time_column, version)
+            try:
+                return self._read_files(layer_path, snapshot, time_column, entity_ids, start, end)
+            except FileNotFoundError:
+                if version is not None or attempt == READ_RETRIES - 1:
+                    raise
+        return pd.DataFrame()
+
+    def _read_files(
+        self,
+        layer_path: Path,
+        snapshot: Snapshot,
+        time_column: str | None,
+        entity_ids: list[str] | None,
+        start: TimeBound,
+        end: TimeBound,
+    ) -> pd.DataFrame:
+        """Read the files of a snapshot that may match the filters."""
+        index = snapshot.files
+        self.last_scan = ScanStats(files_total=len(index))
+
+        if not index:
+            return pd.DataFrame()
+
+        file_names = sorted(index)
+        memory_map = self.settings.read_memory_map
+
+        if not entity_ids and start is None and end is None:
+            self.last_scan.files_read = len(file_names)
+            self.io.add_read(sum(index[name].size_bytes for name in file_names))
+            tables = [
+                pq.read_table(layer_path / name, memory_map=memory_map) for name in file_names
+            ]
+            return self._to_pandas(tables)
+
+        entity_set = {str(e) for e in entity_ids} if entity_ids else None
+        start_ts = to_timestamp(start)
+        end_ts = to_timestamp(end)
+
+        tables = []
+        for name in file_names:
+            stats = index[name]
+            if not stats.may_match(entity_set, start_ts, end_ts):
+                continue
+
+            row_groups = [
+                i
+                for i, rg in enumerate(stats.row_groups)
+                if rg.may_match(entity_set, start_ts, end_ts)
+            ]
+            if not row_groups:
+                continue
+
+            parquet_file = pq.ParquetFile(layer_path / name, memory_map=memory_map)
+            tables.append(parquet_file.read_row_groups(row_groups))
+            self.io.add_read(_row_groups_bytes(parquet_file.metadata, row_groups))
+            self.last_scan.files_read += 1
+            self.last_scan.row_groups_read += len(row_groups)
+
+        if not tables:
+            return pd.DataFrame()
+
+        return filter_rows(self._to_pandas(tables), time_column, entity_set, start_ts, end_ts)
+
+    def _to_pandas(self, tables: list[pa.Table], dtype_backend: str | None = None) -> pd.DataFrame:
+        """
+        Convert the tables read from a layer into a single DataFrame.
+
+        Tables are concatenated in Arrow, which only references their chunks,
+        so the data is converted to pandas once instead of per file and again
+        by a pandas concat. With the pyarrow dtype backend the columns wrap
+        the Arrow buffers (pd.ArrowDtype) rather than being copied to NumPy
+        or Python objects.
+
+        Args:
+            tables: Tables read from the layer
+            dtype_backend: Column types (None for the configured read backend)
+        """
+        if not tables:
+            return pd.DataFrame()
+
+        table = pa.concat_tables(tables, promote_options="permissive")
+        if (dtype_backend or self.settings.read_dtype_backend) == "pyarrow":
+            return table.to_pandas(types_mapper=pd.ArrowDtype)
+        return table.to_pandas()
+
+    def compact(self, layer: str, target_file_bytes: int | None = None) -> CompactionReport:
+        """
+        Merge small files of a layer into larger files sorted by entity and time.
+
+        Small files are packed in name order into bins of roughly the target
+        size, so memory use is bounded by one bin. Each bin is written as a
+        single file with the layer's write options and the compaction
+        row-group size. All
+        bins are swapped in by a single manifest commit; replaced files stay
+        readable by older versions until they are vacuumed.
+        """
+        layer_path, time_column = self._layer(layer)
+        options = ParquetWriteOptions.from_settings(self.settings, layer)
+        target = target_file_bytes or self.settings.compaction_target_file_bytes
+
+        with file_lock(layer_path / COMPACTION_LOCK_NAME):
+            snapshot = self._snapshot(layer_path, time_column)
+            index = snapshot.files
+            report = CompactionReport(
+                layer=layer,
+                files_before=len(index),
+                bytes_before=snapshot.size_bytes,
+            )
+
+            # Pack small files into bins of about the target size
+            bins: list[list[str]] = [[]]
+            bin_bytes = 0
+            for name in sorted(index):
+                if index[name].size_bytes >= target:
+                    continue
+                if bin_bytes >= target:
+                    bins.append([])
+                    bin_bytes = 0
+                bins[-1].append(name)
+                bin_bytes += index[name].size_bytes
+            bins = [names for names in bins if len(names) > 1]
+
+            added = []
+            removed = []
+            for names in bins:
+                df = pd.concat(
+                    [pd.read_parquet(layer_path / name) for name in names], ignore_index=True
+                )
+                output_path = layer_path / f"compacted-{uuid.uuid4().hex}.parquet"
+                tmp_path = layer_path / f".{output_path.name}.tmp"
+                df = options.write(
+                    df, tmp_path, row_group_size=self.settings.compaction_row_group_size
+                )
+                os.replace(tmp_path, output_path)
+
+                added.append(collect_file_stats(output_path, df, time_column))
+                removed.extend(names)
+
+            log = TableLog(layer_path)
+            if added:
+                log.commit(added, removed=removed, operation="compact")
+            log.vacuum(self.settings.manifest_retain_versions)
+            if added and layer == "gold" and self.settings.gold_snapshot_enabled:
+                self._publish_gold_snapshot()
+
+            snapshot = log.snapshot()
+            report.files_after = len(snapshot.files)
+            report.bytes_after = snapshot.size_bytes
+
+        return report
+
     def write_silver(self, df: pd.DataFrame, metadata: BatchMetadata) -> None:
         """Write silver data to parquet."""
-        output_path = Path(self.settings.silver_full_path) / f"{metadata.batch_id}.parquet"
+        self._write_layer(df, "silver", metadata.batch_id)
+
+    def write_quarantine(self, df: pd.DataFrame, metadata: BatchMetadata) -> None:
+        """Write rejected rows to parquet in the quarantine layer."""
+        output_path = Path(self.settings.quarantine_full_path) / f"{metadata.batch_id}.parquet"
         df.to_parquet(output_path, index=False)
+        self.io.add_written(output_path.stat().st_size)
 
-    def read_silver(self) -> pd.DataFrame:
+    def read_silver(
+        self,
+        entity_ids: list[str] | None = None,
+        start: TimeBound = None,
+        end: TimeBound = None,
+        version: int | None = None,
+    ) -> pd.DataFrame:
         """Read silver data from parquet files."""
-        silver_path = Path(self.settings.silver_full_path)
-        parquet_files = list(silver_path.glob("*.parquet"))
-
-        if not parquet_files:
-            return pd.DataFrame()
-
-        dfs = [pd.read_parquet(f) for f in parquet_files]
-        return pd.concat(dfs, ignore_index=True) if dfs else pd.DataFrame()
+        return self._read_layer(
+            Path(self.settings.silver_full_path), "timestamp", entity_ids, start, end, version
+        )
 
     def write_gold(self, df: pd.DataFrame, metadata: BatchMetadata) -> None:
         """Write gold data to parquet."""
-        output_path = Path(self.settings.gold_full_path) / f"{metadata.batch_id}.parquet"
-        df.to_parquet(output_path, index=False)
+        self._write_layer(df, "gold", metadata.batch_id)
+        if self.settings.gold_snapshot_enabled:
+            self._publish_gold_snapshot()
 
-    def read_gold(self) -> pd.DataFrame:
-        """Read gold data from parquet files."""
-        gold_path = Path(self.settings.gold_full_path)
-        parquet_files = list(gold_path.glob("*.parquet"))
+    def _publish_gold_snapshot(self) -> None:
+        """Materialize the latest gold version as the serving snapshot."""
+        layer_path, time_column = self._layer("gold")
+        snapshot = self._snapshot(layer_path, time_column)
+        tables = [pq.read_table(layer_path / name) for name in sorted(snapshot.files)]
+        if not tables:
+            return
+        table = pa.concat_tables(tables, promote_options="permissive")
+        publish_snapshot(Path(self.settings.gold_snapshot_full_path), table, snapshot.version)
 
-        if not parquet_files:
+    def read_gold(
+        self,
+        entity_ids: list[str] | None = None,
+        start: TimeBound = None,
+        end: TimeBound = None,
+        version: int | None = None,
+    ) -> pd.DataFrame:
+        """
+        Read gold data from parquet files.
+
+        With the serving snapshot enabled, latest-version reads are answered
+        from the memory-mapped snapshot. Rows are filtered in Arrow and
+        returned as pd.ArrowDtype columns over the snapshot buffers, so an
+        unfiltered read does not copy the whole table to NumPy.
+        """
+        if self.settings.gold_snapshot_enabled and version is None:
+            table = get_snapshot_reader(self.settings.gold_snapshot_full_path).table()
+            if table is not None:
+                entity_set = {str(e) for e in entity_ids} if entity_ids else None
+                table = filter_table(
+                    table, "date", entity_set, to_timestamp(start), to_timestamp(end)
+                )
+                self.io.add_read(table.nbytes)
+                return self._to_pandas([table], dtype_backend="pyarrow")
+
+        return self._read_layer(
+            Path(self.settings.gold_full_path), "date", entity_ids, start, end, version
+        )
+
+    def write_table(
+        self, df: pd.DataFrame, name: str, metadata: BatchMetadata, mode: str = "overwrite"
+    ) -> None:
+        """
+        Write a derived table as one file and commit it to the table's manifest.
+
+        An overwrite commits the file in place of the table's files; older
+        versions stay readable until vacuumed, like compacted layers. An
+        append is named after the batch, so a retried batch replaces its
+        own file instead of adding it twice.
+        """
+        if mode not in ("overwrite", "append"):
+            raise ValueError(f"Unknown table write mode: {mode}")
+        table_path = self._derived_table(name)
+        table_path.mkdir(parents=True, exist_ok=True)
+        options = ParquetWriteOptions.from_settings(self.settings, "gold")
+
+        if mode == "append":
+            output_path = table_path / f"{metadata.batch_id}.parquet"
+        else:
+            output_path = table_path / f"{metadata.batch_id}-{uuid.uuid4().hex[:8]}.parquet"
+        tmp_path = table_path / f".{output_path.name}.tmp"
+        df = options.write(df, tmp_path)
+        os.replace(tmp_path, output_path)
+        self.io.add_written(output_path.stat().st_size)
+
+        log = TableLog(table_path)
+        stats = [collect_file_stats(output_path, df, None)]
+        if mode == "append":
+            self._commit_append(log, stats)
+        else:
+            log.commit(stats, operation="overwrite", replace=True)
+            log.vacuum(self.settings.manifest_retain_versions)
+
+    def read_table(self, name: str, version: int | None = None) -> pd.DataFrame:
+        """Read silver, gold or a derived table."""
+        if name == "silver":
+            return self.read_silver(version=version)
+        if name == "gold":
+            return self.read_gold(version=version)
+        if self.table_version(name) is None:
             return pd.DataFrame()
+        return self._read_layer(self._derived_table(name), None, version=version)
 
-        dfs = [pd.read_parquet(f) for f in parquet_files]
-        return pd.concat(dfs, ignore_index=True) if dfs else pd.DataFrame()
+    def table_version(self, name: str) -> int | None:
+        """Get the latest version of silver, gold or a derived table from its manifest log."""
+        if name in ("silver", "gold"):
+            layer_path, time_column = self._layer(name)
+            return self._snapshot(layer_path, time_column).version or None
+        return TableLog(self._derived_table(name)).latest_version()
+
+    def _checkpoint_file(self, batch_id: str, name: str) -> Path:
+        """Path of a stored intermediate result."""
+        return Path(self.settings.checkpoint_full_path) / batch_id / f"{name}.parquet"
+
+    def write_checkpoint(self, df: pd.DataFrame, batch_id: str, name: str) -> None:
+        """Write an intermediate result to parquet, replacing it atomically."""
+        output_path = self._checkpoint_file(batch_id, name)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = output_path.with_name(f".{output_path.name}.tmp")
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, output_path)
+        self.io.add_written(output_path.stat().st_size)
+
+    def read_checkpoint(self, batch_id: str, name: str) -> pd.DataFrame:
+        """Read an intermediate result from parquet."""
+        path = self._checkpoint_file(batch_id, name)
+        self.io.add_read(path.stat().st_size)
+        return pd.read_parquet(path)
+
+    def delete_checkpoint(self, batch_id: str) -> None:
+        """Delete the intermediate results of a batch."""
+        shutil.rmtree(Path(self.settings.checkpoint_full_path) / batch_id, ignore_errors=True)
 
     def save_metadata(self, metadata: BatchMetadata) -> None:
-        """Save metadata to JSON file."""
-        metadata_path = (
-            Path(self.settings.metadata_full_path) / f"{metadata.batch_id}_metadata.json"
-        )
+        """Save metadata to a JSON file per batch and layer."""
+        name = f"{metadata.batch_id}_{metadata.layer}" if metadata.layer else metadata.batch_id
+        metadata_path = Path(self.settings.metadata_full_path) / f"{name}_metadata.json"
         with open(metadata_path, "w") as f:
             json.dump(metadata.to_dict(), f, indent=2)
+        self.io.add_written(metadata_path.stat().st_size)
+
+        if metadata.layer:
+            # Latest metadata per layer, so lookups need no directory listing
+            latest_path = Path(self.settings.metadata_full_path) / LATEST_METADATA_DIR
+            latest_path.mkdir(exist_ok=True)
+            tmp_path = latest_path / f".{metadata.layer}.json.{os.getpid()}.tmp"
+            shutil.copyfile(metadata_path, tmp_path)
+            os.replace(tmp_path, latest_path / f"{metadata.layer}.json")
+
+    def latest_metadata(self, layer: str) -> BatchMetadata | None:
+        """Get the latest metadata of a layer from the metadata store."""
+        path = Path(self.settings.metadata_full_path) / LATEST_METADATA_DIR / f"{layer}.json"
+        try:
+            with open(path) as f:
+                return BatchMetadata.from_dict(json.load(f))
+        except FileNotFoundError:
+            return None
+
+    def list_metadata(self, layer: str) -> list[BatchMetadata]:
+        """Get all metadata of a layer from the per-batch JSON files."""
+        records = []
+        for path in Path(self.settings.metadata_full_path).glob(f"*_{layer}_metadata.json"):
+            with open(path) as f:
+                metadata = BatchMetadata.from_dict(json.load(f))
+            # Another layer's name may end with this one's
+            if metadata.layer == layer:
+                records.append(metadata)
+        return sorted(records, key=lambda m: m.ingestion_time)
 
     def health_check(self) -> bool:
         """Check if storage is accessible."""
@@ -0,0 +1,107 @@
+"""Parquet write options for the silver and gold layers."""
+
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+from app.infrastructure.settings import Settings
+
+
+@dataclass
+class ParquetWriteOptions:
+    """How a layer's data files are encoded, compressed and laid out."""
+
+    compression: str = "snappy"
+    compression_level: int | None = None
+    row_group_size: int = 128 * 1024
+    sort_keys: list[str] = field(default_factory=list)
+    dictionary_columns: list[str] | None = None
+    write_statistics: bool = True
+
+    @classmethod
+    def from_settings(cls, settings: Settings, layer: str) -> "ParquetWriteOptions":
+        """
+        Build the write options configured for a layer.
+
+        Args:
+            settings: Application settings
+            layer: Layer name (silver or gold)
+
+        Returns:
+            ParquetWriteOptions for the layer
+        """
+        if layer not in ("silver", "gold"):
+            raise ValueError(f"Unknown layer: {layer}")
+        return cls(
+            compression=getattr(settings, f"{layer}_parquet_compression"),
+            compression_level=getattr(settings, f"{layer}_parquet_compression_level"),
+            row_group_size=getattr(settings, f"{layer}_parquet_row_group_size"),
+            sort_keys=list(getattr(settings, f"{layer}_parquet_sort_keys")),
+            dictionary_columns=getattr(settings, f"{layer}_parquet_dictionary_columns"),
+            write_statistics=getattr(settings, f"{layer}_parquet_statistics"),
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to dictionary."""
+        return asdict(self)
+
+    def sort(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Sort a DataFrame by the configured keys that it contains.
+
+        Args:
+            df: Data about to be written
+
+        Returns:
+            Sorted DataFrame (unchanged if no sort key is present)
+        """
+        keys = [k for k in self.sort_keys if k in df.columns]
+        if not keys:
+            return df
+        return df.sort_values(keys, ignore_index=True, kind="stable")
+
+    def write(
+        self, df: pd.DataFrame, path: Path, row_group_size: int | None = None
+    ) -> pd.DataFrame:
+        """
+        Sort and write a DataFrame to a parquet file.
+
+        Args:
+            df: Data to write
+            path: Output file
+            row_group_size: Override for the configured rows per row group
+
+        Returns:
+            The DataFrame as written, in file order
+        """
+        df = self.sort(df)
+        df.to_parquet(
+            path,
+            index=False,
+            compression=None if self.compression == "none" else self.compression,
+            compression_level=self.compression_level,
+            row_group_size=row_group_size or self.row_group_size,
+            use_dictionary=True if self.dictionary_columns is None else self.dictionary_columns,
+            write_statistics=self.write_statistics,
+        )
+        return df
+
+    def spark_options(self) -> dict[str, str]:
+        """
+        Translate the options to Spark parquet writer options.
+
+        Spark sizes row groups in bytes and Delta collects its own file
+        statistics, so row-group size and statistics are not translated.
+
+        Returns:
+            Writer options for DataFrameWriter.option
+        """
+        options = {
+            "compression": "uncompressed" if self.compression == "none" else self.compression,
+            "parquet.enable.dictionary": str(self.dictionary_columns != []).lower(),
+        }
+        if self.compression_level is not None and self.compression == "zstd":
+            options["parquet.compression.codec.zstd.level"] = str(self.compression_level)
+        return options
@@ -1,11 +1,32 @@
 """Spark-based repository for Databricks execution."""
 
+import json
+import re
+from datetime import date, datetime
 from typing import Any
 
 from app.domain.models import BatchMetadata
-from app.infrastructure.repositories.base import BaseRepository
+from app.infrastructure.repositories.base import BaseRepository, CompactionReport, IoCounters
+from app.infrastructure.repositories.parquet_options import ParquetWriteOptions
 from app.infrastructure.settings import Settings
 
+# Metadata fields stored as JSON strings in the Delta metadata table
+METADATA_JSON_FIELDS = (
+    "stages",
+    "input_versions",
+    "partition_counts",
+    "entity_sketches",
+    "transform_cache",
+)
+
+
+def _metadata_from_row(row: Any) -> BatchMetadata:
+    """Create metadata from a row of the Delta metadata table."""
+    record = row.asDict()
+    for key in METADATA_JSON_FIELDS:
+        record[key] = json.loads(record[key]) if record.get(key) else None
+    return BatchMetadata.from_dict(record)
+
 
 class SparkRepository(BaseRepository):
     """Repository implementation using PySpark for Databricks."""
@@ -19,6 +40,8 @@ class SparkRepository(BaseRepository):
         """
         self.settings = settings
         self._spark = None
+        # Reads and writes run on the executors, so the driver sees no bytes
+        self.io = IoCounters()
 
     @property
     def spark(self) -> Any:
@@ -30,8 +53,12 @@ class SparkRepository(BaseRepository):
 
             # Configure for Databricks if credentials provided
             if self.settings.databricks_host and self.settings.databricks_token:
-                builder = builder.config("spark.databricks.service.address", self.settings.databricks_host)
-                builder = builder.config("spark.databricks.service.token", self.settings.databricks_token)
+                builder = builder.config(
+                    "spark.databricks.service.address", self.settings.databricks_host
+                )
+                builder = builder.config(
+                    "spark.databricks.service.token", self.settings.databricks_token
+                )
 
             self._spark = builder.getOrCreate()
 
@@ -44,7 +71,13 @@ class SparkRepository(BaseRepository):
             return self.spark.read.format("delta").load(bronze_path)
         except Exception:
             # Return empty DataFrame with schema if table doesn't exist
-            from pyspark.sql.types import DoubleType, StringType, StructField, StructType, TimestampType
+            from pyspark.sql.types import (
+                DoubleType,
+                StringType,
+                StructField,
+                StructType,
+                TimestampType,
+            )
 
             schema = StructType(
                 [
@@ -55,43 +88,231 @@ class SparkRepository(BaseRepository):
             )
             return self.spark.createDataFrame([], schema)
 
+    def _writer(self, df: Any, layer: str) -> Any:
+        """Create a Delta writer applying the layer's parquet write options.
+
+        Gold appends merge the schema so tables written before the sketch and
+        percentile columns existed accept the new columns.
+        """
+        options = ParquetWriteOptions.from_settings(self.settings, layer)
+        keys = [k for k in options.sort_keys if k in df.columns]
+        if keys:
+            df = df.sortWithinPartitions(*keys)
+        writer = df.write.format("delta").mode("append").options(**options.spark_options())
+        if layer == "gold":
+            writer = writer.option("mergeSchema", "true")
+        return writer
+
     def write_silver(self, df: Any, metadata: BatchMetadata) -> None:
         """Write silver data to Delta Lake."""
         silver_path = f"{self.settings.silver_full_path}"
-        df.write.format("delta").mode("append").save(silver_path)
+        self._writer(df, "silver").save(silver_path)
+
+    def write_quarantine(self, df: Any, metadata: BatchMetadata) -> None:
+        """Write rejected rows to the quarantine Delta table."""
+        quarantine_path = f"{self.settings.quarantine_full_path}"
+        df.write.format("delta").mode("append").save(quarantine_path)
+
+    @staticmethod
+    def _apply_filters(
+        df: Any,
+        time_column: str,
+        entity_ids: list[str] | None,
+        start: date | datetime | None,
+        end: date | datetime | None,
+    ) -> Any:
+        """Push entity and time filters down so Delta can skip files."""
+        from pyspark.sql import functions as F
 
-    def read_silver(self) -> Any:
+        if entity_ids:
+            df = df.filter(F.col("entity_id").isin(list(entity_ids)))
+        if start is not None:
+            df = df.filter(F.col(time_column) >= F.lit(start))
+        if end is not None:
+            df = df.filter(F.col(time_column) <= F.lit(end))
+        return df
+
+    def read_silver(
+        self,
+        entity_ids: list[str] | None = None,
+        start: date | datetime | None = None,
+        end: date | datetime | None = None,
+        version: int | None = None,
+    ) -> Any:
         """Read silver data from Delta Lake."""
         silver_path = f"{self.settings.silver_full_path}"
         try:
-            return self.spark.read.format("delta").load(silver_path)
+            reader = self.spark.read.format("delta")
+            if version is not None:
+                reader = reader.option("versionAsOf", version)
+            df = reader.load(silver_path)
+            return self._apply_filters(df, "timestamp", entity_ids, start, end)
         except Exception:
             # Return empty DataFrame if table doesn't exist
-            return self.spark.createDataFrame([], schema="timestamp timestamp, entity_id string, value double")
+            return self.spark.createDataFrame(
+                [], schema="timestamp timestamp, entity_id string, value double"
+            )
 
     def write_gold(self, df: Any, metadata: BatchMetadata) -> None:
         """Write gold data to Delta Lake."""
         gold_path = f"{self.settings.gold_full_path}"
-        df.write.format("delta").mode("append").save(gold_path)
+        self._writer(df, "gold").save(gold_path)
 
-    def read_gold(self) -> Any:
+    def read_gold(
+        self,
+        entity_ids: list[str] | None = None,
+        start: date | datetime | None = None,
+        end: date | datetime | None = None,
+        version: int | None = None,
+    ) -> Any:
         """Read gold data from Delta Lake."""
         gold_path = f"{self.settings.gold_full_path}"
         try:
-            return self.spark.read.format("delta").load(gold_path)
+            reader = self.spark.read.format("delta")
+            if version is not None:
+                reader = reader.option("versionAsOf", version)
+            df = reader.load(gold_path)
+            return self._apply_filters(df, "date", entity_ids, start, end)
         except Exception:
             # Return empty DataFrame if table doesn't exist
             return self.spark.createDataFrame([], schema="entity_id string, date date")
 
+    def _derived_table_path(self, name: str) -> str:
+        """Resolve a derived table name to its Delta table path."""
+        if name in ("silver", "gold") or not re.fullmatch(r"[A-Za-z0-9_-]+", name):
+            raise ValueError(f"Invalid derived table name: {name}")
+        return f"{self.settings.derived_tables_full_path}/{name}"
+
+    def write_table(
+        self, df: Any, name: str, metadata: BatchMetadata, mode: str = "overwrite"
+    ) -> None:
+        """Overwrite or append to a derived Delta table (older versions stay readable)."""
+        if mode not in ("overwrite", "append"):
+            raise ValueError(f"Unknown table write mode: {mode}")
+        writer = self._writer(df, "gold")
+        if mode == "overwrite":
+            writer = writer.mode("overwrite").option("overwriteSchema", "true")
+        writer.save(self._derived_table_path(name))
+
+    def read_table(self, name: str, version: int | None = None) -> Any:
+        """Read silver, gold or a derived Delta table."""
+        if name == "silver":
+            return self.read_silver(version=version)
+        if name == "gold":
+            return self.read_gold(version=version)
+        try:
+            reader = self.spark.read.format("delta")
+            if version is not None:
+                reader = reader.option("versionAsOf", version)
+            return reader.load(self._derived_table_path(name))
+        except Exception:
+            # Return empty DataFrame if table doesn't exist
+            return self.spark.createDataFrame([], schema="entity_id string")
+
+    def table_version(self, name: str) -> int | None:
+        """Get the latest version of silver, gold or a derived table from its Delta log."""
+        paths = {"silver": self.settings.silver_full_path, "gold": self.settings.gold_full_path}
+        path = paths.get(name) or self._derived_table_path(name)
+        try:
+            return int(
+                self.spark.sql(f"DESCRIBE HISTORY delta.`{path}` LIMIT 1").first()["version"]
+            )
+        except Exception:
+            return None
+
+    def compact(self, layer: str, target_file_bytes: int | None = None) -> CompactionReport:
+        """Compact a Delta table with OPTIMIZE, clustering by entity and time."""
+        if layer == "silver":
+            path, time_column = self.settings.silver_full_path, "timestamp"
+        elif layer == "gold":
+            path, time_column = self.settings.gold_full_path, "date"
+        else:
+            raise ValueError(f"Unknown layer: {layer}")
+
+        target = target_file_bytes or self.settings.compaction_target_file_bytes
+        self.spark.conf.set("spark.databricks.delta.optimize.maxFileSize", str(target))
+
+        before = self.spark.sql(f"DESCRIBE DETAIL delta.`{path}`").first()
+        # OPTIMIZE commits a new table version, so readers see old or new files only
+        self.spark.sql(f"OPTIMIZE delta.`{path}` ZORDER BY (entity_id, {time_column})")
+        after = self.spark.sql(f"DESCRIBE DETAIL delta.`{path}`").first()
+
+        return CompactionReport(
+            layer=layer,
+            files_before=before["numFiles"],
+            bytes_before=before["sizeInBytes"],
+            files_after=after["numFiles"],
+            bytes_after=after["sizeInBytes"],
+        )
+
+    def _checkpoint_path(self, batch_id: str, name: str = "") -> str:
+        """Path of a batch's intermediate results, or of one of them."""
+        path = f"{self.settings.checkpoint_full_path}/{batch_id}"
+        return f"{path}/{name}" if name else path
+
+    def write_checkpoint(self, df: Any, batch_id: str, name: str) -> None:
+        """Write an intermediate result as parquet (plain files, outside the Delta log)."""
+        df.write.mode("overwrite").parquet(self._checkpoint_path(batch_id, name))
+
+    def read_checkpoint(self, batch_id: str, name: str) -> Any:
+        """Read an intermediate result written by write_checkpoint."""
+        return self.spark.read.parquet(self._checkpoint_path(batch_id, name))
+
+    def delete_checkpoint(self, batch_id: str) -> None:
+        """Delete the intermediate results of a batch through the Hadoop file system."""
+        jvm = self.spark._jvm
+        path = jvm.org.apache.hadoop.fs.Path(self._checkpoint_path(batch_id))
+        path.getFileSystem(self.spark._jsc.hadoopConfiguration()).delete(path, True)
+
     def save_metadata(self, metadata: BatchMetadata) -> None:
         """Save metadata to Delta Lake metadata table."""
         metadata_path = f"{self.settings.metadata_full_path}"
-        
+
         # Convert metadata to DataFrame
-        metadata_df = self.spark.createDataFrame([metadata.to_dict()])
-        
-        # Write to Delta Lake
-        metadata_df.write.format("delta").mode("append").save(metadata_path)
+        record = metadata.to_dict()
+        for key in METADATA_JSON_FIELDS:
+            record[key] = json.dumps(record[key])
+        metadata_df = self.spark.createDataFrame([record])
+
+        # Write to Delta Lake (tables created before a newer field gain its column)
+        metadata_df.write.format("delta").mode("append").option("mergeSchema", "true").save(
+            metadata_path
+        )
+
+    def latest_metadata(self, layer: str) -> BatchMetadata | None:
+        """Get the latest metadata of a layer from the Delta metadata table."""
+        from pyspark.sql import functions as F
+
+        try:
+            row = (
+                self.spark.read.format("delta")
+                .load(self.settings.metadata_full_path)
+                .filter(F.col("layer") == layer)
+                .orderBy(F.col("ingestion_time").desc())
+                .first()
+            )
+        except Exception:
+            return None
+        if row is None:
+            return None
+
+        return _metadata_from_row(row)
+
+    def list_metadata(self, layer: str) -> list[BatchMetadata]:
+        """Get all metadata of a layer from the Delta metadata table."""
+        from pyspark.sql import functions as F
+
+        try:
+            rows = (
+                self.spark.read.format("delta")
+                .load(self.settings.metadata_full_path)
+                .filter(F.col("layer") == layer)
+                .orderBy(F.col("ingestion_time"))
+                .collect()
+            )
+        except Exception:
+            return []
+        return [_metadata_from_row(row) for row in rows]
 
     def health_check(self) -> bool:
         """Check if Spark session is accessible."""
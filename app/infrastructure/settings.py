@@ -6,6 +6,9 @@ from typing import Literal
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+ParquetCodec = Literal["none", "snappy", "gzip", "brotli", "lz4", "zstd"]
+ExecutionMode = Literal["local", "databricks"]
+
 
 class Settings(BaseSettings):
     """Application configuration."""
@@ -18,9 +21,7 @@ class Settings(BaseSettings):
     )
 
     # Execution configuration
-    execution_mode: Literal["local", "databricks"] = Field(
-        default="local", description="Execution engine mode"
-    )
+    execution_mode: ExecutionMode = Field(default="local", description="Execution engine mode")
     processing_mode: Literal["batch", "stream"] = Field(
         default="batch", description="Processing mode"
     )
@@ -31,6 +32,9 @@ class Settings(BaseSettings):
     silver_path: str = Field(default="silver", description="Silver layer relative path")
     gold_path: str = Field(default="gold", description="Gold layer relative path")
     metadata_path: str = Field(default="metadata", description="Metadata storage path")
+    quarantine_path: str = Field(
+        default="quarantine", description="Quarantine layer relative path for rejected rows"
+    )
 
     # Database configuration
     database_url: str = Field(
@@ -41,10 +45,25 @@ class Settings(BaseSettings):
     api_host: str = Field(default="0.0.0.0", description="API host")
     api_port: int = Field(default=8000, description="API port")
     api_reload: bool = Field(default=False, description="API auto-reload")
+    api_workers: int = Field(default=1, description="API worker processes")
 
     # Logging configuration
     log_level: str = Field(default="INFO", description="Logging level")
     log_format: Literal["json", "text"] = Field(default="json", description="Log format")
+    log_async: bool = Field(
+        default=False, description="Render and write logs on a background thread"
+    )
+    log_queue_size: int = Field(
+        default=10_000, description="Log events buffered for the writer thread before dropping"
+    )
+    log_batch_size: int = Field(default=512, description="Most log events written per flush")
+    log_flush_interval: float = Field(
+        default=0.1, description="Seconds the log writer waits for more events before flushing"
+    )
+    log_sample_rates: dict[str, float] = Field(
+        default_factory=dict,
+        description='Fraction of events kept per event name, e.g. {"chunk_read": 0.01}',
+    )
 
     # Databricks configuration (optional)
     databricks_host: str = Field(default="", description="Databricks workspace URL")
@@ -53,8 +72,182 @@ class Settings(BaseSettings):
 
     # Processing configuration
     batch_size: int = Field(default=1000, description="Batch processing size")
-    max_retries: int = Field(default=3, description="Maximum retry attempts")
-    retry_delay: int = Field(default=5, description="Retry delay in seconds")
+    max_retries: int = Field(default=3, description="Retries of a failed batch stage")
+    retry_delay: float = Field(
+        default=5, description="Seconds before the first retry of a stage (doubles per retry)"
+    )
+    retry_max_delay: float = Field(default=60, description="Longest wait between stage retries")
+
+    # Pipelined execution configuration
+    pipeline_overlap_io: bool = Field(
+        default=True, description="Write silver on a background thread while gold is computed"
+    )
+    pipeline_prefetch_files: int = Field(
+        default=1, description="Bronze files read ahead of the one being transformed (0 disables)"
+    )
+
+    # Batch checkpoint configuration
+    checkpoint_enabled: bool = Field(
+        default=False,
+        description="Checkpoint completed batch stages so failed batches can resume",
+    )
+    checkpoint_path: str = Field(
+        default="checkpoints", description="Batch checkpoint relative path"
+    )
+
+    # Multi-source scheduler configuration
+    scheduler_sources: dict[str, str] = Field(
+        default_factory=dict,
+        description="Bronze path (relative to the storage path) of every scheduled source",
+    )
+    scheduler_max_workers: int = Field(
+        default=0, description="Batches the scheduler runs at once (0 uses one per CPU)"
+    )
+    scheduler_memory_budget_mb: int = Field(
+        default=0,
+        description="Estimated memory all running batches may use (0 uses half of the RAM)",
+    )
+    scheduler_memory_per_row: int = Field(
+        default=256, description="Estimated peak memory per bronze row of a batch, in bytes"
+    )
+    scheduler_path: str = Field(default="scheduler", description="Scheduler state relative path")
+
+    # Cross-batch deduplication configuration
+    dedup_enabled: bool = Field(
+        default=False, description="Drop records already committed to silver by earlier batches"
+    )
+    dedup_path: str = Field(default="dedup", description="Dedup key index relative path")
+    dedup_retention_days: int = Field(
+        default=90,
+        description="Days of event time to keep keys for, from the newest key (at most today)",
+    )
+    dedup_bloom_fpr: float = Field(
+        default=0.01, description="False positive rate of the dedup bloom filters"
+    )
+
+    # Transform cache configuration
+    transform_cache_enabled: bool = Field(
+        default=False, description="Reuse silver fragments for unchanged bronze files"
+    )
+    transform_cache_path: str = Field(default="cache", description="Transform cache relative path")
+    transform_cache_max_bytes: int = Field(
+        default=1024**3, description="Transform cache size budget before LRU eviction"
+    )
+
+    # Parquet write configuration
+    silver_parquet_compression: ParquetCodec = Field(
+        default="snappy", description="Compression codec of silver files"
+    )
+    silver_parquet_compression_level: int | None = Field(
+        default=None, description="Compression level of silver files (codec default if unset)"
+    )
+    silver_parquet_row_group_size: int = Field(
+        default=128 * 1024, description="Rows per row group in silver files"
+    )
+    silver_parquet_sort_keys: list[str] = Field(
+        default=["entity_id", "timestamp"], description="Columns silver files are sorted by"
+    )
+    silver_parquet_dictionary_columns: list[str] | None = Field(
+        default=None, description="Dictionary-encoded silver columns (all if unset)"
+    )
+    silver_parquet_statistics: bool = Field(
+        default=True, description="Write column statistics to silver files"
+    )
+    gold_parquet_compression: ParquetCodec = Field(
+        default="snappy", description="Compression codec of gold files"
+    )
+    gold_parquet_compression_level: int | None = Field(
+        default=None, description="Compression level of gold files (codec default if unset)"
+    )
+    gold_parquet_row_group_size: int = Field(
+        default=128 * 1024, description="Rows per row group in gold files"
+    )
+    gold_parquet_sort_keys: list[str] = Field(
+        default=["entity_id", "date"], description="Columns gold files are sorted by"
+    )
+    gold_parquet_dictionary_columns: list[str] | None = Field(
+        default=None, description="Dictionary-encoded gold columns (all if unset)"
+    )
+    gold_parquet_statistics: bool = Field(
+        default=True, description="Write column statistics to gold files"
+    )
+
+    # Layer read configuration
+    read_dtype_backend: Literal["numpy", "pyarrow"] = Field(
+        default="numpy",
+        description="Column types of silver and gold reads (pyarrow keeps Arrow buffers)",
+    )
+    read_memory_map: bool = Field(
+        default=True, description="Memory-map local layer files when reading"
+    )
+
+    # Gold serving snapshot configuration
+    gold_snapshot_enabled: bool = Field(
+        default=False,
+        description="Publish a memory-mapped Arrow snapshot of gold after each gold write",
+    )
+    gold_snapshot_path: str = Field(
+        default="gold_snapshot", description="Gold serving snapshot relative path"
+    )
+
+    # Distinct-entity sketch configuration
+    entity_sketch_precision: int = Field(
+        default=12,
+        ge=4,
+        le=18,
+        description="HyperLogLog precision of the per-date entity sketches of gold batches",
+    )
+
+    # Multi-grain gold configuration
+    gold_grains: list[Literal["hour", "day", "month"]] = Field(
+        default=[],
+        description="Time grains aggregated in one pass over silver, each a gold table",
+    )
+
+    # Derived table configuration
+    derived_tables_enabled: bool = Field(
+        default=False, description="Build the derived tables after every batch"
+    )
+    derived_tables_path: str = Field(
+        default="tables", description="Derived gold tables relative path"
+    )
+    derived_tables_max_workers: int = Field(default=4, description="Derived tables built at once")
+
+    # Compaction configuration
+    compaction_target_file_bytes: int = Field(
+        default=128 * 1024**2, description="Target size of compacted layer files"
+    )
+    compaction_row_group_size: int = Field(
+        default=128 * 1024, description="Rows per row group in compacted layer files"
+    )
+
+    # Table format configuration
+    manifest_retain_versions: int = Field(
+        default=20, description="Manifest versions kept readable when vacuuming a layer"
+    )
+
+    # Profiling configuration
+    profile_path: str = Field(default="profiles", description="Profile output relative path")
+    profile_top_functions: int = Field(
+        default=10, description="Hottest functions per stage reported in profile summaries"
+    )
+    api_profiling_enabled: bool = Field(
+        default=False, description="Profile API requests sent with the X-Profile header"
+    )
+
+    # Validation configuration
+    validation_mode: Literal["full", "sample"] = Field(
+        default="full", description="Silver validation mode (full scan or stratified sample)"
+    )
+    validation_confidence: float = Field(
+        default=0.95, description="Confidence level for sampled validation"
+    )
+    validation_margin: float = Field(
+        default=0.01, description="Margin of error for sampled validation"
+    )
+    validation_failure_threshold: float = Field(
+        default=0.01, description="Estimated failure rate of a sample that triggers full validation"
+    )
 
     @property
     def bronze_full_path(self) -> str:
@@ -71,6 +264,46 @@ class Settings(BaseSettings):
         """Get full gold layer path."""
         return f"{self.storage_path}/{self.gold_path}"
 
+    @property
+    def quarantine_full_path(self) -> str:
+        """Get full quarantine layer path."""
+        return f"{self.storage_path}/{self.quarantine_path}"
+
+    @property
+    def dedup_full_path(self) -> str:
+        """Get full dedup index path."""
+        return f"{self.storage_path}/{self.dedup_path}"
+
+    @property
+    def checkpoint_full_path(self) -> str:
+        """Get full batch checkpoint path."""
+        return f"{self.storage_path}/{self.checkpoint_path}"
+
+    @property
+    def scheduler_full_path(self) -> str:
+        """Get full scheduler state path."""
+        return f"{self.storage_path}/{self.scheduler_path}"
+
+    @property
+    def transform_cache_full_path(self) -> str:
+        """Get full transform cache path."""
+        return f"{self.storage_path}/{self.transform_cache_path}"
+
+    @property
+    def gold_snapshot_full_path(self) -> str:
+        """Get full gold serving snapshot path."""
+        return f"{self.storage_path}/{self.gold_snapshot_path}"
+
+    @property
+    def derived_tables_full_path(self) -> str:
+        """Get full derived tables path."""
+        return f"{self.storage_path}/{self.derived_tables_path}"
+
+    @property
+    def profile_full_path(self) -> str:
+        """Get full profile output path."""
+        return f"{self.storage_path}/{self.profile_path}"
+
     @property
     def metadata_full_path(self) -> str:
         """Get full metadata path."""
@@ -0,0 +1,156 @@
+"""Content-addressed cache of silver fragments produced from bronze files."""
+
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from app.infrastructure.settings import Settings
+
+# Bytes read per chunk when checksumming input files
+CHECKSUM_CHUNK_SIZE = 1024 * 1024
+
+
+def file_checksum(path: Path) -> str:
+    """
+    Compute a streaming SHA-256 checksum of a file.
+
+    Args:
+        path: File to checksum
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHECKSUM_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def content_key(*parts: str) -> str:
+    """
+    Combine checksums and version strings into a single content hash.
+
+    Args:
+        *parts: Checksums and fingerprints identifying the content
+
+    Returns:
+        Hex digest
+    """
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+
+class TransformCache:
+    """
+    Local cache of transformed fragments keyed by content hash.
+
+    Each entry is a directory holding the silver and quarantine fragments
+    and a small JSON descriptor. Entries are evicted least-recently-used
+    first once the cache exceeds its size budget.
+    """
+
+    def __init__(self, settings: Settings):
+        """
+        Initialize transform cache.
+
+        Args:
+            settings: Application settings
+        """
+        self.path = Path(settings.transform_cache_full_path)
+        self.max_bytes = settings.transform_cache_max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def get(self, key: str) -> tuple[pd.DataFrame, pd.DataFrame, int] | None:
+        """
+        Look up a cached fragment.
+
+        Args:
+            key: Content hash
+
+        Returns:
+            Tuple of (silver_df, quarantine_df, records_in), or None on a miss
+        """
+        entry = self.path / key
+        descriptor = entry / "entry.json"
+        if not descriptor.exists():
+            self.misses += 1
+            return None
+
+        try:
+            records_in = json.loads(descriptor.read_text())["records_in"]
+            silver = pd.read_parquet(entry / "silver.parquet")
+            quarantine = pd.read_parquet(entry / "quarantine.parquet")
+        except (OSError, ValueError, KeyError):
+            # Evicted concurrently or corrupt - treat as a miss
+            self.misses += 1
+            return None
+
+        # Mark as recently used for LRU eviction
+        os.utime(descriptor)
+        self.hits += 1
+        return silver, quarantine, records_in
+
+    def put(
+        self, key: str, silver: pd.DataFrame, quarantine: pd.DataFrame, records_in: int
+    ) -> None:
+        """
+        Store a fragment and evict old entries if over budget.
+
+        Args:
+            key: Content hash
+            silver: Silver fragment
+            quarantine: Quarantine fragment
+            records_in: Number of bronze rows the fragment was built from
+        """
+        entry = self.path / key
+        if entry.exists():
+            return
+
+        # Build the entry in a private directory and rename it into place
+        staging = self.path / f".staging-{uuid.uuid4().hex}"
+        staging.mkdir()
+        silver.to_parquet(staging / "silver.parquet", index=False)
+        quarantine.to_parquet(staging / "quarantine.parquet", index=False)
+        (staging / "entry.json").write_text(
+            json.dumps({"records_in": records_in, "created_at": datetime.now().isoformat()})
+        )
+
+        try:
+            os.rename(staging, entry)
+        except OSError:
+            # Another writer stored the same content first
+            shutil.rmtree(staging, ignore_errors=True)
+
+        self._evict()
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until the cache fits its budget."""
+        entries = []
+        total = 0
+        for entry in self.path.iterdir():
+            descriptor = entry / "entry.json"
+            if entry.name.startswith(".") or not descriptor.exists():
+                continue
+            size = sum(f.stat().st_size for f in entry.iterdir())
+            entries.append((descriptor.stat().st_mtime, size, entry))
+            total += size
+
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            self.evictions += 1
+
+    def stats(self) -> dict[str, int]:
+        """Get hit, miss and eviction counters."""
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
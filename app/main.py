@@ -5,6 +5,7 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api.middleware import ProfilingMiddleware, RequestMetricsMiddleware
 from app.api.routes import router
 from app.infrastructure.logging import setup_logging
 from app.infrastructure.settings import get_settings
@@ -17,7 +18,6 @@ async def lifespan(app: FastAPI):
     setup_logging()
     yield
     # Shutdown
-    pass
 
 
 # Create FastAPI app
@@ -38,6 +38,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Record latency, response size and status per route
+app.add_middleware(RequestMetricsMiddleware)
+
+# Profile requests that ask for it (opt-in; not installed otherwise)
+if settings.api_profiling_enabled:
+    app.add_middleware(ProfilingMiddleware, settings=settings)
+
 # Include routers
 app.include_router(router, tags=["platform"])
 
@@ -50,4 +57,5 @@ if __name__ == "__main__":
         host=settings.api_host,
         port=settings.api_port,
         reload=settings.api_reload,
+        workers=settings.api_workers,
     )
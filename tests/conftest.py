@@ -0,0 +1,14 @@
+"""Shared test fixtures."""
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def spark():
+    """Local Spark session, skipping the test when pyspark is not installed."""
+    pytest.importorskip("pyspark")
+    from pyspark.sql import SparkSession
+
+    session = SparkSession.builder.master("local[1]").appName("tests").getOrCreate()
+    yield session
+    session.stop()
@@ -1,12 +1,25 @@
 """Test API - API layer tests."""
 
+import json
+from datetime import datetime
+from pathlib import Path
 from unittest.mock import MagicMock
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
 import pytest
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
 from app.api.dependencies import get_repository
+from app.api.middleware import ProfilingMiddleware
+from app.api.routes import router
+from app.domain.models import BatchMetadata
+from app.domain.sketches import partition_sketches
+from app.domain.transformers import PandasSilverToGoldTransformer
+from app.infrastructure.monitoring import get_metrics_collector
+from app.infrastructure.settings import Settings
 from app.main import app
 
 
@@ -31,9 +44,9 @@ class TestHealthEndpoint:
         """Test that health endpoint returns healthy status when system is OK."""
         # Setup mock repository
         mock_repository.health_check.return_value = True
-        
+
         response = client.get("/health")
-        
+
         assert response.status_code == 200
         data = response.json()
         assert data["status"] == "healthy"
@@ -43,9 +56,9 @@ class TestHealthEndpoint:
     def test_health_returns_unhealthy_when_storage_fails(self, client, mock_repository):
         """Test that health endpoint returns unhealthy when storage check fails."""
         mock_repository.health_check.return_value = False
-        
+
         response = client.get("/health")
-        
+
         assert response.status_code == 200
         data = response.json()
         assert data["status"] == "unhealthy"
@@ -58,15 +71,17 @@ class TestMetricsEndpoint:
     def test_metrics_returns_aggregated_data(self, client, mock_repository):
         """Test that metrics endpoint returns aggregated metrics."""
         # Setup mock repository with gold data
-        gold_df = pd.DataFrame({
-            "entity_id": ["entity_1", "entity_2", "entity_3"],
-            "date": pd.to_datetime(["2026-02-20", "2026-02-20", "2026-02-21"]),
-            "total_value": [100.0, 200.0, 300.0],
-        })
+        gold_df = pd.DataFrame(
+            {
+                "entity_id": ["entity_1", "entity_2", "entity_3"],
+                "date": pd.to_datetime(["2026-02-20", "2026-02-20", "2026-02-21"]),
+                "total_value": [100.0, 200.0, 300.0],
+            }
+        )
         mock_repository.read_gold.return_value = gold_df
-        
+
         response = client.get("/metrics")
-        
+
         assert response.status_code == 200
         data = response.json()
         assert data["total_records"] == 3
@@ -76,28 +91,178 @@ class TestMetricsEndpoint:
         """Test that metrics endpoint handles empty gold layer."""
         gold_df = pd.DataFrame()
         mock_repository.read_gold.return_value = gold_df
-        
+
         response = client.get("/metrics")
-        
+
         assert response.status_code == 200
         data = response.json()
         assert data["total_records"] == 0
         assert data["entity_count"] == 0
 
 
+class TestSketchMetrics:
+    """Test metrics merged from the entity sketches of gold batches."""
+
+    @pytest.fixture
+    def sketched_repository(self, mock_repository):
+        """Mock repository with two gold batches that recorded entity sketches."""
+        batches = []
+        for batch_id, entities, day in [
+            ("b1", range(600), "2026-02-20"),
+            ("b2", range(400, 1_000), "2026-02-21"),
+        ]:
+            gold_df = pd.DataFrame(
+                {
+                    "entity_id": [f"entity_{i}" for i in entities],
+                    "date": pd.Timestamp(day).date(),
+                }
+            )
+            counts, sketches = partition_sketches(gold_df, "entity_id", "date")
+            batches.append(
+                BatchMetadata(
+                    batch_id=batch_id,
+                    source="test",
+                    ingestion_time=datetime(2026, 2, 22),
+                    record_count=len(gold_df),
+                    layer="gold",
+                    partition_counts=counts,
+                    entity_sketches={day: sketch.to_string() for day, sketch in sketches.items()},
+                )
+            )
+        mock_repository.list_metadata.return_value = batches
+        return mock_repository
+
+    def test_merges_sketches_without_reading_gold(self, client, sketched_repository):
+        """Test that counts come from merged sketches, with an error bound."""
+        data = client.get("/metrics").json()
+
+        assert data["exact"] is False
+        assert data["total_records"] == 1_200
+        assert abs(data["entity_count"] - 1_000) <= 3 * data["entity_count_error"] * 1_000
+        assert data["date_range"] == {"start": "2026-02-20", "end": "2026-02-21"}
+        sketched_repository.read_gold.assert_not_called()
+
+    def test_date_range_merges_only_its_partitions(self, client, sketched_repository):
+        """Test that a date range selects the sketches of its dates."""
+        data = client.get("/metrics", params={"start_date": "2026-02-21"}).json()
+
+        assert data["total_records"] == 600
+        assert abs(data["entity_count"] - 600) <= 3 * data["entity_count_error"] * 600
+        assert data["date_range"] == {"start": "2026-02-21", "end": "2026-02-21"}
+
+    def test_exact_scans_gold(self, client, sketched_repository):
+        """Test that exact=true counts distinct entities in gold."""
+        sketched_repository.read_gold.return_value = pd.DataFrame(
+            {
+                "entity_id": ["entity_1", "entity_2", "entity_1"],
+                "date": pd.to_datetime(["2026-02-20", "2026-02-20", "2026-02-21"]),
+            }
+        )
+
+        data = client.get("/metrics", params={"exact": "true"}).json()
+
+        assert data["exact"] is True
+        assert data["entity_count"] == 2
+        assert data["entity_count_error"] is None
+
+    def test_scans_gold_when_a_batch_lacks_sketches(self, client, sketched_repository):
+        """Test that a gold batch written without sketches makes metrics scan gold."""
+        sketched_repository.list_metadata.return_value.insert(
+            0,
+            BatchMetadata(
+                batch_id="b0",
+                source="test",
+                ingestion_time=datetime(2026, 2, 19),
+                record_count=10,
+                layer="gold",
+            ),
+        )
+        sketched_repository.read_gold.return_value = pd.DataFrame(
+            {
+                "entity_id": ["entity_1", "entity_2"],
+                "date": pd.to_datetime(["2026-02-19", "2026-02-20"]),
+            }
+        )
+
+        data = client.get("/metrics").json()
+
+        assert data["exact"] is True
+        assert data["entity_count"] == 2
+        sketched_repository.read_gold.assert_called_once()
+
+
+class TestGoldPercentilesEndpoint:
+    """Test percentiles merged from gold value sketches."""
+
+    @pytest.fixture
+    def gold_df(self):
+        """Gold of two entities over two days of readings every 10 minutes."""
+        values = np.random.default_rng(0).exponential(size=576)
+        silver = pd.DataFrame(
+            {
+                "timestamp": pd.date_range("2026-02-20", periods=288, freq="10min").repeat(2),
+                "entity_id": ["entity_1", "entity_2"] * 288,
+                "value": values,
+            }
+        )
+        return silver, PandasSilverToGoldTransformer().transform(silver.copy())
+
+    def test_merges_sketches_over_the_range(self, client, mock_repository, gold_df):
+        """Test that merged sketches answer the percentiles of all values in range."""
+        silver, gold = gold_df
+        mock_repository.read_gold.return_value = gold
+
+        response = client.get("/gold/percentiles", params={"q": [0.5, 0.99], "per_entity": True})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["record_count"] == 576
+        assert data["exact"] is False
+        for fraction, estimate in data["percentiles"].items():
+            rank = (silver["value"] <= estimate).mean()
+            assert abs(rank - float(fraction)) < 0.02
+        assert set(data["entities"]) == {"entity_1", "entity_2"}
+
+    def test_small_ranges_are_exact(self, client, mock_repository, gold_df):
+        """Test that a range with fewer values than the sketch capacity is exact."""
+        silver, gold = gold_df
+        mock_repository.read_gold.return_value = gold[gold["entity_id"] == "entity_1"].head(1)
+        day = silver[(silver["entity_id"] == "entity_1") & (silver["timestamp"].dt.day == 20)]
+
+        data = client.get("/gold/percentiles", params={"q": 0.5}).json()
+
+        assert data["exact"] is True
+        assert data["percentiles"]["0.5"] == pytest.approx(sorted(day["value"])[71], rel=1e-6)
+
+    def test_rejects_invalid_quantiles(self, client, mock_repository):
+        """Test that quantiles outside 0 to 1 are rejected."""
+        assert client.get("/gold/percentiles", params={"q": 1.5}).status_code == 422
+
+    def test_gold_endpoint_omits_sketches(self, client, mock_repository, gold_df):
+        """Test that /gold returns percentile columns but not the binary sketches."""
+        mock_repository.read_gold.return_value = gold_df[1]
+
+        record = client.get("/gold").json()["data"][0]
+
+        assert "p95_value" in record
+        assert "value_sketch" not in record
+
+
 class TestGoldDataEndpoint:
     """Test gold data query endpoint."""
 
     def test_gold_endpoint_returns_data(self, client, mock_repository):
         """Test that gold endpoint returns data."""
-        gold_df = pd.DataFrame({
-            "entity_id": ["entity_1", "entity_2"],
-            "total_value": [100.0, 200.0],
-        })
+        gold_df = pd.DataFrame(
+            {
+                "entity_id": ["entity_1", "entity_2"],
+                "total_value": [100.0, 200.0],
+            }
+        )
         mock_repository.read_gold.return_value = gold_df
-        
+
         response = client.get("/gold?limit=10")
-        
+
         assert response.status_code == 200
         data = response.json()
         assert data["count"] == 2
@@ -106,19 +271,62 @@ class TestGoldDataEndpoint:
 
     def test_gold_endpoint_respects_limit(self, client, mock_repository):
         """Test that gold endpoint respects limit parameter."""
-        gold_df = pd.DataFrame({
-            "entity_id": [f"entity_{i}" for i in range(100)],
-            "total_value": [float(i) for i in range(100)],
-        })
+        gold_df = pd.DataFrame(
+            {
+                "entity_id": [f"entity_{i}" for i in range(100)],
+                "total_value": [float(i) for i in range(100)],
+            }
+        )
         mock_repository.read_gold.return_value = gold_df
-        
+
         response = client.get("/gold?limit=10")
-        
+
         assert response.status_code == 200
         data = response.json()
         assert data["count"] == 10
         assert data["total_available"] == 100
 
+    def test_gold_endpoint_serializes_arrow_dtypes(self, client, mock_repository):
+        """Test that Arrow-backed gold columns, including nulls, serialize to JSON."""
+        gold_df = pd.DataFrame(
+            {
+                "entity_id": ["entity_1", "entity_2"],
+                "date": pd.to_datetime(["2026-02-20", "2026-02-21"]).date,
+                "avg_value": [100.0, None],
+                "aggregated_at": pd.to_datetime(["2026-02-22 10:00:00"] * 2),
+            }
+        )
+        table = pa.Table.from_pandas(gold_df, preserve_index=False)
+        mock_repository.read_gold.return_value = table.to_pandas(types_mapper=pd.ArrowDtype)
+
+        response = client.get("/gold?limit=10")
+
+        assert response.status_code == 200
+        rows = response.json()["data"]
+        assert rows[0]["date"] == "2026-02-20"
+        assert rows[0]["aggregated_at"].startswith("2026-02-22T10:00:00")
+        assert rows[1]["avg_value"] is None
+
+    def test_gold_endpoint_serializes_numpy_nulls(self, client, mock_repository):
+        """Test that NaN and NaT in NumPy-backed gold serialize as null."""
+        mock_repository.read_gold.return_value = pd.DataFrame(
+            {
+                "entity_id": ["entity_1", "entity_2"],
+                "date": pd.to_datetime(["2026-02-20", "2026-02-21"]).date,
+                "std_value": [1.5, float("nan")],
+                "aggregated_at": pd.to_datetime(["2026-02-22 10:00:00", None]),
+            }
+        )
+
+        response = client.get("/gold?limit=10")
+
+        assert response.status_code == 200
+        rows = response.json()["data"]
+        assert rows[0]["date"] == "2026-02-20"
+        assert rows[0]["aggregated_at"].startswith("2026-02-22T10:00:00")
+        assert rows[1]["std_value"] is None
+        assert rows[1]["aggregated_at"] is None
+
 
 class TestRootEndpoint:
     """Test root endpoint."""
@@ -126,9 +334,110 @@ class TestRootEndpoint:
     def test_root_returns_service_info(self, client):
         """Test that root endpoint returns service information."""
         response = client.get("/")
-        
+
         assert response.status_code == 200
         data = response.json()
         assert data["service"] == "Energy Data Platform"
         assert "version" in data
         assert data["status"] == "running"
+
+
+class TestRuntimeMetricsEndpoint:
+    """Test request instrumentation and the Prometheus runtime metrics endpoint."""
+
+    def test_records_requests_per_route(self, client, mock_repository):
+        """Test that requests are exported with route, status and latency quantiles."""
+        mock_repository.health_check.return_value = True
+        mock_repository.latest_metadata.return_value = None
+        get_metrics_collector().reset()
+        for _ in range(3):
+            client.get("/health")
+        client.get("/does-not-exist")
+
+        response = client.get("/metrics/runtime")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        text = response.text
+        labels = 'method="GET",route="/health",status="200"'
+        assert f"energy_platform_http_request_seconds_count{{{labels}}} 3" in text
+        assert f'energy_platform_http_request_seconds_quantile{{{labels},quantile="0.99"}}' in text
+        assert f"energy_platform_http_response_bytes_count{{{labels}}} 3" in text
+        assert 'route="unmatched",status="404"' in text
+        assert "energy_platform_manifest_cache_hits " in text
+
+    def test_exports_persisted_batch_and_scheduler_metrics(
+        self, client, mock_repository, tmp_path, monkeypatch
+    ):
+        """Test that stage timings and source reports saved by other processes are exported."""
+        from app.application.scheduler import SourceReport, SourceWatermarks
+
+        settings = Settings(storage_path=str(tmp_path))
+        monkeypatch.setattr("app.api.routes.get_settings", lambda: settings)
+        watermarks = SourceWatermarks(settings)
+        watermarks.set("meters", started_at=1_700_000_000.0, batch_id="b1")
+        watermarks.save_report(
+            SourceReport(
+                source="meters",
+                status="succeeded",
+                lag_seconds=42.0,
+                duration_seconds=2.0,
+                records_in=100,
+            )
+        )
+        mock_repository.latest_metadata.side_effect = lambda layer: BatchMetadata(
+            batch_id="b1",
+            source="meters",
+            ingestion_time=datetime(2026, 2, 20, 10, 0, 0 if layer == "silver" else 5),
+            record_count=48 if layer == "silver" else 4,
+            layer=layer,
+            stages=(
+                [
+                    {"name": "write_gold", "wall_seconds": 0.25},
+                    {"name": "write_gold", "wall_seconds": 0.5},
+                ]
+                if layer == "gold"
+                else []
+            ),
+            transform_cache={"hits": 3, "misses": 1} if layer == "gold" else {},
+        )
+        get_metrics_collector().reset()
+
+        text = client.get("/metrics/runtime").text
+
+        assert 'energy_platform_pipeline_last_batch_stage_seconds{stage="write_gold"} 0.75' in text
+        assert 'energy_platform_pipeline_last_batch_records{layer="silver"} 48' in text
+        assert "energy_platform_transform_cache_last_batch_hits 3" in text
+        assert 'energy_platform_scheduler_source_lag_seconds{source="meters"} 42' in text
+        assert 'energy_platform_scheduler_source_throughput{source="meters"} 50' in text
+        assert "energy_platform_scheduler_source_watermark_timestamp_seconds" in text
+
+    def test_response_size_is_counted(self, client):
+        """Test that the recorded response size matches the body sent."""
+        get_metrics_collector().reset()
+
+        body = client.get("/").content
+
+        size = get_metrics_collector().get_total("http_response_bytes", {"route": "/"})
+        assert size == len(body)
+
+
+class TestRequestProfiling:
+    """Test opt-in API request profiling."""
+
+    def test_profiles_requests_with_header(self, tmp_path):
+        """Test that only requests with the profile header are profiled."""
+        settings = Settings(storage_path=str(tmp_path), api_profiling_enabled=True)
+        profiled_app = FastAPI()
+        profiled_app.include_router(router)
+        profiled_app.add_middleware(ProfilingMiddleware, settings=settings)
+        profiled_client = TestClient(profiled_app)
+
+        plain = profiled_client.get("/")
+        profiled = profiled_client.get("/", headers={"X-Profile": "1"})
+
+        assert "x-profile-path" not in plain.headers
+        profile_dir = Path(profiled.headers["x-profile-path"])
+        assert profile_dir.parent == tmp_path / "profiles" / "api"
+        assert (profile_dir / "request.prof").exists()
+        assert "request" in json.loads((profile_dir / "summary.json").read_text())
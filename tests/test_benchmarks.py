@@ -0,0 +1,117 @@
+"""Test benchmarks - run on small inputs to check the measurements are sane."""
+
+from app.benchmarks.parquet import configurations, run_parquet_benchmark, sample_silver
+from app.benchmarks.pipeline import (
+    STAGES,
+    StageResult,
+    compare_results,
+    load_results,
+    run_pipeline_benchmark,
+    save_results,
+)
+from app.benchmarks.reads import DEFAULT_READ_MODES, run_read_benchmark
+from app.benchmarks.startup import cli_commands, run_startup_benchmark
+from app.infrastructure.repositories.parquet_options import ParquetWriteOptions
+
+
+class TestParquetBenchmark:
+    """Test the parquet write configuration benchmark."""
+
+    def test_configuration_grid(self):
+        """Test that the grid covers every codec, row-group size and sort choice."""
+        base = ParquetWriteOptions(sort_keys=["entity_id", "timestamp"])
+
+        grid = configurations(base, codecs=("snappy", "zstd"), row_group_sizes=(100, 1000))
+
+        assert len(grid) == 8
+        assert {options.compression for _, options in grid} == {"snappy", "zstd"}
+        assert sum(1 for _, options in grid if not options.sort_keys) == 4
+
+    def test_results_measure_each_configuration(self, tmp_path):
+        """Test that every configuration reports size and a correct filtered row count."""
+        df = sample_silver(num_entities=10, periods=100)
+        grid = configurations(
+            ParquetWriteOptions(sort_keys=["entity_id", "timestamp"]),
+            codecs=("none", "zstd"),
+            row_group_sizes=(100,),
+        )
+
+        results = run_parquet_benchmark(df, grid, "timestamp", repeats=1, directory=tmp_path)
+
+        assert [r.label for r in results] == [label for label, _ in grid]
+        assert all(r.file_bytes > 0 and r.write_seconds > 0 for r in results)
+        # One entity over the first tenth of a 99-hour span (hours 0-9)
+        assert {r.filter_rows for r in results} == {10}
+
+
+class TestReadBenchmark:
+    """Test the layer read mode benchmark."""
+
+    def test_every_mode_reads_all_rows(self, tmp_path):
+        """Test that each read mode loads every silver row."""
+        results = run_read_benchmark(num_entities=3, periods=24, batches=2, directory=tmp_path)
+
+        assert [(r.dtype_backend, r.memory_map) for r in results] == list(DEFAULT_READ_MODES)
+        assert {r.silver_rows for r in results} == {3 * 24 * 2}
+        assert all(r.frame_bytes > 0 for r in results)
+
+
+class TestPipelineBenchmark:
+    """Test the per-stage pipeline benchmark."""
+
+    def test_runs_every_stage(self, tmp_path):
+        """Test that each stage is measured with its row count and memory."""
+        results = run_pipeline_benchmark([2000], modes=["local"], directory=tmp_path)
+
+        assert [r.stage for r in results] == list(STAGES)
+        by_stage = {r.stage: r for r in results}
+        assert by_stage["read_bronze"].rows == 2020
+        assert by_stage["bronze_to_silver"].rows == 2020
+        assert by_stage["write_silver"].rows == 2000
+        assert all(r.wall_seconds > 0 and r.peak_rss_bytes > 0 for r in results)
+
+    def test_results_round_trip(self, tmp_path):
+        """Test that saved results load back unchanged."""
+        results = [StageResult("local", 100, "read_bronze", 100, 0.5, 1024)]
+
+        save_results(results, tmp_path / "results.json")
+
+        assert load_results(tmp_path / "results.json") == results
+
+    def test_compare_flags_slower_and_larger_stages(self):
+        """Test that throughput drops and memory growth beyond the threshold are flagged."""
+        baseline = [
+            StageResult("local", 100, "read_bronze", 100, 1.0, 1000),
+            StageResult("local", 100, "write_gold", 100, 1.0, 1000),
+        ]
+        current = [
+            StageResult("local", 100, "read_bronze", 100, 1.05, 1050),
+            StageResult("local", 100, "write_gold", 100, 2.0, 2000),
+        ]
+
+        regressions = compare_results(baseline, current, threshold=0.1)
+
+        assert [(r.stage, r.metric) for r in regressions] == [
+            ("write_gold", "rows_per_second"),
+            ("write_gold", "peak_rss_bytes"),
+        ]
+        assert regressions[0].change == -0.5
+
+
+class TestStartupBenchmark:
+    """Test the CLI and API start-up benchmark."""
+
+    def test_lists_cli_commands(self):
+        """Test that commands are listed as typed on the command line."""
+        commands = cli_commands()
+
+        assert "run-batch" in commands
+        assert "bench-startup" in commands
+
+    def test_cli_starts_without_engine_libraries(self):
+        """Test that starting a pipeline command imports no engine library."""
+        results = run_startup_benchmark(["run-batch"], repeats=1, include_api=False)
+
+        assert [r.target for r in results] == ["cli run-batch"]
+        assert results[0].seconds > 0
+        assert results[0].heavy_modules == []
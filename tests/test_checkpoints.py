@@ -0,0 +1,36 @@
+"""Test batch checkpoints."""
+
+from app.infrastructure.checkpoints import BatchCheckpoint, CheckpointStore
+from app.infrastructure.settings import Settings
+
+
+class TestCheckpointStore:
+    """Test saving and loading batch checkpoints."""
+
+    def test_round_trip(self, tmp_path):
+        """Test that a saved checkpoint loads with its stages and values."""
+        store = CheckpointStore(Settings(storage_path=str(tmp_path)))
+        checkpoint = BatchCheckpoint(batch_id="b1", source="test", runs=1)
+        checkpoint.completed.append("silver")
+        checkpoint.values.update(records_in=10, checksum=None)
+
+        store.save(checkpoint)
+        loaded = store.load("b1")
+
+        assert loaded.completed == ["silver"]
+        assert loaded.values == {"records_in": 10, "checksum": None}
+        assert loaded.is_completed("silver")
+        assert not loaded.is_completed("gold")
+        assert loaded.updated_at is not None
+        assert store.list_batches() == ["b1"]
+
+    def test_missing_and_deleted(self, tmp_path):
+        """Test that unknown and deleted batches have no checkpoint."""
+        store = CheckpointStore(Settings(storage_path=str(tmp_path)))
+        store.save(BatchCheckpoint(batch_id="b1", source="test"))
+
+        store.delete("b1")
+
+        assert store.load("b1") is None
+        assert store.load("b2") is None
+        assert store.list_batches() == []
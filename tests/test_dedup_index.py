@@ -0,0 +1,78 @@
+"""Test dedup index - cross-batch deduplication tests."""
+
+import pandas as pd
+import pytest
+
+from app.infrastructure.dedup_index import PandasDedupIndex
+from app.infrastructure.settings import Settings
+
+
+@pytest.fixture
+def dedup_index(tmp_path):
+    """Create a dedup index backed by a temporary directory."""
+    return PandasDedupIndex(Settings(storage_path=str(tmp_path), dedup_retention_days=7))
+
+
+def _silver(start: str, hours: int, entity: str = "entity_1") -> pd.DataFrame:
+    """Build hourly silver rows for one entity."""
+    return pd.DataFrame(
+        {
+            "timestamp": pd.date_range(start, periods=hours, freq="h"),
+            "entity_id": entity,
+            "value": 1.0,
+        }
+    )
+
+
+class TestPandasDedupIndex:
+    """Test persistent dedup index."""
+
+    def test_drops_rows_committed_by_earlier_batch(self, dedup_index):
+        """Test that re-delivered rows are dropped in a later batch."""
+        first = _silver("2026-02-01", 48)
+        dedup_index.commit(first)
+
+        redelivered = pd.concat([_silver("2026-02-02", 24), _silver("2026-02-03", 24)])
+        result, duplicates = dedup_index.drop_seen(redelivered)
+
+        assert duplicates == 24
+        assert len(result) == 24
+        assert result["timestamp"].min() == pd.Timestamp("2026-02-03")
+
+    def test_keeps_same_timestamp_for_other_entities(self, dedup_index):
+        """Test that keys combine entity and timestamp."""
+        dedup_index.commit(_silver("2026-02-01", 24, entity="entity_1"))
+
+        result, duplicates = dedup_index.drop_seen(_silver("2026-02-01", 24, entity="entity_2"))
+
+        assert duplicates == 0
+        assert len(result) == 24
+
+    def test_drops_repeated_keys_within_batch(self, dedup_index):
+        """Test that rows repeating a key within the batch are dropped."""
+        batch = pd.concat([_silver("2026-02-01", 10), _silver("2026-02-01", 10)])
+
+        result, duplicates = dedup_index.drop_seen(batch)
+
+        assert duplicates == 10
+        assert len(result) == 10
+
+    def test_expires_buckets_outside_retention(self, dedup_index, tmp_path):
+        """Test that old day buckets are removed once newer keys arrive."""
+        dedup_index.commit(_silver("2026-01-01", 24))
+        dedup_index.commit(_silver("2026-02-01", 24))
+
+        buckets = sorted(p.stem for p in (tmp_path / "dedup").glob("*.npy"))
+
+        assert buckets == ["2026-02-01"]
+
+    def test_future_timestamps_do_not_expire_the_index(self, dedup_index, tmp_path):
+        """Test that retention is measured from today at the latest."""
+        today = pd.Timestamp.today().normalize()
+        dedup_index.commit(_silver(str(today - pd.Timedelta(days=1)), 24))
+        dedup_index.commit(_silver(str(today + pd.DateOffset(years=10)), 24))
+
+        _, duplicates = dedup_index.drop_seen(_silver(str(today - pd.Timedelta(days=1)), 24))
+
+        assert duplicates == 24
+        assert len(list((tmp_path / "dedup").glob("*.npy"))) == 2
@@ -0,0 +1,74 @@
+"""Test the execution engine registry."""
+
+import pytest
+
+from app.domain.transformers import PandasBronzeToSilverTransformer, PandasSilverToGoldTransformer
+from app.infrastructure.dedup_index import PandasDedupIndex
+from app.infrastructure.engines import (
+    ENGINES,
+    EngineSpec,
+    available_engines,
+    create_dedup_index,
+    create_repository,
+    create_transformers,
+    get_engine,
+    load_component,
+    register_engine,
+)
+from app.infrastructure.repositories.pandas_repository import PandasRepository
+from app.infrastructure.settings import Settings
+
+
+@pytest.fixture
+def settings(tmp_path):
+    """Local-mode settings on a scratch storage path."""
+    return Settings(execution_mode="local", storage_path=str(tmp_path))
+
+
+class TestEngineRegistry:
+    """Test engine lookup and component creation."""
+
+    def test_local_components(self, settings):
+        """Test that local mode creates the pandas repository and transformers."""
+        bronze_to_silver, silver_to_gold = create_transformers(settings)
+
+        assert isinstance(create_repository(settings), PandasRepository)
+        assert isinstance(bronze_to_silver, PandasBronzeToSilverTransformer)
+        assert isinstance(silver_to_gold, PandasSilverToGoldTransformer)
+
+    def test_unknown_mode(self):
+        """Test that an unregistered mode is rejected."""
+        with pytest.raises(ValueError, match="Unknown execution mode"):
+            get_engine("nonexistent")
+
+    def test_dedup_index_follows_setting(self, settings):
+        """Test that a dedup index is only created when dedup is enabled."""
+        repository = create_repository(settings)
+
+        settings.dedup_enabled = False
+        assert create_dedup_index(settings, repository) is None
+        settings.dedup_enabled = True
+        assert isinstance(create_dedup_index(settings, repository), PandasDedupIndex)
+
+    def test_register_engine(self):
+        """Test that a registered engine is selectable and its requirement is checked."""
+        register_engine(
+            EngineSpec(
+                name="custom",
+                repository=ENGINES["local"].repository,
+                bronze_to_silver=ENGINES["local"].bronze_to_silver,
+                silver_to_gold=ENGINES["local"].silver_to_gold,
+                dedup_index=ENGINES["local"].dedup_index,
+                requires="package_that_is_not_installed",
+            )
+        )
+        try:
+            assert get_engine("custom").name == "custom"
+            assert "custom" not in available_engines()
+            assert "local" in available_engines()
+        finally:
+            ENGINES.pop("custom")
+
+    def test_load_component(self):
+        """Test that components are imported from module:attribute paths."""
+        assert load_component("app.infrastructure.settings:Settings") is Settings
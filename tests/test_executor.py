@@ -0,0 +1,82 @@
+"""Test pipelined execution helpers."""
+
+import threading
+import time
+
+import pytest
+
+from app.application.executor import IoExecutor, prefetched
+
+
+class TestIoExecutor:
+    """Test the background I/O executor."""
+
+    def test_runs_tasks_in_order_off_the_calling_thread(self):
+        """Test that tasks run in submission order on another thread."""
+        calls = []
+        with IoExecutor() as io:
+            for i in range(5):
+                io.submit(lambda i=i: calls.append((i, threading.get_ident())))
+            io.wait()
+
+        assert [i for i, _ in calls] == list(range(5))
+        assert {thread for _, thread in calls} != {threading.get_ident()}
+
+    def test_failure_skips_later_tasks_and_propagates(self):
+        """Test that tasks after a failure are skipped and the error is raised."""
+        calls = []
+
+        def fail():
+            raise OSError("disk full")
+
+        with IoExecutor() as io:
+            io.submit(calls.append, 1)
+            io.submit(fail)
+            io.submit(calls.append, 2)
+            with pytest.raises(OSError, match="disk full"):
+                io.wait()
+            with pytest.raises(OSError):
+                io.check()
+
+        assert calls == [1]
+
+
+class TestPrefetched:
+    """Test loading items ahead of their use."""
+
+    def test_yields_in_order_while_loading_ahead(self):
+        """Test that the next item loads while the current one is processed."""
+        started = {}
+
+        def load(item):
+            started[item] = time.perf_counter()
+            time.sleep(0.02)
+            return item * 10
+
+        results = []
+        for value in prefetched(range(3), load, depth=1):
+            results.append(value)
+            time.sleep(0.05)  # the next load runs meanwhile
+
+        assert results == [0, 10, 20]
+        assert started[1] - started[0] < 0.05
+
+    def test_inline_without_depth(self):
+        """Test that depth 0 loads items on the calling thread."""
+        threads = list(prefetched(range(2), lambda _: threading.get_ident(), depth=0))
+
+        assert threads == [threading.get_ident()] * 2
+
+    def test_load_errors_are_raised_in_order(self):
+        """Test that a failed load raises when its item is reached."""
+
+        def load(item):
+            if item == 1:
+                raise ValueError("bad file")
+            return item
+
+        results = prefetched(range(3), load, depth=1)
+
+        assert next(results) == 0
+        with pytest.raises(ValueError, match="bad file"):
+            next(results)
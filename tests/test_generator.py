@@ -0,0 +1,114 @@
+"""Test generator - synthetic bronze data."""
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from app.domain.transformers import PandasBronzeToSilverTransformer
+from app.infrastructure.generator import GeneratorConfig, generate_bronze, generate_chunk
+
+
+class TestGeneratorConfig:
+    """Test row counts and time grid of the configuration."""
+
+    def test_range_covers_every_entity_and_period(self):
+        """Test that the default grid spans start to end inclusive for every entity."""
+        config = GeneratorConfig(entities=3, start="2026-02-01", end="2026-02-02", freq="h")
+
+        assert config.total_rows == 3 * 25
+
+    def test_rows_per_file_overrides_range(self):
+        """Test that rows per file sets the volume and files split it evenly."""
+        config = GeneratorConfig(files=4, rows_per_file=1000)
+
+        assert config.total_rows == 4000
+        assert config.file_rows(3) == (3000, 4000)
+
+    def test_calendar_frequency_is_rejected(self):
+        """Test that only fixed-length frequencies are accepted."""
+        with pytest.raises(ValueError):
+            _ = GeneratorConfig(freq="MS").total_rows
+
+
+class TestGenerateBronze:
+    """Test generated files."""
+
+    def test_clean_data_is_the_full_grid(self, tmp_path):
+        """Test that data without defects has one reading per entity and period."""
+        config = GeneratorConfig(entities=5, start="2026-02-01", end="2026-02-03", files=3)
+
+        report = generate_bronze(config, tmp_path, workers=1)
+
+        df = pd.concat([pd.read_parquet(p) for p in sorted(tmp_path.glob("*.parquet"))])
+        assert report.files == 3
+        assert report.rows == len(df) == 5 * 49
+        assert not df.duplicated(["entity_id", "timestamp"]).any()
+        assert df["timestamp"].min() == pd.Timestamp("2026-02-01")
+        assert df["timestamp"].max() == pd.Timestamp("2026-02-03")
+
+    def test_output_is_reproducible(self, tmp_path):
+        """Test that the same seed gives the same files, in-process or with workers."""
+        config = GeneratorConfig(
+            entities=10, files=2, rows_per_file=5000, chunk_rows=2000, null_ratio=0.05, seed=7
+        )
+
+        generate_bronze(config, tmp_path / "a", workers=1)
+        generate_bronze(config, tmp_path / "b", workers=2)
+
+        for name in ["bronze_00000.parquet", "bronze_00001.parquet"]:
+            pd.testing.assert_frame_equal(
+                pd.read_parquet(tmp_path / "a" / name), pd.read_parquet(tmp_path / "b" / name)
+            )
+
+    def test_chunks_of_one_file_are_written_in_parallel(self, tmp_path):
+        """Test that a single file split over workers matches the in-process output."""
+        config = GeneratorConfig(
+            entities=10, files=1, rows_per_file=10_000, chunk_rows=1000, null_ratio=0.05, seed=3
+        )
+
+        report = generate_bronze(config, tmp_path / "b", workers=3)
+        generate_bronze(config, tmp_path / "a", workers=1)
+
+        path = "bronze_00000.parquet"
+        assert report.files == 1 and report.rows == 10_000
+        assert pq.ParquetFile(tmp_path / "b" / path).num_row_groups == 10
+        pd.testing.assert_frame_equal(
+            pd.read_parquet(tmp_path / "a" / path), pd.read_parquet(tmp_path / "b" / path)
+        )
+
+    def test_duplicates_copy_dirty_rows_exactly(self):
+        """Test that duplicated rows keep the defects of the row they copy."""
+        config = GeneratorConfig(
+            entities=10, rows_per_file=20_000, null_ratio=0.5, duplicate_ratio=0.1
+        )
+        bronze = generate_chunk(config, 0, 20_000, seed=(0,)).to_pandas()
+
+        copies = bronze[bronze.duplicated()]
+
+        # Were rows corrupted after copying, most copies would differ from their source
+        assert len(copies) == pytest.approx(2000, rel=0.15)
+        assert copies.isna().any(axis=1).mean() == pytest.approx(0.5, abs=0.1)
+
+    def test_dirty_rows_are_quarantined_or_dropped(self):
+        """Test that generated defects are caught by the silver stage at about their ratios."""
+        config = GeneratorConfig(
+            entities=100,
+            rows_per_file=100_000,
+            null_ratio=0.02,
+            bad_type_ratio=0.02,
+            duplicate_ratio=0.02,
+            late_ratio=0.02,
+        )
+        bronze = generate_chunk(config, 0, 100_000, seed=(0,)).to_pandas()
+
+        silver, quarantine = PandasBronzeToSilverTransformer().transform_with_quarantine(bronze)
+
+        reasons = quarantine["reject_reason"].value_counts()
+        # Null rows lose one of three fields; bad rows break timestamp or value equally
+        assert reasons["null_timestamp"] == pytest.approx(100_000 * 0.02 / 3, rel=0.15)
+        assert reasons["null_entity_id"] == pytest.approx(100_000 * 0.02 / 3, rel=0.15)
+        assert reasons["unparseable_timestamp"] == pytest.approx(100_000 * 0.02 / 2, rel=0.15)
+        assert len(bronze) - len(bronze.drop_duplicates()) == pytest.approx(2000, rel=0.15)
+        assert silver["value"].isna().sum() == pytest.approx(
+            100_000 * 0.02 * (1 / 3 + 1 / 2), rel=0.15
+        )
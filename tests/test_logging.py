@@ -0,0 +1,133 @@
+"""Test logging - background sink and event sampling."""
+
+import io
+import json
+import os
+import threading
+
+import pytest
+import structlog
+
+from app.infrastructure.logging import EventSampler, QueueLogSink
+
+
+def _render(logger, method_name, event_dict) -> str:
+    """Render an event as JSON, formatting exceptions like the configured chain."""
+    event_dict = structlog.processors.format_exc_info(logger, method_name, event_dict)
+    return json.dumps(event_dict, default=str)
+
+
+class TestQueueLogSink:
+    """Test the queue-backed log sink."""
+
+    def test_writes_events_in_order(self):
+        """Test that queued events are rendered and written by the writer thread."""
+        stream = io.StringIO()
+        sink = QueueLogSink(_render, stream=stream, flush_interval=0.01)
+
+        for i in range(100):
+            with pytest.raises(structlog.DropEvent):
+                sink(None, "info", {"event": "chunk_read", "chunk": i})
+        sink.close()
+
+        events = [json.loads(line) for line in stream.getvalue().splitlines()]
+        assert [e["chunk"] for e in events] == list(range(100))
+        assert sink.stats() == {"queued": 100, "written": 100, "dropped": 0}
+
+    def test_drops_and_reports_when_full(self):
+        """Test that a full queue drops events without blocking and reports the count."""
+        stream = io.StringIO()
+        release = threading.Event()
+
+        def slow_render(logger, method_name, event_dict) -> str:
+            release.wait()
+            return _render(logger, method_name, event_dict)
+
+        sink = QueueLogSink(slow_render, stream=stream, max_queue=5, flush_interval=0.01)
+        for i in range(50):
+            with pytest.raises(structlog.DropEvent):
+                sink(None, "info", {"event": "chunk_read", "chunk": i})
+        release.set()
+        sink.close()
+
+        events = [json.loads(line) for line in stream.getvalue().splitlines()]
+        dropped = [e for e in events if e["event"] == "log_events_dropped"]
+        assert sink.dropped > 0
+        assert sum(e["dropped"] for e in dropped) == sink.dropped
+        assert len(events) - len(dropped) == 50 - sink.dropped
+
+    def test_counts_events_from_many_threads(self):
+        """Test that queued and dropped counts add up when many threads log at once."""
+        sink = QueueLogSink(_render, stream=io.StringIO(), max_queue=100, flush_interval=0.01)
+
+        def log_events() -> None:
+            for i in range(500):
+                with pytest.raises(structlog.DropEvent):
+                    sink(None, "info", {"event": "chunk_read", "chunk": i})
+
+        threads = [threading.Thread(target=log_events) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        sink.close()
+
+        stats = sink.stats()
+        assert stats["queued"] + stats["dropped"] == 8 * 500
+        assert stats["written"] == stats["queued"]
+
+    def test_captures_exception_on_calling_thread(self):
+        """Test that exc_info=True is resolved before the event leaves the thread."""
+        stream = io.StringIO()
+        sink = QueueLogSink(_render, stream=stream, flush_interval=0.01)
+
+        try:
+            raise ValueError("bad chunk")
+        except ValueError:
+            with pytest.raises(structlog.DropEvent):
+                sink(None, "error", {"event": "chunk_failed", "exc_info": True})
+        sink.close()
+
+        event = json.loads(stream.getvalue())
+        assert "ValueError: bad chunk" in event["exception"]
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork")
+    def test_writes_in_forked_child(self):
+        """Test that a forked child gets a writer thread of its own."""
+        read_fd, write_fd = os.pipe()
+        stream = os.fdopen(write_fd, "w")
+        sink = QueueLogSink(_render, stream=stream, flush_interval=0.01)
+
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover - runs in the child
+            try:
+                sink(None, "info", {"event": "worker_started"})
+            except structlog.DropEvent:
+                pass
+            sink.flush()
+            os._exit(0 if sink.written == 1 else 1)
+        _, status = os.waitpid(pid, 0)
+        sink.close()
+        stream.close()
+
+        with os.fdopen(read_fd) as output:
+            events = [json.loads(line) for line in output.read().splitlines()]
+        assert os.waitstatus_to_exitcode(status) == 0
+        assert [e["event"] for e in events] == ["worker_started"]
+
+
+class TestEventSampler:
+    """Test sampling of high-frequency events."""
+
+    def test_samples_only_configured_events(self):
+        """Test that configured events are sampled and others always pass."""
+        sampler = EventSampler({"chunk_read": 0.0, "row_seen": 1.0})
+
+        with pytest.raises(structlog.DropEvent):
+            sampler(None, "info", {"event": "chunk_read"})
+        kept = sampler(None, "info", {"event": "row_seen"})
+        other = sampler(None, "info", {"event": "batch_completed"})
+
+        assert sampler.dropped == 1
+        assert kept["sample_rate"] == 1.0
+        assert "sample_rate" not in other
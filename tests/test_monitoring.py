@@ -0,0 +1,117 @@
+"""Test monitoring - metrics collection."""
+
+import threading
+
+from app.infrastructure.monitoring import MetricsCollector, render_prometheus
+
+
+class TestMetricsCollector:
+    """Test the bounded-memory metrics collector."""
+
+    def test_aggregates_values(self):
+        """Test count, total, average, min, max and quantiles of a metric."""
+        collector = MetricsCollector()
+        for value in range(1, 101):
+            collector.record("latency", value / 100)
+
+        metrics = collector.get_all_metrics()["latency"]
+
+        assert collector.get_count("latency") == 100
+        assert collector.get_total("latency") == sum(v / 100 for v in range(1, 101))
+        assert collector.get_average("latency") == metrics["average"]
+        assert (metrics["min"], metrics["max"]) == (0.01, 1.0)
+        assert metrics["p50"] == 0.5
+        assert metrics["p99"] == 0.99
+
+    def test_histogram_buckets(self):
+        """Test that values are counted into the bucket of their upper bound."""
+        collector = MetricsCollector(buckets=(1.0, 10.0))
+        for value in [0.5, 1.0, 2.0, 50.0]:
+            collector.record("size", value)
+
+        buckets = collector.get_all_metrics()["size"]["buckets"]
+
+        assert buckets == {"1.0": 2, "10.0": 1, "+Inf": 1}
+
+    def test_labelled_series(self):
+        """Test that labelled series are kept apart and aggregate without labels."""
+        collector = MetricsCollector()
+        collector.record("requests", 1, {"route": "/gold", "status": 200})
+        collector.record("requests", 1, {"route": "/gold", "status": 500})
+        collector.record("requests", 1, {"route": "/health", "status": 200})
+
+        assert collector.get_count("requests") == 3
+        assert collector.get_count("requests", {"route": "/gold"}) == 2
+        assert collector.get_count("requests", {"status": 200}) == 2
+        assert "requests{route=/gold,status=500}" in collector.get_all_metrics()
+
+    def test_concurrent_updates(self):
+        """Test that updates from several threads are all counted."""
+        collector = MetricsCollector()
+
+        def record() -> None:
+            for value in range(5_000):
+                collector.record("work", value)
+
+        threads = [threading.Thread(target=record) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert collector.get_count("work") == 20_000
+        assert collector.get_total("work") == 4 * sum(range(5_000))
+
+    def test_reset(self):
+        """Test that reset drops every series."""
+        collector = MetricsCollector()
+        collector.record("latency", 1.0)
+
+        collector.reset()
+
+        assert collector.get_all_metrics() == {}
+        assert collector.get_average("latency") == 0.0
+
+    def test_counters_and_gauges(self):
+        """Test that counters accumulate and gauges keep the last value."""
+        collector = MetricsCollector()
+        collector.increment("batches", labels={"status": "succeeded"})
+        collector.increment("batches", 2, labels={"status": "failed"})
+        collector.set_gauge("snapshot_version", 3)
+        collector.set_gauge("snapshot_version", 4)
+
+        assert collector.get_value("batches") == 3
+        assert collector.get_value("batches", {"status": "failed"}) == 2
+        assert collector.get_value("snapshot_version") == 4
+
+
+class TestRenderPrometheus:
+    """Test the Prometheus text exposition."""
+
+    def test_histogram_quantiles_and_counters(self):
+        """Test cumulative buckets, sum, count, quantiles and counter suffixes."""
+        collector = MetricsCollector(buckets=(0.1, 1.0))
+        for value in [0.05, 0.5, 2.0]:
+            collector.record("latency", value, {"route": "/gold"})
+        collector.increment("batches", labels={"status": "ok"})
+
+        lines = render_prometheus(collector, namespace="app").splitlines()
+
+        assert "# TYPE app_latency histogram" in lines
+        assert 'app_latency_bucket{route="/gold",le="0.1"} 1' in lines
+        assert 'app_latency_bucket{route="/gold",le="1.0"} 2' in lines
+        assert 'app_latency_bucket{route="/gold",le="+Inf"} 3' in lines
+        assert 'app_latency_sum{route="/gold"} 2.55' in lines
+        assert 'app_latency_count{route="/gold"} 3' in lines
+        assert 'app_latency_quantile{route="/gold",quantile="0.5"} 0.5' in lines
+        assert "# TYPE app_batches_total counter" in lines
+        assert 'app_batches_total{status="ok"} 1.0' in lines
+
+    def test_escapes_label_values(self):
+        """Test that quotes and backslashes in label values are escaped."""
+        collector = MetricsCollector()
+        collector.set_gauge("info", 1, {"path": 'a"b\\c'})
+
+        text = render_prometheus(collector, namespace="")
+
+        assert 'info{path="a\\"b\\\\c"} 1.0' in text
@@ -1,15 +1,23 @@
 """Test pipeline - application layer tests with mocks."""
 
+import json
 from unittest.mock import MagicMock
 
 import pandas as pd
 import pytest
 
 from app.application.pipeline import Pipeline
+from app.application.runner import BatchRunner, retry_delay
+from app.application.tables import default_tables
+from app.domain.sketches import HyperLogLog
 from app.domain.transformers import (
     PandasBronzeToSilverTransformer,
+    PandasMultiGrainTransformer,
     PandasSilverToGoldTransformer,
 )
+from app.infrastructure.monitoring import get_metrics_collector
+from app.infrastructure.repositories.pandas_repository import PandasRepository
+from app.infrastructure.settings import Settings
 
 
 class TestPipeline:
@@ -19,28 +27,30 @@ class TestPipeline:
         """Test that pipeline executes complete Bronze -> Silver -> Gold flow."""
         # Create mock repository
         mock_repository = MagicMock()
-        
+
         # Setup bronze data
-        bronze_df = pd.DataFrame({
-            "timestamp": pd.to_datetime(["2026-02-20 10:00:00", "2026-02-20 11:00:00"]),
-            "entity_id": ["entity_1", "entity_2"],
-            "value": [100.0, 200.0],
-        })
+        bronze_df = pd.DataFrame(
+            {
+                "timestamp": pd.to_datetime(["2026-02-20 10:00:00", "2026-02-20 11:00:00"]),
+                "entity_id": ["entity_1", "entity_2"],
+                "value": [100.0, 200.0],
+            }
+        )
         mock_repository.read_bronze.return_value = bronze_df
-        
+
         # Create pipeline
         pipeline = Pipeline(
             repository=mock_repository,
             bronze_to_silver=PandasBronzeToSilverTransformer(),
             silver_to_gold=PandasSilverToGoldTransformer(),
         )
-        
+
         # Run pipeline
         silver_df, gold_df, silver_count, gold_count = pipeline.run_batch()
-        
+
         # Verify bronze was read
         mock_repository.read_bronze.assert_called_once()
-        
+
         # Verify transformations produced data
         assert len(silver_df) > 0
         assert len(gold_df) > 0
@@ -50,25 +60,27 @@ class TestPipeline:
     def test_handles_empty_bronze_data(self):
         """Test that pipeline handles empty bronze data gracefully."""
         mock_repository = MagicMock()
-        
+
         # Setup empty bronze data
-        bronze_df = pd.DataFrame({
-            "timestamp": [],
-            "entity_id": [],
-            "value": [],
-        })
+        bronze_df = pd.DataFrame(
+            {
+                "timestamp": [],
+                "entity_id": [],
+                "value": [],
+            }
+        )
         mock_repository.read_bronze.return_value = bronze_df
-        
+
         # Create pipeline
         pipeline = Pipeline(
             repository=mock_repository,
             bronze_to_silver=PandasBronzeToSilverTransformer(),
             silver_to_gold=PandasSilverToGoldTransformer(),
         )
-        
+
         # Run pipeline
-        silver_df, gold_df, silver_count, gold_count = pipeline.run_batch()
-        
+        _, _, silver_count, gold_count = pipeline.run_batch()
+
         # Should complete without errors
         assert silver_count == 0
         assert gold_count == 0
@@ -78,30 +90,344 @@ class TestPipeline:
         mock_repository = MagicMock()
         mock_bronze_to_silver = MagicMock()
         mock_silver_to_gold = MagicMock()
-        
+
         # Setup mock transformers
         bronze_df = pd.DataFrame({"col": [1, 2, 3]})
         silver_df = pd.DataFrame({"col": [1, 2]})
         gold_df = pd.DataFrame({"col": [1]})
-        
+
         mock_repository.read_bronze.return_value = bronze_df
-        mock_bronze_to_silver.transform.return_value = silver_df
+        mock_bronze_to_silver.transform_with_quarantine.return_value = (silver_df, None)
         mock_silver_to_gold.transform.return_value = gold_df
-        
+
         # Create pipeline with mock transformers
         pipeline = Pipeline(
             repository=mock_repository,
             bronze_to_silver=mock_bronze_to_silver,
             silver_to_gold=mock_silver_to_gold,
         )
-        
+
         # Run pipeline
         result_silver, result_gold, _, _ = pipeline.run_batch()
-        
+
         # Verify transformers were called correctly
-        mock_bronze_to_silver.transform.assert_called_once()
+        mock_bronze_to_silver.transform_with_quarantine.assert_called_once()
         mock_silver_to_gold.transform.assert_called_once()
-        
+
         # Verify correct data was returned
         assert len(result_silver) == 2
         assert len(result_gold) == 1
+
+    def test_to_silver_returns_quarantined_rows(self):
+        """Test that the silver stage returns rejected rows alongside silver data."""
+        mock_repository = MagicMock()
+
+        bronze_df = pd.DataFrame(
+            {
+                "timestamp": ["2026-02-20 10:00:00", None, "not-a-date"],
+                "entity_id": ["entity_1", "entity_2", "entity_3"],
+                "value": [100.0, 200.0, 300.0],
+            }
+        )
+
+        pipeline = Pipeline(
+            repository=mock_repository,
+            bronze_to_silver=PandasBronzeToSilverTransformer(),
+            silver_to_gold=PandasSilverToGoldTransformer(),
+        )
+
+        silver_df, quarantine_df = pipeline.to_silver(bronze_df)
+
+        assert len(silver_df) == 1
+        assert len(quarantine_df) == 2
+
+
+class TestBatchRunner:
+    """Test batch runner instrumentation."""
+
+    def _runner(self, tmp_path) -> tuple[BatchRunner, PandasRepository]:
+        """Create a runner over local storage with two days of bronze data."""
+        settings = Settings(storage_path=str(tmp_path), retry_delay=0, checkpoint_enabled=True)
+        repository = PandasRepository(settings)
+        bronze_df = pd.DataFrame(
+            {
+                "timestamp": pd.date_range("2026-02-20", periods=48, freq="h"),
+                "entity_id": ["entity_1", "entity_2"] * 24,
+                "value": [float(i) for i in range(48)],
+            }
+        )
+        bronze_df.to_parquet(tmp_path / "bronze" / "readings.parquet", index=False)
+
+        pipeline = Pipeline(
+            repository=repository,
+            bronze_to_silver=PandasBronzeToSilverTransformer(),
+            silver_to_gold=PandasSilverToGoldTransformer(),
+        )
+        runner = BatchRunner(pipeline, repository, source="test", settings=settings)
+        return runner, repository
+
+    def test_records_a_span_per_stage(self, tmp_path):
+        """Test that each stage reports its rows, bytes and timings."""
+        runner, _ = self._runner(tmp_path)
+        # Sequential, so spans finish in a fixed order
+        runner.settings.pipeline_overlap_io = False
+        runner.settings.pipeline_prefetch_files = 0
+
+        metrics = runner.run()
+
+        spans = {span.name: span for span in metrics.stages}
+        assert list(spans) == [
+            "read_bronze",
+            "bronze_to_silver",
+            "deduplicate",
+            "checkpoint_silver",
+            "write_silver",
+            "save_silver_metadata",
+            "validate_silver",
+            "silver_to_gold",
+            "sketch_gold",
+            "checkpoint_gold",
+            "write_gold",
+            "save_gold_metadata",
+            "commit_silver_keys",
+        ]
+        assert spans["read_bronze"].rows_out == 48
+        assert spans["read_bronze"].bytes_read > 0
+        assert spans["silver_to_gold"].rows_in == 48
+        assert spans["silver_to_gold"].rows_out == 4
+        assert spans["write_silver"].bytes_written > 0
+        assert spans["write_gold"].bytes_written > 0
+        assert all(span.wall_seconds >= 0 and span.error is None for span in spans.values())
+        assert metrics.to_dict()["stages"][0]["name"] == "read_bronze"
+        collector = get_metrics_collector()
+        assert collector.get_count("pipeline_stage_seconds", {"stage": "write_gold"}) >= 1
+
+    def test_prefetched_bronze_matches_a_single_read(self, tmp_path):
+        """Test that reading bronze ahead per file gives the same silver as one read."""
+        runner, repository = self._runner(tmp_path)
+        extra = pd.DataFrame(
+            {
+                "timestamp": pd.date_range("2026-02-22", periods=24, freq="h"),
+                "entity_id": ["entity_3"] * 24,
+                "value": [float(i) for i in range(24)],
+            }
+        )
+        extra.to_parquet(tmp_path / "bronze" / "readings_2.parquet", index=False)
+        expected, _ = runner.pipeline.to_silver(repository.read_bronze())
+
+        metrics = runner.run()
+
+        spans = {span.name: span for span in metrics.stages}
+        assert "read_bronze" not in spans
+        assert spans["bronze_to_silver"].rows_in == 72
+        assert spans["bronze_to_silver"].rows_out == 72
+        silver = repository.read_silver()
+        assert sorted(zip(silver["entity_id"], silver["timestamp"])) == sorted(
+            zip(expected["entity_id"], expected["timestamp"])
+        )
+
+    def test_persists_spans_with_layer_metadata(self, tmp_path):
+        """Test that silver and gold metadata are kept apart and carry the spans."""
+        runner, _ = self._runner(tmp_path)
+
+        runner.run()
+
+        (silver_file,) = (tmp_path / "metadata").glob("*_silver_metadata.json")
+        (gold_file,) = (tmp_path / "metadata").glob("*_gold_metadata.json")
+        silver = json.loads(silver_file.read_text())
+        gold = json.loads(gold_file.read_text())
+        assert silver["record_count"] == 48
+        assert gold["record_count"] == 4
+        assert "write_silver" in [s["name"] for s in silver["stages"]]
+        assert "write_gold" in [s["name"] for s in gold["stages"]]
+
+    def test_keeps_records_in_when_a_stage_fails(self, tmp_path):
+        """Test that a failed run reports the rows read and the failing stage."""
+        runner, repository = self._runner(tmp_path)
+        repository.write_gold = MagicMock(side_effect=OSError("disk full"))
+
+        metrics = runner.run()
+
+        assert metrics.errors == 1
+        assert metrics.records_in == 48
+        assert metrics.records_out == 0
+        assert metrics.stages[-1].name == "write_gold"
+        assert metrics.stages[-1].error == "OSError"
+
+    def test_retries_a_transient_stage_failure(self, tmp_path):
+        """Test that a stage failing once is retried and the batch completes."""
+        runner, repository = self._runner(tmp_path)
+        repository.write_gold = MagicMock(side_effect=[OSError("timeout"), None])
+
+        metrics = runner.run()
+
+        assert metrics.errors == 0
+        assert metrics.records_out == 4
+        attempts = [span for span in metrics.stages if span.name == "write_gold"]
+        assert [span.error for span in attempts] == ["OSError", None]
+        assert repository.write_gold.call_count == 2
+
+    def test_resume_runs_only_incomplete_stages(self, tmp_path):
+        """Test that a resumed batch reuses checkpointed gold and only writes it."""
+        runner, repository = self._runner(tmp_path)
+        runner.settings.max_retries = 0
+        repository.write_gold = MagicMock(side_effect=OSError("disk full"))
+        failed = runner.run()
+        batch_id = runner.batch_id
+        del repository.write_gold
+
+        metrics = runner.run(resume=batch_id)
+
+        assert failed.errors == 1
+        assert metrics.errors == 0
+        assert runner.batch_id == batch_id
+        assert metrics.records_in == 48
+        assert metrics.records_out == 4
+        assert [span.name for span in metrics.stages] == [
+            "load_gold_checkpoint",
+            "write_gold",
+            "save_gold_metadata",
+            "commit_silver_keys",
+        ]
+        assert repository.read_gold()["entity_id"].nunique() == 2
+        assert len(repository.read_silver()) == 48
+        # A completed batch leaves no checkpoint behind
+        assert list((tmp_path / "checkpoints").iterdir()) == []
+
+    def test_gold_metadata_records_entity_sketches(self, tmp_path):
+        """Test that gold metadata carries row counts and an entity sketch per date."""
+        runner, repository = self._runner(tmp_path)
+
+        runner.run()
+
+        metadata = repository.latest_metadata("gold")
+        assert metadata.partition_counts == {"2026-02-20": 2, "2026-02-21": 2}
+        sketch = HyperLogLog.from_string(metadata.entity_sketches["2026-02-21"])
+        assert sketch.count() == 2
+        assert repository.list_metadata("gold") == [metadata]
+
+    def test_builds_derived_tables_after_the_layers(self, tmp_path):
+        """Test that derived tables are built from the committed gold of the batch."""
+        runner, repository = self._runner(tmp_path)
+        runner.pipeline.tables = default_tables(runner.settings)
+
+        metrics = runner.run()
+
+        assert metrics.stages[-1].name == "build_tables"
+        summary = repository.read_table("entity_summary")
+        assert list(summary["entity_id"]) == ["entity_1", "entity_2"]
+        assert list(summary["days"]) == [2, 2]
+
+    def test_writes_a_gold_table_per_grain(self, tmp_path):
+        """Test that every grain's aggregates are appended to its own gold table."""
+        runner, repository = self._runner(tmp_path)
+        runner.pipeline.gold_grains = PandasMultiGrainTransformer(["hour", "day"])
+
+        metrics = runner.run()
+
+        assert metrics.errors == 0
+        assert {"silver_to_gold_grains", "write_gold_hourly", "write_gold_daily"} <= {
+            span.name for span in metrics.stages
+        }
+        assert len(repository.read_table("gold_hourly")) == 48
+        daily = repository.read_table("gold_daily")
+        assert list(daily["record_count"]) == [12, 12, 12, 12]
+        assert daily["total_value"].sum() == repository.read_gold()["total_value"].sum()
+
+    def test_checkpoints_are_off_by_default(self, tmp_path):
+        """Test that a batch writes no checkpoints unless they are enabled."""
+        runner, _ = self._runner(tmp_path)
+        runner = BatchRunner(
+            runner.pipeline,
+            runner.repository,
+            source="test",
+            settings=Settings(storage_path=str(tmp_path), retry_delay=0),
+        )
+
+        metrics = runner.run()
+
+        assert runner.checkpoints is None
+        assert not any(span.name.startswith("checkpoint_") for span in metrics.stages)
+        assert not (tmp_path / "checkpoints").exists()
+
+    def test_resume_requires_a_checkpoint(self, tmp_path):
+        """Test that resuming a batch without a checkpoint is rejected."""
+        runner, _ = self._runner(tmp_path)
+
+        with pytest.raises(ValueError, match="No checkpoint"):
+            runner.run(resume="20260101_000000")
+
+    def test_overlapped_writes_match_sequential_output(self, tmp_path):
+        """Test that writing silver during the gold transform writes the same layers."""
+        overlapped, overlapped_repository = self._runner(tmp_path / "overlapped")
+        sequential, sequential_repository = self._runner(tmp_path / "sequential")
+        sequential.settings.pipeline_overlap_io = False
+
+        overlapped_metrics = overlapped.run()
+        sequential.run()
+
+        assert overlapped_metrics.errors == 0
+        assert {span.name for span in overlapped_metrics.stages} >= {"write_silver", "write_gold"}
+        pd.testing.assert_frame_equal(
+            overlapped_repository.read_gold().drop(columns="aggregated_at"),
+            sequential_repository.read_gold().drop(columns="aggregated_at"),
+        )
+        assert len(overlapped_repository.read_silver()) == 48
+
+    def test_failed_background_write_stops_later_commits(self, tmp_path):
+        """Test that gold is not committed after silver failed to write on the I/O thread."""
+        runner, repository = self._runner(tmp_path)
+        runner.settings.max_retries = 0
+        repository.write_silver = MagicMock(side_effect=OSError("disk full"))
+        repository.write_gold = MagicMock()
+
+        metrics = runner.run()
+
+        assert metrics.errors == 1
+        assert metrics.records_in == 48
+        repository.write_gold.assert_not_called()
+        checkpoint = runner.checkpoints.load(runner.batch_id)
+        assert "write_silver" not in checkpoint.completed
+        assert "silver" in checkpoint.completed
+
+    def test_failed_gold_write_does_not_commit_silver_keys(self, tmp_path):
+        """Test that silver keys stay uncommitted when gold fails to write."""
+        runner, repository = self._runner(tmp_path)
+        runner.settings.max_retries = 0
+        repository.write_gold = MagicMock(side_effect=OSError("disk full"))
+        runner.pipeline.commit_silver_keys = MagicMock()
+
+        metrics = runner.run()
+
+        assert metrics.errors == 1
+        runner.pipeline.commit_silver_keys.assert_not_called()
+        checkpoint = runner.checkpoints.load(runner.batch_id)
+        assert "commit_silver_keys" not in checkpoint.completed
+
+    def test_retry_delay_backs_off_exponentially(self):
+        """Test that retry waits double per attempt up to the maximum."""
+        delays = [retry_delay(attempt, 1.0, 5.0) for attempt in range(5)]
+
+        assert delays == [1.0, 2.0, 4.0, 5.0, 5.0]
+
+    def test_profile_writes_stage_profiles(self, tmp_path):
+        """Test that a profiled run writes a CPU profile per stage and a summary."""
+        runner, _ = self._runner(tmp_path)
+        runner.profile = True
+
+        metrics = runner.run()
+
+        (batch_dir,) = (tmp_path / "profiles").iterdir()
+        summary = json.loads((batch_dir / "summary.json").read_text())
+        assert set(summary) == {span.name for span in metrics.stages}
+        assert (batch_dir / "silver_to_gold.prof").exists()
+        assert summary["silver_to_gold"]["hottest_functions"]
+        assert summary["bronze_to_silver"]["traced_peak_bytes"] > 0
+
+    def test_no_profiles_without_profile_flag(self, tmp_path):
+        """Test that unprofiled runs write nothing to the profile directory."""
+        runner, _ = self._runner(tmp_path)
+
+        runner.run()
+
+        assert not (tmp_path / "profiles").exists()
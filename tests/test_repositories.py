@@ -0,0 +1,434 @@
+"""Test repositories - infrastructure layer tests against local storage."""
+
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from app.domain.models import BatchMetadata
+from app.infrastructure.repositories import manifest
+from app.infrastructure.repositories.gold_snapshot import (
+    SnapshotReader,
+    current_version,
+    publish_snapshot,
+)
+from app.infrastructure.repositories.manifest import TableLog
+from app.infrastructure.repositories.pandas_repository import PandasRepository
+from app.infrastructure.repositories.parquet_options import ParquetWriteOptions
+from app.infrastructure.settings import Settings
+
+
+@pytest.fixture
+def repository(tmp_path):
+    """Create a pandas repository backed by a temporary directory."""
+    return PandasRepository(Settings(storage_path=str(tmp_path)))
+
+
+def _metadata(batch_id: str, layer: str) -> BatchMetadata:
+    """Build batch metadata for a test write."""
+    return BatchMetadata(
+        batch_id=batch_id,
+        source="test",
+        ingestion_time=datetime.now(),
+        record_count=0,
+        layer=layer,
+    )
+
+
+def _write_daily_silver(repository: PandasRepository, days: int, entities: int) -> None:
+    """Write one silver file per day with hourly readings for each entity."""
+    for day in range(days):
+        timestamps = pd.date_range(
+            pd.Timestamp("2026-02-01") + pd.Timedelta(days=day), periods=24, freq="h"
+        )
+        df = pd.DataFrame(
+            {
+                "timestamp": timestamps.repeat(entities),
+                "entity_id": [f"entity_{i}" for i in range(entities)] * len(timestamps),
+                "value": 1.0,
+            }
+        )
+        repository.write_silver(df, _metadata(f"batch_{day:03d}", "silver"))
+
+
+class TestLayerIndex:
+    """Test statistics index and data skipping."""
+
+    def test_write_records_file_and_row_group_stats(self, repository, tmp_path):
+        """Test that writes record row counts and time/entity statistics."""
+        _write_daily_silver(repository, days=1, entities=3)
+
+        stats = TableLog(tmp_path / "silver").snapshot().files["batch_000.parquet"]
+
+        assert stats.num_rows == 72
+        assert stats.entity_ids == ["entity_0", "entity_1", "entity_2"]
+        assert stats.min_time.startswith("2026-02-01T00:00")
+        assert sum(rg.num_rows for rg in stats.row_groups) == 72
+
+    def test_time_filter_skips_files_outside_range(self, repository):
+        """Test that a week-long query only touches that week's files."""
+        _write_daily_silver(repository, days=30, entities=3)
+
+        df = repository.read_silver(
+            entity_ids=["entity_1"], start="2026-02-10", end="2026-02-16 23:59:59"
+        )
+
+        assert repository.last_scan.files_total == 30
+        assert repository.last_scan.files_read == 7
+        assert len(df) == 7 * 24
+        assert set(df["entity_id"]) == {"entity_1"}
+
+    def test_entity_filter_uses_bloom_for_many_entities(self, repository):
+        """Test that entity pruning works when chunks store bloom filters."""
+        _write_daily_silver(repository, days=2, entities=300)
+
+        assert len(repository.read_silver(entity_ids=["entity_42"])) == 48
+        assert len(repository.read_silver(entity_ids=["missing"])) == 0
+        assert repository.last_scan.files_read == 0
+
+    def test_unfiltered_read_returns_all_rows(self, repository):
+        """Test that reads without filters return every row."""
+        _write_daily_silver(repository, days=3, entities=2)
+
+        assert len(repository.read_silver()) == 3 * 24 * 2
+
+
+class TestCompaction:
+    """Test small-file compaction."""
+
+    def test_compaction_merges_small_files(self, repository, tmp_path):
+        """Test that small files are merged without losing or duplicating rows."""
+        _write_daily_silver(repository, days=10, entities=3)
+        before = repository.read_silver()
+
+        report = repository.compact("silver", target_file_bytes=10 * 1024**2)
+
+        after = repository.read_silver()
+        assert report.files_before == 10
+        assert report.files_after == 1
+        assert len(TableLog(tmp_path / "silver").snapshot().files) == 1
+        assert len(after) == len(before)
+        assert after["entity_id"].is_monotonic_increasing
+
+    def test_compacted_files_keep_data_skipping(self, repository):
+        """Test that the compacted file's row groups are still pruned by entity."""
+        _write_daily_silver(repository, days=4, entities=3)
+        repository.settings.compaction_row_group_size = 24
+        repository.compact("silver", target_file_bytes=10 * 1024**2)
+
+        df = repository.read_silver(entity_ids=["entity_2"])
+
+        assert len(df) == 4 * 24
+        assert repository.last_scan.row_groups_read == 4
+
+    def test_writes_after_compaction_are_visible(self, repository):
+        """Test that files appended after compaction are read with the compacted ones."""
+        _write_daily_silver(repository, days=3, entities=2)
+        repository.compact("silver", target_file_bytes=10 * 1024**2)
+
+        df = pd.DataFrame(
+            {
+                "timestamp": [pd.Timestamp("2026-03-01")],
+                "entity_id": ["entity_0"],
+                "value": [1.0],
+            }
+        )
+        repository.write_silver(df, _metadata("batch_late", "silver"))
+
+        assert len(repository.read_silver()) == 3 * 24 * 2 + 1
+
+
+class TestTableLog:
+    """Test manifest versioning and snapshot reads."""
+
+    def test_each_write_commits_a_version(self, repository, tmp_path):
+        """Test that every write publishes a new version with one more file."""
+        _write_daily_silver(repository, days=3, entities=2)
+
+        log = TableLog(tmp_path / "silver")
+        latest = log.latest_version()
+
+        assert len(log.snapshot().files) == 3
+        assert len(log.snapshot(latest - 1).files) == 2
+        assert log.snapshot().num_rows == 3 * 24 * 2
+
+    def test_empty_layer_has_no_version_until_written(self, repository, tmp_path):
+        """Test that reading an empty layer commits nothing and the first write is version 1."""
+        assert repository.table_version("silver") is None
+        assert repository.read_silver().empty
+        assert TableLog(tmp_path / "silver").latest_version() is None
+
+        _write_daily_silver(repository, days=1, entities=1)
+
+        assert repository.table_version("silver") == 1
+
+    def test_read_old_version(self, repository, tmp_path):
+        """Test that reads can be pinned to an earlier version."""
+        _write_daily_silver(repository, days=3, entities=2)
+        version = TableLog(tmp_path / "silver").latest_version() - 1
+
+        assert len(repository.read_silver(version=version)) == 2 * 24 * 2
+        assert len(repository.read_silver()) == 3 * 24 * 2
+
+    def test_missing_version_raises(self, repository, tmp_path):
+        """Test that reading an unknown version is an error."""
+        _write_daily_silver(repository, days=1, entities=1)
+
+        with pytest.raises(ValueError):
+            TableLog(tmp_path / "silver").snapshot(99)
+
+    def test_compaction_keeps_old_version_readable(self, repository, tmp_path):
+        """Test that files replaced by compaction stay readable until vacuumed."""
+        _write_daily_silver(repository, days=4, entities=2)
+        before = TableLog(tmp_path / "silver").latest_version()
+
+        repository.compact("silver", target_file_bytes=10 * 1024**2)
+
+        assert len(TableLog(tmp_path / "silver").snapshot(before).files) == 4
+        assert len(repository.read_silver(version=before)) == 4 * 24 * 2
+
+    def test_vacuum_deletes_unreferenced_files(self, repository, tmp_path, monkeypatch):
+        """Test that vacuum drops old manifests and files only they referenced."""
+        _write_daily_silver(repository, days=4, entities=2)
+        repository.compact("silver", target_file_bytes=10 * 1024**2)
+        monkeypatch.setattr(manifest, "VACUUM_GRACE_SECONDS", -1)
+
+        log = TableLog(tmp_path / "silver")
+        deleted = log.vacuum(retain_versions=1)
+
+        assert len(deleted) == 4
+        assert log.versions() == [log.latest_version()]
+        assert len(list((tmp_path / "silver").glob("*.parquet"))) == 1
+        assert len(repository.read_silver()) == 4 * 24 * 2
+
+    def test_appends_vacuum_old_manifests(self, tmp_path):
+        """Test that appending batches keeps a bounded number of manifests."""
+        repository = PandasRepository(
+            Settings(storage_path=str(tmp_path), manifest_retain_versions=3)
+        )
+        _write_daily_silver(repository, days=10, entities=1)
+
+        log = TableLog(tmp_path / "silver")
+        assert len(log.versions()) <= 2 * 3
+        assert log.versions()[-1] == log.latest_version()
+        assert len(repository.read_silver()) == 10 * 24
+
+    def test_existing_files_are_bootstrapped(self, repository, tmp_path):
+        """Test that a layer written without a manifest is picked up on first read."""
+        df = pd.DataFrame(
+            {
+                "timestamp": pd.date_range("2026-02-01", periods=5, freq="h"),
+                "entity_id": "entity_0",
+                "value": 1.0,
+            }
+        )
+        df.to_parquet(tmp_path / "silver" / "legacy.parquet", index=False)
+
+        assert len(repository.read_silver()) == 5
+        assert TableLog(tmp_path / "silver").latest_version() == 1
+
+
+class TestParquetWriteOptions:
+    """Test per-layer parquet write settings."""
+
+    def test_silver_files_use_layer_settings(self, tmp_path):
+        """Test that codec, row-group size and sort order follow the silver settings."""
+        settings = Settings(
+            storage_path=str(tmp_path),
+            silver_parquet_compression="zstd",
+            silver_parquet_row_group_size=50,
+        )
+        repository = PandasRepository(settings)
+        _write_daily_silver(repository, days=1, entities=5)
+
+        path = tmp_path / "silver" / "batch_000.parquet"
+        metadata = pq.ParquetFile(path).metadata
+        df = pd.read_parquet(path)
+
+        assert metadata.row_group(0).column(0).compression == "ZSTD"
+        assert metadata.num_row_groups == 3
+        assert df["entity_id"].is_monotonic_increasing
+
+    def test_from_settings_rejects_unknown_layer(self):
+        """Test that only silver and gold have write options."""
+        with pytest.raises(ValueError):
+            ParquetWriteOptions.from_settings(Settings(), "bronze")
+
+    def test_spark_options(self):
+        """Test translation to Spark writer options."""
+        options = ParquetWriteOptions(compression="zstd", compression_level=9)
+
+        assert options.spark_options() == {
+            "compression": "zstd",
+            "parquet.enable.dictionary": "true",
+            "parquet.compression.codec.zstd.level": "9",
+        }
+
+
+class TestReadModes:
+    """Test dtype backend and memory-mapped layer reads."""
+
+    def test_pyarrow_backend_returns_arrow_dtypes(self, tmp_path):
+        """Test that the pyarrow backend keeps columns in Arrow buffers."""
+        repository = PandasRepository(
+            Settings(storage_path=str(tmp_path), read_dtype_backend="pyarrow")
+        )
+        _write_daily_silver(repository, days=2, entities=2)
+
+        df = repository.read_silver()
+
+        assert len(df) == 2 * 24 * 2
+        assert all(isinstance(dtype, pd.ArrowDtype) for dtype in df.dtypes)
+
+    def test_backends_return_same_filtered_rows(self, tmp_path):
+        """Test that filtered reads agree across dtype backends and memory mapping."""
+        numpy_repository = PandasRepository(
+            Settings(storage_path=str(tmp_path), read_memory_map=False)
+        )
+        _write_daily_silver(numpy_repository, days=5, entities=3)
+        arrow_repository = PandasRepository(
+            Settings(storage_path=str(tmp_path), read_dtype_backend="pyarrow")
+        )
+
+        query = {"entity_ids": ["entity_1"], "start": "2026-02-02", "end": "2026-02-03 12:00"}
+        expected = numpy_repository.read_silver(**query)
+        result = arrow_repository.read_silver(**query)
+
+        assert len(result) == len(expected) == 37
+        assert result["value"].astype(float).sum() == expected["value"].sum()
+
+
+def _write_daily_gold(repository: PandasRepository, days: int, entities: int) -> None:
+    """Write one gold file per day with a row for each entity."""
+    for day in range(days):
+        df = pd.DataFrame(
+            {
+                "entity_id": [f"entity_{i}" for i in range(entities)],
+                "date": (pd.Timestamp("2026-02-01") + pd.Timedelta(days=day)).date(),
+                "total_value": float(day),
+            }
+        )
+        repository.write_gold(df, _metadata(f"gold_{day:03d}", "gold"))
+
+
+class TestGoldSnapshot:
+    """Test the memory-mapped gold serving snapshot."""
+
+    @pytest.fixture
+    def snapshot_repository(self, tmp_path):
+        """Create a repository that publishes gold snapshots."""
+        return PandasRepository(Settings(storage_path=str(tmp_path), gold_snapshot_enabled=True))
+
+    def test_gold_write_publishes_snapshot(self, snapshot_repository, tmp_path):
+        """Test that each gold write publishes a snapshot of the latest gold version."""
+        _write_daily_gold(snapshot_repository, days=3, entities=2)
+
+        snapshot_path = tmp_path / "gold_snapshot"
+        assert current_version(snapshot_path) == TableLog(tmp_path / "gold").latest_version()
+        assert len(list(snapshot_path.glob("gold-*.arrow"))) == 2
+
+    def test_snapshot_reads_match_parquet_reads(self, snapshot_repository):
+        """Test that snapshot-served reads return the same rows as parquet reads."""
+        _write_daily_gold(snapshot_repository, days=5, entities=3)
+        query = {"entity_ids": ["entity_1"], "start": "2026-02-02", "end": "2026-02-04"}
+
+        from_snapshot = snapshot_repository.read_gold(**query)
+        from_parquet = snapshot_repository.read_gold(
+            **query, version=TableLog(snapshot_repository.settings.gold_full_path).latest_version()
+        )
+
+        assert len(from_snapshot) == len(from_parquet) == 3
+        assert from_snapshot["total_value"].tolist() == from_parquet["total_value"].tolist()
+        assert len(snapshot_repository.read_gold()) == 15
+
+    def test_snapshot_reads_wrap_arrow_buffers(self, snapshot_repository):
+        """Test that snapshot reads return Arrow-backed columns with the numpy backend."""
+        _write_daily_gold(snapshot_repository, days=2, entities=2)
+
+        df = snapshot_repository.read_gold()
+
+        assert snapshot_repository.settings.read_dtype_backend == "numpy"
+        assert all(isinstance(dtype, pd.ArrowDtype) for dtype in df.dtypes)
+
+    def test_compaction_republishes_snapshot(self, snapshot_repository, tmp_path):
+        """Test that compacting gold publishes a snapshot of the compacted version."""
+        _write_daily_gold(snapshot_repository, days=3, entities=2)
+
+        snapshot_repository.compact("gold", target_file_bytes=10 * 1024**2)
+
+        assert (
+            current_version(tmp_path / "gold_snapshot")
+            == TableLog(tmp_path / "gold").latest_version()
+        )
+        assert len(snapshot_repository.read_gold()) == 6
+
+    def test_reader_remaps_new_snapshot(self, snapshot_repository, tmp_path):
+        """Test that a long-lived reader picks up snapshots published after it mapped one."""
+        reader = SnapshotReader(tmp_path / "gold_snapshot")
+        _write_daily_gold(snapshot_repository, days=1, entities=2)
+        assert reader.table().num_rows == 2
+
+        df = pd.DataFrame({"entity_id": ["entity_9"], "date": [pd.Timestamp("2026-03-01").date()]})
+        snapshot_repository.write_gold(df, _metadata("gold_late", "gold"))
+
+        assert reader.table().num_rows == 3
+        assert reader.version == current_version(tmp_path / "gold_snapshot")
+
+    def test_older_snapshot_is_not_published(self, tmp_path):
+        """Test that the marker never moves back to an older version."""
+        table = pa.table({"entity_id": ["entity_0"]})
+
+        assert publish_snapshot(tmp_path, table, version=5)
+        assert not publish_snapshot(tmp_path, table, version=4)
+        assert current_version(tmp_path) == 5
+
+
+class TestDerivedTables:
+    """Test derived table storage and the latest-metadata lookup."""
+
+    def test_write_replaces_table_contents(self, repository):
+        """Test that each write is a new version holding only the new data."""
+        repository.write_table(pd.DataFrame({"entity_id": ["a"]}), "summary", _metadata("b1", "t"))
+        repository.write_table(pd.DataFrame({"entity_id": ["b"]}), "summary", _metadata("b2", "t"))
+
+        assert repository.table_version("summary") == 2
+        assert list(repository.read_table("summary")["entity_id"]) == ["b"]
+        assert list(repository.read_table("summary", version=1)["entity_id"]) == ["a"]
+
+    def test_append_adds_rows_once_per_batch(self, repository):
+        """Test that appends keep earlier batches and a rewritten batch replaces its rows."""
+        for batch_id, entity in [("b1", "a"), ("b2", "b"), ("b2", "c")]:
+            repository.write_table(
+                pd.DataFrame({"entity_id": [entity]}), "hourly", _metadata(batch_id, "t"), "append"
+            )
+
+        assert sorted(repository.read_table("hourly")["entity_id"]) == ["a", "c"]
+        with pytest.raises(ValueError):
+            repository.write_table(pd.DataFrame(), "hourly", _metadata("b3", "t"), "merge")
+
+    def test_unwritten_table_is_empty(self, repository):
+        """Test that a table never written has no version and reads empty."""
+        assert repository.table_version("summary") is None
+        assert repository.read_table("summary").empty
+
+    def test_rejects_unsafe_names(self, repository):
+        """Test that derived tables cannot be named like a layer or outside their directory."""
+        for name in ("gold", "../gold"):
+            with pytest.raises(ValueError):
+                repository.write_table(pd.DataFrame(), name, _metadata("b1", "t"))
+
+    def test_latest_metadata_per_layer(self, repository):
+        """Test that the metadata store returns the last metadata saved for a layer."""
+        repository.save_metadata(_metadata("b1", "gold"))
+        latest = _metadata("b2", "gold")
+        latest.input_versions = {"silver": 3}
+        repository.save_metadata(latest)
+        repository.save_metadata(_metadata("b3", "silver"))
+
+        stored = repository.latest_metadata("gold")
+
+        assert stored.batch_id == "b2"
+        assert stored.input_versions == {"silver": 3}
+        assert repository.latest_metadata("table_summary") is None
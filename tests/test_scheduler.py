@@ -0,0 +1,189 @@
+"""Test multi-source scheduler - planning, admission and concurrent batches."""
+
+import os
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from app.application.scheduler import (
+    Scheduler,
+    SourcePlan,
+    SourceWatermarks,
+    admit,
+    parse_sources,
+    plan_source,
+)
+from app.infrastructure.settings import Settings
+
+
+def _write_bronze(storage: Path, bronze_path: str, name: str, entity: str) -> Path:
+    """Write a day of hourly readings of one entity to a source's bronze path."""
+    directory = storage / bronze_path
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{name}.parquet"
+    pd.DataFrame(
+        {
+            "timestamp": pd.date_range("2026-02-20", periods=24, freq="h"),
+            "entity_id": [entity] * 24,
+            "value": [float(i) for i in range(24)],
+        }
+    ).to_parquet(path, index=False)
+    return path
+
+
+def _plan(source: str, backlog_bytes: int, memory_bytes: int) -> SourcePlan:
+    """Plan of a source with the given backlog and memory estimate."""
+    return SourcePlan(
+        source=source,
+        bronze_path=source,
+        files=1,
+        backlog_files=1,
+        backlog_bytes=backlog_bytes,
+        lag_seconds=0.0,
+        memory_bytes=memory_bytes,
+    )
+
+
+class TestParseSources:
+    """Test parsing of name=bronze_path source entries."""
+
+    def test_parses_entries(self):
+        """Test that every entry maps a source to its bronze path."""
+        assert parse_sources(["meters=bronze/meters", " grid = bronze/grid"]) == {
+            "meters": "bronze/meters",
+            "grid": "bronze/grid",
+        }
+
+    @pytest.mark.parametrize("entries", [["meters"], ["=bronze"], ["a=x", "a=y"]])
+    def test_rejects_invalid_entries(self, entries):
+        """Test that malformed and repeated entries are rejected."""
+        with pytest.raises(ValueError):
+            parse_sources(entries)
+
+
+class TestAdmit:
+    """Test admission of batches within the worker and memory budgets."""
+
+    def test_takes_batches_in_priority_order_up_to_the_workers(self):
+        """Test that no more batches start than there are free workers."""
+        pending = [_plan("a", 30, 10), _plan("b", 20, 10), _plan("c", 10, 10)]
+
+        admitted = admit(pending, running=1, reserved=10, workers=3, budget=0)
+
+        assert [plan.source for plan in admitted] == ["a", "b"]
+
+    def test_backfills_smaller_batches_that_fit(self):
+        """Test that a batch that fits starts while a larger one waits for memory."""
+        pending = [_plan("large", 30, 80), _plan("small", 10, 20)]
+
+        admitted = admit(pending, running=1, reserved=50, workers=4, budget=100)
+
+        assert [plan.source for plan in admitted] == ["small"]
+
+    def test_runs_a_batch_above_the_budget_alone(self):
+        """Test that an oversized batch waits for an idle pool, then runs by itself."""
+        pending = [_plan("huge", 30, 500), _plan("small", 10, 20)]
+
+        assert [p.source for p in admit(pending, 1, 20, workers=4, budget=100)] == ["small"]
+        assert [p.source for p in admit(pending, 0, 0, workers=4, budget=100)] == ["huge"]
+
+
+class TestPlanSource:
+    """Test backlog measurement."""
+
+    def test_counts_files_after_the_watermark(self, tmp_path):
+        """Test that only files changed since the last batch are backlog, but all use memory."""
+        old = _write_bronze(tmp_path, "bronze/meters", "old", "meter_1")
+        new = _write_bronze(tmp_path, "bronze/meters", "new", "meter_1")
+        os.utime(old, (1_000, 1_000))
+        os.utime(new, (2_000, 2_000))
+        settings = Settings(storage_path=str(tmp_path), scheduler_memory_per_row=100)
+
+        plan = plan_source(settings, "meters", "bronze/meters", watermark=1_500, now=2_600)
+
+        assert plan.files == 2
+        assert plan.backlog_files == 1
+        assert plan.backlog_bytes == new.stat().st_size
+        assert plan.lag_seconds == 600
+        assert plan.memory_bytes == 48 * 100
+
+
+class TestScheduler:
+    """Test scheduled batches of several sources."""
+
+    def _scheduler(self, tmp_path, workers: int = 1) -> Scheduler:
+        """Create a scheduler over two sources with a bronze file each."""
+        _write_bronze(tmp_path, "bronze/meters", "readings", "meter_1")
+        _write_bronze(tmp_path, "bronze/grid", "readings", "grid_1")
+        settings = Settings(storage_path=str(tmp_path), retry_delay=0)
+        sources = {"meters": "bronze/meters", "grid": "bronze/grid"}
+        return Scheduler(settings, sources, workers=workers)
+
+    def test_runs_a_batch_per_source(self, tmp_path):
+        """Test that every source gets its own batch and layer files."""
+        reports = self._scheduler(tmp_path).run()
+
+        assert {r.source: r.status for r in reports} == {
+            "meters": "succeeded",
+            "grid": "succeeded",
+        }
+        assert all(r.records_in == 24 and r.throughput > 0 for r in reports)
+        silver_files = sorted(p.stem for p in (tmp_path / "silver").glob("*.parquet"))
+        assert silver_files == sorted(r.batch_id for r in reports)
+        assert all(r.batch_id.endswith(f"_{r.source}") for r in reports)
+
+    def test_skips_sources_without_new_files(self, tmp_path):
+        """Test that a source runs again only once new bronze files arrive."""
+        scheduler = self._scheduler(tmp_path)
+        scheduler.run()
+        _write_bronze(tmp_path, "bronze/grid", "more", "grid_2")
+        os.utime(tmp_path / "bronze/grid/more.parquet")
+
+        reports = {r.source: r for r in scheduler.run()}
+
+        assert reports["meters"].status == "skipped"
+        assert reports["grid"].status == "succeeded"
+        assert reports["grid"].backlog_files == 1
+
+    def test_persists_the_latest_report_of_every_source(self, tmp_path):
+        """Test that each source's latest outcome is saved for other processes to export."""
+        scheduler = self._scheduler(tmp_path)
+        scheduler.run()
+        scheduler.run()
+
+        saved = {r["source"]: r for r in SourceWatermarks(scheduler.settings).reports()}
+
+        assert {source: r["status"] for source, r in saved.items()} == {
+            "meters": "skipped",
+            "grid": "skipped",
+        }
+        assert all(r["reported_at"] > 0 for r in saved.values())
+
+    def test_failed_source_keeps_its_backlog(self, tmp_path):
+        """Test that a failing source does not stop the others or advance its watermark."""
+        scheduler = self._scheduler(tmp_path)
+        (tmp_path / "bronze/grid/bad.parquet").write_bytes(b"not parquet")
+
+        reports = {r.source: r for r in scheduler.run()}
+
+        assert reports["meters"].status == "succeeded"
+        assert reports["grid"].status == "failed"
+        assert reports["grid"].error
+        assert SourceWatermarks(scheduler.settings).get("grid") is None
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork")
+    def test_runs_sources_in_worker_processes(self, tmp_path):
+        """Test that concurrent batches of different sources all land in the shared layers."""
+        reports = self._scheduler(tmp_path, workers=2).run()
+
+        assert [r.status for r in reports] == ["succeeded", "succeeded"]
+        silver = pd.concat(pd.read_parquet(p) for p in (tmp_path / "silver").glob("*.parquet"))
+        assert sorted(silver["entity_id"].unique()) == ["grid_1", "meter_1"]
+
+    def test_requires_separate_bronze_paths(self, tmp_path):
+        """Test that two sources cannot share a bronze path."""
+        settings = Settings(storage_path=str(tmp_path))
+
+        with pytest.raises(ValueError):
+            Scheduler(settings, {"a": "bronze", "b": "bronze"})
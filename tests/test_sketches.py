@@ -0,0 +1,191 @@
+"""Test probabilistic sketches."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.domain.sketches import (
+    HyperLogLog,
+    KllSketch,
+    grouped_kll_sketches,
+    merge_kll_bytes,
+    partition_sketches,
+)
+
+
+def _rank(values: np.ndarray, estimate: float) -> float:
+    """Fraction of values at or below an estimate."""
+    return float(np.mean(values <= estimate))
+
+
+class TestKllSketch:
+    """Test the KLL quantile sketch."""
+
+    def test_quantiles_within_rank_error(self):
+        """Test that estimated quantiles are within about 1% rank of the truth."""
+        values = np.random.default_rng(0).lognormal(size=200_000)
+        sketch = KllSketch(seed=0)
+        sketch.update_many(values)
+
+        for fraction, estimate in zip([0.5, 0.95, 0.99], sketch.quantiles([0.5, 0.95, 0.99])):
+            assert abs(_rank(values, estimate) - fraction) < 0.015
+
+    def test_memory_is_bounded(self):
+        """Test that the number of retained items does not grow with the input."""
+        sketch = KllSketch(k=100, seed=0)
+        for value in range(100_000):
+            sketch.update(value)
+
+        retained = sum(len(c) for c in sketch.compactors)
+        assert len(sketch) == 100_000
+        assert retained < 3 * 100 + 10
+
+    def test_merge_matches_single_sketch(self):
+        """Test that merged partial sketches summarize the combined input."""
+        values = np.random.default_rng(1).normal(size=100_000)
+        left, right = KllSketch(seed=1), KllSketch(seed=2)
+        left.update_many(values[:30_000])
+        right.update_many(values[30_000:])
+
+        left.merge(right)
+
+        assert len(left) == 100_000
+        assert abs(_rank(values, left.quantile(0.9)) - 0.9) < 0.015
+
+    def test_small_inputs_are_exact(self):
+        """Test that inputs smaller than k are kept exactly."""
+        sketch = KllSketch()
+        assert sketch.quantile(0.5) is None
+
+        sketch.update_many([5.0, 1.0, float("nan"), 3.0])
+
+        assert len(sketch) == 3
+        assert sketch.quantiles([0.0, 0.5, 1.0]) == [1.0, 3.0, 5.0]
+
+    def test_string_round_trip(self):
+        """Test that a serialized sketch answers the same quantiles."""
+        sketch = KllSketch(k=50, seed=0)
+        sketch.update_many(np.arange(10_000))
+
+        restored = KllSketch.from_string(sketch.to_string())
+
+        assert len(restored) == len(sketch)
+        assert restored.quantiles([0.1, 0.5, 0.9]) == sketch.quantiles([0.1, 0.5, 0.9])
+
+    def test_bytes_round_trip(self):
+        """Test that the binary form restores the sketch with four bytes per item."""
+        sketch = KllSketch(k=50, seed=0)
+        sketch.update_many(np.arange(10_000))
+
+        data = sketch.to_bytes()
+        restored = KllSketch.from_bytes(data)
+
+        items = sum(len(c) for c in sketch.compactors)
+        assert len(data) == 16 + 4 * len(sketch.compactors) + 4 * items
+        assert restored.compactors == sketch.compactors
+        assert len(restored) == len(sketch)
+
+    def test_merge_bytes_summarizes_all_inputs(self):
+        """Test that merging serialized sketches in one pass keeps the rank error."""
+        values = np.random.default_rng(3).normal(size=50_000)
+        blobs = []
+        for part in np.array_split(values, 500):
+            sketch = KllSketch(seed=3)
+            sketch.update_many(part)
+            blobs.append(sketch.to_bytes())
+
+        merged = merge_kll_bytes([*blobs, None])
+
+        assert len(merged) == 50_000
+        assert abs(_rank(values, merged.quantile(0.95)) - 0.95) < 0.015
+        assert merge_kll_bytes([]) is None
+        with pytest.raises(ValueError):
+            merge_kll_bytes([blobs[0], KllSketch(k=50).to_bytes()])
+
+    def test_grouped_sketches_match_per_group_sketches(self):
+        """Test that every group's quantiles equal those of its own sketch."""
+        rng = np.random.default_rng(4)
+        codes = np.concatenate([rng.integers(0, 3, 300), np.full(1_000, 3), [-1]])
+        values = rng.random(len(codes))
+        values[0] = np.nan
+
+        sketches, quantiles = grouped_kll_sketches(codes, values, 5, k=200, fractions=[0.5, 0.9])
+
+        for group in range(4):
+            sketch = KllSketch.from_bytes(sketches[group])
+            assert len(sketch) == np.count_nonzero((codes == group) & ~np.isnan(values))
+            # Serialized items are float32
+            assert list(quantiles[group]) == pytest.approx(sketch.quantiles([0.5, 0.9]), rel=1e-6)
+        assert not KllSketch.from_bytes(sketches[3]).is_exact
+        assert len(KllSketch.from_bytes(sketches[4])) == 0
+        assert np.isnan(quantiles[4]).all()
+
+
+class TestHyperLogLog:
+    """Test the HyperLogLog distinct-count sketch."""
+
+    @pytest.mark.parametrize("distinct", [0, 1, 50, 5_000, 200_000])
+    def test_count_within_error_bound(self, distinct):
+        """Test that estimates are within three standard errors of the true count."""
+        sketch = HyperLogLog()
+        sketch.add([f"entity_{i}" for i in range(distinct)] * 2)
+
+        assert abs(sketch.count() - distinct) <= 3 * sketch.relative_error * distinct
+
+    def test_merge_counts_the_union(self):
+        """Test that merged sketches count values shared by both only once."""
+        left, right, union = HyperLogLog(), HyperLogLog(), HyperLogLog()
+        left.add(range(60_000))
+        right.add(range(40_000, 100_000))
+        union.add(range(100_000))
+
+        left.merge(right)
+
+        assert left.count() == union.count()
+        with pytest.raises(ValueError):
+            left.merge(HyperLogLog(precision=10))
+
+    def test_string_round_trip(self):
+        """Test that a serialized sketch is compact and gives the same count."""
+        sketch = HyperLogLog(precision=14)
+        sketch.add(range(1_000))
+
+        data = sketch.to_string()
+        restored = HyperLogLog.from_string(data)
+
+        assert len(data) < len(sketch.registers)
+        assert restored.precision == 14
+        assert restored.count() == sketch.count()
+
+    def test_partition_sketches_per_date(self):
+        """Test that rows are counted and entities sketched per date."""
+        df = pd.DataFrame(
+            {
+                "entity_id": ["a", "b", "a", "c", None],
+                "date": pd.to_datetime(["2026-02-20"] * 2 + ["2026-02-21"] * 3).date,
+            }
+        )
+
+        counts, sketches = partition_sketches(df, "entity_id", "date")
+
+        assert counts == {"2026-02-20": 2, "2026-02-21": 2}
+        assert {day: sketch.count() for day, sketch in sketches.items()} == counts
+        assert partition_sketches(df, "entity_id", "missing") == ({}, {})
+
+    def test_spark_partition_sketches_merge_with_pandas(self, spark):
+        """Test that both engines hash values alike, so their sketches are identical."""
+        df = pd.DataFrame(
+            {
+                "entity_id": [f"entity_{i % 700}" for i in range(3_000)],
+                "date": pd.to_datetime(["2026-02-20", "2026-02-21"] * 1_500).date,
+            }
+        )
+
+        counts, sketches = partition_sketches(df, "entity_id", "date")
+        spark_counts, spark_sketches = partition_sketches(
+            spark.createDataFrame(df), "entity_id", "date"
+        )
+
+        assert spark_counts == counts
+        for day, sketch in sketches.items():
+            assert np.array_equal(spark_sketches[day].registers, sketch.registers)
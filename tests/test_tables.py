@@ -0,0 +1,206 @@
+"""Test derived tables - graph declaration, parallel builds and freshness."""
+
+import threading
+from datetime import datetime
+from typing import Any
+
+import pandas as pd
+import pytest
+
+from app.application.tables import TableBuilder, TableGraph
+from app.domain.models import BatchMetadata
+from app.domain.transformers import (
+    PandasEntitySummaryTransformer,
+    PandasSilverToGoldTransformer,
+    SingleInputTransformer,
+    TableTransformer,
+)
+from app.infrastructure.repositories.pandas_repository import PandasRepository
+from app.infrastructure.settings import Settings
+
+
+class CountTransformer(TableTransformer):
+    """Counts the rows of its input per entity."""
+
+    def __init__(self, input_name: str = "silver", column: str = "rows"):
+        """Initialize transformer."""
+        self.input_name = input_name
+        self.column = column
+
+    def transform(self, inputs: dict[str, Any]) -> Any:
+        """Count rows per entity."""
+        df = inputs[self.input_name]
+        return df.groupby("entity_id").size().rename(self.column).reset_index()
+
+
+class FailingTransformer(TableTransformer):
+    """Fails every build."""
+
+    def transform(self, inputs: dict[str, Any]) -> Any:
+        """Raise an error."""
+        raise RuntimeError("bad table")
+
+
+class BarrierTransformer(CountTransformer):
+    """Counts rows once every table sharing its barrier is building."""
+
+    def __init__(self, barrier: threading.Barrier):
+        """Initialize transformer."""
+        super().__init__()
+        self.barrier = barrier
+
+    def transform(self, inputs: dict[str, Any]) -> Any:
+        """Wait for the other builds, then count rows."""
+        self.barrier.wait()
+        return super().transform(inputs)
+
+
+class CountingRepository(PandasRepository):
+    """Pandas repository that counts table reads."""
+
+    def __init__(self, settings: Settings):
+        """Initialize repository."""
+        super().__init__(settings)
+        self.reads: list[str] = []
+
+    def read_table(self, name: str, version: Any = None) -> Any:
+        """Count the read, then read the table."""
+        self.reads.append(name)
+        return super().read_table(name, version)
+
+
+def _write_silver(repository: PandasRepository, batch_id: str, entities: list[str]) -> None:
+    """Write a day of hourly silver readings of some entities."""
+    timestamps = pd.date_range("2026-02-01", periods=24, freq="h")
+    df = pd.DataFrame(
+        {
+            "timestamp": timestamps.repeat(len(entities)),
+            "entity_id": entities * len(timestamps),
+            "value": 1.0,
+        }
+    )
+    metadata = BatchMetadata(
+        batch_id=batch_id,
+        source="test",
+        ingestion_time=datetime.now(),
+        record_count=len(df),
+        layer="silver",
+    )
+    repository.write_silver(df, metadata)
+
+
+def _graph() -> TableGraph:
+    """Daily aggregates and a per-entity count from silver, and a summary of the aggregates."""
+    graph = TableGraph()
+    graph.add("daily", ["silver"], SingleInputTransformer(PandasSilverToGoldTransformer()))
+    graph.add("counts", ["silver"], CountTransformer())
+    graph.add("summary", ["daily"], PandasEntitySummaryTransformer("daily"))
+    return graph
+
+
+@pytest.fixture
+def repository(tmp_path):
+    """Create a read-counting repository with one silver batch."""
+    repository = CountingRepository(Settings(storage_path=str(tmp_path)))
+    _write_silver(repository, "batch_1", ["entity_1", "entity_2"])
+    return repository
+
+
+class TestTableGraph:
+    """Test derived table declarations."""
+
+    def test_rejects_invalid_declarations(self):
+        """Test that names must be new and inputs declared before use."""
+        graph = _graph()
+
+        with pytest.raises(ValueError):
+            graph.add("daily", ["silver"], CountTransformer())
+        with pytest.raises(ValueError):
+            graph.add("gold", ["silver"], CountTransformer())
+        with pytest.raises(ValueError):
+            graph.add("mart", ["missing"], CountTransformer())
+
+    def test_upstream_selects_dependencies_in_build_order(self):
+        """Test that selecting a table selects the derived tables it reads."""
+        assert _graph().upstream(["summary"]) == ["daily", "summary"]
+
+
+class TestTableBuilder:
+    """Test building derived tables."""
+
+    def test_builds_every_table_reading_silver_once(self, repository):
+        """Test that all tables are built and silver is read once for both of its readers."""
+        reports = {r.table: r for r in TableBuilder(repository, _graph()).build()}
+
+        assert {name: r.status for name, r in reports.items()} == {
+            "daily": "built",
+            "counts": "built",
+            "summary": "built",
+        }
+        # The summary reads the daily table built in the same run, not a re-read
+        assert repository.reads == ["silver"]
+        summary = repository.read_table("summary")
+        assert list(summary["entity_id"]) == ["entity_1", "entity_2"]
+        assert list(summary["record_count"]) == [24, 24]
+        assert reports["summary"].input_versions == {"daily": reports["daily"].version}
+
+    def test_skips_tables_whose_inputs_are_unchanged(self, repository):
+        """Test that a second build reads nothing and rebuilds nothing."""
+        TableBuilder(repository, _graph()).build()
+        repository.reads.clear()
+
+        reports = TableBuilder(repository, _graph()).build()
+
+        assert {r.status for r in reports} == {"fresh"}
+        assert repository.reads == []
+
+    def test_rebuilds_downstream_of_a_changed_input(self, repository):
+        """Test that a new silver version rebuilds its readers and the tables reading them."""
+        TableBuilder(repository, _graph()).build()
+        _write_silver(repository, "batch_2", ["entity_3"])
+
+        reports = {r.table: r for r in TableBuilder(repository, _graph()).build()}
+
+        assert {name: r.status for name, r in reports.items()} == {
+            "daily": "built",
+            "counts": "built",
+            "summary": "built",
+        }
+        assert len(repository.read_table("summary")) == 3
+
+    def test_rebuilds_when_the_transformer_changes(self, repository):
+        """Test that a changed transformer configuration makes its table stale."""
+        TableBuilder(repository, _graph()).build()
+        graph = _graph()
+        graph.tables.pop("counts")
+        graph.add("counts", ["silver"], CountTransformer(column="readings"))
+
+        reports = {r.table: r.status for r in TableBuilder(repository, graph).build()}
+
+        assert reports == {"daily": "fresh", "summary": "fresh", "counts": "built"}
+        assert "readings" in repository.read_table("counts").columns
+
+    def test_failed_table_skips_its_dependents(self, repository):
+        """Test that tables reading a failed table are skipped while others still build."""
+        graph = TableGraph()
+        graph.add("broken", ["silver"], FailingTransformer())
+        graph.add("downstream", ["broken"], CountTransformer("broken"))
+        graph.add("counts", ["silver"], CountTransformer())
+
+        reports = {r.table: r for r in TableBuilder(repository, graph).build()}
+
+        assert reports["broken"].status == "failed"
+        assert reports["broken"].error == "bad table"
+        assert reports["downstream"].status == "skipped"
+        assert reports["counts"].status == "built"
+
+    def test_builds_independent_tables_in_parallel(self, repository):
+        """Test that tables with ready inputs are built at the same time."""
+        barrier = threading.Barrier(2, timeout=5)
+        graph = TableGraph()
+        graph.add("first", ["silver"], BarrierTransformer(barrier))
+        graph.add("second", ["silver"], BarrierTransformer(barrier))
+
+        reports = TableBuilder(repository, graph, max_workers=2).build()
+
+        assert [r.status for r in reports] == ["built", "built"]
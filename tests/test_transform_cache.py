@@ -0,0 +1,118 @@
+"""Test transform cache - content-addressed silver fragment caching."""
+
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import pytest
+
+from app.application.pipeline import Pipeline
+from app.domain import transformers
+from app.domain.transformers import (
+    PandasBronzeToSilverTransformer,
+    PandasSilverToGoldTransformer,
+)
+from app.infrastructure.repositories.pandas_repository import PandasRepository
+from app.infrastructure.settings import Settings
+from app.infrastructure.transform_cache import TransformCache
+
+
+@pytest.fixture
+def settings(tmp_path):
+    """Create settings backed by a temporary directory."""
+    return Settings(storage_path=str(tmp_path))
+
+
+def _write_bronze(settings: Settings, name: str, start: str) -> None:
+    """Write an hourly bronze file for two entities."""
+    timestamps = pd.date_range(start, periods=24, freq="h")
+    df = pd.DataFrame(
+        {
+            "timestamp": timestamps.repeat(2).astype(str),
+            "entity_id": ["entity_1", "entity_2"] * 24,
+            "value": [1.0, 2.0] * 24,
+        }
+    )
+    df.to_parquet(f"{settings.bronze_full_path}/{name}.parquet", index=False)
+
+
+def _pipeline(settings: Settings, cache: TransformCache) -> Pipeline:
+    """Create a pipeline with a transform cache."""
+    return Pipeline(
+        repository=PandasRepository(settings),
+        bronze_to_silver=PandasBronzeToSilverTransformer(),
+        silver_to_gold=PandasSilverToGoldTransformer(),
+        transform_cache=cache,
+    )
+
+
+class TestTransformCache:
+    """Test cached bronze to silver transformation."""
+
+    def test_rerun_reuses_cached_fragments(self, settings):
+        """Test that unchanged bronze files are not transformed again."""
+        cache = TransformCache(settings)
+        pipeline = _pipeline(settings, cache)
+        _write_bronze(settings, "day_1", "2026-02-01")
+        _write_bronze(settings, "day_2", "2026-02-02")
+
+        first, _, records_in, checksum = pipeline.to_silver_cached()
+
+        with patch.object(PandasBronzeToSilverTransformer, "transform_with_quarantine") as spy:
+            second, _, _, second_checksum = pipeline.to_silver_cached()
+
+        spy.assert_not_called()
+        assert cache.stats() == {"hits": 2, "misses": 2, "evictions": 0}
+        assert records_in == 96
+        assert len(first) == len(second) == 96
+        assert checksum == second_checksum
+
+    def test_only_new_files_are_transformed(self, settings):
+        """Test that adding a bronze file only transforms that file."""
+        cache = TransformCache(settings)
+        pipeline = _pipeline(settings, cache)
+        _write_bronze(settings, "day_1", "2026-02-01")
+        pipeline.to_silver_cached()
+
+        _write_bronze(settings, "day_2", "2026-02-02")
+        silver, _, _, _ = pipeline.to_silver_cached()
+
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 2
+        assert len(silver) == 96
+
+    def test_evicts_least_recently_used_entries(self, settings):
+        """Test that the cache stays within its size budget."""
+        cache = TransformCache(settings.model_copy(update={"transform_cache_max_bytes": 1}))
+        pipeline = _pipeline(settings, cache)
+        _write_bronze(settings, "day_1", "2026-02-01")
+        _write_bronze(settings, "day_2", "2026-02-02")
+
+        pipeline.to_silver_cached()
+
+        assert cache.evictions >= 1
+
+    def test_requires_a_repository_reading_bronze_per_file(self, settings):
+        """Test that a table-backed repository cannot be given a transform cache."""
+        repository = MagicMock(spec=["read_bronze", "write_silver", "write_gold"])
+
+        with pytest.raises(ValueError, match="does not read bronze per file"):
+            Pipeline(
+                repository=repository,
+                bronze_to_silver=PandasBronzeToSilverTransformer(),
+                silver_to_gold=PandasSilverToGoldTransformer(),
+                transform_cache=TransformCache(settings),
+            )
+
+    def test_fingerprint_covers_module_code_and_transform_version(self, monkeypatch):
+        """Test that module-level code and the transform version change the fingerprint."""
+        transformer = PandasBronzeToSilverTransformer()
+        fingerprint = transformer.fingerprint()
+
+        monkeypatch.setattr(transformers, "TRANSFORM_VERSION", transformers.TRANSFORM_VERSION + 1)
+        bumped = transformer.fingerprint()
+        monkeypatch.undo()
+        with patch.object(transformers, "_module_source", lambda name: f"# edited\n{name}"):
+            edited = transformer.fingerprint()
+
+        assert len({fingerprint, bumped, edited}) == 3
+        assert transformer.fingerprint() == fingerprint
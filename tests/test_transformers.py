@@ -1,11 +1,19 @@
 """Test transformers - domain layer unit tests."""
 
 import pandas as pd
+import pyarrow as pa
 import pytest
 
+from app.domain.sketches import KllSketch
 from app.domain.transformers import (
+    REJECT_NULL_ENTITY_ID,
+    REJECT_NULL_TIMESTAMP,
+    REJECT_UNPARSEABLE_TIMESTAMP,
     PandasBronzeToSilverTransformer,
+    PandasMultiGrainTransformer,
     PandasSilverToGoldTransformer,
+    SparkBronzeToSilverTransformer,
+    SparkSilverToGoldTransformer,
 )
 
 
@@ -15,31 +23,35 @@ class TestPandasBronzeToSilverTransformer:
     def test_removes_duplicates(self):
         """Test that duplicate records are removed."""
         transformer = PandasBronzeToSilverTransformer()
-        
+
         # Create data with duplicates
-        df = pd.DataFrame({
-            "timestamp": ["2026-02-20 10:00:00", "2026-02-20 10:00:00", "2026-02-20 11:00:00"],
-            "entity_id": ["entity_1", "entity_1", "entity_2"],
-            "value": [100.0, 100.0, 200.0],
-        })
-        
+        df = pd.DataFrame(
+            {
+                "timestamp": ["2026-02-20 10:00:00", "2026-02-20 10:00:00", "2026-02-20 11:00:00"],
+                "entity_id": ["entity_1", "entity_1", "entity_2"],
+                "value": [100.0, 100.0, 200.0],
+            }
+        )
+
         result = transformer.transform(df)
-        
+
         # Should have 2 records (one duplicate removed)
         assert len(result) == 2
 
     def test_handles_missing_timestamps(self):
         """Test that records with missing timestamps are dropped."""
         transformer = PandasBronzeToSilverTransformer()
-        
-        df = pd.DataFrame({
-            "timestamp": ["2026-02-20 10:00:00", None, "2026-02-20 11:00:00"],
-            "entity_id": ["entity_1", "entity_2", "entity_3"],
-            "value": [100.0, 200.0, 300.0],
-        })
-        
+
+        df = pd.DataFrame(
+            {
+                "timestamp": ["2026-02-20 10:00:00", None, "2026-02-20 11:00:00"],
+                "entity_id": ["entity_1", "entity_2", "entity_3"],
+                "value": [100.0, 200.0, 300.0],
+            }
+        )
+
         result = transformer.transform(df)
-        
+
         # Should have 2 records (null timestamp dropped)
         assert len(result) == 2
         assert result["timestamp"].notna().all()
@@ -47,18 +59,43 @@ class TestPandasBronzeToSilverTransformer:
     def test_adds_quality_flags(self):
         """Test that quality flags are added."""
         transformer = PandasBronzeToSilverTransformer()
-        
-        df = pd.DataFrame({
-            "timestamp": ["2026-02-20 10:00:00", "2026-02-20 11:00:00"],
-            "entity_id": ["entity_1", "entity_2"],
-            "value": [100.0, "invalid"],
-        })
-        
+
+        df = pd.DataFrame(
+            {
+                "timestamp": ["2026-02-20 10:00:00", "2026-02-20 11:00:00"],
+                "entity_id": ["entity_1", "entity_2"],
+                "value": [100.0, "invalid"],
+            }
+        )
+
         result = transformer.transform(df)
-        
+
         assert "value_is_valid" in result.columns
         assert "processed_at" in result.columns
 
+    def test_quarantines_rejected_rows_with_reason(self):
+        """Test that rejected rows are split off and tagged with a reason code."""
+        transformer = PandasBronzeToSilverTransformer()
+
+        df = pd.DataFrame(
+            {
+                "timestamp": ["2026-02-20 10:00:00", None, "not-a-date", "2026-02-20 11:00:00"],
+                "entity_id": ["entity_1", "entity_2", "entity_3", None],
+                "value": [100.0, 200.0, "invalid", 400.0],
+            }
+        )
+
+        silver, quarantine = transformer.transform_with_quarantine(df)
+
+        assert len(silver) == 1
+        assert len(silver) + len(quarantine) == len(df)
+        assert set(quarantine["reject_reason"]) == {
+            REJECT_NULL_TIMESTAMP,
+            REJECT_NULL_ENTITY_ID,
+            REJECT_UNPARSEABLE_TIMESTAMP,
+        }
+        assert quarantine.loc[quarantine["entity_id"] == "entity_3", "value"].iloc[0] == "invalid"
+
 
 class TestPandasSilverToGoldTransformer:
     """Test silver to gold transformation."""
@@ -66,19 +103,23 @@ class TestPandasSilverToGoldTransformer:
     def test_aggregates_by_entity_and_date(self):
         """Test that data is aggregated correctly."""
         transformer = PandasSilverToGoldTransformer()
-        
-        df = pd.DataFrame({
-            "timestamp": pd.to_datetime([
-                "2026-02-20 10:00:00",
-                "2026-02-20 11:00:00",
-                "2026-02-20 12:00:00",
-            ]),
-            "entity_id": ["entity_1", "entity_1", "entity_2"],
-            "value": [100.0, 200.0, 300.0],
-        })
-        
+
+        df = pd.DataFrame(
+            {
+                "timestamp": pd.to_datetime(
+                    [
+                        "2026-02-20 10:00:00",
+                        "2026-02-20 11:00:00",
+                        "2026-02-20 12:00:00",
+                    ]
+                ),
+                "entity_id": ["entity_1", "entity_1", "entity_2"],
+                "value": [100.0, 200.0, 300.0],
+            }
+        )
+
         result = transformer.transform(df)
-        
+
         # Should have 2 aggregated records (one per entity)
         assert len(result) == 2
         assert "total_value" in result.columns
@@ -88,30 +129,209 @@ class TestPandasSilverToGoldTransformer:
     def test_computes_derived_metrics(self):
         """Test that derived metrics are computed."""
         transformer = PandasSilverToGoldTransformer()
-        
-        df = pd.DataFrame({
-            "timestamp": pd.to_datetime(["2026-02-20 10:00:00", "2026-02-20 11:00:00"]),
-            "entity_id": ["entity_1", "entity_1"],
-            "value": [100.0, 200.0],
-        })
-        
+
+        df = pd.DataFrame(
+            {
+                "timestamp": pd.to_datetime(["2026-02-20 10:00:00", "2026-02-20 11:00:00"]),
+                "entity_id": ["entity_1", "entity_1"],
+                "value": [100.0, 200.0],
+            }
+        )
+
         result = transformer.transform(df)
-        
+
         assert "value_range" in result.columns
         assert "aggregated_at" in result.columns
         assert result["value_range"].iloc[0] == 100.0  # 200 - 100
 
+    def test_sketches_values_with_percentiles(self):
+        """Test that every entity-day gets exact percentiles and a sketch of its values."""
+        df = pd.DataFrame(
+            {
+                "timestamp": pd.date_range("2026-02-20", periods=96, freq="h"),
+                "entity_id": ["entity_1", "entity_2"] * 48,
+                "value": [float(i) for i in range(95)] + [None],
+            }
+        )
+
+        result = PandasSilverToGoldTransformer().transform(df.copy())
+
+        first = df[(df["entity_id"] == "entity_1") & (df["timestamp"].dt.day == 20)]["value"]
+        assert result["p50_value"].iloc[0] == sorted(first)[5]
+        assert result["p99_value"].iloc[0] == first.max()
+        for row in result.itertuples():
+            sketch = KllSketch.from_bytes(row.value_sketch)
+            assert len(sketch) == row.record_count
+            assert sketch.quantile(0.95) == row.p95_value
+
+    def test_arrow_backed_input_matches_numpy(self):
+        """Test that Arrow-backed silver aggregates to the same values as NumPy-backed silver."""
+        df = pd.DataFrame(
+            {
+                "timestamp": pd.date_range("2026-02-20", periods=72, freq="h"),
+                "entity_id": ["entity_1", "entity_2"] * 36,
+                "value": [float(i) for i in range(71)] + [None],
+            }
+        )
+        arrow_df = pa.Table.from_pandas(df, preserve_index=False).to_pandas(
+            types_mapper=pd.ArrowDtype
+        )
+
+        expected = PandasSilverToGoldTransformer().transform(df.copy())
+        result = PandasSilverToGoldTransformer().transform(arrow_df)
+
+        assert isinstance(result["total_value"].dtype, pd.ArrowDtype)
+        assert result["date"].astype(str).tolist() == expected["date"].astype(str).tolist()
+        for column in [
+            "total_value",
+            "avg_value",
+            "min_value",
+            "max_value",
+            "record_count",
+            "p95_value",
+        ]:
+            assert result[column].astype(float).tolist() == expected[column].astype(float).tolist()
+
     def test_handles_empty_dataframe(self):
         """Test that empty DataFrame is handled gracefully."""
         transformer = PandasSilverToGoldTransformer()
-        
-        df = pd.DataFrame({
-            "timestamp": [],
-            "entity_id": [],
-            "value": [],
-        })
-        
+
+        df = pd.DataFrame(
+            {
+                "timestamp": [],
+                "entity_id": [],
+                "value": [],
+            }
+        )
+
         result = transformer.transform(df)
-        
+
         # Should return empty DataFrame but with expected columns
         assert len(result) == 0
+
+
+class TestSparkBronzeToSilverTransformer:
+    """Test bronze to silver cleaning on Spark."""
+
+    def test_tagged_bronze_is_cached_until_released(self, spark):
+        """Test that silver and quarantine share one persisted scan that release frees."""
+        bronze = pd.DataFrame(
+            {
+                "timestamp": ["2026-02-20 10:00:00", None, "2026-02-20 12:00:00"],
+                "entity_id": ["entity_1", "entity_2", None],
+                "value": ["1.5", "2.5", "3.5"],
+            }
+        )
+        transformer = SparkBronzeToSilverTransformer()
+
+        silver, quarantine = transformer.transform_with_quarantine(spark.createDataFrame(bronze))
+
+        assert silver.count() == 1
+        assert quarantine.count() == 2
+        (tagged,) = transformer._persisted
+        assert tagged.is_cached
+        transformer.release()
+        assert not tagged.is_cached
+        assert transformer._persisted == []
+
+
+class TestSparkSilverToGoldTransformer:
+    """Test silver to gold aggregation on Spark."""
+
+    def test_sketches_are_aggregated_next_to_builtin_metrics(self, spark):
+        """Test that every entity-day gets its metrics and a deserializable value sketch."""
+        silver = pd.DataFrame(
+            {
+                "timestamp": pd.date_range("2026-01-01", periods=96, freq="h"),
+                "entity_id": ["entity_1", "entity_2"] * 48,
+                "value": [float(i) for i in range(96)],
+            }
+        )
+
+        gold = SparkSilverToGoldTransformer().transform(spark.createDataFrame(silver)).toPandas()
+        gold = gold.sort_values(["entity_id", "date"]).reset_index(drop=True)
+
+        assert len(gold) == 8
+        assert list(gold["record_count"]) == [12] * 8
+        for row in gold.itertuples():
+            sketch = KllSketch.from_bytes(row.value_sketch)
+            assert sketch.count == row.record_count
+            assert sketch.quantile(0.0) == row.min_value
+            assert sketch.quantile(1.0) == row.max_value
+
+    def test_matches_pandas_sketches_and_percentiles(self, spark):
+        """Test that both engines build the same sketches and percentiles from the same data."""
+        silver = pd.DataFrame(
+            {
+                "timestamp": pd.date_range("2026-01-01", periods=2_000, freq="min"),
+                "entity_id": ["entity_1", "entity_2"] * 1_000,
+                "value": [float((i * 7919) % 1_000) / 7 for i in range(2_000)],
+            }
+        )
+        columns = ["value_sketch", "p50_value", "p95_value", "p99_value"]
+
+        expected = PandasSilverToGoldTransformer().transform(silver.copy())
+        gold = SparkSilverToGoldTransformer().transform(spark.createDataFrame(silver)).toPandas()
+        gold = gold.sort_values(["entity_id", "date"]).reset_index(drop=True)
+
+        for column in columns:
+            assert list(gold[column]) == list(expected[column])
+
+
+class TestPandasMultiGrainTransformer:
+    """Test multi-grain gold aggregation."""
+
+    def _silver(self) -> pd.DataFrame:
+        """Two months of readings every 20 minutes, with a missing value."""
+        timestamps = pd.date_range("2026-01-30", "2026-02-02", freq="20min")
+        values = [float(i % 17) for i in range(len(timestamps))]
+        values[5] = None
+        return pd.DataFrame(
+            {
+                "timestamp": timestamps,
+                "entity_id": ["entity_1", "entity_2"] * (len(timestamps) // 2) + ["entity_1"],
+                "value": values,
+            }
+        )
+
+    @pytest.mark.parametrize(
+        "table,freq", [("gold_hourly", "h"), ("gold_daily", "D"), ("gold_monthly", "MS")]
+    )
+    def test_rollup_matches_direct_aggregation(self, table, freq):
+        """Test that every rolled-up grain equals grouping silver at that grain directly."""
+        silver = self._silver()
+        expected = (
+            silver.groupby(["entity_id", pd.Grouper(key="timestamp", freq=freq)])["value"]
+            .agg(["sum", "mean", "min", "max", "count"])
+            .reset_index()
+        )
+
+        result = PandasMultiGrainTransformer(["month", "hour", "day"]).transform(silver)[table]
+
+        assert list(result["period"]) == list(expected["timestamp"])
+        assert list(result["entity_id"]) == list(expected["entity_id"])
+        pd.testing.assert_series_equal(result["total_value"], expected["sum"], check_names=False)
+        pd.testing.assert_series_equal(result["avg_value"], expected["mean"], check_names=False)
+        assert list(result["record_count"]) == list(expected["count"])
+        assert list(result["value_range"]) == list(expected["max"] - expected["min"])
+
+    def test_outputs_only_the_requested_grains(self):
+        """Test that the tables follow the requested grains, finest first."""
+        transformer = PandasMultiGrainTransformer(["month", "day"])
+
+        result = transformer.transform(self._silver())
+
+        assert transformer.tables == ["gold_daily", "gold_monthly"]
+        assert list(result) == ["gold_daily", "gold_monthly"]
+        assert list(result["gold_monthly"]["period"].astype(str)) == [
+            "2026-01-01",
+            "2026-02-01",
+            "2026-01-01",
+            "2026-02-01",
+        ]
+
+    @pytest.mark.parametrize("grains", [[], ["week"]])
+    def test_rejects_invalid_grains(self, grains):
+        """Test that unknown or missing grains are rejected."""
+        with pytest.raises(ValueError):
+            PandasMultiGrainTransformer(grains)
@@ -0,0 +1,89 @@
+"""Test validation - domain layer validation tests."""
+
+import numpy as np
+import pandas as pd
+
+from app.domain.validation import (
+    required_sample_size,
+    validate_silver_quality,
+    validate_silver_quality_sampled,
+)
+
+
+def _silver_frame(rows: int, invalid_every: int = 0) -> pd.DataFrame:
+    """Build a silver-shaped DataFrame with optional invalid values."""
+    value_is_valid = np.ones(rows, dtype=bool)
+    if invalid_every:
+        value_is_valid[::invalid_every] = False
+    return pd.DataFrame(
+        {
+            "timestamp": pd.date_range("2026-02-01", periods=rows, freq="min"),
+            "entity_id": [f"entity_{i % 10}" for i in range(rows)],
+            "value": np.arange(rows, dtype=float),
+            "value_is_valid": value_is_valid,
+        }
+    )
+
+
+class TestRequiredSampleSize:
+    """Test sample size derivation."""
+
+    def test_sample_size_grows_with_confidence(self):
+        """Test that a higher confidence level needs a larger sample."""
+        assert required_sample_size(1_000_000, 0.99, 0.01) > required_sample_size(
+            1_000_000, 0.95, 0.01
+        )
+
+    def test_sample_size_is_bounded_by_population(self):
+        """Test that small batches are never over-sampled."""
+        assert required_sample_size(100, 0.95, 0.01) <= 100
+        assert required_sample_size(0) == 0
+
+
+class TestSampledSilverValidation:
+    """Test sampling-based silver validation."""
+
+    def test_clean_batch_is_validated_on_sample_only(self):
+        """Test that a clean batch is validated from a sample with an estimate."""
+        df = _silver_frame(200_000)
+
+        result = validate_silver_quality_sampled(df, margin=0.02, seed=42)
+
+        assert result.is_valid
+        assert result.sampled
+        assert result.records_validated < len(df)
+        assert result.estimated_failure_rate == 0.0
+        low, high = result.confidence_interval
+        assert low == 0.0 and 0.0 < high < 0.02
+
+    def test_escalates_to_full_validation_above_threshold(self):
+        """Test that an estimate above the threshold triggers full validation."""
+        df = _silver_frame(200_000, invalid_every=10)
+
+        result = validate_silver_quality_sampled(df, margin=0.02, threshold=0.05, seed=42)
+
+        assert result.is_valid
+        assert not result.sampled
+        assert result.records_validated == len(df)
+        assert 0.05 < result.estimated_failure_rate < 0.15
+        assert "exceeds threshold" in result.warnings[0]
+        assert result.warnings[1:] == validate_silver_quality(df).warnings
+
+    def test_duplicates_in_sample_escalate_to_full_validation(self):
+        """Test that duplicate keys found in the sample fail the batch with the exact count."""
+        df = _silver_frame(100_000)
+        df = pd.concat([df, df], ignore_index=True)
+
+        result = validate_silver_quality_sampled(df, margin=0.02, seed=42)
+
+        assert not result.is_valid
+        assert not result.sampled
+        assert result.errors == validate_silver_quality(df).errors
+        assert result.records_failed == 100_000
+        assert "duplicate keys in sample" in result.warnings[0]
+
+    def test_small_batch_falls_back_to_full_validation(self):
+        """Test that batches smaller than the sample size are fully validated."""
+        df = _silver_frame(100)
+
+        assert validate_silver_quality_sampled(df) == validate_silver_quality(df)